@@ -0,0 +1,31 @@
+"""add keyword registry version counters
+
+Revision ID: 202603041000
+Revises: 202603021230
+Create Date: 2026-03-04 10:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "202603041000"
+down_revision: Union[str, None] = "202603021230"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "keyword_registry_versions",
+        sa.Column("tenant_id", sa.UUID(), nullable=False),
+        sa.Column("version", sa.BigInteger(), nullable=False, server_default=sa.text("0")),
+        sa.Column("updated_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint("tenant_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("keyword_registry_versions")
@@ -0,0 +1,36 @@
+"""add shared rate limit buckets
+
+Revision ID: 202603051000
+Revises: 202603041000
+Create Date: 2026-03-05 10:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "202603051000"
+down_revision: Union[str, None] = "202603041000"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Unlogged: bucket state is disposable, so skip WAL for these hot-row updates.
+    op.execute(
+        """
+        CREATE UNLOGGED TABLE rate_limit_buckets (
+            bucket_key TEXT PRIMARY KEY,
+            tokens DOUBLE PRECISION NOT NULL,
+            last_allowed BOOLEAN NOT NULL DEFAULT true,
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+            expires_at TIMESTAMPTZ NOT NULL
+        )
+        """
+    )
+    op.execute("CREATE INDEX idx_rate_limit_buckets_expires_at ON rate_limit_buckets (expires_at)")
+
+
+def downgrade() -> None:
+    op.drop_table("rate_limit_buckets")
@@ -0,0 +1,32 @@
+"""add running-job lease expiry index for set-based reclaim
+
+Revision ID: 202603061000
+Revises: 202603051000
+Create Date: 2026-03-06 10:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "202603061000"
+down_revision: Union[str, None] = "202603051000"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # idx_jobs_worker_lease leads with claimed_by_worker; reclaim scans by expiry alone.
+    op.create_index(
+        "idx_jobs_running_lease_expires",
+        "jobs",
+        ["lease_expires_at"],
+        unique=False,
+        postgresql_where=sa.text("status = 'running'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_jobs_running_lease_expires", table_name="jobs")
@@ -0,0 +1,41 @@
+"""add workflow job state-change outbox
+
+Revision ID: 202603071000
+Revises: 202603061000
+Create Date: 2026-03-07 10:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = "202603071000"
+down_revision: Union[str, None] = "202603061000"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "workflow_job_events",
+        sa.Column("id", sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column("workflow_run_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("step_key", sa.Text(), nullable=False),
+        sa.Column("job_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("job_status", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False, server_default=sa.text("now()")),
+    )
+    op.create_index(
+        "idx_workflow_job_events_run",
+        "workflow_job_events",
+        ["workflow_run_id", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_workflow_job_events_run", table_name="workflow_job_events")
+    op.drop_table("workflow_job_events")
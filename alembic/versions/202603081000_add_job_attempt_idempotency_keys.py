@@ -0,0 +1,34 @@
+"""add worker idempotency keys to job attempts
+
+Revision ID: 202603081000
+Revises: 202603071000
+Create Date: 2026-03-08 10:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "202603081000"
+down_revision: Union[str, None] = "202603071000"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("job_attempts", sa.Column("claim_key", sa.Text(), nullable=True))
+    op.add_column("job_attempts", sa.Column("result_key", sa.Text(), nullable=True))
+    op.create_index(
+        "idx_job_attempts_worker_claim_key",
+        "job_attempts",
+        ["worker_id", "claim_key"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_job_attempts_worker_claim_key", table_name="job_attempts")
+    op.drop_column("job_attempts", "result_key")
+    op.drop_column("job_attempts", "claim_key")
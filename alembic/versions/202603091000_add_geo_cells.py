@@ -0,0 +1,54 @@
+"""add image geohash column and geo_cells cluster table
+
+Revision ID: 202603091000
+Revises: 202603081000
+Create Date: 2026-03-09 10:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = "202603091000"
+down_revision: Union[str, None] = "202603081000"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("image_metadata", sa.Column("geohash", sa.String(length=12), nullable=True))
+    op.create_index(
+        "idx_image_metadata_tenant_geohash",
+        "image_metadata",
+        ["tenant_id", "geohash"],
+        unique=False,
+    )
+    op.create_table(
+        "geo_cells",
+        sa.Column("tenant_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("precision", sa.Integer(), nullable=False),
+        sa.Column("cell", sa.String(length=12), nullable=False),
+        sa.Column("center_lat", sa.Float(), nullable=False),
+        sa.Column("center_lon", sa.Float(), nullable=False),
+        sa.Column("image_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("lat_sum", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("lon_sum", sa.Float(), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("tenant_id", "precision", "cell"),
+    )
+    op.create_index(
+        "idx_geo_cells_tenant_precision_center",
+        "geo_cells",
+        ["tenant_id", "precision", "center_lat", "center_lon"],
+        unique=False,
+    )
+    # Existing rows are backfilled per tenant with `zoltag rebuild-geo-index`.
+
+
+def downgrade() -> None:
+    op.drop_index("idx_geo_cells_tenant_precision_center", table_name="geo_cells")
+    op.drop_table("geo_cells")
+    op.drop_index("idx_image_metadata_tenant_geohash", table_name="image_metadata")
+    op.drop_column("image_metadata", "geohash")
@@ -0,0 +1,58 @@
+"""add email outbox
+
+Revision ID: 202603101000
+Revises: 202603091000
+Create Date: 2026-03-10 10:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = "202603101000"
+down_revision: Union[str, None] = "202603091000"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "email_outbox",
+        sa.Column("id", sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column("tenant_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("tenants.id", ondelete="CASCADE"), nullable=True),
+        sa.Column("kind", sa.Text(), nullable=False),
+        sa.Column("to_email", sa.Text(), nullable=False),
+        sa.Column("subject", sa.Text(), nullable=False),
+        sa.Column("html_body", sa.Text(), nullable=True),
+        sa.Column("text_body", sa.Text(), nullable=True),
+        sa.Column("status", sa.Text(), nullable=False, server_default="pending"),
+        sa.Column("attempt_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("max_attempts", sa.Integer(), nullable=False, server_default="5"),
+        sa.Column("next_attempt_at", sa.DateTime(), nullable=False, server_default=sa.text("now()")),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("provider_message_id", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False, server_default=sa.text("now()")),
+        sa.Column("sent_at", sa.DateTime(), nullable=True),
+        sa.CheckConstraint("status in ('pending','sent','failed')", name="ck_email_outbox_status"),
+    )
+    op.create_index(
+        "idx_email_outbox_status_next_attempt",
+        "email_outbox",
+        ["status", "next_attempt_at"],
+        unique=False,
+    )
+    op.create_index(
+        "idx_email_outbox_tenant_sent",
+        "email_outbox",
+        ["tenant_id", "sent_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_email_outbox_tenant_sent", table_name="email_outbox")
+    op.drop_index("idx_email_outbox_status_next_attempt", table_name="email_outbox")
+    op.drop_table("email_outbox")
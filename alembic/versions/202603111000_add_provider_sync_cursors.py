@@ -0,0 +1,41 @@
+"""add provider sync cursors
+
+Revision ID: 202603111000
+Revises: 202603101000
+Create Date: 2026-03-11 10:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = "202603111000"
+down_revision: Union[str, None] = "202603101000"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "provider_sync_cursors",
+        sa.Column(
+            "provider_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("tenant_provider_integrations.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("tenant_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("provider_type", sa.String(length=32), nullable=False),
+        sa.Column("cursor", sa.Text(), nullable=False),
+        sa.Column("state", postgresql.JSONB(astext_type=sa.Text()), nullable=False, server_default=sa.text("'{}'::jsonb")),
+        sa.Column("updated_at", sa.DateTime(), nullable=False, server_default=sa.text("now()")),
+    )
+    op.create_index("ix_provider_sync_cursors_tenant_id", "provider_sync_cursors", ["tenant_id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_provider_sync_cursors_tenant_id", table_name="provider_sync_cursors")
+    op.drop_table("provider_sync_cursors")
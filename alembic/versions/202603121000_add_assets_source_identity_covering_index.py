@@ -0,0 +1,52 @@
+"""add covering index for bulk sync source lookups
+
+Revision ID: 202603121000
+Revises: 202603111000
+Create Date: 2026-03-12 10:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "202603121000"
+down_revision: Union[str, None] = "202603111000"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    with op.get_context().autocommit_block():
+        op.execute(
+            sa.text(
+                """
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS
+                    idx_assets_tenant_source_identity_inc_rev
+                ON assets (tenant_id, source_provider, source_key)
+                INCLUDE (id, source_rev, provider_id, created_at)
+                """
+            )
+        )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    with op.get_context().autocommit_block():
+        op.execute(
+            sa.text(
+                """
+                DROP INDEX CONCURRENTLY IF EXISTS
+                    idx_assets_tenant_source_identity_inc_rev
+                """
+            )
+        )
@@ -0,0 +1,37 @@
+"""add geo_cell_deltas journal
+
+Revision ID: 202603131000
+Revises: 202603121000
+Create Date: 2026-03-13 10:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = "202603131000"
+down_revision: Union[str, None] = "202603121000"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "geo_cell_deltas",
+        sa.Column("id", sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column("tenant_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("cell", sa.String(length=12), nullable=False),
+        sa.Column("image_count", sa.Integer(), nullable=False),
+        sa.Column("lat_sum", sa.Float(), nullable=False),
+        sa.Column("lon_sum", sa.Float(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False, server_default=sa.text("now()")),
+    )
+    op.create_index("idx_geo_cell_deltas_tenant", "geo_cell_deltas", ["tenant_id", "id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("idx_geo_cell_deltas_tenant", table_name="geo_cell_deltas")
+    op.drop_table("geo_cell_deltas")
@@ -0,0 +1,5 @@
+"""Reproducible performance benchmarks for Zoltag hot paths.
+
+Run ``python -m benchmarks.run --help`` (or ``make bench``). See
+``benchmarks/run.py`` for baselines and regression thresholds.
+"""
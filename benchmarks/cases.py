@@ -0,0 +1,358 @@
+"""Benchmark cases for the hot paths of the API, worker and sync pipeline.
+
+Each case is a ``Benchmark``:
+
+- ``run(ctx)`` is the timed call. It returns the number of operations it
+  performed, which is used for throughput cases; ``None`` means one.
+- ``setup(ctx)`` is optional and runs untimed before every repetition.
+- ``teardown(ctx)`` is optional and runs untimed after every repetition.
+
+Router handlers are called directly (unwrapped from ``offload``), with their
+FastAPI parameter defaults resolved. This keeps HTTP and JSON encoding out of
+the numbers.
+"""
+
+from __future__ import annotations
+
+import inspect
+import io
+import json
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+from fastapi.params import Depends as DependsParam
+from pydantic.fields import FieldInfo
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.requests import Request
+
+from zoltag.auth.models import UserProfile
+from zoltag.tenant import Tenant
+
+from benchmarks.synthetic import BENCH_TAG_TYPE, SyntheticTenant
+
+
+@dataclass
+class BenchContext:
+    """Everything a case needs: database, tenant, a super-admin user and scratch space."""
+
+    session_factory: sessionmaker
+    synthetic: SyntheticTenant
+    work_dir: Path
+    tenant: Tenant = field(init=False)
+    user: UserProfile = field(init=False)
+    db: Optional[Session] = None
+    state: Dict[str, Any] = field(default_factory=dict)
+
+    def __post_init__(self):
+        self.tenant = Tenant(
+            id=self.synthetic.tenant_id,
+            name=self.synthetic.identifier,
+            identifier=self.synthetic.identifier,
+            key_prefix=self.synthetic.identifier,
+        )
+        # UUID columns bind UUID objects on every dialect (string ids need the SQLite shim).
+        self.tenant.id = self.synthetic.tenant_id
+        self.user = UserProfile(
+            supabase_uid=uuid.UUID(int=0),
+            email="bench@example.com",
+            is_active=True,
+            is_super_admin=True,
+        )
+
+    def session(self) -> Session:
+        if self.db is None:
+            self.db = self.session_factory()
+        return self.db
+
+    def close(self) -> None:
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+    def sample_image_id(self) -> int:
+        index = self.state.get("sample_index", 0)
+        self.state["sample_index"] = index + 1
+        return self.synthetic.sample_image_ids[index % len(self.synthetic.sample_image_ids)]
+
+
+@dataclass
+class Benchmark:
+    name: str
+    run: Callable[[BenchContext], Optional[int]]
+    setup: Optional[Callable[[BenchContext], None]] = None
+    teardown: Optional[Callable[[BenchContext], None]] = None
+
+
+BENCHMARKS: Dict[str, Benchmark] = {}
+
+
+def benchmark(name: str, **options) -> Callable:
+    def decorator(func: Callable[[BenchContext], Optional[int]]):
+        BENCHMARKS[name] = Benchmark(name=name, run=func, **options)
+        return func
+
+    return decorator
+
+
+def call_handler(handler: Callable, **overrides) -> Any:
+    """Call a FastAPI handler directly, resolving ``Query(...)`` defaults."""
+    func = inspect.unwrap(handler)
+    kwargs = {}
+    for name, parameter in inspect.signature(func).parameters.items():
+        if name in overrides:
+            kwargs[name] = overrides[name]
+            continue
+        default = parameter.default
+        if isinstance(default, DependsParam):
+            raise TypeError(f"{func.__name__}() needs dependency {name!r}")
+        if isinstance(default, FieldInfo):
+            default = default.default
+        if default is inspect.Parameter.empty:
+            raise TypeError(f"{func.__name__}() needs argument {name!r}")
+        kwargs[name] = default
+    return func(**kwargs)
+
+
+def _request(path: str) -> Request:
+    return Request({"type": "http", "method": "GET", "path": path, "headers": [], "query_string": b""})
+
+
+def _list_images(ctx: BenchContext, **params) -> None:
+    from zoltag.routers.images.core import list_images
+
+    call_handler(
+        list_images,
+        request=_request("/api/v1/images"),
+        tenant=ctx.tenant,
+        current_user=ctx.user,
+        db=ctx.session(),
+        **params,
+    )
+    ctx.session().rollback()
+
+
+def _keyword(ctx: BenchContext, rank: int) -> str:
+    return list(ctx.synthetic.keywords)[rank]
+
+
+# --- list_images filter combinations ------------------------------------------------
+
+
+@benchmark("list_images.browse")
+def list_images_browse(ctx: BenchContext):
+    _list_images(ctx, limit=100)
+
+
+@benchmark("list_images.deep_offset")
+def list_images_deep_offset(ctx: BenchContext):
+    _list_images(ctx, limit=100, offset=min(5000, max(0, ctx.synthetic.asset_count - 100)))
+
+
+@benchmark("list_images.rating")
+def list_images_rating(ctx: BenchContext):
+    _list_images(ctx, limit=100, rating=2, rating_operator="gte", hide_zero_rating=True)
+
+
+@benchmark("list_images.category_filters")
+def list_images_category_filters(ctx: BenchContext):
+    filters = {
+        "animals": {"keywords": [_keyword(ctx, 0), _keyword(ctx, 1)], "operator": "OR"},
+        "places": {"keywords": [_keyword(ctx, 30)], "operator": "OR"},
+    }
+    _list_images(ctx, limit=100, category_filters=json.dumps(filters))
+
+
+@benchmark("list_images.permatag")
+def list_images_permatag(ctx: BenchContext):
+    _list_images(ctx, limit=100, permatag_keyword=_keyword(ctx, 2), permatag_signum=1)
+
+
+@benchmark("list_images.ml_score")
+def list_images_ml_score(ctx: BenchContext):
+    _list_images(ctx, limit=100, ml_keyword=_keyword(ctx, 3), ml_tag_type=BENCH_TAG_TYPE, order_by="ml_score")
+
+
+@benchmark("list_images.text_lexical")
+def list_images_text_lexical(ctx: BenchContext):
+    _list_images(ctx, limit=100, text_query=_keyword(ctx, 4).replace("-", " "))
+
+
+def _install_query_embedding(ctx: BenchContext) -> None:
+    from zoltag.routers.images import core
+
+    # Query encoding is model inference, not search; use a fixed vector of the tenant's dimension.
+    vector = np.random.default_rng(7).normal(size=ctx.synthetic.embedding_dim).astype(np.float32)
+    vector /= np.linalg.norm(vector)
+    ctx.state["query_embedding"] = core._get_text_query_embedding
+    core._get_text_query_embedding = lambda _text_query: vector
+
+
+def _restore_query_embedding(ctx: BenchContext) -> None:
+    from zoltag.routers.images import core
+
+    core._get_text_query_embedding = ctx.state.pop("query_embedding")
+
+
+@benchmark("list_images.text_hybrid", setup=_install_query_embedding, teardown=_restore_query_embedding)
+def list_images_text_hybrid(ctx: BenchContext):
+    _list_images(
+        ctx,
+        limit=100,
+        text_query=_keyword(ctx, 5).replace("-", " "),
+        hybrid_vector_weight=0.6,
+        hybrid_lexical_weight=0.4,
+    )
+
+
+# --- similarity, stats and tag hydration ------------------------------------------------
+
+
+@benchmark("images.similar")
+def images_similar(ctx: BenchContext):
+    from zoltag.routers.images.core import get_similar_images
+
+    call_handler(get_similar_images, image_id=ctx.sample_image_id(), tenant=ctx.tenant, db=ctx.session())
+    ctx.session().rollback()
+
+
+def _use_bench_sessions(module_name: str):
+    def setup(ctx: BenchContext) -> None:
+        import importlib
+
+        module = importlib.import_module(module_name)
+        ctx.state[module_name] = module.SessionLocal
+        module.SessionLocal = ctx.session_factory
+
+    def teardown(ctx: BenchContext) -> None:
+        import importlib
+
+        importlib.import_module(module_name).SessionLocal = ctx.state.pop(module_name)
+
+    return setup, teardown
+
+
+_stats_setup, _stats_teardown = _use_bench_sessions("zoltag.routers.images.stats")
+
+
+@benchmark("images.stats", setup=_stats_setup, teardown=_stats_teardown)
+def images_stats(ctx: BenchContext):
+    from zoltag.routers.images.stats import _compute_image_stats
+
+    _compute_image_stats(ctx.tenant.id, True)
+
+
+@benchmark("tags.current_for_page")
+def tags_current_for_page(ctx: BenchContext):
+    from zoltag.routers.filtering import compute_current_tags_for_images
+
+    start = ctx.synthetic.first_image_id + (ctx.state.get("page", 0) * 100) % max(1, ctx.synthetic.asset_count - 100)
+    ctx.state["page"] = ctx.state.get("page", 0) + 1
+    image_ids = list(range(start, start + min(100, ctx.synthetic.asset_count)))
+    compute_current_tags_for_images(ctx.session(), ctx.tenant, image_ids, BENCH_TAG_TYPE)
+    return len(image_ids)
+
+
+# --- worker claim throughput ---------------------------------------------------------
+
+WORKER_CLAIM_JOBS = 200
+
+
+_use_worker_sessions, _restore_worker_sessions = _use_bench_sessions("zoltag.worker")
+
+
+def _enqueue_claimable_jobs(ctx: BenchContext) -> None:
+    from zoltag.metadata import Job, JobDefinition
+
+    _use_worker_sessions(ctx)
+    db = ctx.session_factory()
+    try:
+        definition = db.query(JobDefinition).filter(JobDefinition.key == "bench-noop").first()
+        if definition is None:
+            definition = JobDefinition(id=uuid.uuid4(), key="bench-noop", description="benchmark", timeout_seconds=60)
+            db.add(definition)
+            db.flush()
+        now = datetime.utcnow()
+        db.add_all(
+            Job(
+                id=uuid.uuid4(),
+                tenant_id=ctx.tenant.id,
+                definition_id=definition.id,
+                status="queued",
+                priority=100,
+                queued_at=now,
+                scheduled_for=now,
+                payload={},
+                max_attempts=1,
+            )
+            for _ in range(WORKER_CLAIM_JOBS)
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+@benchmark("worker.claim", setup=_enqueue_claimable_jobs, teardown=_restore_worker_sessions)
+def worker_claim(ctx: BenchContext):
+    from zoltag import worker
+
+    claimed = 0
+    while worker._claim_next_job(
+        worker_id="bench-worker",
+        hostname="bench",
+        version="bench",
+        lease_seconds=300,
+        queues=["default"],
+    ):
+        claimed += 1
+    return claimed
+
+
+# --- sync pipeline -----------------------------------------------------------------
+
+SYNC_FILES = 20
+
+
+def _write_sync_files(ctx: BenchContext) -> None:
+    from PIL import Image
+
+    batch = ctx.state.get("sync_batch", 0)
+    ctx.state["sync_batch"] = batch + 1
+    folder = ctx.work_dir / "sync" / f"batch-{batch:04d}"
+    folder.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(batch)
+    paths = []
+    for index in range(SYNC_FILES):
+        pixels = rng.integers(0, 255, size=(480, 640, 3), dtype=np.uint8)
+        buffer = io.BytesIO()
+        Image.fromarray(pixels).save(buffer, format="JPEG", quality=85)
+        path = folder / f"bench-{batch:04d}-{index:03d}.jpg"
+        path.write_bytes(buffer.getvalue())
+        paths.append(str(path))
+    ctx.state["sync_paths"] = paths
+
+
+@benchmark("sync.process_storage_entry", setup=_write_sync_files)
+def sync_process_storage_entry(ctx: BenchContext):
+    from zoltag.routers.local import _LocalThumbnailBucket
+    from zoltag.storage.local_provider import LocalFilesystemProvider
+    from zoltag.sync_pipeline import process_storage_entry
+
+    thumbnail_dir = ctx.work_dir / "thumbnails"
+    provider = LocalFilesystemProvider(thumbnail_dir=thumbnail_dir)
+    bucket = _LocalThumbnailBucket(thumbnail_dir)
+    db = ctx.session()
+    paths: List[str] = ctx.state.pop("sync_paths")
+    for path in paths:
+        process_storage_entry(
+            db=db,
+            tenant=ctx.tenant,
+            entry=provider.get_entry(path),
+            provider=provider,
+            thumbnail_bucket=bucket,
+        )
+        db.commit()
+    return len(paths)
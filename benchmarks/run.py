@@ -0,0 +1,292 @@
+"""Run benchmarks against a synthetic tenant and compare with a JSON baseline.
+
+Examples:
+  python -m benchmarks.run --scale 10k
+  python -m benchmarks.run --scale 100k --cases 'list_images.*' --repeat 10
+  python -m benchmarks.run --scale 10k --write-baseline
+  python -m benchmarks.run --scale 1m --database-url postgresql://localhost/zoltag_bench
+
+SQLite databases are created under --work-dir and reused across runs. Postgres
+databases must already be migrated (``alembic upgrade head``), so pgvector
+columns and indexes match production. The synthetic tenant is generated once
+per (database, scale, seed) and reused.
+
+Every case records its median, p95, min and max wall time and the number of
+SQL statements it issued. Results are compared with the baseline for the same
+dialect and scale (``benchmarks/baselines/<dialect>-<scale>.json``). The run
+fails (exit 1) when:
+
+- a median is slower than the baseline by more than the threshold
+  (default 25%, overridable per case in the baseline's ``thresholds``) and by
+  at least --min-delta-ms, or
+- a case issues more SQL statements than its baseline. Statement counts are
+  deterministic, so this catches N+1 regressions independent of machine speed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import fnmatch
+import json
+import logging
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from dataclasses import asdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from zoltag.instrumentation import collect_profile
+from zoltag.settings import settings
+
+from benchmarks.cases import BENCHMARKS, BenchContext
+from benchmarks.synthetic import SyntheticTenant, build_synthetic_tenant, create_schema, parse_scale
+
+
+BASELINE_DIR = Path(__file__).resolve().parent / "baselines"
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_MIN_DELTA_MS = 2.0
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", default="10k", help="Asset count: 1k, 10k, 100k, 1m or an integer.")
+    parser.add_argument("--seed", type=int, default=0, help="Synthetic data seed.")
+    parser.add_argument("--embedding-dim", type=int, default=64, help="Embedding dimension of synthetic vectors.")
+    parser.add_argument("--database-url", default=None, help="Database to benchmark (default: SQLite in --work-dir).")
+    parser.add_argument("--work-dir", default=".bench", help="Directory for SQLite files, thumbnails and tenant info.")
+    parser.add_argument("--rebuild", action="store_true", help="Regenerate the synthetic SQLite database.")
+    parser.add_argument("--cases", action="append", default=None, help="Case name glob (repeatable). Default: all.")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed repetitions per case.")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed repetitions per case.")
+    parser.add_argument("--baseline", default=None, help="Baseline JSON (default: benchmarks/baselines/<dialect>-<scale>.json).")
+    parser.add_argument("--write-baseline", action="store_true", help="Save these results as the baseline.")
+    parser.add_argument("--output", default=None, help="Also write results JSON to this path.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Allowed relative median slowdown.")
+    parser.add_argument("--min-delta-ms", type=float, default=DEFAULT_MIN_DELTA_MS, help="Ignore slowdowns smaller than this.")
+    parser.add_argument("--list", action="store_true", help="List cases and exit.")
+    return parser.parse_args(argv)
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip() or None
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def prepare_database(args: argparse.Namespace, asset_count: int, work_dir: Path):
+    """Return (engine, synthetic tenant), generating the tenant if needed."""
+    scale_label = str(args.scale).lower()
+    if args.database_url:
+        engine = create_engine(args.database_url)
+    else:
+        db_path = work_dir / f"sqlite-{scale_label}-seed{args.seed}.db"
+        if args.rebuild and db_path.exists():
+            db_path.unlink()
+        engine = create_engine(f"sqlite:///{db_path}")
+        create_schema(engine)
+    if engine.dialect.name == "sqlite":
+        # Desktop mode binds string tenant ids to UUID columns through this shim; benchmark the same setup.
+        from zoltag.database import _patch_uuid_for_sqlite
+
+        _patch_uuid_for_sqlite()
+
+    info_path = work_dir / f"{engine.dialect.name}-{scale_label}-seed{args.seed}.tenant.json"
+    if info_path.exists() and not args.rebuild:
+        data = json.loads(info_path.read_text())
+        synthetic = SyntheticTenant(**{**data, "tenant_id": uuid.UUID(data["tenant_id"])})
+        with engine.connect() as conn:
+            exists = conn.execute(
+                text("SELECT 1 FROM tenants WHERE identifier = :identifier"), {"identifier": synthetic.identifier}
+            ).first()
+        if exists:
+            return engine, synthetic
+
+    started = time.perf_counter()
+    print(f"Generating synthetic tenant with {asset_count} assets...", flush=True)
+    with engine.connect() as conn:
+        max_image_id = conn.execute(text("SELECT COALESCE(MAX(id), 0) FROM image_metadata")).scalar() or 0
+    synthetic = build_synthetic_tenant(
+        engine,
+        asset_count,
+        seed=args.seed,
+        embedding_dim=args.embedding_dim,
+        identifier=f"bench-{scale_label}-seed{args.seed}-{int(time.time())}",
+        first_image_id=int(max_image_id) + 1,
+        progress=lambda step: print(f"  {step}", flush=True),
+    )
+    print(f"Generated in {time.perf_counter() - started:.1f}s", flush=True)
+    data = asdict(synthetic)
+    data["tenant_id"] = str(synthetic.tenant_id)
+    info_path.write_text(json.dumps(data, indent=2))
+    return engine, synthetic
+
+
+def run_case(ctx: BenchContext, name: str, *, repeat: int, warmup: int) -> dict:
+    case = BENCHMARKS[name]
+    timings: List[float] = []
+    ops_total = 0
+    sql_statements: Optional[int] = None
+    for iteration in range(warmup + repeat):
+        if case.setup:
+            case.setup(ctx)
+        try:
+            with collect_profile(name) as profile:
+                started = time.perf_counter()
+                ops = case.run(ctx)
+                elapsed = time.perf_counter() - started
+        finally:
+            if case.teardown:
+                case.teardown(ctx)
+        if iteration < warmup:
+            continue
+        timings.append(elapsed)
+        ops_total += 1 if ops is None else int(ops)
+        # Statement counts should be identical on every run; keep the smallest to ignore one-off cache fills.
+        sql_statements = profile.sql_count if sql_statements is None else min(sql_statements, profile.sql_count)
+    ordered = sorted(timings)
+    p95_index = min(len(ordered) - 1, max(0, int(round(0.95 * len(ordered))) - 1))
+    return {
+        "median_ms": round(statistics.median(ordered) * 1000, 3),
+        "p95_ms": round(ordered[p95_index] * 1000, 3),
+        "min_ms": round(ordered[0] * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+        "repeat": len(ordered),
+        "ops_per_second": round(ops_total / sum(ordered), 2) if sum(ordered) > 0 else None,
+        "sql_statements": sql_statements,
+    }
+
+
+def compare_to_baseline(
+    results: Dict[str, dict],
+    baseline: dict,
+    *,
+    threshold: float = DEFAULT_THRESHOLD,
+    min_delta_ms: float = DEFAULT_MIN_DELTA_MS,
+) -> List[str]:
+    """Return human-readable regressions of ``results`` against ``baseline``."""
+    regressions: List[str] = []
+    thresholds = baseline.get("thresholds") or {}
+    for name, current in sorted(results.items()):
+        previous = (baseline.get("cases") or {}).get(name)
+        if not previous:
+            continue
+        allowed = float(thresholds.get(name, threshold))
+        before = float(previous["median_ms"])
+        after = float(current["median_ms"])
+        if after - before >= min_delta_ms and after > before * (1.0 + allowed):
+            regressions.append(
+                f"{name}: median {after:.1f} ms vs baseline {before:.1f} ms (+{(after / before - 1) * 100:.0f}%, allowed {allowed * 100:.0f}%)"
+            )
+        if previous.get("sql_statements") is not None and current.get("sql_statements") is not None:
+            if current["sql_statements"] > previous["sql_statements"]:
+                regressions.append(
+                    f"{name}: {current['sql_statements']} SQL statements vs baseline {previous['sql_statements']}"
+                )
+    return regressions
+
+
+def _print_results(results: Dict[str, dict], baseline: Optional[dict]) -> None:
+    previous_cases = (baseline or {}).get("cases") or {}
+    print(f"{'case':36} {'median ms':>10} {'p95 ms':>10} {'sql':>6} {'ops/s':>10} {'vs base':>8}")
+    for name, row in results.items():
+        previous = previous_cases.get(name)
+        change = ""
+        if previous and previous.get("median_ms"):
+            change = f"{(row['median_ms'] / previous['median_ms'] - 1) * 100:+.0f}%"
+        print(
+            f"{name:36} {row['median_ms']:>10.2f} {row['p95_ms']:>10.2f} "
+            f"{row['sql_statements'] if row['sql_statements'] is not None else '-':>6} "
+            f"{row['ops_per_second'] if row['ops_per_second'] is not None else '-':>10} {change:>8}"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    if args.list:
+        print("\n".join(BENCHMARKS))
+        return 0
+    selected = [
+        name for name in BENCHMARKS if not args.cases or any(fnmatch.fnmatch(name, pattern) for pattern in args.cases)
+    ]
+    if not selected:
+        print("No benchmark cases match", args.cases, file=sys.stderr)
+        return 2
+
+    logging.basicConfig(level=logging.WARNING)
+    asset_count = parse_scale(args.scale)
+    work_dir = Path(args.work_dir).resolve()
+    work_dir.mkdir(parents=True, exist_ok=True)
+    settings.local_vector_store_dir = str(work_dir / "vector-store")
+
+    engine, synthetic = prepare_database(args, asset_count, work_dir)
+    dialect = engine.dialect.name
+    scratch = Path(tempfile.mkdtemp(prefix="scratch-", dir=work_dir))
+    ctx = BenchContext(session_factory=sessionmaker(bind=engine), synthetic=synthetic, work_dir=scratch)
+
+    results: Dict[str, dict] = {}
+    try:
+        for name in selected:
+            print(f"running {name}...", flush=True)
+            results[name] = run_case(ctx, name, repeat=max(1, args.repeat), warmup=max(0, args.warmup))
+    finally:
+        ctx.close()
+        engine.dispose()
+
+    baseline_path = Path(args.baseline) if args.baseline else BASELINE_DIR / f"{dialect}-{str(args.scale).lower()}.json"
+    baseline = json.loads(baseline_path.read_text()) if baseline_path.exists() else None
+    document = {
+        "meta": {
+            "dialect": dialect,
+            "scale": str(args.scale).lower(),
+            "assets": synthetic.asset_count,
+            "seed": args.seed,
+            "embedding_dim": synthetic.embedding_dim,
+            "repeat": args.repeat,
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        },
+        "thresholds": (baseline or {}).get("thresholds", {}),
+        "cases": results,
+    }
+
+    _print_results(results, baseline)
+    if args.output:
+        Path(args.output).write_text(json.dumps(document, indent=2) + "\n")
+    if args.write_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        if baseline:
+            # Keep cases that were not re-run in this invocation.
+            document["cases"] = {**(baseline.get("cases") or {}), **results}
+        baseline_path.write_text(json.dumps(document, indent=2) + "\n")
+        print(f"Baseline written to {baseline_path}")
+        return 0
+    if baseline is None:
+        print(f"No baseline at {baseline_path}; run with --write-baseline to create one.")
+        return 0
+
+    regressions = compare_to_baseline(results, baseline, threshold=args.threshold, min_delta_ms=args.min_delta_ms)
+    if regressions:
+        print("\nRegressions:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print("\nNo regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -126,12 +126,13 @@ class AssetsAdmin extends LitElement {
       this.selectedIds = [];
     }
     try {
-      const response = this.assetView === 'dupes'
+      const response = this._isDuplicateView()
         ? await getDuplicateImages(this.tenant, {
           offset,
           limit,
           sortOrder: 'desc',
           filenameQuery: this.filenameFilter,
+          match: this.assetView === 'similar' ? 'near' : 'exact',
         })
         : await getImages(this.tenant, {
           offset,
@@ -329,8 +330,12 @@ class AssetsAdmin extends LitElement {
     this._loadAssets({ offset: 0, limit: parsed });
   }
 
+  _isDuplicateView() {
+    return this.assetView === 'dupes' || this.assetView === 'similar';
+  }
+
   _setAssetView(nextView) {
-    if (nextView !== 'recent' && nextView !== 'dupes') return;
+    if (!['recent', 'dupes', 'similar'].includes(nextView)) return;
     if (this.assetView === nextView) return;
     this.assetView = nextView;
   }
@@ -424,6 +429,12 @@ class AssetsAdmin extends LitElement {
             >
               <i class="fas fa-clone mr-2"></i>Dupes
             </button>
+            <button
+              class="admin-subtab ${this.assetView === 'similar' ? 'active' : ''}"
+              @click=${() => this._setAssetView('similar')}
+            >
+              <i class="fas fa-images mr-2"></i>Similar
+            </button>
           </div>
           <div class="flex items-center gap-2 mb-4 max-w-xl">
             <input
@@ -457,7 +468,7 @@ class AssetsAdmin extends LitElement {
               <div class="absolute inset-0 z-10 flex items-center justify-center bg-white/70">
                 <div class="inline-flex items-center gap-2 rounded-md border border-blue-100 bg-white px-3 py-2 text-sm text-blue-700 shadow-sm">
                   <span class="inline-block h-4 w-4 animate-spin rounded-full border-2 border-blue-600 border-t-transparent"></span>
-                  <span>Loading ${this.assetView === 'dupes' ? 'duplicates' : 'assets'}...</span>
+                  <span>Loading ${this._isDuplicateView() ? 'duplicates' : 'assets'}...</span>
                 </div>
               </div>
             ` : html``}
@@ -482,7 +493,7 @@ class AssetsAdmin extends LitElement {
                     const counts = this._getCounts(asset);
                     const duplicateGroup = asset?.duplicate_group || '';
                     const previousGroup = index > 0 ? (rows[index - 1]?.duplicate_group || '') : '';
-                    const showDuplicateDivider = this.assetView === 'dupes' && (
+                    const showDuplicateDivider = this._isDuplicateView() && (
                       index === 0 || duplicateGroup !== previousGroup
                     );
                     const ratingDisplay = Number.isFinite(counts.ratingValue)
@@ -511,7 +522,7 @@ class AssetsAdmin extends LitElement {
                         <td class="px-3 py-2 text-gray-700 text-xs whitespace-nowrap">
                           <div>rating:${ratingDisplay}</div>
                           <div>tags:${counts.tags}</div>
-                          ${this.assetView === 'dupes' ? html`
+                          ${this._isDuplicateView() ? html`
                             <div>dupes:${asset?.duplicate_count || 0}</div>
                           ` : html``}
                         </td>
@@ -551,7 +562,7 @@ class AssetsAdmin extends LitElement {
                   ${!this.loading && rows.length === 0 ? html`
                     <tr>
                       <td class="px-3 py-6 text-gray-500 text-center" colspan="8">
-                        ${this.assetView === 'dupes' ? 'No embedding duplicates found.' : 'No assets found.'}
+                        ${this._isDuplicateView() ? 'No duplicates found.' : 'No assets found.'}
                       </td>
                     </tr>
                   ` : html``}
@@ -445,8 +445,8 @@ export class GuestAnnotationDrawer extends LitElement {
 
     this.fullImageLoading = true;
     try {
-      const { fetchWithAuth } = await import('../services/api.js');
-      const blob = await fetchWithAuth(`/guest/lists/${this.listId}/assets/${this.image.id}/full`, {
+      const { fetchWithAuth, DISPLAY_RENDITION_SIZE } = await import('../services/api.js');
+      const blob = await fetchWithAuth(`/guest/lists/${this.listId}/assets/${this.image.id}/full?size=${DISPLAY_RENDITION_SIZE}`, {
         method: 'GET',
         headers: { 'X-Tenant-ID': this.tenantId },
         responseType: 'blob',
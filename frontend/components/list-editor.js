@@ -15,6 +15,7 @@ import {
   getPresentationTemplates,
   uploadPresentationTemplate,
   exportListPptx,
+  DISPLAY_RENDITION_SIZE,
 } from '../services/api.js';
 import { renderImageGrid } from './shared/image-grid.js';
 import { allowByPermissionOrRole } from './shared/tenant-permissions.js';
@@ -1788,7 +1789,7 @@ class ListEditor extends LitElement {
       }
 
       this._slideshowPrefetchActive += 1;
-      fetchWithAuth(`/images/${task.imageId}/full`, {
+      fetchWithAuth(`/images/${task.imageId}/full?size=${DISPLAY_RENDITION_SIZE}`, {
         tenantId: this.tenant,
         responseType: 'blob',
       })
@@ -1916,7 +1917,7 @@ class ListEditor extends LitElement {
       }
       if (controller.signal.aborted) return;
       if (!blobUrl) {
-        const fullBlob = await fetchWithAuth(`/images/${imageId}/full`, {
+        const fullBlob = await fetchWithAuth(`/images/${imageId}/full?size=${DISPLAY_RENDITION_SIZE}`, {
           tenantId: this.tenant,
           responseType: 'blob',
           signal: controller.signal,
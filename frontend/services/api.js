@@ -175,6 +175,8 @@ export async function getDuplicateImages(
     sortOrder = 'desc',
     includeTotal = false,
     filenameQuery = '',
+    match = 'exact',
+    maxDistance = null,
   } = {}
 ) {
   const params = new URLSearchParams();
@@ -187,6 +189,12 @@ export async function getDuplicateImages(
   if (includeTotal) {
     params.append('include_total', 'true');
   }
+  if (match && match !== 'exact') {
+    params.append('match', match);
+  }
+  if (Number.isFinite(maxDistance)) {
+    params.append('max_distance', String(maxDistance));
+  }
   return fetchWithAuth(`/images/duplicates?${params.toString()}`, {
     tenantId,
   });
@@ -216,8 +224,11 @@ export async function getImageStats(tenantId, { force = false, includeRatings =
   );
 }
 
-export async function getFullImage(tenantId, imageId, { signal } = {}) {
-  return fetchWithAuth(`/images/${imageId}/full`, {
+export const DISPLAY_RENDITION_SIZE = 2560;
+
+export async function getFullImage(tenantId, imageId, { signal, size = DISPLAY_RENDITION_SIZE } = {}) {
+  const query = size ? `?size=${encodeURIComponent(size)}` : '';
+  return fetchWithAuth(`/images/${imageId}/full${query}`, {
     tenantId,
     responseType: 'blob',
     signal,
@@ -3,6 +3,11 @@
 from __future__ import annotations
 
 import logging
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime
 from typing import Any, Optional
 from uuid import UUID
 
@@ -18,6 +23,11 @@ EVENT_AUTH_LOGIN = "auth.login"
 EVENT_SEARCH_IMAGES = "search.images"
 EVENT_SEARCH_NL = "search.nl"
 
+ACTIVITY_QUEUE_MAX_EVENTS = 10000
+ACTIVITY_FLUSH_BATCH_SIZE = 200
+ACTIVITY_FLUSH_INTERVAL_SECONDS = 2.0
+ACTIVITY_DROP_LOG_EVERY = 1000
+
 
 def extract_client_ip(
     *,
@@ -68,9 +78,11 @@ def record_activity_event(
     user_agent: Optional[str] = None,
     details: Optional[dict[str, Any]] = None,
 ) -> None:
-    """Persist an activity event in an isolated transaction.
+    """Persist an activity event outside the caller's transaction.
 
-    Logging is non-blocking for primary request flows; failures are swallowed.
+    When the background sink is running (API processes) the event is queued
+    and written in a later batch; otherwise it is inserted immediately in an
+    isolated transaction. Failures are logged and swallowed.
     """
     normalized_event_type = str(event_type or "").strip().lower()
     if not normalized_event_type:
@@ -89,7 +101,154 @@ def record_activity_event(
     try:
         bind = db.get_bind()
         engine = bind.engine if hasattr(bind, "engine") else bind
+    except Exception:
+        logger.warning("Failed to resolve engine for activity event type=%s", normalized_event_type, exc_info=True)
+        return
+
+    sink = _activity_sink
+    if sink is not None and sink.is_running:
+        values["id"] = uuid.uuid4()
+        values["created_at"] = datetime.utcnow()
+        sink.submit(engine, values)
+        return
+
+    try:
         with engine.begin() as conn:
             conn.execute(sa.insert(ActivityEvent).values(**values))
     except Exception:
         logger.warning("Failed to write activity event for type=%s", normalized_event_type, exc_info=True)
+
+
+class ActivityEventSink:
+    """Background writer that batches activity events into multi-row INSERTs.
+
+    Events are buffered in a bounded queue; when it is full new events are
+    dropped (and counted) rather than slowing down the request that emitted
+    them. A single thread flushes when a batch fills up or the flush interval
+    passes, and ``stop`` drains whatever is still queued.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_queue_size: int = ACTIVITY_QUEUE_MAX_EVENTS,
+        batch_size: int = ACTIVITY_FLUSH_BATCH_SIZE,
+        flush_interval_seconds: float = ACTIVITY_FLUSH_INTERVAL_SECONDS,
+    ):
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval_seconds = max(0.01, float(flush_interval_seconds))
+        self._queue: "queue.Queue[tuple[Any, dict]]" = queue.Queue(maxsize=max(1, int(max_queue_size)))
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stats_lock = threading.Lock()
+        self._stats = {"enqueued": 0, "written": 0, "dropped": 0, "failed": 0, "flushes": 0}
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.is_running:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="zoltag-activity-sink", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout_seconds: float = 5.0) -> None:
+        """Stop the writer thread and flush any queued events."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout_seconds)
+        self._thread = None
+        self._write(self._drain(limit=None))
+
+    def submit(self, engine, values: dict) -> bool:
+        try:
+            self._queue.put_nowait((engine, values))
+        except queue.Full:
+            dropped = self._bump("dropped")
+            if dropped == 1 or dropped % ACTIVITY_DROP_LOG_EVERY == 0:
+                logger.warning("Activity event queue full; dropped %s events so far", dropped)
+            return False
+        self._bump("enqueued")
+        return True
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            result = dict(self._stats)
+        result["queued"] = self._queue.qsize()
+        return result
+
+    def _bump(self, key: str, amount: int = 1) -> int:
+        with self._stats_lock:
+            self._stats[key] += amount
+            return self._stats[key]
+
+    def _drain(self, limit: Optional[int]) -> list:
+        items = []
+        while limit is None or len(items) < limit:
+            try:
+                items.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return items
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            deadline = time.monotonic() + self.flush_interval_seconds
+            batch = []
+            while len(batch) < self.batch_size and not self._stop_event.is_set():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=min(remaining, 0.5)))
+                except queue.Empty:
+                    continue
+                batch.extend(self._drain(limit=self.batch_size - len(batch)))
+            self._write(batch)
+
+    def _write(self, batch: list) -> None:
+        if not batch:
+            return
+        rows_by_engine: dict[Any, list[dict]] = {}
+        for engine, values in batch:
+            rows_by_engine.setdefault(engine, []).append(values)
+        for engine, rows in rows_by_engine.items():
+            for start in range(0, len(rows), self.batch_size):
+                chunk = rows[start:start + self.batch_size]
+                try:
+                    with engine.begin() as conn:
+                        conn.execute(sa.insert(ActivityEvent).values(chunk))
+                except Exception:
+                    self._bump("failed", len(chunk))
+                    logger.warning("Failed to write %s activity events", len(chunk), exc_info=True)
+                    continue
+                self._bump("written", len(chunk))
+                self._bump("flushes")
+
+
+_activity_sink: Optional[ActivityEventSink] = None
+
+
+def start_activity_sink(**kwargs) -> ActivityEventSink:
+    """Route ``record_activity_event`` through a background batching writer."""
+    global _activity_sink
+    if _activity_sink is None or not _activity_sink.is_running:
+        _activity_sink = ActivityEventSink(**kwargs)
+        _activity_sink.start()
+    return _activity_sink
+
+
+def stop_activity_sink(timeout_seconds: float = 5.0) -> None:
+    """Flush queued events and return to synchronous writes."""
+    global _activity_sink
+    sink = _activity_sink
+    _activity_sink = None
+    if sink is not None:
+        sink.stop(timeout_seconds=timeout_seconds)
+
+
+def get_activity_sink_stats() -> Optional[dict]:
+    sink = _activity_sink
+    return sink.stats() if sink is not None else None
@@ -11,6 +11,8 @@ from sqlalchemy.orm import Session
 from starlette.middleware.base import BaseHTTPMiddleware
 from typing import Optional
 
+from zoltag.concurrency import InFlightRequestMiddleware, event_loop_lag_monitor
+from zoltag.instrumentation import RequestMetricsMiddleware
 from zoltag.database import SessionLocal
 from zoltag.dependencies import get_db, get_tenant
 from zoltag.tenant import Tenant
@@ -18,9 +20,6 @@ from zoltag.metadata import Tenant as TenantModel
 from zoltag.settings import settings
 from zoltag.auth.dependencies import require_super_admin
 from zoltag.auth.models import UserProfile
-from zoltag.ratelimit import limiter
-from slowapi import _rate_limit_exceeded_handler
-from slowapi.errors import RateLimitExceeded
 
 # Import local router (only registered in local mode, harmless to import always)
 from zoltag.routers import local as local_router
@@ -48,6 +47,7 @@ from zoltag.routers import (
     config,
     nl_search,
     jobs,
+    metrics,
     sentinel,
     sharing,
     guest,
@@ -59,8 +59,6 @@ app = FastAPI(
     version="0.1.0"
 )
 logger = logging.getLogger(__name__)
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
 
 class LocalTenantMiddleware(BaseHTTPMiddleware):
@@ -115,6 +113,51 @@ async def audit_model_config_startup():
         )
 
 
+@app.on_event("startup")
+async def start_event_loop_lag_monitor():
+    """Sample event-loop delay to flag handlers that block the loop."""
+    event_loop_lag_monitor.start()
+
+
+@app.on_event("shutdown")
+async def stop_event_loop_lag_monitor():
+    await event_loop_lag_monitor.stop()
+
+
+@app.on_event("startup")
+async def start_activity_event_sink():
+    """Batch activity/audit writes off the request path."""
+    from zoltag.activity import start_activity_sink
+
+    start_activity_sink()
+
+
+@app.on_event("shutdown")
+async def stop_activity_event_sink():
+    """Flush queued activity events before the process exits."""
+    from zoltag.activity import stop_activity_sink
+
+    stop_activity_sink()
+
+
+@app.on_event("shutdown")
+async def close_provider_http_clients():
+    """Close pooled storage-provider connections."""
+    from zoltag.storage.http_client import aclose_clients
+
+    await aclose_clients()
+
+
+@app.on_event("shutdown")
+async def stop_local_library_indexer():
+    """Stop the local folder watcher and persist the library manifest."""
+    if not settings.local_mode:
+        return
+    from zoltag.local_indexer import stop_local_indexer
+
+    stop_local_indexer()
+
+
 @app.on_event("startup")
 async def start_worker_mode():
     """Start background queue worker when running in worker mode or local mode."""
@@ -166,6 +209,10 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Tracks in-flight requests so the event-loop lag monitor can name blocking handlers.
+app.add_middleware(InFlightRequestMiddleware)
+# Per-request phase/SQL timing for /metrics and the Server-Timing response header.
+app.add_middleware(RequestMetricsMiddleware)
 
 # Register all routers
 # Auth routers (no tenant required for register/login/me endpoints)
@@ -192,6 +239,7 @@ app.include_router(sync.router)
 app.include_router(config.router)
 app.include_router(nl_search.router)
 app.include_router(jobs.router)
+app.include_router(metrics.router)
 app.include_router(sentinel.router)
 app.include_router(sharing.router)
 app.include_router(guest.router)
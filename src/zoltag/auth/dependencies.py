@@ -1,11 +1,13 @@
 """FastAPI dependencies for authentication and authorization."""
 
+import hashlib
+import threading
 import time
 from typing import Optional, Callable
 import math
 from fastapi import Header, HTTPException, Depends, Request, status
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy import event, func, inspect as sa_inspect
 from jose import JWTError, jwt as jose_jwt
 from datetime import datetime, timedelta, timezone
 
@@ -61,6 +63,147 @@ def _make_local_user() -> UserProfile:  # type: ignore[return-value]
     return _LocalUser()  # type: ignore[return-value]
 
 
+# Short-lived principal cache: verified token -> detached UserProfile snapshot,
+# plus emails known to have no pending invitations. Entries are dropped when a
+# commit touches the user profile or creates an invitation for the email.
+# Expired entries are swept on insert; past the size cap the oldest go first.
+PRINCIPAL_CACHE_TTL_SECONDS = 30
+PRINCIPAL_CACHE_MAX_ENTRIES = 10_000
+PRINCIPAL_CACHE_SWEEP_INTERVAL_SECONDS = 60
+_PRINCIPAL_CHANGES_INFO_KEY = "zoltag_principal_changes"
+_principal_cache_lock = threading.Lock()
+_principal_cache: dict[str, tuple[float, UserProfile]] = {}
+_no_pending_invitations_cache: dict[str, float] = {}
+_principal_cache_last_sweep = 0.0
+
+
+def _sweep_principal_caches(now: float) -> None:
+    """Drop expired entries from both caches. Caller holds ``_principal_cache_lock``."""
+    global _principal_cache_last_sweep
+    if (
+        now - _principal_cache_last_sweep < PRINCIPAL_CACHE_SWEEP_INTERVAL_SECONDS
+        and len(_principal_cache) <= PRINCIPAL_CACHE_MAX_ENTRIES
+        and len(_no_pending_invitations_cache) <= PRINCIPAL_CACHE_MAX_ENTRIES
+    ):
+        return
+    _principal_cache_last_sweep = now
+    for key in [key for key, entry in _principal_cache.items() if entry[0] <= now]:
+        del _principal_cache[key]
+    for email in [email for email, expires_at in _no_pending_invitations_cache.items() if expires_at <= now]:
+        del _no_pending_invitations_cache[email]
+    # Dicts keep insertion order, so the oldest entries are evicted first.
+    for cache in (_principal_cache, _no_pending_invitations_cache):
+        while len(cache) > PRINCIPAL_CACHE_MAX_ENTRIES:
+            del cache[next(iter(cache))]
+
+
+def _token_cache_key(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def _token_expires_at(token: str) -> Optional[float]:
+    try:
+        claims = jose_jwt.get_unverified_claims(token)
+    except Exception:
+        return None
+    exp = claims.get("exp") if isinstance(claims, dict) else None
+    try:
+        return float(exp) if exp is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _snapshot_user_profile(user: UserProfile) -> UserProfile:
+    """Detached copy of the profile's column values, safe to share across sessions."""
+    snapshot = UserProfile(**{
+        attr.key: getattr(user, attr.key)
+        for attr in sa_inspect(UserProfile).column_attrs
+    })
+    make_transient_to_detached(snapshot)
+    return snapshot
+
+
+def _cache_principal(token: str, user: UserProfile) -> None:
+    expires_at = time.time() + PRINCIPAL_CACHE_TTL_SECONDS
+    token_exp = _token_expires_at(token)
+    if token_exp is not None:
+        expires_at = min(expires_at, token_exp)
+    snapshot = _snapshot_user_profile(user)
+    with _principal_cache_lock:
+        _principal_cache[_token_cache_key(token)] = (expires_at, snapshot)
+        _sweep_principal_caches(time.time())
+
+
+def _get_cached_principal(db: Session, token: str) -> Optional[UserProfile]:
+    key = _token_cache_key(token)
+    with _principal_cache_lock:
+        entry = _principal_cache.get(key)
+        if entry is not None and entry[0] <= time.time():
+            _principal_cache.pop(key, None)
+            entry = None
+    if entry is None:
+        return None
+    # load=False attaches the snapshot to this session without a SELECT.
+    return db.merge(entry[1], load=False)
+
+
+def _has_no_pending_invitations(email: str) -> bool:
+    with _principal_cache_lock:
+        expires_at = _no_pending_invitations_cache.get(email)
+    return expires_at is not None and expires_at > time.time()
+
+
+def _remember_no_pending_invitations(email: str) -> None:
+    now = time.time()
+    with _principal_cache_lock:
+        _no_pending_invitations_cache[email] = now + PRINCIPAL_CACHE_TTL_SECONDS
+        _sweep_principal_caches(now)
+
+
+def invalidate_principal_cache(
+    supabase_uid: Optional[str] = None,
+    email: Optional[str] = None,
+) -> None:
+    """Drop cached principals for a user and/or invitation state for an email (all if neither given)."""
+    with _principal_cache_lock:
+        if supabase_uid is None and email is None:
+            _principal_cache.clear()
+            _no_pending_invitations_cache.clear()
+            return
+        if email is not None:
+            _no_pending_invitations_cache.pop(str(email).strip().lower(), None)
+        if supabase_uid is not None:
+            target = str(supabase_uid)
+            for key in [key for key, (_, snapshot) in _principal_cache.items() if str(snapshot.supabase_uid) == target]:
+                _principal_cache.pop(key, None)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_principal_changes(session: Session, _flush_context) -> None:
+    changes = None
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, UserProfile):
+            changes = changes if changes is not None else session.info.setdefault(_PRINCIPAL_CHANGES_INFO_KEY, set())
+            changes.add(("user", str(obj.supabase_uid)))
+        elif isinstance(obj, Invitation) and obj.email:
+            changes = changes if changes is not None else session.info.setdefault(_PRINCIPAL_CHANGES_INFO_KEY, set())
+            changes.add(("email", str(obj.email).strip().lower()))
+
+
+@event.listens_for(Session, "after_commit")
+def _drop_committed_principals(session: Session) -> None:
+    for kind, value in session.info.pop(_PRINCIPAL_CHANGES_INFO_KEY, ()):
+        if kind == "user":
+            invalidate_principal_cache(supabase_uid=value)
+        else:
+            invalidate_principal_cache(email=value)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_principal_changes(session: Session) -> None:
+    session.info.pop(_PRINCIPAL_CHANGES_INFO_KEY, None)
+
+
 RBAC_PERMISSION_CACHE_TTL_SECONDS = 30
 _tenant_permission_cache = {}
 
@@ -299,6 +442,10 @@ async def _resolve_authenticated_user(
 
     token = authorization[7:]  # Remove "Bearer " prefix
 
+    cached_user = _get_cached_principal(db, token)
+    if cached_user is not None:
+        return cached_user
+
     try:
         supabase_uid = await get_supabase_uid_from_token(token)
     except JWTError:
@@ -318,6 +465,7 @@ async def _resolve_authenticated_user(
             detail="User profile not found. Please complete registration."
         )
 
+    _cache_principal(token, user)
     return user
 
 
@@ -366,7 +514,12 @@ async def get_current_user(
 
     user = await _resolve_authenticated_user(authorization=authorization, db=db)
 
-    changed_tenant_ids = claim_pending_invitations_for_user(db, user=user)
+    normalized_email = str(getattr(user, "email", "") or "").strip().lower()
+    changed_tenant_ids: set[str] = set()
+    if not _has_no_pending_invitations(normalized_email):
+        changed_tenant_ids = claim_pending_invitations_for_user(db, user=user)
+        if not changed_tenant_ids:
+            _remember_no_pending_invitations(normalized_email)
     if changed_tenant_ids:
         db.commit()
         for tenant_id in changed_tenant_ids:
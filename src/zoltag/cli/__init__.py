@@ -15,9 +15,11 @@ def _register_commands_once() -> None:
     from .commands import (
         embeddings,
         face_recognition,
+        geo,
         ingest,
         inspect,
         metadata,
+        renditions,
         sync,
         sync_flickr,
         sync_gdrive,
@@ -50,6 +52,8 @@ def _register_commands_once() -> None:
     cli.add_command(inspect.show_config_command, name="show-config")
     cli.add_command(thumbnails.backfill_thumbnails_command, name="backfill-thumbnails")
     cli.add_command(text_index.rebuild_asset_text_index_command, name="rebuild-asset-text-index")
+    cli.add_command(renditions.build_renditions_command, name="build-renditions")
+    cli.add_command(geo.rebuild_geo_index_command, name="rebuild-geo-index")
 
     _COMMANDS_REGISTERED = True
 
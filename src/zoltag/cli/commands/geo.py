@@ -0,0 +1,39 @@
+"""Geo index rebuild command."""
+
+from __future__ import annotations
+
+import click
+
+from zoltag.cli.base import CliCommand
+from zoltag.geo import rebuild_geo_cells
+
+
+@click.command(name="rebuild-geo-index")
+@click.option("--tenant-id", required=True, help="Tenant ID for which to rebuild geohashes and map clusters")
+def rebuild_geo_index_command(tenant_id: str):
+    """Recompute image geohashes and the precomputed map cluster cells."""
+    cmd = RebuildGeoIndexCommand(tenant_id=tenant_id)
+    cmd.run()
+
+
+class RebuildGeoIndexCommand(CliCommand):
+    """Command to rebuild the geo index for one tenant."""
+
+    def __init__(self, *, tenant_id: str):
+        super().__init__()
+        self.tenant_id = tenant_id
+
+    def run(self):
+        self.setup_db()
+        try:
+            self.load_tenant(self.tenant_id)
+            click.echo(f"Rebuilding geo index (tenant={self.tenant.id})")
+            result = rebuild_geo_cells(self.db, self.tenant.id)
+            self.db.commit()
+            click.echo(
+                "✓ Geo index rebuild complete: "
+                f"located={result['located']} geohashes_updated={result['geohashes_updated']} "
+                f"cells={result['cells']}"
+            )
+        finally:
+            self.cleanup_db()
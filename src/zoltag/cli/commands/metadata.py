@@ -1,7 +1,8 @@
 """Metadata refresh command."""
 
 import click
-from typing import Optional
+from typing import Optional, Sequence
+from uuid import UUID
 from sqlalchemy import or_
 from dropbox import Dropbox
 
@@ -13,11 +14,13 @@ from zoltag.exif import (
     parse_exif_int,
     parse_exif_str,
 )
+from zoltag.exif_reader import ExifRangeError, read_provider_exif
 from zoltag.image import ImageProcessor
 from zoltag.metadata import Asset, ImageMetadata
 from zoltag.dependencies import get_secret
 from zoltag.dropbox import DropboxClient
 from zoltag.dropbox_oauth import load_dropbox_oauth_credentials
+from zoltag.storage import DropboxStorageProvider
 from zoltag.cli.base import CliCommand
 
 
@@ -50,6 +53,7 @@ def _dropbox_refs_for_image(image: ImageMetadata, asset: Optional[Asset]) -> lis
 @click.option('--download-exif/--no-download-exif', default=False, help='Download full image files from Dropbox to extract embedded EXIF data (slow but thorough)')
 @click.option('--update-exif/--no-update-exif', default=True, help='Store merged EXIF data in database exif_data column (not stored in GCP buckets)')
 @click.option('--dry-run', is_flag=True, help='Preview changes without writing to database')
+@click.option('--asset-id', multiple=True, help='Only refresh these asset UUIDs (repeatable)')
 def refresh_metadata_command(
     tenant_id: str,
     limit: Optional[int],
@@ -57,7 +61,8 @@ def refresh_metadata_command(
     batch_size: int,
     download_exif: bool,
     update_exif: bool,
-    dry_run: bool
+    dry_run: bool,
+    asset_id: Sequence[str],
 ):
     """Refresh missing EXIF and camera metadata for images by querying Dropbox.
 
@@ -72,7 +77,8 @@ def refresh_metadata_command(
     Use --dry-run to preview changes first."""
     cmd = RefreshMetadataCommand(
         tenant_id, limit, offset, batch_size,
-        download_exif, update_exif, dry_run
+        download_exif, update_exif, dry_run,
+        asset_ids=asset_id,
     )
     cmd.run()
 
@@ -106,7 +112,8 @@ class RefreshMetadataCommand(CliCommand):
         batch_size: int,
         download_exif: bool,
         update_exif: bool,
-        dry_run: bool
+        dry_run: bool,
+        asset_ids: Sequence[str] = (),
     ):
         super().__init__()
         self.tenant_id = tenant_id
@@ -116,6 +123,7 @@ class RefreshMetadataCommand(CliCommand):
         self.download_exif = download_exif
         self.update_exif = update_exif
         self.dry_run = dry_run
+        self.asset_ids = list(asset_ids or [])
 
     def run(self):
         """Execute metadata refresh command."""
@@ -173,6 +181,9 @@ class RefreshMetadataCommand(CliCommand):
             self.tenant_filter(ImageMetadata),
             missing_filter
         ).order_by(ImageMetadata.id.desc())
+        if self.asset_ids:
+            # Batched per-asset jobs (see zoltag.job_coalescing) carry an explicit asset list.
+            base_query = base_query.filter(ImageMetadata.asset_id.in_([UUID(str(value)) for value in self.asset_ids]))
 
         if self.offset:
             base_query = base_query.offset(self.offset)
@@ -183,6 +194,8 @@ class RefreshMetadataCommand(CliCommand):
             return
 
         processor = ImageProcessor() if self.download_exif else None
+        # EXIF is read from the header byte ranges; only unsupported containers download in full.
+        dropbox_provider = DropboxStorageProvider(client=dbx)
         updated = 0
         skipped = 0
         failed = 0
@@ -261,12 +274,23 @@ class RefreshMetadataCommand(CliCommand):
 
                 extracted_exif = {}
                 if self.download_exif:
+                    header_exif = None
                     try:
-                        _, response = dbx.files_download(dropbox_refs[0])
-                        img = processor.load_image(response.content)
-                        extracted_exif = processor.extract_exif(img)
+                        header_exif = read_provider_exif(dropbox_provider, dropbox_refs[0])
+                    except ExifRangeError:
+                        pass
                     except Exception as exc:
-                        click.echo(f"\nEXIF download failed for {image.id}: {exc}")
+                        # Transport errors fall back to the full download, as in sync.
+                        click.echo(f"\nHeader EXIF read failed for {image.id}, downloading full file: {exc}")
+                    if header_exif is not None:
+                        extracted_exif = header_exif
+                    else:
+                        try:
+                            _, response = dbx.files_download(dropbox_refs[0])
+                            img = processor.load_image(response.content)
+                            extracted_exif = processor.extract_exif(img)
+                        except Exception as exc:
+                            click.echo(f"\nEXIF download failed for {image.id}: {exc}")
 
                 merged_exif = {}
                 if self.update_exif:
@@ -0,0 +1,123 @@
+"""Display rendition pre-generation command."""
+
+from typing import Optional, Sequence
+from uuid import UUID
+
+import click
+
+from zoltag.cli.base import CliCommand
+from zoltag.dependencies import get_secret
+from zoltag.metadata import Asset, ImageMetadata
+from zoltag.renditions import RENDITION_FORMATS, RENDITION_SIZES, get_rendition_store, rendition_for_asset
+from zoltag.storage import create_storage_provider
+
+
+@click.command(name='build-renditions')
+@click.option('--tenant-id', required=True, help='Tenant ID for which to build display renditions')
+@click.option('--asset-id', multiple=True, help='Only build renditions for these asset UUIDs (repeatable)')
+@click.option('--size', 'sizes', multiple=True, type=click.Choice([str(size) for size in RENDITION_SIZES]),
+              help='Rendition size to build (repeatable; default all sizes)')
+@click.option('--format', 'formats', multiple=True, type=click.Choice(sorted(RENDITION_FORMATS)),
+              help='Rendition format to build (repeatable; default jpeg and webp)')
+@click.option('--limit', default=None, type=int, help='Maximum number of images to process (newest first)')
+def build_renditions_command(
+    tenant_id: str,
+    asset_id: Sequence[str],
+    sizes: Sequence[str],
+    formats: Sequence[str],
+    limit: Optional[int],
+):
+    """Generate cached display renditions so full-image views skip the provider download."""
+    cmd = BuildRenditionsCommand(
+        tenant_id=tenant_id,
+        asset_ids=asset_id,
+        sizes=[int(size) for size in sizes] or list(RENDITION_SIZES),
+        formats=list(formats) or sorted(RENDITION_FORMATS),
+        limit=limit,
+    )
+    cmd.run()
+
+
+class BuildRenditionsCommand(CliCommand):
+    """Build missing display renditions for a tenant's images."""
+
+    def __init__(
+        self,
+        *,
+        tenant_id: str,
+        asset_ids: Sequence[str],
+        sizes: Sequence[int],
+        formats: Sequence[str],
+        limit: Optional[int],
+    ):
+        super().__init__()
+        self.tenant_id = tenant_id
+        self.asset_ids = list(asset_ids or [])
+        self.sizes = list(sizes)
+        self.formats = list(formats)
+        self.limit = limit
+
+    def run(self):
+        self.setup_db()
+        try:
+            self._build_renditions()
+        finally:
+            self.cleanup_db()
+
+    def _build_renditions(self):
+        self.tenant = self.load_tenant(self.tenant_id)
+        query = (
+            self.db.query(ImageMetadata, Asset)
+            .join(Asset, Asset.id == ImageMetadata.asset_id)
+            .filter(
+                self.tenant_filter(ImageMetadata),
+                Asset.media_type != 'video',
+                Asset.source_key.is_not(None),
+            )
+            .order_by(ImageMetadata.id.desc())
+        )
+        if self.asset_ids:
+            query = query.filter(Asset.id.in_([UUID(str(value)) for value in self.asset_ids]))
+        if self.limit:
+            query = query.limit(self.limit)
+        rows = query.all()
+        if not rows:
+            click.echo("No images to render.")
+            return
+
+        store = get_rendition_store(self.tenant)
+        providers = {}
+        built = 0
+        failed = 0
+        click.echo(f"Building renditions for {len(rows)} images (sizes={self.sizes}, formats={self.formats})...")
+        for index, (image, asset) in enumerate(rows, start=1):
+            provider_name = (asset.source_provider or 'dropbox').strip().lower()
+            source_ref = (asset.source_key or '').strip()
+            if not source_ref or source_ref.startswith('/local/') or 'thumbnail-only' in source_ref:
+                continue
+            original: dict = {}
+
+            def _download_original(provider_name=provider_name, source_ref=source_ref, original=original) -> bytes:
+                # One provider download per image, shared by every size and format.
+                if 'bytes' not in original:
+                    if provider_name not in providers:
+                        providers[provider_name] = create_storage_provider(
+                            provider_name, tenant=self.tenant, get_secret=get_secret
+                        )
+                    original['bytes'] = providers[provider_name].download_file(source_ref)
+                return original['bytes']
+
+            try:
+                for size in self.sizes:
+                    for fmt in self.formats:
+                        rendition_for_asset(
+                            store, self.tenant, image, asset,
+                            size=size, fmt=fmt, download_source=_download_original,
+                        )
+                built += 1
+            except Exception as exc:  # noqa: BLE001
+                failed += 1
+                click.echo(f"  Failed {image.filename or image.id}: {exc}")
+            if index % 25 == 0 or index == len(rows):
+                click.echo(f"  Progress: {index}/{len(rows)} (built {built}, failed {failed})")
+        click.echo(f"✓ Renditions complete: built={built} failed={failed}")
@@ -8,11 +8,12 @@ from google.cloud import storage
 from zoltag.settings import settings
 from zoltag.dependencies import get_secret
 from zoltag.integrations import TenantIntegrationRepository
-from zoltag.metadata import Asset, Tenant as TenantModel
+from zoltag.metadata import Tenant as TenantModel
 from zoltag.dropbox import DropboxClient
 from zoltag.dropbox_oauth import load_dropbox_oauth_credentials
 from zoltag.image import is_supported_media_file
-from zoltag.sync_pipeline import process_dropbox_entry
+from zoltag.storage import DropboxStorageProvider
+from zoltag.sync_pipeline import iter_pending_entries, process_storage_entry
 from zoltag.cli.base import CliCommand
 
 
@@ -37,11 +38,6 @@ def _format_folder_listing_error(folder: str, exc: Exception) -> str:
     return f"Failed to list Dropbox folder {folder_label}: {text or exc.__class__.__name__}"
 
 
-def _dropbox_entry_key(entry) -> str:
-    """Return stable Dropbox identity key (id preferred, path fallback)."""
-    return str(getattr(entry, "id", "") or "").strip() or str(getattr(entry, "path_display", "") or "").strip()
-
-
 @click.command(name='sync-dropbox')
 @click.option('--tenant-id', default='demo', help='Tenant ID to sync from Dropbox')
 @click.option('--count', default=500, type=int, help='Number of sync iterations to perform (useful for incremental syncs)')
@@ -156,14 +152,7 @@ class SyncDropboxCommand(CliCommand):
 
         click.echo(f"Sync folders: {sync_folders}")
 
-        processed_paths: set[str] = set()
-        if not self.reprocess_existing:
-            q = self.db.query(Asset.source_key).filter(
-                self.tenant_filter(Asset),
-                Asset.source_provider == "dropbox",
-            )
-            processed_paths = set(row[0] for row in q.all() if row[0])
-
+        provider = DropboxStorageProvider(client=dropbox_client)
         processed = 0
         for folder in sync_folders:
             if processed >= remaining:
@@ -171,65 +160,54 @@ class SyncDropboxCommand(CliCommand):
 
             click.echo(f"\nListing folder: {folder or '(root)'}")
 
+            # Entries are processed as list_folder pages arrive; each batch is
+            # checked against existing assets in one query.
             try:
-                entries = list(dropbox_client.list_folder(folder, recursive=True))
+                pending_entries = iter_pending_entries(
+                    self.db,
+                    tenant_context,
+                    (
+                        entry
+                        for entry in provider.iter_image_entries(sync_folders=[folder])
+                        if is_supported_media_file(entry.name, None)
+                    ),
+                    provider_name=provider.provider_name,
+                    provider_id=record_provider_id,
+                    reprocess_existing=self.reprocess_existing,
+                )
+                for pending in pending_entries:
+                    entry = pending.entry
+                    if processed >= remaining:
+                        break
+
+                    try:
+                        click.echo(f"\nProcessing: {entry.display_path}")
+                        if pending.revision_changed:
+                            click.echo("  ↻ Source changed since last sync, reprocessing")
+
+                        result = process_storage_entry(
+                            db=self.db,
+                            tenant=tenant_context,
+                            entry=entry,
+                            provider=provider,
+                            thumbnail_bucket=thumbnail_bucket,
+                            reprocess_existing=self.reprocess_existing,
+                            provider_id=record_provider_id,
+                            pending=pending,
+                            log=lambda message: click.echo(f"  {message}"),
+                        )
+
+                        if result.status == "processed":
+                            click.echo(f"  ✓ Metadata + asset recorded (ID: {result.image_id})")
+                            processed += 1
+                        elif result.status == "skipped":
+                            click.echo("  ↪ Already synced, skipping")
+
+                    except Exception as e:
+                        click.echo(f"  ✗ Error: {e}", err=True)
+                        self.db.rollback()
             except Exception as exc:
                 click.echo(f"  ✗ {_format_folder_listing_error(folder, exc)}", err=True)
                 continue
 
-            click.echo(f"Found {len(entries)} entries")
-
-            unprocessed = []
-            folder_remaining = max(remaining - processed, 0)
-            total_entries = len(entries)
-            click.echo(f"Scanning {total_entries} entries for unprocessed images...")
-
-            for index, entry in enumerate(entries, start=1):
-                if index % 500 == 0:
-                    click.echo(f"  Scanned {index}/{total_entries} entries...")
-                if not is_supported_media_file(entry.name, None):
-                    continue
-                dropbox_key = _dropbox_entry_key(entry)
-                if not dropbox_key:
-                    continue
-                if not self.reprocess_existing and dropbox_key in processed_paths:
-                    continue
-                unprocessed.append(entry)
-                if len(unprocessed) >= folder_remaining:
-                    break
-
-            click.echo(f"Found {len(unprocessed)} unprocessed images")
-
-            for entry in unprocessed:
-                if processed >= remaining:
-                    break
-
-                try:
-                    dropbox_path = entry.path_display
-                    click.echo(f"\nProcessing: {dropbox_path}")
-
-                    result = process_dropbox_entry(
-                        db=self.db,
-                        tenant=tenant_context,
-                        entry=entry,
-                        dropbox_client=dropbox_client,
-                        thumbnail_bucket=thumbnail_bucket,
-                        reprocess_existing=self.reprocess_existing,
-                        provider_id=record_provider_id,
-                        log=lambda message: click.echo(f"  {message}"),
-                    )
-
-                    if result.status == "processed":
-                        dropbox_key = _dropbox_entry_key(entry)
-                        if dropbox_key:
-                            processed_paths.add(dropbox_key)
-                        click.echo(f"  ✓ Metadata + asset recorded (ID: {result.image_id})")
-                        processed += 1
-                    elif result.status == "skipped":
-                        click.echo("  ↪ Already synced, skipping")
-
-                except Exception as e:
-                    click.echo(f"  ✗ Error: {e}", err=True)
-                    self.db.rollback()
-
         return processed
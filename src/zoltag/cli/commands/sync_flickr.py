@@ -11,11 +11,10 @@ from zoltag.cli.base import CliCommand
 from zoltag.dependencies import get_secret
 from zoltag.image import is_supported_media_file
 from zoltag.integrations import TenantIntegrationRepository
-from zoltag.metadata import Asset
 from zoltag.metadata import Tenant as TenantModel
 from zoltag.settings import settings
 from zoltag.storage.providers import FlickrStorageProvider
-from zoltag.sync_pipeline import process_storage_entry
+from zoltag.sync_pipeline import iter_pending_entries, process_storage_entry
 
 
 @click.command(name="sync-flickr")
@@ -160,60 +159,50 @@ class SyncFlickrCommand(CliCommand):
         else:
             click.echo("No albums selected — syncing full Flickr photostream")
 
-        processed_keys: set[str] = set()
-        if not self.reprocess_existing:
-            q = self.db.query(Asset.source_key).filter(
-                self.tenant_filter(Asset),
-                Asset.source_provider == "flickr",
-            )
-            processed_keys = {row[0] for row in q.all() if row[0]}
-
         click.echo("Listing items from Flickr...")
+
+        # Photos are processed as listing pages arrive instead of after a full listing.
+        processed = 0
         try:
-            all_entries = provider.list_image_entries(sync_folders=sync_albums or None)
+            # Listed entries are checked against existing assets a batch at a time.
+            pending_entries = iter_pending_entries(
+                self.db,
+                tenant_context,
+                (entry for entry in provider.iter_image_entries(sync_folders=sync_albums or None) if is_supported_media_file(entry.name, entry.mime_type)),
+                provider_name=provider.provider_name,
+                provider_id=record_provider_id,
+                reprocess_existing=self.reprocess_existing,
+            )
+            for pending in pending_entries:
+                entry = pending.entry
+                if processed >= remaining:
+                    break
+
+                try:
+                    click.echo(f"\nProcessing: {entry.display_path or entry.name} ({entry.source_key})")
+                    if pending.revision_changed:
+                        click.echo("  ↻ Source changed since last sync, reprocessing")
+                    result = process_storage_entry(
+                        db=self.db,
+                        tenant=tenant_context,
+                        entry=entry,
+                        provider=provider,
+                        thumbnail_bucket=thumbnail_bucket,
+                        reprocess_existing=self.reprocess_existing,
+                        provider_id=record_provider_id,
+                        pending=pending,
+                        log=lambda message: click.echo(f"  {message}"),
+                    )
+                    if result.status == "processed":
+                        click.echo(f"  ✓ Metadata + asset recorded (ID: {result.image_id})")
+                        processed += 1
+                    elif result.status == "skipped":
+                        click.echo("  ↪ Already synced, skipping")
+                except Exception as exc:
+                    click.echo(f"  ✗ Error: {exc}", err=True)
+                    self.db.rollback()
         except Exception as exc:
             click.echo(f"  ✗ Failed to list Flickr items: {exc}", err=True)
-            return 0
-
-        click.echo(f"Found {len(all_entries)} total entries")
-
-        unprocessed = []
-        for entry in all_entries:
-            if not is_supported_media_file(entry.name, entry.mime_type):
-                continue
-            if not self.reprocess_existing and entry.source_key in processed_keys:
-                continue
-            unprocessed.append(entry)
-            if len(unprocessed) >= remaining:
-                break
-
-        click.echo(f"Found {len(unprocessed)} unprocessed items")
-
-        processed = 0
-        for entry in unprocessed:
-            if processed >= remaining:
-                break
-
-            try:
-                click.echo(f"\nProcessing: {entry.display_path or entry.name} ({entry.source_key})")
-                result = process_storage_entry(
-                    db=self.db,
-                    tenant=tenant_context,
-                    entry=entry,
-                    provider=provider,
-                    thumbnail_bucket=thumbnail_bucket,
-                    reprocess_existing=self.reprocess_existing,
-                    provider_id=record_provider_id,
-                    log=lambda message: click.echo(f"  {message}"),
-                )
-                if result.status == "processed":
-                    processed_keys.add(entry.source_key)
-                    click.echo(f"  ✓ Metadata + asset recorded (ID: {result.image_id})")
-                    processed += 1
-                elif result.status == "skipped":
-                    click.echo("  ↪ Already synced, skipping")
-            except Exception as exc:
-                click.echo(f"  ✗ Error: {exc}", err=True)
-                self.db.rollback()
+            return processed
 
         return processed
@@ -7,10 +7,11 @@ from google.cloud import storage
 from zoltag.settings import settings
 from zoltag.dependencies import get_secret
 from zoltag.integrations import TenantIntegrationRepository
-from zoltag.metadata import Asset, Tenant as TenantModel
+from zoltag.metadata import Tenant as TenantModel
 from zoltag.image import is_supported_media_file
 from zoltag.storage.providers import GoogleDriveStorageProvider
-from zoltag.sync_pipeline import process_storage_entry
+from zoltag.sync_cursors import DriveSyncListing
+from zoltag.sync_pipeline import iter_pending_entries, process_storage_entry
 from zoltag.cli.base import CliCommand
 
 
@@ -138,63 +139,71 @@ class SyncGdriveCommand(CliCommand):
         else:
             click.echo("No sync folders configured — listing entire Drive")
 
-        processed_keys: set[str] = set()
-        if not self.reprocess_existing:
-            q = self.db.query(Asset.source_key).filter(
-                self.tenant_filter(Asset),
-                Asset.source_provider == "gdrive",
-            )
-            processed_keys = set(row[0] for row in q.all() if row[0])
+        listing = DriveSyncListing(
+            self.db,
+            provider,
+            tenant_id=tenant_context.id,
+            provider_id=record_provider_id,
+            sync_folders=sync_folders,
+            reprocess_existing=self.reprocess_existing,
+        )
+        if listing.is_incremental:
+            click.echo("Listing Google Drive changes since the last complete sync...")
+        else:
+            click.echo("Listing files from Google Drive...")
 
-        click.echo("Listing files from Google Drive...")
+        # Entries are processed as listing pages arrive instead of after a full walk;
+        # each batch is checked against existing assets in one query.
+        processed = 0
+        failed = 0
         try:
-            all_entries = provider.list_image_entries(sync_folders=sync_folders or None)
+            pending_entries = iter_pending_entries(
+                self.db,
+                tenant_context,
+                (entry for entry in listing if is_supported_media_file(entry.name, entry.mime_type)),
+                provider_name=provider.provider_name,
+                provider_id=record_provider_id,
+                reprocess_existing=self.reprocess_existing,
+            )
+            for pending in pending_entries:
+                entry = pending.entry
+                if processed >= remaining:
+                    break
+
+                try:
+                    click.echo(f"\nProcessing: {entry.display_path or entry.name} ({entry.source_key})")
+                    if pending.revision_changed:
+                        click.echo("  ↻ Source changed since last sync, reprocessing")
+
+                    result = process_storage_entry(
+                        db=self.db,
+                        tenant=tenant_context,
+                        entry=entry,
+                        provider=provider,
+                        thumbnail_bucket=thumbnail_bucket,
+                        reprocess_existing=self.reprocess_existing,
+                        provider_id=record_provider_id,
+                        pending=pending,
+                        log=lambda message: click.echo(f"  {message}"),
+                    )
+
+                    if result.status == "processed":
+                        click.echo(f"  ✓ Metadata + asset recorded (ID: {result.image_id})")
+                        processed += 1
+                    elif result.status == "skipped":
+                        click.echo("  ↪ Already synced, skipping")
+
+                except Exception as e:
+                    failed += 1
+                    click.echo(f"  ✗ Error: {e}", err=True)
+                    self.db.rollback()
         except Exception as exc:
             click.echo(f"  ✗ Failed to list Google Drive files: {exc}", err=True)
-            return 0
-
-        click.echo(f"Found {len(all_entries)} total entries")
-
-        unprocessed = []
-        for entry in all_entries:
-            if not is_supported_media_file(entry.name, entry.mime_type):
-                continue
-            if not self.reprocess_existing and entry.source_key in processed_keys:
-                continue
-            unprocessed.append(entry)
-            if len(unprocessed) >= remaining:
-                break
-
-        click.echo(f"Found {len(unprocessed)} unprocessed files")
-
-        processed = 0
-        for entry in unprocessed:
-            if processed >= remaining:
-                break
-
-            try:
-                click.echo(f"\nProcessing: {entry.display_path or entry.name} ({entry.source_key})")
-
-                result = process_storage_entry(
-                    db=self.db,
-                    tenant=tenant_context,
-                    entry=entry,
-                    provider=provider,
-                    thumbnail_bucket=thumbnail_bucket,
-                    reprocess_existing=self.reprocess_existing,
-                    provider_id=record_provider_id,
-                    log=lambda message: click.echo(f"  {message}"),
-                )
-
-                if result.status == "processed":
-                    processed_keys.add(entry.source_key)
-                    click.echo(f"  ✓ Metadata + asset recorded (ID: {result.image_id})")
-                    processed += 1
-                elif result.status == "skipped":
-                    click.echo("  ↪ Already synced, skipping")
+            return processed
 
-            except Exception as e:
-                click.echo(f"  ✗ Error: {e}", err=True)
-                self.db.rollback()
+        # Only a run that handled everything it listed may move the cursor forward.
+        if not failed and listing.mark_complete():
+            self.db.commit()
+            click.echo("Saved Google Drive changes cursor for the next incremental sync")
 
         return processed
@@ -11,11 +11,10 @@ from zoltag.integrations import (
     normalize_selection_mode,
     normalize_sync_items,
 )
-from zoltag.metadata import Asset
 from zoltag.metadata import Tenant as TenantModel
 from zoltag.settings import settings
 from zoltag.storage.providers import GooglePhotosStorageProvider
-from zoltag.sync_pipeline import process_storage_entry
+from zoltag.sync_pipeline import iter_pending_entries, process_storage_entry
 
 
 @click.command(name='sync-gphotos')
@@ -155,69 +154,60 @@ class SyncGphotosCommand(CliCommand):
             else:
                 click.echo("No sync albums configured — listing entire Google Photos library")
 
-        processed_keys: set[str] = set()
-        if not self.reprocess_existing:
-            q = self.db.query(Asset.source_key).filter(
-                self.tenant_filter(Asset),
-                Asset.source_provider == "gphotos",
-            )
-            processed_keys = {row[0] for row in q.all() if row[0]}
-
         click.echo("Listing items from Google Photos...")
+
+        processed = 0
         try:
             if selection_mode == "picker":
-                all_entries = provider.list_picker_entries(
+                entries = provider.list_picker_entries(
                     picker_session_id,
                     picked_media_item_ids=selected_item_ids or None,
                 )
             else:
-                all_entries = provider.list_image_entries(sync_folders=sync_albums or None)
+                # Catalog items are processed as listing pages arrive.
+                entries = provider.iter_image_entries(sync_folders=sync_albums or None)
+            # Listed entries are checked against existing assets a batch at a time.
+            pending_entries = iter_pending_entries(
+                self.db,
+                tenant_context,
+                (entry for entry in entries if is_supported_media_file(entry.name, entry.mime_type)),
+                provider_name=provider.provider_name,
+                provider_id=record_provider_id,
+                reprocess_existing=self.reprocess_existing,
+            )
+            for pending in pending_entries:
+                entry = pending.entry
+                if processed >= remaining:
+                    break
+
+                try:
+                    click.echo(f"\nProcessing: {entry.display_path or entry.name} ({entry.source_key})")
+                    if pending.revision_changed:
+                        click.echo("  ↻ Source changed since last sync, reprocessing")
+
+                    result = process_storage_entry(
+                        db=self.db,
+                        tenant=tenant_context,
+                        entry=entry,
+                        provider=provider,
+                        thumbnail_bucket=thumbnail_bucket,
+                        reprocess_existing=self.reprocess_existing,
+                        provider_id=record_provider_id,
+                        pending=pending,
+                        log=lambda message: click.echo(f"  {message}"),
+                    )
+
+                    if result.status == "processed":
+                        click.echo(f"  ✓ Metadata + asset recorded (ID: {result.image_id})")
+                        processed += 1
+                    elif result.status == "skipped":
+                        click.echo("  ↪ Already synced, skipping")
+
+                except Exception as e:
+                    click.echo(f"  ✗ Error: {e}", err=True)
+                    self.db.rollback()
         except Exception as exc:
             click.echo(f"  ✗ Failed to list Google Photos items: {exc}", err=True)
-            return 0
-
-        click.echo(f"Found {len(all_entries)} total entries")
-
-        unprocessed = []
-        for entry in all_entries:
-            if not is_supported_media_file(entry.name, entry.mime_type):
-                continue
-            if not self.reprocess_existing and entry.source_key in processed_keys:
-                continue
-            unprocessed.append(entry)
-            if len(unprocessed) >= remaining:
-                break
-
-        click.echo(f"Found {len(unprocessed)} unprocessed items")
-
-        processed = 0
-        for entry in unprocessed:
-            if processed >= remaining:
-                break
-
-            try:
-                click.echo(f"\nProcessing: {entry.display_path or entry.name} ({entry.source_key})")
-
-                result = process_storage_entry(
-                    db=self.db,
-                    tenant=tenant_context,
-                    entry=entry,
-                    provider=provider,
-                    thumbnail_bucket=thumbnail_bucket,
-                    reprocess_existing=self.reprocess_existing,
-                    provider_id=record_provider_id,
-                    log=lambda message: click.echo(f"  {message}"),
-                )
-
-                if result.status == "processed":
-                    processed_keys.add(entry.source_key)
-                    click.echo(f"  ✓ Metadata + asset recorded (ID: {result.image_id})")
-                    processed += 1
-                elif result.status == "skipped":
-                    click.echo("  ↪ Already synced, skipping")
-
-            except Exception as e:
-                click.echo(f"  ✗ Error: {e}", err=True)
-                self.db.rollback()
+            return processed
 
         return processed
@@ -156,7 +156,7 @@ class SyncProvidersCommand(CliCommand):
         click.echo("\n--- rebuild-asset-text-index ---")
         RebuildAssetTextIndexCommand(
             tenant_id=self.tenant_id,
-            asset_id=None,
+            asset_ids=[],
             limit=None,
             offset=0,
             refresh=False,
@@ -6,9 +6,9 @@ from google.cloud import storage
 from zoltag.settings import settings
 from zoltag.dependencies import get_secret
 from zoltag.integrations import TenantIntegrationRepository
-from zoltag.metadata import Asset, Tenant as TenantModel
+from zoltag.metadata import Tenant as TenantModel
 from zoltag.storage.providers import YouTubeStorageProvider
-from zoltag.sync_pipeline import process_storage_entry
+from zoltag.sync_pipeline import iter_pending_entries, process_storage_entry
 from zoltag.cli.base import CliCommand
 
 
@@ -125,61 +125,53 @@ class SyncYoutubeCommand(CliCommand):
         else:
             click.echo("No sync playlists configured — listing all uploads from channel")
 
-        processed_keys: set[str] = set()
-        if not self.reprocess_existing:
-            q = self.db.query(Asset.source_key).filter(
-                self.tenant_filter(Asset),
-                Asset.source_provider == "youtube",
-            )
-            processed_keys = set(row[0] for row in q.all() if row[0])
-
         click.echo("Listing videos from YouTube...")
+
+        # Videos are processed as playlist pages arrive instead of after a full listing.
+        processed = 0
         try:
-            all_entries = provider.list_image_entries(sync_folders=sync_playlists or None)
+            # Listed entries are checked against existing assets a batch at a time.
+            pending_entries = iter_pending_entries(
+                self.db,
+                tenant_context,
+                provider.iter_image_entries(sync_folders=sync_playlists or None),
+                provider_name=provider.provider_name,
+                provider_id=record_provider_id,
+                reprocess_existing=self.reprocess_existing,
+            )
+            for pending in pending_entries:
+                entry = pending.entry
+                if processed >= remaining:
+                    break
+
+                try:
+                    click.echo(f"\nProcessing: {entry.name} ({entry.source_key})")
+                    if pending.revision_changed:
+                        click.echo("  ↻ Source changed since last sync, reprocessing")
+
+                    result = process_storage_entry(
+                        db=self.db,
+                        tenant=tenant_context,
+                        entry=entry,
+                        provider=provider,
+                        thumbnail_bucket=thumbnail_bucket,
+                        reprocess_existing=self.reprocess_existing,
+                        provider_id=record_provider_id,
+                        pending=pending,
+                        log=lambda message: click.echo(f"  {message}"),
+                    )
+
+                    if result.status == "processed":
+                        click.echo(f"  ✓ Metadata recorded (ID: {result.image_id})")
+                        processed += 1
+                    elif result.status == "skipped":
+                        click.echo("  ↪ Already synced, skipping")
+
+                except Exception as e:
+                    click.echo(f"  ✗ Error: {e}", err=True)
+                    self.db.rollback()
         except Exception as exc:
             click.echo(f"  ✗ Failed to list YouTube videos: {exc}", err=True)
-            return 0
-
-        click.echo(f"Found {len(all_entries)} total entries")
-
-        unprocessed = []
-        for entry in all_entries:
-            if not self.reprocess_existing and entry.source_key in processed_keys:
-                continue
-            unprocessed.append(entry)
-            if len(unprocessed) >= remaining:
-                break
-
-        click.echo(f"Found {len(unprocessed)} unprocessed videos")
-
-        processed = 0
-        for entry in unprocessed:
-            if processed >= remaining:
-                break
-
-            try:
-                click.echo(f"\nProcessing: {entry.name} ({entry.source_key})")
-
-                result = process_storage_entry(
-                    db=self.db,
-                    tenant=tenant_context,
-                    entry=entry,
-                    provider=provider,
-                    thumbnail_bucket=thumbnail_bucket,
-                    reprocess_existing=self.reprocess_existing,
-                    provider_id=record_provider_id,
-                    log=lambda message: click.echo(f"  {message}"),
-                )
-
-                if result.status == "processed":
-                    processed_keys.add(entry.source_key)
-                    click.echo(f"  ✓ Metadata recorded (ID: {result.image_id})")
-                    processed += 1
-                elif result.status == "skipped":
-                    click.echo("  ↪ Already synced, skipping")
-
-            except Exception as e:
-                click.echo(f"  ✗ Error: {e}", err=True)
-                self.db.rollback()
+            return processed
 
         return processed
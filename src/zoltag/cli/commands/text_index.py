@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from typing import Optional
+from typing import Optional, Sequence
 
 import click
 
@@ -12,7 +12,11 @@ from zoltag.text_index import rebuild_asset_text_index
 
 @click.command(name="rebuild-asset-text-index")
 @click.option("--tenant-id", required=True, help="Tenant ID for which to rebuild text index documents")
-@click.option("--asset-id", default=None, help="Optional single asset UUID to rebuild")
+@click.option(
+    "--asset-id",
+    multiple=True,
+    help="Asset UUID to rebuild (repeatable); default rebuilds the tenant selection",
+)
 @click.option("--limit", default=None, type=int, help="Maximum number of assets to rebuild")
 @click.option("--offset", default=0, type=int, help="Offset into tenant asset set")
 @click.option(
@@ -27,7 +31,7 @@ from zoltag.text_index import rebuild_asset_text_index
 )
 def rebuild_asset_text_index_command(
     tenant_id: str,
-    asset_id: Optional[str],
+    asset_id: Sequence[str],
     limit: Optional[int],
     offset: int,
     refresh: bool,
@@ -36,7 +40,7 @@ def rebuild_asset_text_index_command(
     """Rebuild per-asset denormalized text-search documents."""
     cmd = RebuildAssetTextIndexCommand(
         tenant_id=tenant_id,
-        asset_id=asset_id,
+        asset_ids=list(asset_id),
         limit=limit,
         offset=offset,
         refresh=refresh,
@@ -52,7 +56,7 @@ class RebuildAssetTextIndexCommand(CliCommand):
         self,
         *,
         tenant_id: str,
-        asset_id: Optional[str],
+        asset_ids: Sequence[str],
         limit: Optional[int],
         offset: int,
         refresh: bool,
@@ -60,7 +64,7 @@ class RebuildAssetTextIndexCommand(CliCommand):
     ):
         super().__init__()
         self.tenant_id = tenant_id
-        self.asset_id = asset_id
+        self.asset_ids = list(asset_ids or [])
         self.limit = limit
         self.offset = offset
         self.refresh = refresh
@@ -72,7 +76,7 @@ class RebuildAssetTextIndexCommand(CliCommand):
             self.load_tenant(self.tenant_id)
             click.echo(
                 "Rebuilding asset text index "
-                f"(tenant={self.tenant.id}, asset_id={self.asset_id or '-'}, "
+                f"(tenant={self.tenant.id}, assets={len(self.asset_ids) or '-'}, "
                 f"offset={self.offset}, limit={self.limit or '-'}, "
                 f"refresh={bool(self.refresh)}, "
                 f"include_embeddings={bool(self.include_embeddings)})"
@@ -80,7 +84,7 @@ class RebuildAssetTextIndexCommand(CliCommand):
             result = rebuild_asset_text_index(
                 self.db,
                 tenant_id=self.tenant.id,
-                asset_id=self.asset_id,
+                asset_ids=self.asset_ids or None,
                 limit=self.limit,
                 offset=self.offset,
                 refresh=self.refresh,
@@ -0,0 +1,189 @@
+"""Keep blocking handler work off the event loop.
+
+Most routers use the synchronous SQLAlchemy session and google-cloud-storage
+client. ``offload`` wraps a plain ``def`` handler so FastAPI awaits it while it
+runs on a worker thread, with a per-route ``CapacityLimiter`` so one heavy
+route cannot take every thread (or every pooled DB connection).
+
+``EventLoopLagMonitor`` samples how late the loop wakes up and, when it lags,
+records which in-flight requests were running on the loop at the time, so
+handlers that still block can be found and moved.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import itertools
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+import anyio
+import anyio.to_thread
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ROUTE_CONCURRENCY = 16
+ROUTE_CONCURRENCY_LIMITS: Dict[str, int] = {
+    "images.list": 16,
+    "images.thumbnail": 16,
+    "images.duplicates": 4,
+    "keywords.tag_stats": 8,
+    "lists.export_pptx": 2,
+    "guest": 16,
+    "guest.full": 8,
+}
+
+EVENT_LOOP_LAG_SAMPLE_SECONDS = 0.5
+EVENT_LOOP_LAG_WARN_SECONDS = 0.25
+
+_limiters_lock = threading.Lock()
+_route_limiters: Dict[str, anyio.CapacityLimiter] = {}
+
+
+def get_route_limiter(route: str) -> anyio.CapacityLimiter:
+    with _limiters_lock:
+        limiter = _route_limiters.get(route)
+        if limiter is None:
+            limiter = anyio.CapacityLimiter(ROUTE_CONCURRENCY_LIMITS.get(route, DEFAULT_ROUTE_CONCURRENCY))
+            _route_limiters[route] = limiter
+        return limiter
+
+
+async def run_blocking(route: str, func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run ``func`` on a worker thread, bounded by the route's concurrency limit."""
+    entry = _current_request.get()
+    if entry is not None:
+        entry["offloaded"] += 1
+    try:
+        return await anyio.to_thread.run_sync(
+            functools.partial(func, *args, **kwargs),
+            limiter=get_route_limiter(route),
+        )
+    finally:
+        if entry is not None:
+            entry["offloaded"] -= 1
+
+
+def offload(route: str) -> Callable:
+    """Decorate a synchronous FastAPI handler to run on the route's bounded threadpool."""
+
+    def decorator(func: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(func):
+            raise TypeError(f"offload() expects a synchronous handler, got coroutine {func.__name__}")
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            return await run_blocking(route, func, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+# --- Event-loop lag monitoring -------------------------------------------------
+
+_current_request: contextvars.ContextVar[Optional[dict]] = contextvars.ContextVar(
+    "zoltag_current_request", default=None
+)
+_in_flight: Dict[int, dict] = {}
+_request_ids = itertools.count()
+
+
+class InFlightRequestMiddleware:
+    """ASGI middleware recording in-flight HTTP requests for the lag monitor."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope.get("type") != "http":
+            await self.app(scope, receive, send)
+            return
+        request_id = next(_request_ids)
+        entry = {"scope": scope, "started": time.monotonic(), "offloaded": 0}
+        _in_flight[request_id] = entry
+        token = _current_request.set(entry)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_request.reset(token)
+            _in_flight.pop(request_id, None)
+
+
+def _route_label(scope: dict) -> str:
+    route = scope.get("route")
+    path = getattr(route, "path", None) or scope.get("path") or "?"
+    return f"{scope.get('method', '?')} {path}"
+
+
+class EventLoopLagMonitor:
+    """Periodically measure event-loop wake-up delay and attribute lag to handlers."""
+
+    def __init__(
+        self,
+        *,
+        sample_seconds: float = EVENT_LOOP_LAG_SAMPLE_SECONDS,
+        warn_seconds: float = EVENT_LOOP_LAG_WARN_SECONDS,
+    ):
+        self.sample_seconds = sample_seconds
+        self.warn_seconds = warn_seconds
+        self._task: Optional[asyncio.Task] = None
+        self.samples = 0
+        self.lag_events = 0
+        self.last_lag_seconds = 0.0
+        self.max_lag_seconds = 0.0
+        self.suspects: Dict[str, int] = {}
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run(), name="zoltag-loop-lag-monitor")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    def record(self, lag_seconds: float) -> None:
+        self.samples += 1
+        self.last_lag_seconds = lag_seconds
+        self.max_lag_seconds = max(self.max_lag_seconds, lag_seconds)
+        if lag_seconds < self.warn_seconds:
+            return
+        self.lag_events += 1
+        # Requests whose work is currently on a worker thread cannot have blocked the loop.
+        on_loop = [_route_label(entry["scope"]) for entry in list(_in_flight.values()) if not entry["offloaded"]]
+        for label in set(on_loop):
+            self.suspects[label] = self.suspects.get(label, 0) + 1
+        logger.warning(
+            "Event loop blocked for %.0f ms; in-flight on loop: %s",
+            lag_seconds * 1000,
+            ", ".join(sorted(set(on_loop))) or "none",
+        )
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.sample_seconds)
+            self.record(max(0.0, loop.time() - started - self.sample_seconds))
+
+    def stats(self) -> dict:
+        return {
+            "samples": self.samples,
+            "lag_events": self.lag_events,
+            "last_lag_ms": round(self.last_lag_seconds * 1000, 1),
+            "max_lag_ms": round(self.max_lag_seconds * 1000, 1),
+            "suspects": dict(sorted(self.suspects.items(), key=lambda item: item[1], reverse=True)),
+        }
+
+
+event_loop_lag_monitor = EventLoopLagMonitor()
@@ -4,6 +4,7 @@ from typing import List, Dict, Optional
 
 from sqlalchemy.orm import Session
 
+from zoltag.keyword_registry import bump_keyword_registry_version, get_keyword_registry
 from zoltag.models.config import KeywordCategory as DBKeywordCategory, Keyword as DBKeyword
 from zoltag.metadata import Person as DBPerson
 from zoltag.tenant_scope import tenant_column_filter_for_values
@@ -63,6 +64,7 @@ class ConfigManager:
         for cat_data in categories_data:
             self._create_category(cat_data, None)
         
+        bump_keyword_registry_version(self.session, self.tenant_id)
         self.session.commit()
     
     def save_people(self, people_data: List[dict]) -> None:
@@ -85,54 +87,13 @@ class ConfigManager:
         self.session.commit()
     
     def _get_keywords_from_db(self, include_people: bool = False) -> List[dict]:
-        """Fetch keywords from database."""
-        categories = self.session.query(DBKeywordCategory).filter(
-            self._tenant_filter(DBKeywordCategory),
-            DBKeywordCategory.parent_id == None
-        ).order_by(DBKeywordCategory.sort_order).all()
-        
-        if not categories:
-            return []
-        
-        result = []
-        for category in categories:
-            self._extract_keywords_recursive(category, "", result, include_people=include_people)
-        
-        return result
-    
-    def _extract_keywords_recursive(
-        self,
-        category: DBKeywordCategory,
-        parent_path: str,
-        result: List[dict],
-        include_people: bool = False
-    ):
-        """Recursively extract keywords with category paths.
+        """Fetch keywords from the tenant keyword registry.
 
-        Excludes 'person' type keywords since those are for manual people tagging,
-        not for ML model classification.
+        Excludes 'person' type keywords unless requested since those are for
+        manual people tagging, not for ML model classification.
         """
-        category_path = f"{parent_path}/{category.name}" if parent_path else category.name
-
-        for keyword in sorted(category.keywords, key=lambda k: k.sort_order):
-            # Skip person keywords - they're for manual tagging, not ML
-            if not include_people and getattr(keyword, 'tag_type', 'keyword') == 'person':
-                continue
-            result.append({
-                'keyword': keyword.keyword,
-                'category': category_path,
-                'prompt': keyword.prompt,
-                'person_id': keyword.person_id,
-                'tag_type': getattr(keyword, 'tag_type', 'keyword'),
-            })
-
-        for subcat in sorted(category.subcategories, key=lambda c: c.sort_order):
-            self._extract_keywords_recursive(
-                subcat,
-                category_path,
-                result,
-                include_people=include_people
-            )
+        registry = get_keyword_registry(self.session, self.tenant_id)
+        return registry.config_keywords(include_people=include_people)
     
     def _get_people_from_db(self) -> List[dict]:
         """Fetch people from database."""
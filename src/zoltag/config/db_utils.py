@@ -6,8 +6,7 @@ and improve maintainability across the application.
 
 from typing import Dict, List, Set
 from sqlalchemy.orm import Session
-from zoltag.models.config import Keyword, KeywordCategory
-from zoltag.tenant_scope import tenant_column_filter_for_values
+from zoltag.keyword_registry import get_keyword_registry, get_keyword_registry_for_ids
 
 
 def load_keywords_map(
@@ -18,8 +17,8 @@ def load_keywords_map(
     """
     Load keyword name and category for multiple keyword IDs.
 
-    Handles large lists by chunking to avoid database parameter limits.
-    Returns dict with safe fallback for missing IDs.
+    Served from the tenant keyword registry; an unknown ID re-checks the
+    registry version and reloads it only if it changed. Missing IDs are omitted.
 
     Args:
         db: Database session
@@ -32,31 +31,7 @@ def load_keywords_map(
     if not keyword_ids:
         return {}
 
-    # Chunk to avoid parameter limit (PostgreSQL ~32k, SQLite 999; chunk at 500 for safety)
-    CHUNK_SIZE = 500
-    keywords_data = {}
-    keyword_list = list(keyword_ids)
-
-    for i in range(0, len(keyword_list), CHUNK_SIZE):
-        chunk = keyword_list[i : i + CHUNK_SIZE]
-        rows = db.query(
-            Keyword.id,
-            Keyword.keyword,
-            KeywordCategory.name
-        ).join(
-            KeywordCategory, Keyword.category_id == KeywordCategory.id
-        ).filter(
-            tenant_column_filter_for_values(Keyword, tenant_id),
-            Keyword.id.in_(chunk)
-        ).all()
-
-        for kw_id, kw_name, cat_name in rows:
-            keywords_data[kw_id] = {
-                "keyword": kw_name,
-                "category": cat_name,
-            }
-
-    return keywords_data
+    return get_keyword_registry_for_ids(db, tenant_id, keyword_ids).keywords_map(keyword_ids)
 
 
 def load_keyword_info_by_name(
@@ -78,21 +53,7 @@ def load_keyword_info_by_name(
     if not keyword_names:
         return {}
 
-    keywords_data = db.query(
-        Keyword.keyword,
-        Keyword.id,
-        KeywordCategory.name
-    ).join(
-        KeywordCategory, Keyword.category_id == KeywordCategory.id
-    ).filter(
-        tenant_column_filter_for_values(Keyword, tenant_id),
-        Keyword.keyword.in_(keyword_names)
-    ).all()
-
-    return {
-        kw_name: {"id": kw_id, "category": cat_name}
-        for kw_name, kw_id, cat_name in keywords_data
-    }
+    return get_keyword_registry(db, tenant_id).info_by_name(keyword_names)
 
 
 def format_machine_tags(tags, keywords_map: Dict[int, Dict]) -> List[Dict]:
@@ -1,8 +1,38 @@
-"""Email sending via Resend API."""
-
+"""Guest email rendering and the durable outbox that delivers it.
+
+Request handlers never talk to the mail provider. ``queue_*`` functions
+render a message and add an ``EmailOutbox`` row to the caller's transaction,
+so the email is sent if and only if the surrounding change commits.
+``process_email_outbox`` is drained by the job worker:
+
+- Due rows are claimed with ``SKIP LOCKED`` so several workers can drain
+  concurrently, and sent in batches (Resend's batch API takes up to 100).
+  Claimed rows are leased and committed before the provider call, so no row
+  lock is held across the HTTP request.
+- A rejected batch is retried one message at a time, so only the bad row
+  records the failure. Failed sends are retried with exponential backoff up
+  to ``max_attempts``, then marked ``failed``.
+- Once a row is ``sent`` or ``failed`` its bodies are cleared (magic links and
+  OTP codes must not outlive delivery), and ``purge_email_outbox`` deletes
+  finished rows after ``email_outbox_retention_days``.
+- Each tenant may send at most ``email_tenant_max_per_minute`` messages; the
+  rest of its rows are pushed back a minute so other tenants are not starved.
+
+``settings.email_transport = "file"`` swaps Resend for ``FileSinkTransport``,
+which writes each message as JSON to a directory (local mode and tests).
+"""
+
+import json
 import logging
-from typing import Optional
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional, Sequence
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
 
+from zoltag.metadata import EmailOutbox
 from zoltag.settings import settings
 
 logger = logging.getLogger(__name__)
@@ -12,6 +42,13 @@ try:
 except Exception:  # pragma: no cover - optional dependency in local dev
     resend = None
 
+RESEND_MAX_BATCH = 100
+_RETRY_BASE_SECONDS = 30
+_RETRY_MAX_SECONDS = 3600
+_THROTTLE_WINDOW = timedelta(minutes=1)
+# How long a claimed row is hidden from other drains while its batch is sent.
+_CLAIM_LEASE = timedelta(minutes=5)
+
 
 def _resend_available() -> bool:
     if resend is None:
@@ -48,32 +85,14 @@ def _extract_resend_message_id(response: object) -> str | None:
     return None
 
 
-def send_guest_invite_email(
+def _render_guest_invite(
     to_email: str,
     invite_link: str,
-    list_name: Optional[str] = None,
-    inviter_name: Optional[str] = None,
-    tenant_name: Optional[str] = None,
-) -> bool:
-    """Send a guest invitation email via Resend.
-
-    Args:
-        to_email: Recipient email address
-        invite_link: The full invite link URL
-        list_name: Name of the photo list being shared (optional)
-        inviter_name: Name of person sending the invite (optional)
-        tenant_name: Tenant/org name for "on behalf of" text (optional)
-
-    Returns:
-        True if email sent successfully, False otherwise
-    """
-    if not _resend_available():
-        return False
-
-    # Set the API key
-    resend.api_key = settings.email_resend_api_key
-
-    # Build email subject and body
+    list_name: Optional[str],
+    inviter_name: Optional[str],
+    tenant_name: Optional[str],
+) -> tuple[str, str, str]:
+    """Return ``(subject, html, text)`` for a guest invitation."""
     subject = "You're invited to view shared media"
     if list_name:
         subject = f'Invitation to view "{list_name}"'
@@ -156,56 +175,15 @@ This invitation was sent to {to_email}
 If you didn't expect this invitation, you can safely ignore this email.
     """.strip()
 
-    try:
-        params = {
-            "from": settings.email_from_address,
-            "to": [to_email],
-            "subject": subject,
-            "html": html_body,
-            "text": text_body,
-        }
-
-        logger.info(
-            "Sending invite email to %s via Resend (from=%s, key=%s)",
-            to_email,
-            settings.email_from_address,
-            _masked_api_key(),
-        )
-        response = resend.Emails.send(params)
-        message_id = _extract_resend_message_id(response)
-        if not message_id:
-            logger.error("Resend returned no message id for invite email to %s. Raw response=%r", to_email, response)
-            return False
-        logger.info("✅ Email accepted by Resend for %s, ID: %s", to_email, message_id)
-        return True
-
-    except Exception as e:
-        logger.error(f"❌ Failed to send email to {to_email}: {e}")
-        return False
+    return subject, html_body, text_body
 
 
-async def send_guest_magic_link_email(
+def _render_guest_magic_link(
     to_email: str,
     magic_link: str,
-    otp_code: Optional[str] = None,
-) -> bool:
-    """Send a guest magic link authentication email via Resend.
-
-    Args:
-        to_email: Recipient email address
-        magic_link: The Supabase magic link URL
-        otp_code: Optional OTP code for manual entry (if supported)
-
-    Returns:
-        True if email sent successfully, False otherwise
-    """
-    if not _resend_available():
-        return False
-
-    # Set the API key
-    resend.api_key = settings.email_resend_api_key
-
-    # Build email subject and body
+    otp_code: Optional[str],
+) -> tuple[str, str, str]:
+    """Return ``(subject, html, text)`` for a guest sign-in link."""
     subject = "Sign in to view your shared photos on Zoltag"
 
     # HTML email body
@@ -265,57 +243,14 @@ This sign-in link was sent to {to_email}
 If you didn't request this link, you can safely ignore this email.
     """.strip()
 
-    try:
-        params = {
-            "from": settings.email_from_address,
-            "to": [to_email],
-            "subject": subject,
-            "html": html_body,
-            "text": text_body,
-        }
-
-        logger.info(
-            "Sending magic link email to %s via Resend (from=%s, key=%s)",
-            to_email,
-            settings.email_from_address,
-            _masked_api_key(),
-        )
-        response = resend.Emails.send(params)
-        message_id = _extract_resend_message_id(response)
-        if not message_id:
-            logger.error("Resend returned no message id for magic link email to %s. Raw response=%r", to_email, response)
-            return False
-        logger.info("✅ Magic link email accepted by Resend for %s, ID: %s", to_email, message_id)
-        return True
-
-    except Exception as e:
-        logger.error(f"❌ Failed to send magic link email to {to_email}: {e}")
-        return False
+    return subject, html_body, text_body
 
 
-async def send_guest_access_reminder_email(
+def _render_guest_access_reminder(
     to_email: str,
     access_link: str,
-) -> bool:
-    """Send a simple access reminder email (no magic link tokens).
-
-    User clicks link, lands on /guest, and requests a fresh magic link there.
-    This avoids Supabase's email-sending behavior and redirect URL issues.
-
-    Args:
-        to_email: Recipient email address
-        access_link: Simple link to /guest page (no auth tokens)
-
-    Returns:
-        True if email sent successfully, False otherwise
-    """
-    if not _resend_available():
-        return False
-
-    # Set the API key
-    resend.api_key = settings.email_resend_api_key
-
-    # Build email subject and body
+) -> tuple[str, str, str]:
+    """Return ``(subject, html, text)`` for an access reminder (no auth tokens)."""
     subject = "Access your shared photos on Zoltag"
 
     # HTML email body
@@ -370,29 +305,297 @@ This access link was sent to {to_email}
 If you didn't request this link, you can safely ignore this email.
     """.strip()
 
-    try:
-        params = {
-            "from": settings.email_from_address,
-            "to": [to_email],
-            "subject": subject,
-            "html": html_body,
-            "text": text_body,
-        }
+    return subject, html_body, text_body
+
+
+# --- outbox ----------------------------------------------------------------------
 
+
+def queue_email(
+    db: Session,
+    *,
+    kind: str,
+    to_email: str,
+    subject: str,
+    html_body: str,
+    text_body: str,
+    tenant_id: Optional[uuid.UUID | str] = None,
+) -> EmailOutbox:
+    """Add a message to the outbox; it is delivered once the caller commits."""
+    message = EmailOutbox(
+        tenant_id=uuid.UUID(str(tenant_id)) if tenant_id else None,
+        kind=kind,
+        to_email=to_email,
+        subject=subject,
+        html_body=html_body,
+        text_body=text_body,
+        status="pending",
+        max_attempts=max(1, int(settings.email_outbox_max_attempts)),
+        next_attempt_at=datetime.utcnow(),
+    )
+    db.add(message)
+    return message
+
+
+def queue_guest_invite_email(
+    db: Session,
+    *,
+    to_email: str,
+    invite_link: str,
+    list_name: Optional[str] = None,
+    inviter_name: Optional[str] = None,
+    tenant_name: Optional[str] = None,
+    tenant_id: Optional[uuid.UUID | str] = None,
+) -> EmailOutbox:
+    """Queue a guest invitation for ``to_email`` with its sign-in link."""
+    subject, html_body, text_body = _render_guest_invite(to_email, invite_link, list_name, inviter_name, tenant_name)
+    return queue_email(
+        db,
+        kind="guest_invite",
+        to_email=to_email,
+        subject=subject,
+        html_body=html_body,
+        text_body=text_body,
+        tenant_id=tenant_id,
+    )
+
+
+def queue_guest_magic_link_email(
+    db: Session,
+    *,
+    to_email: str,
+    magic_link: str,
+    otp_code: Optional[str] = None,
+    tenant_id: Optional[uuid.UUID | str] = None,
+) -> EmailOutbox:
+    """Queue a guest magic-link sign-in email."""
+    subject, html_body, text_body = _render_guest_magic_link(to_email, magic_link, otp_code)
+    return queue_email(
+        db,
+        kind="guest_magic_link",
+        to_email=to_email,
+        subject=subject,
+        html_body=html_body,
+        text_body=text_body,
+        tenant_id=tenant_id,
+    )
+
+
+def queue_guest_access_reminder_email(
+    db: Session,
+    *,
+    to_email: str,
+    access_link: str,
+    tenant_id: Optional[uuid.UUID | str] = None,
+) -> EmailOutbox:
+    """Queue an access reminder pointing at /guest, where a fresh link can be requested."""
+    subject, html_body, text_body = _render_guest_access_reminder(to_email, access_link)
+    return queue_email(
+        db,
+        kind="guest_access_reminder",
+        to_email=to_email,
+        subject=subject,
+        html_body=html_body,
+        text_body=text_body,
+        tenant_id=tenant_id,
+    )
+
+
+# --- transports ------------------------------------------------------------------
+
+
+class ResendBatchTransport:
+    """Sends up to ``RESEND_MAX_BATCH`` messages per Resend batch API call."""
+
+    def send_batch(self, messages: Sequence[dict]) -> list[Optional[str]]:
+        resend.api_key = settings.email_resend_api_key
         logger.info(
-            "Sending access reminder email to %s via Resend (from=%s, key=%s)",
-            to_email,
+            "Sending %s email(s) via Resend batch (from=%s, key=%s)",
+            len(messages),
             settings.email_from_address,
             _masked_api_key(),
         )
-        response = resend.Emails.send(params)
-        message_id = _extract_resend_message_id(response)
-        if not message_id:
-            logger.error("Resend returned no message id for access reminder email to %s. Raw response=%r", to_email, response)
-            return False
-        logger.info("✅ Access reminder email accepted by Resend for %s, ID: %s", to_email, message_id)
-        return True
-
-    except Exception as e:
-        logger.error(f"❌ Failed to send access reminder email to {to_email}: {e}")
-        return False
+        response = resend.Batch.send(list(messages))
+        data = response.get("data") if isinstance(response, dict) else getattr(response, "data", None)
+        return [_extract_resend_message_id(item) for item in (data or [])]
+
+
+class FileSinkTransport:
+    """Writes each message as a JSON file instead of sending it."""
+
+    def __init__(self, directory: str | Path):
+        self.directory = Path(directory)
+
+    def send_batch(self, messages: Sequence[dict]) -> list[Optional[str]]:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        message_ids = []
+        for message in messages:
+            message_id = f"{datetime.utcnow():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:12]}"
+            (self.directory / f"{message_id}.json").write_text(json.dumps(message, indent=2), encoding="utf-8")
+            message_ids.append(message_id)
+        return message_ids
+
+
+def get_email_transport():
+    """The configured transport, or None when delivery is not possible."""
+    transport = str(settings.email_transport or "resend").strip().lower()
+    if transport == "file":
+        directory = settings.email_file_sink_dir or str(Path(settings.local_data_dir) / "email-outbox")
+        return FileSinkTransport(directory)
+    if transport != "resend":
+        logger.error("Unknown EMAIL_TRANSPORT %r - cannot send email", settings.email_transport)
+        return None
+    return ResendBatchTransport() if _resend_available() else None
+
+
+def email_delivery_available() -> bool:
+    return get_email_transport() is not None
+
+
+def _retry_delay(attempt_count: int) -> timedelta:
+    return timedelta(seconds=min(_RETRY_MAX_SECONDS, _RETRY_BASE_SECONDS * 2 ** max(0, attempt_count - 1)))
+
+
+def _throttled(db: Session, rows: list[EmailOutbox], now: datetime) -> tuple[list[EmailOutbox], list[EmailOutbox]]:
+    """Split claimed rows into ``(sendable, deferred)`` by each tenant's per-minute budget."""
+    limit = int(settings.email_tenant_max_per_minute or 0)
+    tenant_ids = {row.tenant_id for row in rows if row.tenant_id is not None}
+    if limit <= 0 or not tenant_ids:
+        return rows, []
+    recent = dict(
+        db.query(EmailOutbox.tenant_id, func.count(EmailOutbox.id))
+        .filter(
+            EmailOutbox.tenant_id.in_(tenant_ids),
+            EmailOutbox.status == "sent",
+            EmailOutbox.sent_at >= now - _THROTTLE_WINDOW,
+        )
+        .group_by(EmailOutbox.tenant_id)
+        .all()
+    )
+    remaining = {tenant_id: max(0, limit - int(recent.get(tenant_id, 0))) for tenant_id in tenant_ids}
+    sendable, deferred = [], []
+    for row in rows:
+        if row.tenant_id is None or remaining[row.tenant_id] > 0:
+            if row.tenant_id is not None:
+                remaining[row.tenant_id] -= 1
+            sendable.append(row)
+        else:
+            deferred.append(row)
+    return sendable, deferred
+
+
+def _send_isolating_failures(transport, messages: Sequence[dict]) -> list[tuple[Optional[str], Optional[str]]]:
+    """Send ``messages`` and return ``(message_id, error)`` for each one.
+
+    A rejected batch is retried one message at a time, so one bad address
+    does not fail (and back off) every other row in the batch.
+    """
+    try:
+        message_ids = list(transport.send_batch(messages) or [])
+    except Exception as exc:  # noqa: BLE001 - every failure is retried per row.
+        error = str(exc) or exc.__class__.__name__
+        if len(messages) == 1:
+            logger.error("❌ Email to %s failed: %s", ", ".join(messages[0]["to"]), error)
+            return [(None, error)]
+        logger.warning("Email batch of %s failed (%s); retrying one at a time", len(messages), error)
+        return [result for message in messages for result in _send_isolating_failures(transport, [message])]
+    return [(message_ids[index] if index < len(message_ids) else None, None) for index in range(len(messages))]
+
+
+def _clear_bodies(row: EmailOutbox) -> None:
+    # Guest bodies carry live sign-in links and OTP codes.
+    row.html_body = None
+    row.text_body = None
+
+
+def purge_email_outbox(db: Session, *, retention_days: Optional[int] = None) -> int:
+    """Delete ``sent`` and ``failed`` rows created more than ``retention_days`` ago.
+
+    Pending rows are never purged. Returns the number of rows deleted; the
+    caller commits.
+    """
+    days = int(settings.email_outbox_retention_days if retention_days is None else retention_days)
+    if days <= 0:
+        return 0
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    return (
+        db.query(EmailOutbox)
+        .filter(EmailOutbox.status.in_(("sent", "failed")), EmailOutbox.created_at < cutoff)
+        .delete(synchronize_session=False)
+    )
+
+
+def process_email_outbox(db: Session, *, limit: Optional[int] = None, transport=None) -> int:
+    """Send one batch of due outbox messages; returns how many were attempted.
+
+    Claimed rows are leased (pushed ``_CLAIM_LEASE`` into the future) and
+    committed before the provider call, so concurrent drains skip them without
+    a row lock being held across the HTTP request. If the worker dies
+    mid-send, the rows become due again when the lease runs out. The caller
+    commits the recorded results.
+    """
+    batch_size = max(1, min(int(limit or settings.email_outbox_batch_size), RESEND_MAX_BATCH))
+    now = datetime.utcnow()
+    rows = (
+        db.query(EmailOutbox)
+        .filter(EmailOutbox.status == "pending", EmailOutbox.next_attempt_at <= now)
+        .order_by(EmailOutbox.next_attempt_at.asc(), EmailOutbox.id.asc())
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    if not rows:
+        return 0
+    # Resolved only when mail is waiting, so an unconfigured provider is not logged every tick.
+    transport = transport or get_email_transport()
+    if transport is None:
+        return 0
+
+    sendable, deferred = _throttled(db, rows, now)
+    for row in deferred:
+        row.next_attempt_at = now + _THROTTLE_WINDOW
+    if deferred:
+        logger.info("Deferred %s email(s) over the per-tenant send rate", len(deferred))
+    if not sendable:
+        return 0
+
+    messages = [
+        {
+            "from": settings.email_from_address,
+            "to": [row.to_email],
+            "subject": row.subject,
+            "html": row.html_body,
+            "text": row.text_body,
+        }
+        for row in sendable
+    ]
+    row_ids = [row.id for row in sendable]
+    for row in sendable:
+        row.next_attempt_at = now + _CLAIM_LEASE
+    db.commit()
+
+    results = _send_isolating_failures(transport, messages)
+
+    finished_at = datetime.utcnow()
+    # One query refreshes the rows expired by the commit above.
+    rows_by_id = {row.id: row for row in db.query(EmailOutbox).filter(EmailOutbox.id.in_(row_ids)).all()}
+    for row_id, (message_id, error) in zip(row_ids, results, strict=True):
+        row = rows_by_id.get(row_id)
+        if row is None:  # Tenant deleted while the batch was in flight.
+            continue
+        row.attempt_count = int(row.attempt_count or 0) + 1
+        if message_id:
+            row.status = "sent"
+            row.sent_at = finished_at
+            row.provider_message_id = message_id
+            row.last_error = None
+            _clear_bodies(row)
+            continue
+        row.last_error = error or "Provider returned no message id"
+        if row.attempt_count >= int(row.max_attempts or 1):
+            row.status = "failed"
+            _clear_bodies(row)
+            logger.error("❌ Giving up on %s email %s to %s: %s", row.kind, row.id, row.to_email, row.last_error)
+        else:
+            row.next_attempt_at = finished_at + _retry_delay(row.attempt_count)
+    return len(sendable)
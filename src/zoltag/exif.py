@@ -3,6 +3,11 @@
 from datetime import datetime
 from typing import Any, Optional
 
+from PIL import ExifTags
+
+# Vendor blobs can be tens of kilobytes of binary; they are never read back.
+_SKIPPED_EXIF_TAGS = {ExifTags.Base.MakerNote}
+
 
 def get_exif_value(exif: dict, *keys: str) -> Any:
     """Return the first non-empty EXIF value for the given keys."""
@@ -67,3 +72,69 @@ def parse_exif_str(value: Any) -> Optional[str]:
     if isinstance(value, str):
         return value
     return str(value)
+
+
+def _json_safe_exif_value(value: Any) -> Any:
+    if hasattr(value, "numerator") and hasattr(value, "denominator"):
+        # IFDRational
+        if value.denominator != 0:
+            return float(value.numerator) / float(value.denominator)
+        return float(value.numerator)
+    if isinstance(value, bytes):
+        try:
+            return value.replace(b"\x00", b"").decode("utf-8", errors="ignore")
+        except Exception:
+            return str(value)
+    if isinstance(value, str):
+        return value.replace("\x00", "")
+    if isinstance(value, (list, tuple)):
+        return [
+            _json_safe_exif_value(item) if hasattr(item, "numerator") and hasattr(item, "denominator") else item
+            for item in value
+        ]
+    return value
+
+
+def _gps_degrees(value: Any, ref: Any) -> Optional[float]:
+    if not isinstance(value, (list, tuple)) or len(value) != 3:
+        return None
+    try:
+        degrees, minutes, seconds = (float(_json_safe_exif_value(part)) for part in value)
+    except (TypeError, ValueError, ZeroDivisionError):
+        return None
+    decimal = degrees + minutes / 60.0 + seconds / 3600.0
+    if str(ref or "").strip().upper() in {"S", "W"}:
+        decimal = -decimal
+    return decimal
+
+
+def exif_to_dict(exif: Any) -> dict:
+    """Flatten a PIL ``Image.Exif`` into a JSON-safe ``{tag name: value}`` dict.
+
+    Top-level tags keep their existing shape. Tags from the Exif sub-IFD
+    (``DateTimeOriginal``, ``FNumber``, ...) are added without overriding them,
+    and GPS coordinates become signed decimal ``GPSLatitude``/``GPSLongitude``.
+    """
+    exif_data: dict = {}
+    for tag_id, value in exif.items():
+        exif_data[ExifTags.TAGS.get(tag_id, tag_id)] = _json_safe_exif_value(value)
+
+    try:
+        sub_ifd = exif.get_ifd(ExifTags.IFD.Exif)
+    except Exception:
+        sub_ifd = {}
+    for tag_id, value in sub_ifd.items():
+        if tag_id in _SKIPPED_EXIF_TAGS:
+            continue
+        exif_data.setdefault(ExifTags.TAGS.get(tag_id, tag_id), _json_safe_exif_value(value))
+
+    try:
+        gps = exif.get_ifd(ExifTags.IFD.GPSInfo)
+    except Exception:
+        gps = {}
+    latitude = _gps_degrees(gps.get(ExifTags.GPS.GPSLatitude), gps.get(ExifTags.GPS.GPSLatitudeRef))
+    longitude = _gps_degrees(gps.get(ExifTags.GPS.GPSLongitude), gps.get(ExifTags.GPS.GPSLongitudeRef))
+    if latitude is not None and longitude is not None:
+        exif_data["GPSLatitude"] = latitude
+        exif_data["GPSLongitude"] = longitude
+    return exif_data
@@ -0,0 +1,309 @@
+"""Read EXIF from the header of an original without downloading all of it.
+
+Capture metadata sits near the start of a file: in JPEG ``APP1`` segments,
+in the IFDs of TIFF-based RAW formats (CR2, NEF, ARW, DNG, ...), or in the
+``Exif`` item that a HEIF ``meta`` box points at. ``read_exif_header`` walks
+those structures through a ``read_range(start, length)`` callable, so a
+multi-megabyte original usually costs one or two small ranged reads.
+
+Reads are served from block-aligned, cached chunks and capped at
+``MAX_HEADER_BYTES``. ``ExifRangeError`` means the container is not
+understood or the cap was hit; callers then fall back to a full download.
+"""
+
+from __future__ import annotations
+
+import io
+import re
+import struct
+from typing import Any, Callable, Optional
+
+from PIL import Image
+
+from zoltag.exif import exif_to_dict
+
+ReadRange = Callable[[int, int], bytes]
+
+HEADER_CHUNK_BYTES = 64 * 1024
+MAX_HEADER_BYTES = 1024 * 1024
+
+_XMP_NAMESPACE = b"http://ns.adobe.com/xap/1.0/\x00"
+_XMP_DATE_PATTERN = re.compile(
+    r"(?:exif:DateTimeOriginal|xmp:CreateDate|photoshop:DateCreated)"
+    r"(?:\s*=\s*\"([^\"]+)\"|>([^<]+)<)"
+)
+_TIFF_MAGIC = (b"II*\x00", b"MM\x00*")
+_HEIF_BRANDS = {b"heic", b"heix", b"heim", b"heis", b"hevc", b"hevx", b"mif1", b"msf1", b"avif"}
+
+
+class ExifRangeError(Exception):
+    """The header could not be parsed from ranged reads."""
+
+
+class _ChunkedReader:
+    """Caches block-aligned chunks fetched through ``read_range``."""
+
+    def __init__(self, read_range: ReadRange, *, chunk_bytes: int, max_bytes: int):
+        self._read_range = read_range
+        self._chunk_bytes = max(4096, int(chunk_bytes))
+        self._max_bytes = max(self._chunk_bytes, int(max_bytes))
+        self._chunks: dict[int, bytes] = {}
+        self._size: Optional[int] = None
+        self.bytes_fetched = 0
+
+    def _fetch(self, first: int, last: int) -> None:
+        start = first * self._chunk_bytes
+        length = (last - first + 1) * self._chunk_bytes
+        if self.bytes_fetched + length > self._max_bytes:
+            raise ExifRangeError(f"EXIF header exceeds {self._max_bytes} bytes")
+        data = self._read_range(start, length) or b""
+        self.bytes_fetched += len(data)
+        if len(data) < length:
+            self._size = start + len(data)
+        for index in range(first, last + 1):
+            offset = (index - first) * self._chunk_bytes
+            self._chunks[index] = data[offset:offset + self._chunk_bytes]
+
+    def read(self, start: int, length: int) -> bytes:
+        if length <= 0 or start < 0:
+            return b""
+        end = start + length
+        if self._size is not None:
+            end = min(end, self._size)
+            if start >= end:
+                return b""
+        first = start // self._chunk_bytes
+        last = (end - 1) // self._chunk_bytes
+        missing = [index for index in range(first, last + 1) if index not in self._chunks]
+        # Fetch each run of missing chunks with a single request.
+        while missing:
+            run_end = 0
+            while run_end + 1 < len(missing) and missing[run_end + 1] == missing[run_end] + 1:
+                run_end += 1
+            self._fetch(missing[0], missing[run_end])
+            missing = missing[run_end + 1:]
+        data = b"".join(self._chunks[index] for index in range(first, last + 1))
+        offset = start - first * self._chunk_bytes
+        return data[offset:offset + (end - start)]
+
+
+class _RangeFile(io.RawIOBase):
+    """Seekable file view of ``_ChunkedReader`` starting at ``base``, for PIL."""
+
+    def __init__(self, reader: _ChunkedReader, base: int = 0):
+        self._reader = reader
+        self._base = base
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            raise io.UnsupportedOperation("size of a ranged file is unknown")
+        self._position = max(0, offset)
+        return self._position
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            raise io.UnsupportedOperation("unbounded read of a ranged file")
+        data = self._reader.read(self._base + self._position, size)
+        self._position += len(data)
+        return data
+
+
+def _load_tiff_exif(reader: _ChunkedReader, base: int) -> dict:
+    exif = Image.Exif()
+    try:
+        exif.load_from_fp(_RangeFile(reader, base))
+        return exif_to_dict(exif)
+    except ExifRangeError:
+        raise
+    except Exception as exc:
+        raise ExifRangeError(f"Unreadable TIFF structure at offset {base}: {exc}") from exc
+
+
+def _xmp_capture_date(packet: bytes) -> Optional[str]:
+    match = _XMP_DATE_PATTERN.search(packet.decode("utf-8", errors="ignore"))
+    if not match:
+        return None
+    return (match.group(1) or match.group(2) or "").strip() or None
+
+
+def _read_jpeg(reader: _ChunkedReader) -> dict:
+    tiff_offset: Optional[int] = None
+    xmp_date: Optional[str] = None
+    position = 2
+    while True:
+        header = reader.read(position, 4)
+        if len(header) < 2 or header[0] != 0xFF:
+            break
+        marker = header[1]
+        if marker == 0xFF:
+            position += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:
+            position += 2
+            continue
+        # Metadata lives in the APPn segments ahead of the tables and scan data.
+        if not 0xE0 <= marker <= 0xEF or len(header) < 4:
+            break
+        (segment_length,) = struct.unpack(">H", header[2:4])
+        if marker == 0xE1:
+            signature = reader.read(position + 4, len(_XMP_NAMESPACE))
+            if signature.startswith(b"Exif\x00\x00") and tiff_offset is None:
+                tiff_offset = position + 10
+            elif signature == _XMP_NAMESPACE and xmp_date is None:
+                xmp_date = _xmp_capture_date(reader.read(position + 4, segment_length - 2))
+        position += 2 + segment_length
+
+    exif = _load_tiff_exif(reader, tiff_offset) if tiff_offset is not None else {}
+    if xmp_date and not exif.get("DateTimeOriginal"):
+        exif["DateTimeOriginal"] = xmp_date
+    return exif
+
+
+def _iter_boxes(reader: _ChunkedReader, start: int, end: Optional[int]):
+    """Yield ``(type, payload_start, box_end)`` for ISO-BMFF boxes in ``[start, end)``."""
+    position = start
+    while end is None or position + 8 <= end:
+        header = reader.read(position, 16)
+        if len(header) < 8:
+            return
+        size, box_type = struct.unpack(">I4s", header[:8])
+        payload_start = position + 8
+        if size == 1:
+            if len(header) < 16:
+                return
+            (size,) = struct.unpack(">Q", header[8:16])
+            payload_start = position + 16
+        elif size == 0:
+            if end is None:
+                return
+            size = end - position
+        if size < payload_start - position:
+            raise ExifRangeError(f"Corrupt ISO-BMFF box {box_type!r} at offset {position}")
+        yield box_type, payload_start, position + size
+        position += size
+
+
+def _read_uint(data: bytes, offset: int, size: int) -> tuple[int, int]:
+    if size == 0:
+        return 0, offset
+    if offset + size > len(data):
+        raise ExifRangeError("Truncated HEIF item location")
+    return int.from_bytes(data[offset:offset + size], "big"), offset + size
+
+
+def _heif_exif_item_id(iinf: bytes) -> Optional[int]:
+    version = iinf[0]
+    offset = 4 + (2 if version == 0 else 4)
+    while offset + 8 <= len(iinf):
+        size, box_type = struct.unpack(">I4s", iinf[offset:offset + 8])
+        if size < 8:
+            break
+        if box_type == b"infe":
+            entry = iinf[offset + 8:offset + size]
+            entry_version = entry[0] if entry else 0
+            if entry_version >= 2:
+                id_size = 2 if entry_version == 2 else 4
+                item_id = int.from_bytes(entry[4:4 + id_size], "big")
+                item_type = entry[4 + id_size + 2:4 + id_size + 6]
+                if item_type == b"Exif":
+                    return item_id
+        offset += size
+    return None
+
+
+def _heif_item_extent(iloc: bytes, wanted_item_id: int) -> Optional[tuple[int, int]]:
+    version = iloc[0]
+    offset_size, length_size = iloc[4] >> 4, iloc[4] & 0x0F
+    base_offset_size = iloc[5] >> 4
+    index_size = iloc[5] & 0x0F if version in (1, 2) else 0
+    cursor = 6
+    item_count, cursor = _read_uint(iloc, cursor, 2 if version < 2 else 4)
+    for _ in range(item_count):
+        item_id, cursor = _read_uint(iloc, cursor, 2 if version < 2 else 4)
+        construction_method = 0
+        if version in (1, 2):
+            method_field, cursor = _read_uint(iloc, cursor, 2)
+            construction_method = method_field & 0x0F
+        cursor += 2  # data_reference_index
+        base_offset, cursor = _read_uint(iloc, cursor, base_offset_size)
+        extent_count, cursor = _read_uint(iloc, cursor, 2)
+        extents = []
+        for _ in range(extent_count):
+            _, cursor = _read_uint(iloc, cursor, index_size)
+            extent_offset, cursor = _read_uint(iloc, cursor, offset_size)
+            extent_length, cursor = _read_uint(iloc, cursor, length_size)
+            extents.append((base_offset + extent_offset, extent_length))
+        if item_id == wanted_item_id:
+            if construction_method != 0 or not extents:
+                raise ExifRangeError("HEIF Exif item is not stored at a file offset")
+            return extents[0]
+    return None
+
+
+def _read_heif(reader: _ChunkedReader) -> dict:
+    for box_type, payload_start, box_end in _iter_boxes(reader, 0, None):
+        if box_type != b"meta":
+            continue
+        exif_item_id = None
+        iloc = None
+        # ``meta`` is a full box: skip its version/flags word.
+        for child_type, child_start, child_end in _iter_boxes(reader, payload_start + 4, box_end):
+            if child_type == b"iinf":
+                exif_item_id = _heif_exif_item_id(reader.read(child_start, child_end - child_start))
+            elif child_type == b"iloc":
+                iloc = reader.read(child_start, child_end - child_start)
+        if exif_item_id is None:
+            return {}
+        if iloc is None:
+            raise ExifRangeError("HEIF meta box has no item locations")
+        extent = _heif_item_extent(iloc, exif_item_id)
+        if extent is None:
+            raise ExifRangeError("HEIF Exif item has no location")
+        item_offset, _ = extent
+        # The item starts with a 4-byte offset to the TIFF header (past an optional "Exif\0\0").
+        (tiff_header_offset,) = struct.unpack(">I", reader.read(item_offset, 4).rjust(4, b"\x00"))
+        return _load_tiff_exif(reader, item_offset + 4 + tiff_header_offset)
+    raise ExifRangeError("HEIF file has no meta box")
+
+
+def read_exif_header(
+    read_range: ReadRange,
+    *,
+    chunk_bytes: int = HEADER_CHUNK_BYTES,
+    max_bytes: int = MAX_HEADER_BYTES,
+) -> dict:
+    """Parse EXIF (plus an XMP capture date for JPEG) through ranged reads.
+
+    Returns the same ``{tag name: value}`` shape as
+    ``ImageProcessor.extract_exif``; an empty dict means the file was parsed
+    but carries no EXIF.
+    """
+    reader = _ChunkedReader(read_range, chunk_bytes=chunk_bytes, max_bytes=max_bytes)
+    head = reader.read(0, 12)
+    if head.startswith(b"\xff\xd8"):
+        return _read_jpeg(reader)
+    if head[:4] in _TIFF_MAGIC:
+        return _load_tiff_exif(reader, 0)
+    if head[4:8] == b"ftyp" and head[8:12] in _HEIF_BRANDS:
+        return _read_heif(reader)
+    raise ExifRangeError("Unsupported container for ranged EXIF reads")
+
+
+def read_provider_exif(provider: Any, source_key: str, **kwargs: Any) -> dict:
+    """``read_exif_header`` over ``provider.read_range`` for one source file."""
+    return read_exif_header(
+        lambda start, length: provider.read_range(source_key, start, length),
+        **kwargs,
+    )
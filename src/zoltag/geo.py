@@ -0,0 +1,575 @@
+"""Geohash cells and precomputed map clusters for geotagged images.
+
+Every geotagged ``ImageMetadata`` row carries a ``geohash`` (precision
+``GEOHASH_PRECISION``), derived from ``gps_latitude``/``gps_longitude`` by a
+mapper hook, so every ORM writer (sync, metadata refresh, uploads) keeps it
+current. Two things are built on it:
+
+- Location filters. ``GeoFilter`` turns a bounding box or a radius into a
+  handful of ``geohash`` prefix ranges, which hit the
+  ``(tenant_id, geohash)`` index, plus an exact check on the coordinates.
+- Map clusters. ``geo_cells`` holds one row per tenant, precision
+  (``CLUSTER_PRECISIONS``) and cell, with the image count and coordinate
+  sums for a centroid, so panning the map reads at most a few thousand
+  pre-aggregated rows instead of the raw points.
+
+Every image in a tenant shares the same coarse cells, so writers do not
+update ``geo_cells`` directly. An ``after_flush`` hook appends +1/-1 deltas
+for inserted, moved and deleted images to the ``geo_cell_deltas`` journal,
+and workers fold the journal into ``geo_cells`` (``fold_geo_cell_deltas``),
+locking cells in key order. Map counts therefore trail ingest by one worker
+drain interval.
+
+Bulk ``Query.delete()`` bypasses the flush hooks; call
+``release_image_location`` for the row first. ``rebuild_geo_cells``
+recomputes a tenant from scratch (``zoltag rebuild-geo-index``).
+"""
+
+from __future__ import annotations
+
+import math
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Iterable, Optional
+from uuid import UUID
+
+import sqlalchemy as sa
+from sqlalchemy import event
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from zoltag.metadata import GeoCell, GeoCellDelta, ImageMetadata
+
+GEOHASH_PRECISION = 9
+CLUSTER_PRECISIONS = tuple(range(1, 8))
+MAX_FILTER_RANGES = 32
+# Journal rows folded into geo_cells per transaction.
+GEO_DELTA_FOLD_BATCH = 5000
+KM_PER_DEGREE = 111.32
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_BASE32_INDEX = {char: index for index, char in enumerate(_BASE32)}
+# Web-map zoom level -> geohash precision giving roughly 20-60 cells per screen.
+_ZOOM_PRECISION = ((3, 1), (5, 2), (8, 3), (10, 4), (13, 5), (15, 6))
+
+
+# --- geohash encoding ------------------------------------------------------------
+
+
+def _valid_point(latitude, longitude) -> bool:
+    try:
+        latitude = float(latitude)
+        longitude = float(longitude)
+    except (TypeError, ValueError):
+        return False
+    return -90.0 <= latitude <= 90.0 and -180.0 <= longitude <= 180.0
+
+
+def encode_geohash(latitude: float, longitude: float, precision: int = GEOHASH_PRECISION) -> str:
+    """Standard base32 geohash of a point."""
+    lat_low, lat_high = -90.0, 90.0
+    lon_low, lon_high = -180.0, 180.0
+    chars = []
+    bits = 0
+    value = 0
+    use_longitude = True
+    while len(chars) < precision:
+        if use_longitude:
+            middle = (lon_low + lon_high) / 2
+            if longitude >= middle:
+                value = (value << 1) | 1
+                lon_low = middle
+            else:
+                value <<= 1
+                lon_high = middle
+        else:
+            middle = (lat_low + lat_high) / 2
+            if latitude >= middle:
+                value = (value << 1) | 1
+                lat_low = middle
+            else:
+                value <<= 1
+                lat_high = middle
+        use_longitude = not use_longitude
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits = 0
+            value = 0
+    return "".join(chars)
+
+
+def cell_size(precision: int) -> tuple[float, float]:
+    """``(latitude_degrees, longitude_degrees)`` spanned by a cell."""
+    total_bits = 5 * precision
+    lon_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lon_bits)
+
+
+def decode_bounds(geohash: str) -> tuple[float, float, float, float]:
+    """``(west, south, east, north)`` of a geohash cell."""
+    lat_low, lat_high = -90.0, 90.0
+    lon_low, lon_high = -180.0, 180.0
+    use_longitude = True
+    for char in geohash:
+        value = _BASE32_INDEX[char]
+        for shift in range(4, -1, -1):
+            bit = (value >> shift) & 1
+            if use_longitude:
+                middle = (lon_low + lon_high) / 2
+                lon_low, lon_high = (middle, lon_high) if bit else (lon_low, middle)
+            else:
+                middle = (lat_low + lat_high) / 2
+                lat_low, lat_high = (middle, lat_high) if bit else (lat_low, middle)
+            use_longitude = not use_longitude
+    return lon_low, lat_low, lon_high, lat_high
+
+
+def cell_center(geohash: str) -> tuple[float, float]:
+    west, south, east, north = decode_bounds(geohash)
+    return (south + north) / 2, (west + east) / 2
+
+
+def precision_for_zoom(zoom: int) -> int:
+    """Cluster precision for a web-map zoom level."""
+    for max_zoom, precision in _ZOOM_PRECISION:
+        if zoom < max_zoom:
+            return precision
+    return CLUSTER_PRECISIONS[-1]
+
+
+def _next_prefix(prefix: str) -> Optional[str]:
+    """Smallest geohash greater than every hash starting with ``prefix``."""
+    chars = list(prefix)
+    while chars:
+        index = _BASE32_INDEX[chars[-1]]
+        if index + 1 < len(_BASE32):
+            chars[-1] = _BASE32[index + 1]
+            return "".join(chars)
+        chars.pop()
+    return None
+
+
+def cover_bbox(west: float, south: float, east: float, north: float, max_cells: int = MAX_FILTER_RANGES) -> list[str]:
+    """Geohash cells covering a (non-wrapping) box, at the finest precision within ``max_cells``."""
+    cells: list[str] = []
+    for precision in range(1, GEOHASH_PRECISION + 1):
+        lat_step, lon_step = cell_size(precision)
+        rows = range(int((south + 90.0) // lat_step), int(min(north + 90.0, 179.999999) // lat_step) + 1)
+        cols = range(int((west + 180.0) // lon_step), int(min(east + 180.0, 359.999999) // lon_step) + 1)
+        if len(rows) * len(cols) > max_cells and cells:
+            break
+        cells = sorted(
+            encode_geohash(-90.0 + (row + 0.5) * lat_step, -180.0 + (col + 0.5) * lon_step, precision)
+            for row in rows
+            for col in cols
+        )
+    return cells
+
+
+def prefix_ranges(cells: Iterable[str]) -> list[tuple[str, Optional[str]]]:
+    """Merge sorted cells into ``[low, high)`` geohash ranges (``high`` None = unbounded)."""
+    ranges: list[tuple[str, Optional[str]]] = []
+    for cell in sorted(cells):
+        high = _next_prefix(cell)
+        if ranges and ranges[-1][1] == cell:
+            ranges[-1] = (ranges[-1][0], high)
+        else:
+            ranges.append((cell, high))
+    return ranges
+
+
+# --- location filters ------------------------------------------------------------
+
+
+def _bbox_conditions(west: float, south: float, east: float, north: float) -> list:
+    boxes = [(west, south, east, north)]
+    if west > east:
+        boxes = [(west, south, 180.0, north), (-180.0, south, east, north)]
+    cells = []
+    for box in boxes:
+        cells.extend(cover_bbox(*box, max_cells=MAX_FILTER_RANGES // len(boxes)))
+    geohash_ranges = []
+    for low, high in prefix_ranges(cells):
+        condition = ImageMetadata.geohash >= low
+        if high is not None:
+            condition = sa.and_(condition, ImageMetadata.geohash < high)
+        geohash_ranges.append(condition)
+    return [
+        sa.or_(*geohash_ranges),
+        ImageMetadata.gps_latitude.between(south, north),
+        ImageMetadata.gps_longitude.between(west, east)
+        if west <= east
+        else sa.or_(ImageMetadata.gps_longitude >= west, ImageMetadata.gps_longitude <= east),
+    ]
+
+
+def _radius_bbox(latitude: float, longitude: float, radius_km: float) -> tuple[float, float, float, float]:
+    lat_span = radius_km / KM_PER_DEGREE
+    south, north = max(-90.0, latitude - lat_span), min(90.0, latitude + lat_span)
+    cos_lat = math.cos(math.radians(latitude))
+    lon_span = radius_km / (KM_PER_DEGREE * cos_lat) if cos_lat > 1e-6 else 360.0
+    if north >= 90.0 or south <= -90.0 or lon_span >= 180.0:
+        return -180.0, south, 180.0, north
+    west, east = longitude - lon_span, longitude + lon_span
+    if west < -180.0:
+        west += 360.0
+    if east > 180.0:
+        east -= 360.0
+    return west, south, east, north
+
+
+@dataclass(frozen=True)
+class GeoFilter:
+    """A bounding box and/or a circle; images must fall inside both.
+
+    ``bbox`` is ``(west, south, east, north)``; ``west > east`` means the box
+    crosses the antimeridian. ``near`` is ``(latitude, longitude)``.
+    """
+
+    bbox: Optional[tuple[float, float, float, float]] = None
+    near: Optional[tuple[float, float]] = None
+    radius_km: Optional[float] = None
+
+    def conditions(self) -> list:
+        """SQL conditions on ``ImageMetadata`` selecting images inside the filter."""
+        conditions = [ImageMetadata.geohash.is_not(None)]
+        if self.bbox is not None:
+            conditions.extend(_bbox_conditions(*self.bbox))
+        if self.near is not None and self.radius_km is not None:
+            latitude, longitude = self.near
+            west, south, east, north = _radius_bbox(latitude, longitude, self.radius_km)
+            conditions.extend(_bbox_conditions(west, south, east, north))
+            # Equirectangular distance: accurate to well under 1% for radii of a
+            # few hundred km, and plain arithmetic on every database backend.
+            lon_scale = KM_PER_DEGREE * max(math.cos(math.radians(latitude)), 1e-6)
+            lat_km = (ImageMetadata.gps_latitude - latitude) * KM_PER_DEGREE
+            centers = [longitude]
+            if west > east:
+                centers.append(longitude - 360.0 if longitude > 0 else longitude + 360.0)
+            within = []
+            for center in centers:
+                lon_km = (ImageMetadata.gps_longitude - center) * lon_scale
+                within.append(lat_km * lat_km + lon_km * lon_km <= self.radius_km * self.radius_km)
+            conditions.append(sa.or_(*within))
+        return conditions
+
+
+def _parse_floats(raw: str, count: int, name: str) -> list[float]:
+    parts = [part.strip() for part in str(raw).split(",")]
+    try:
+        values = [float(part) for part in parts]
+    except ValueError:
+        values = []
+    if len(values) != count:
+        raise ValueError(f"{name} must have {count} comma-separated numbers")
+    if not all(math.isfinite(value) for value in values):
+        raise ValueError(f"{name} must be finite")
+    return values
+
+
+def parse_bbox(bbox: str) -> tuple[float, float, float, float]:
+    """Parse ``"west,south,east,north"`` in degrees."""
+    west, south, east, north = _parse_floats(bbox, 4, "bbox")
+    if not (-90.0 <= south <= north <= 90.0):
+        raise ValueError("bbox latitudes must satisfy -90 <= south <= north <= 90")
+    if not (-180.0 <= west <= 180.0 and -180.0 <= east <= 180.0):
+        raise ValueError("bbox longitudes must be within [-180, 180]")
+    return west, south, east, north
+
+
+def parse_geo_filter(
+    bbox: Optional[str] = None,
+    near: Optional[str] = None,
+    radius_km: Optional[float] = None,
+) -> Optional[GeoFilter]:
+    """Build a ``GeoFilter`` from query parameters; ``ValueError`` on bad input.
+
+    ``near`` is ``"lat,lon"`` and requires ``radius_km`` (and vice versa).
+    """
+    if (near is None) != (radius_km is None):
+        raise ValueError("near and radius_km must be given together")
+    parsed_bbox = parse_bbox(bbox) if bbox else None
+    if near is None:
+        return GeoFilter(bbox=parsed_bbox) if parsed_bbox else None
+    latitude, longitude = _parse_floats(near, 2, "near")
+    if not (-90.0 <= latitude <= 90.0 and -180.0 <= longitude <= 180.0):
+        raise ValueError("near must be a valid latitude,longitude")
+    if not 0 < float(radius_km) <= 20000:
+        raise ValueError("radius_km must be greater than 0 and at most 20000")
+    return GeoFilter(bbox=parsed_bbox, near=(latitude, longitude), radius_km=float(radius_km))
+
+
+# --- cluster cells ---------------------------------------------------------------
+
+
+def _point(latitude, longitude) -> Optional[tuple[float, float]]:
+    if not _valid_point(latitude, longitude):
+        return None
+    return float(latitude), float(longitude)
+
+
+def _add_point_deltas(deltas: dict, tenant_id, point: tuple[float, float], sign: int) -> None:
+    geohash = encode_geohash(point[0], point[1], CLUSTER_PRECISIONS[-1])
+    for precision in CLUSTER_PRECISIONS:
+        delta = deltas[(tenant_id, precision, geohash[:precision])]
+        delta[0] += sign
+        delta[1] += sign * point[0]
+        delta[2] += sign * point[1]
+
+
+def _journal_point(journal: dict, tenant_id, point: tuple[float, float], sign: int) -> None:
+    delta = journal[(tenant_id, encode_geohash(point[0], point[1], CLUSTER_PRECISIONS[-1]))]
+    delta[0] += sign
+    delta[1] += sign * point[0]
+    delta[2] += sign * point[1]
+
+
+def _append_journal(connection, journal: dict) -> None:
+    rows = [
+        {"tenant_id": tenant_id, "cell": cell, "image_count": count, "lat_sum": lat_sum, "lon_sum": lon_sum}
+        for (tenant_id, cell), (count, lat_sum, lon_sum) in journal.items()
+        if count or lat_sum or lon_sum
+    ]
+    if rows:
+        connection.execute(GeoCellDelta.__table__.insert(), rows)
+
+
+def _insert_for(connection):
+    return pg_insert if connection.dialect.name == "postgresql" else sqlite_insert
+
+
+def _apply_deltas(connection, deltas: dict) -> None:
+    # Rows are upserted in key order so concurrent folds lock cells in the same order.
+    deltas = {key: delta for key, delta in sorted(deltas.items()) if delta[0] or delta[1] or delta[2]}
+    if not deltas:
+        return
+    rows = []
+    for (tenant_id, precision, cell), (count, lat_sum, lon_sum) in deltas.items():
+        center_lat, center_lon = cell_center(cell)
+        rows.append({
+            "tenant_id": tenant_id,
+            "precision": precision,
+            "cell": cell,
+            "center_lat": center_lat,
+            "center_lon": center_lon,
+            "image_count": count,
+            "lat_sum": lat_sum,
+            "lon_sum": lon_sum,
+        })
+    table = GeoCell.__table__
+    stmt = _insert_for(connection)(table).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.tenant_id, table.c.precision, table.c.cell],
+        set_={
+            "image_count": table.c.image_count + stmt.excluded.image_count,
+            "lat_sum": table.c.lat_sum + stmt.excluded.lat_sum,
+            "lon_sum": table.c.lon_sum + stmt.excluded.lon_sum,
+        },
+    )
+    connection.execute(stmt)
+
+    emptied = defaultdict(list)
+    for (tenant_id, precision, cell), (count, _, _) in deltas.items():
+        if count < 0:
+            emptied[(tenant_id, precision)].append(cell)
+    for (tenant_id, precision), cells in emptied.items():
+        connection.execute(
+            table.delete().where(
+                table.c.tenant_id == tenant_id,
+                table.c.precision == precision,
+                table.c.cell.in_(cells),
+                table.c.image_count <= 0,
+            )
+        )
+
+
+def release_image_location(db: Session, image: ImageMetadata) -> None:
+    """Drop ``image`` from its cluster cells ahead of a bulk ``Query.delete()``."""
+    point = _point(image.gps_latitude, image.gps_longitude)
+    if point is None or image.tenant_id is None:
+        return
+    journal = defaultdict(lambda: [0, 0.0, 0.0])
+    _journal_point(journal, image.tenant_id, point, -1)
+    _append_journal(db.connection(), journal)
+
+
+def fold_geo_cell_deltas(db: Session, *, limit: int = GEO_DELTA_FOLD_BATCH) -> int:
+    """Apply up to ``limit`` journal rows to ``geo_cells``; the caller commits.
+
+    Rows are claimed with ``SKIP LOCKED`` so several workers can drain the
+    journal. Returns the number of journal rows consumed.
+    """
+    journal = (
+        db.query(GeoCellDelta)
+        .order_by(GeoCellDelta.id.asc())
+        .limit(max(1, int(limit)))
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    if not journal:
+        return 0
+    deltas = defaultdict(lambda: [0, 0.0, 0.0])
+    for row in journal:
+        for precision in CLUSTER_PRECISIONS:
+            delta = deltas[(row.tenant_id, precision, row.cell[:precision])]
+            delta[0] += row.image_count
+            delta[1] += row.lat_sum
+            delta[2] += row.lon_sum
+    connection = db.connection()
+    _apply_deltas(connection, deltas)
+    connection.execute(GeoCellDelta.__table__.delete().where(GeoCellDelta.__table__.c.id.in_([row.id for row in journal])))
+    return len(journal)
+
+
+def rebuild_geo_cells(db: Session, tenant_id: UUID | str, batch_size: int = 5000) -> dict:
+    """Recompute geohashes and cluster cells for one tenant; the caller commits."""
+    tenant_uuid = tenant_id if isinstance(tenant_id, UUID) else UUID(str(tenant_id))
+    stale_geohashes = 0
+    located = 0
+    deltas = defaultdict(lambda: [0, 0.0, 0.0])
+    last_id = 0
+    while True:
+        rows = (
+            db.query(ImageMetadata.id, ImageMetadata.gps_latitude, ImageMetadata.gps_longitude, ImageMetadata.geohash)
+            .filter(ImageMetadata.tenant_id == tenant_uuid, ImageMetadata.id > last_id)
+            .order_by(ImageMetadata.id.asc())
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        updates = []
+        for image_id, latitude, longitude, current in rows:
+            point = _point(latitude, longitude)
+            geohash = encode_geohash(*point) if point else None
+            if geohash != current:
+                updates.append({"image_id": image_id, "geohash": geohash})
+            if point:
+                located += 1
+                _add_point_deltas(deltas, tenant_uuid, point, 1)
+        if updates:
+            stale_geohashes += len(updates)
+            db.execute(
+                ImageMetadata.__table__.update()
+                .where(ImageMetadata.__table__.c.id == sa.bindparam("image_id"))
+                .values(geohash=sa.bindparam("geohash")),
+                updates,
+            )
+
+    connection = db.connection()
+    # Pending journal rows are already reflected in the recount.
+    connection.execute(GeoCellDelta.__table__.delete().where(GeoCellDelta.__table__.c.tenant_id == tenant_uuid))
+    connection.execute(GeoCell.__table__.delete().where(GeoCell.__table__.c.tenant_id == tenant_uuid))
+    _apply_deltas(connection, deltas)
+    return {"located": located, "geohashes_updated": stale_geohashes, "cells": len(deltas)}
+
+
+def cluster_cells(
+    db: Session,
+    tenant_id: UUID | str,
+    *,
+    west: float,
+    south: float,
+    east: float,
+    north: float,
+    precision: int,
+    max_cells: int,
+) -> tuple[list[GeoCell], bool]:
+    """Precomputed cells whose centers fall in the box, largest first.
+
+    Returns ``(cells, truncated)``; ``truncated`` means more than
+    ``max_cells`` cells matched.
+    """
+    tenant_uuid = tenant_id if isinstance(tenant_id, UUID) else UUID(str(tenant_id))
+    lat_step, lon_step = cell_size(precision)
+    # A cell straddling the viewport edge still belongs on the map.
+    south, north = south - lat_step / 2, north + lat_step / 2
+    west, east = west - lon_step / 2, east + lon_step / 2
+    if east - west >= 360.0:
+        longitude_condition = sa.true()
+    elif west <= east:
+        longitude_condition = sa.or_(
+            GeoCell.center_lon.between(west, east),
+            GeoCell.center_lon <= east - 360.0,
+            GeoCell.center_lon >= west + 360.0,
+        )
+    else:
+        longitude_condition = sa.or_(GeoCell.center_lon >= west, GeoCell.center_lon <= east)
+    rows = (
+        db.query(GeoCell)
+        .filter(
+            GeoCell.tenant_id == tenant_uuid,
+            GeoCell.precision == precision,
+            GeoCell.center_lat.between(south, north),
+            longitude_condition,
+        )
+        .order_by(GeoCell.image_count.desc(), GeoCell.cell.asc())
+        .limit(max_cells + 1)
+        .all()
+    )
+    return rows[:max_cells], len(rows) > max_cells
+
+
+# --- maintenance hooks -----------------------------------------------------------
+
+
+@event.listens_for(ImageMetadata.gps_latitude, "set", active_history=True)
+@event.listens_for(ImageMetadata.gps_longitude, "set", active_history=True)
+def _keep_previous_point(target, value, oldvalue, initiator):
+    # Registered for ``active_history``: the previous point is loaded before it is
+    # overwritten, so the flush hook can decrement the cell it was counted in.
+    return value
+
+
+@event.listens_for(ImageMetadata, "before_insert")
+@event.listens_for(ImageMetadata, "before_update")
+def _set_geohash(mapper, connection, target) -> None:
+    point = _point(target.gps_latitude, target.gps_longitude)
+    geohash = encode_geohash(*point) if point else None
+    if target.geohash != geohash:
+        target.geohash = geohash
+
+
+def _previous_point(obj) -> Optional[tuple[float, float]]:
+    state = sa.inspect(obj)
+    values = []
+    for key in ("gps_latitude", "gps_longitude"):
+        history = state.attrs[key].history
+        previous = history.deleted or history.unchanged
+        values.append(previous[0] if previous else None)
+    return _point(*values)
+
+
+@event.listens_for(Session, "after_flush")
+def _maintain_geo_cells(session, flush_context) -> None:
+    journal = defaultdict(lambda: [0, 0.0, 0.0])
+    for obj in session.new:
+        if isinstance(obj, ImageMetadata):
+            point = _point(obj.gps_latitude, obj.gps_longitude)
+            if point:
+                _journal_point(journal, obj.tenant_id, point, 1)
+    for obj in session.dirty:
+        if not isinstance(obj, ImageMetadata):
+            continue
+        state = sa.inspect(obj)
+        if not (state.attrs.gps_latitude.history.has_changes() or state.attrs.gps_longitude.history.has_changes()):
+            continue
+        previous = _previous_point(obj)
+        current = _point(obj.gps_latitude, obj.gps_longitude)
+        if previous == current:
+            continue
+        if previous:
+            _journal_point(journal, obj.tenant_id, previous, -1)
+        if current:
+            _journal_point(journal, obj.tenant_id, current, 1)
+    for obj in session.deleted:
+        if isinstance(obj, ImageMetadata):
+            point = _previous_point(obj)
+            if point:
+                _journal_point(journal, obj.tenant_id, point, -1)
+    if journal:
+        _append_journal(session.connection(), journal)
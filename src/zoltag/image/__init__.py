@@ -3,17 +3,27 @@
 import io
 import json
 import os
+import secrets
 import shutil
 import subprocess
 import tempfile
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
-from typing import Tuple
+from typing import Iterator, Tuple
 
+import httpx
 import imagehash
 import numpy as np
-from PIL import Image, ExifTags, ImageDraw, ImageOps
+from PIL import Image, ImageDraw, ImageOps
 import cv2
 
+from zoltag.exif import exif_to_dict
+
+# Upper bound for one ffprobe/ffmpeg call; also the network stall timeout for URL sources.
+FFMPEG_TIMEOUT_SECONDS = 120
+
 # Register HEIC support if available
 try:
     from pillow_heif import register_heif_opener
@@ -72,40 +82,7 @@ class ImageProcessor:
             exif = image.getexif()
             if exif is None:
                 return exif_data
-            
-            for tag_id, value in exif.items():
-                tag_name = ExifTags.TAGS.get(tag_id, tag_id)
-                
-                # Convert non-JSON serializable types
-                if hasattr(value, 'numerator') and hasattr(value, 'denominator'):
-                    # IFDRational type
-                    if value.denominator != 0:
-                        value = float(value.numerator) / float(value.denominator)
-                    else:
-                        value = float(value.numerator)
-                elif isinstance(value, bytes):
-                    # Convert bytes to string, remove null bytes
-                    try:
-                        value = value.replace(b'\x00', b'').decode('utf-8', errors='ignore')
-                    except:
-                        value = str(value)
-                elif isinstance(value, str):
-                    # Remove null bytes from strings
-                    value = value.replace('\x00', '')
-                elif isinstance(value, (list, tuple)):
-                    # Convert lists/tuples of non-serializable types
-                    converted_list = []
-                    for item in value:
-                        if hasattr(item, 'numerator') and hasattr(item, 'denominator'):
-                            if item.denominator != 0:
-                                converted_list.append(float(item.numerator) / float(item.denominator))
-                            else:
-                                converted_list.append(float(item.numerator))
-                        else:
-                            converted_list.append(item)
-                    value = converted_list
-                
-                exif_data[tag_name] = value
+            exif_data = exif_to_dict(exif)
         except Exception as e:
             # Some images may have corrupted EXIF data
             print(f"Warning: Error extracting EXIF data: {e}")
@@ -196,7 +173,7 @@ def is_supported_media_file(filename: str, mime_type: str | None = None) -> bool
 
 
 class VideoProcessor:
-    """Extract thumbnail and metadata from video bytes."""
+    """Extract thumbnail and metadata from video bytes, files, or URLs."""
 
     def __init__(self, thumbnail_size: Tuple[int, int] = (256, 256), seek_seconds: float = 1.0):
         self.thumbnail_size = thumbnail_size
@@ -229,13 +206,40 @@ class VideoProcessor:
             with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as temp_file:
                 temp_file.write(data)
                 temp_path = temp_file.name
+            return self.extract_features_from_source(temp_path, filename=filename)
+        finally:
+            if temp_path and os.path.exists(temp_path):
+                try:
+                    os.remove(temp_path)
+                except Exception:
+                    pass
 
-            width, height, duration_ms, format_name = self._probe_video(temp_path)
+    def extract_features_from_source(
+        self,
+        source: str,
+        filename: str = "video",
+        headers: dict[str, str] | None = None,
+    ) -> dict:
+        """Extract metadata and a poster thumbnail from a local path or URL.
+
+        ffprobe and ffmpeg open ``source`` themselves, so for HTTP URLs only the
+        container index and the keyframes around each seek point are fetched
+        via range requests instead of the whole file. ``headers`` (e.g. a
+        bearer token) never reach the ffmpeg command line; they are added by a
+        loopback proxy (``_authorized_source``).
+        """
+        suffix = Path(filename or "video.mp4").suffix or ".mp4"
+        thumbnail_bytes = None
+        with _authorized_source(source, headers, suffix=suffix) as local_source:
+            width, height, duration_ms, format_name = self._probe_video(local_source)
             duration_s = (duration_ms / 1000.0) if duration_ms else None
             seek_candidates = self._seek_candidates(duration_s)
-            thumbnail_bytes = None
-            for seek_s in seek_candidates:
-                frame_bytes = self._extract_frame(temp_path, seek_seconds=seek_s)
+            frames = self._extract_frames(local_source, seek_candidates)
+            if not frames:
+                # Some containers refuse the multi-input graph; retry seeks one by one.
+                frames = (self._extract_frame(local_source, seek_seconds=seek_s) for seek_s in seek_candidates)
+
+            for frame_bytes in frames:
                 if not frame_bytes:
                     continue
                 try:
@@ -246,22 +250,16 @@ class VideoProcessor:
                     break
                 except Exception:
                     continue
-            if thumbnail_bytes is None:
-                thumbnail_bytes = self.create_placeholder_thumbnail()
-
-            return {
-                "thumbnail": thumbnail_bytes,
-                "width": width,
-                "height": height,
-                "duration_ms": duration_ms,
-                "format": format_name or suffix.lstrip(".").upper() or None,
-            }
-        finally:
-            if temp_path and os.path.exists(temp_path):
-                try:
-                    os.remove(temp_path)
-                except Exception:
-                    pass
+        if thumbnail_bytes is None:
+            thumbnail_bytes = self.create_placeholder_thumbnail()
+
+        return {
+            "thumbnail": thumbnail_bytes,
+            "width": width,
+            "height": height,
+            "duration_ms": duration_ms,
+            "format": format_name or suffix.lstrip(".").upper() or None,
+        }
 
     def _probe_video(self, video_path: str) -> tuple[int | None, int | None, int | None, str | None]:
         if shutil.which("ffprobe") is None:
@@ -276,10 +274,10 @@ class VideoProcessor:
             "v:0",
             "-of",
             "json",
-            video_path,
+            *_input_args(video_path),
         ]
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+            result = subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=FFMPEG_TIMEOUT_SECONDS)
         except Exception:
             return None, None, None, None
 
@@ -320,6 +318,42 @@ class VideoProcessor:
         except Exception:
             return False
 
+    def _extract_frames(
+        self, video_path: str, seek_candidates: list[float]
+    ) -> list[bytes]:
+        """Grab one frame per seek position with a single ffmpeg process.
+
+        Each position is its own input with an input-side ``-ss`` so ffmpeg
+        jumps straight to the nearest keyframe; the one-frame segments are
+        concatenated into a single MJPEG stream in candidate order.
+        """
+        if not seek_candidates or shutil.which("ffmpeg") is None:
+            return []
+        cmd = ["ffmpeg", "-hide_banner", "-loglevel", "error"]
+        graph = []
+        for index, seek_s in enumerate(seek_candidates):
+            seek_value = max(0.0, float(seek_s or 0.0))
+            cmd += ["-ss", f"{seek_value:.3f}", *_input_args(video_path)]
+            graph.append(f"[{index}:v:0]trim=end_frame=1,setpts=PTS-STARTPTS[v{index}]")
+        labels = "".join(f"[v{index}]" for index in range(len(seek_candidates)))
+        graph.append(f"{labels}concat=n={len(seek_candidates)}:v=1:a=0[frames]")
+        cmd += [
+            "-filter_complex",
+            ";".join(graph),
+            "-map",
+            "[frames]",
+            "-f",
+            "image2pipe",
+            "-vcodec",
+            "mjpeg",
+            "pipe:1",
+        ]
+        try:
+            result = subprocess.run(cmd, capture_output=True, check=True, timeout=FFMPEG_TIMEOUT_SECONDS)
+        except Exception:
+            return []
+        return split_jpeg_stream(result.stdout or b"")
+
     def _extract_frame(self, video_path: str, seek_seconds: float = 1.0) -> bytes | None:
         if shutil.which("ffmpeg") is None:
             return None
@@ -331,8 +365,7 @@ class VideoProcessor:
             "error",
             "-ss",
             f"{seek_value:.3f}",
-            "-i",
-            video_path,
+            *_input_args(video_path),
             "-frames:v",
             "1",
             "-f",
@@ -342,13 +375,103 @@ class VideoProcessor:
             "pipe:1",
         ]
         try:
-            result = subprocess.run(cmd, capture_output=True, check=True)
+            result = subprocess.run(cmd, capture_output=True, check=True, timeout=FFMPEG_TIMEOUT_SECONDS)
         except Exception:
             return None
         data = result.stdout or b""
         return data if data else None
 
 
+def _input_args(source: str) -> list[str]:
+    """Build ffmpeg/ffprobe ``-i`` arguments, with HTTP options for URLs."""
+    if not source.startswith(("http://", "https://")):
+        return ["-i", source]
+    return ["-rw_timeout", str(FFMPEG_TIMEOUT_SECONDS * 1_000_000), "-i", source]
+
+
+# Response headers ffmpeg needs to seek through a proxied source.
+_PROXIED_RESPONSE_HEADERS = ("content-type", "content-length", "content-range", "accept-ranges")
+
+
+@contextmanager
+def _authorized_source(source: str, headers: dict[str, str] | None, *, suffix: str = "") -> Iterator[str]:
+    """Yield a URL ffmpeg can open without being given ``headers``.
+
+    ffmpeg only takes extra request headers on its command line, where any
+    local user can read them from the process list. When headers are needed,
+    a loopback server is started for the duration of the block at an
+    unguessable ``127.0.0.1`` path; it forwards ffmpeg's GET/HEAD requests
+    (including ``Range``) to ``source`` with the headers added.
+    """
+    if not headers or not source.startswith(("http://", "https://")):
+        yield source
+        return
+
+    path = f"/{secrets.token_urlsafe(24)}{suffix}"
+    client = httpx.Client(follow_redirects=True, timeout=FFMPEG_TIMEOUT_SECONDS)
+    upstream_headers = {**headers, "Accept-Encoding": "identity"}
+
+    class _Handler(BaseHTTPRequestHandler):
+        def do_HEAD(self):
+            self._forward(send_body=False)
+
+        def do_GET(self):
+            self._forward(send_body=True)
+
+        def _forward(self, *, send_body: bool) -> None:
+            if self.path != path:
+                self.send_error(404)
+                return
+            request_headers = dict(upstream_headers)
+            if self.headers.get("Range"):
+                request_headers["Range"] = self.headers["Range"]
+            try:
+                with client.stream(self.command, source, headers=request_headers) as response:
+                    self.send_response(response.status_code)
+                    for name in _PROXIED_RESPONSE_HEADERS:
+                        if name in response.headers:
+                            self.send_header(name, response.headers[name])
+                    self.end_headers()
+                    if send_body:
+                        for chunk in response.iter_raw(256 * 1024):
+                            self.wfile.write(chunk)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # ffmpeg drops the connection when it seeks elsewhere.
+            except httpx.HTTPError:
+                self.send_error(502)
+
+        def log_message(self, format, *args):  # noqa: A002 - BaseHTTPRequestHandler signature.
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name="ffmpeg-source-proxy", daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}{path}"
+    finally:
+        server.shutdown()
+        server.server_close()
+        client.close()
+
+
+def split_jpeg_stream(data: bytes) -> list[bytes]:
+    """Split concatenated JPEG images (ffmpeg ``image2pipe`` output) into frames.
+
+    Entropy-coded data byte-stuffs 0xFF, so a start-of-image marker only
+    appears at frame boundaries.
+    """
+    frames = []
+    start = data.find(b"\xff\xd8\xff")
+    while start != -1:
+        following = data.find(b"\xff\xd8\xff", start + 3)
+        frame = data[start:following] if following != -1 else data[start:]
+        if frame.rstrip(b"\x00").endswith(b"\xff\xd9"):
+            frames.append(frame)
+        start = following
+    return frames
+
+
 def _to_int(value) -> int | None:
     try:
         if value is None:
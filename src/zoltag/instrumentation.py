@@ -0,0 +1,431 @@
+"""Per-request timing, SQL counters and an on-demand sampling profiler.
+
+``RequestMetricsMiddleware`` opens a ``RequestProfile`` for every HTTP request.
+Handlers mark named phases with ``span()`` or a ``PhaseTimer``; SQLAlchemy
+cursor events add statement counts and durations to the same profile (the
+profile lives in a context variable, so it follows handlers onto the
+``offload`` threadpool). When the request finishes its numbers are folded into
+process-wide histograms that ``render_prometheus`` exposes in the Prometheus
+text format, and the phases are returned to the caller as a ``Server-Timing``
+header.
+
+``SamplingProfiler`` snapshots every thread's stack at a fixed interval and
+returns collapsed ("folded") stacks that flamegraph tools read directly.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import functools
+import logging
+import re
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from zoltag.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+DURATION_BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_COUNT_BUCKETS: Tuple[float, ...] = (1, 2, 5, 10, 20, 50, 100, 250, 500)
+PROFILE_MAX_SECONDS = 60.0
+PROFILE_MIN_INTERVAL_SECONDS = 0.001
+
+_STATEMENT_LITERALS = re.compile(r"\b\d+\b|'[^']*'|\(\s*(?:\?|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\?|%\(\w+\)s|:\w+))*\s*\)")
+
+
+class RequestProfile:
+    """Phase timings and SQL counters collected for one request."""
+
+    __slots__ = ("route", "started", "spans", "sql_count", "sql_seconds", "statement_counts")
+
+    def __init__(self, route: str = "?"):
+        self.route = route
+        self.started = time.perf_counter()
+        self.spans: Dict[str, float] = {}
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        self.statement_counts: Dict[str, int] = {}
+
+    def add_span(self, name: str, seconds: float) -> None:
+        self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+    def add_statement(self, statement: str, seconds: float) -> None:
+        self.sql_count += 1
+        self.sql_seconds += seconds
+        shape = _STATEMENT_LITERALS.sub("?", statement)
+        self.statement_counts[shape] = self.statement_counts.get(shape, 0) + 1
+
+    def most_repeated_statement(self) -> Tuple[Optional[str], int]:
+        if not self.statement_counts:
+            return None, 0
+        shape = max(self.statement_counts, key=self.statement_counts.__getitem__)
+        return shape, self.statement_counts[shape]
+
+    def server_timing(self) -> str:
+        parts = [f"{_token(name)};dur={seconds * 1000:.1f}" for name, seconds in self.spans.items()]
+        if self.sql_count:
+            parts.append(f'sql;dur={self.sql_seconds * 1000:.1f};desc="{self.sql_count} statements"')
+        return ", ".join(parts)
+
+
+_current_profile: contextvars.ContextVar[Optional[RequestProfile]] = contextvars.ContextVar(
+    "zoltag_request_profile", default=None
+)
+
+
+def current_profile() -> Optional[RequestProfile]:
+    return _current_profile.get()
+
+
+@contextlib.contextmanager
+def collect_profile(route: str = "?") -> Iterator[RequestProfile]:
+    """Collect spans and SQL for a block outside HTTP requests (jobs, benchmarks)."""
+    profile = RequestProfile(route)
+    token = _current_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        _current_profile.reset(token)
+
+
+def _token(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", name) or "span"
+
+
+@contextlib.contextmanager
+def span(name: str) -> Iterator[None]:
+    """Time a block as phase ``name`` of the current request (no-op outside one)."""
+    profile = _current_profile.get()
+    if profile is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add_span(name, time.perf_counter() - started)
+
+
+def traced(name: str) -> Callable:
+    """Decorate a function so each call is recorded as span ``name``."""
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class PhaseTimer:
+    """Record consecutive phases of a long handler without re-indenting it.
+
+    ``lap(name)`` attributes the time since the previous lap (or creation) to
+    ``name``.
+    """
+
+    __slots__ = ("_profile", "_last")
+
+    def __init__(self):
+        self._profile = _current_profile.get()
+        self._last = time.perf_counter()
+
+    def lap(self, name: str) -> None:
+        now = time.perf_counter()
+        if self._profile is not None:
+            self._profile.add_span(name, now - self._last)
+        self._last = now
+
+
+# --- process-wide metrics -------------------------------------------------------
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "total", "count")
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.total += value
+        self.count += 1
+        for idx, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[idx] += 1
+                break
+
+
+class MetricsRegistry:
+    """Counters and histograms keyed by label tuples, rendered as Prometheus text."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[Tuple[Tuple[str, str], ...], float]] = {}
+        self._histograms: Dict[str, Dict[Tuple[Tuple[str, str], ...], _Histogram]] = {}
+        self._help: Dict[str, str] = {}
+
+    def describe(self, name: str, help_text: str) -> None:
+        self._help[name] = help_text
+
+    def inc(self, name: str, labels: Dict[str, str], amount: float = 1.0) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + amount
+
+    def observe(self, name: str, labels: Dict[str, str], value: float, buckets: Sequence[float] = DURATION_BUCKETS) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram(buckets)
+            histogram.observe(value)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def render(self) -> List[str]:
+        lines: List[str] = []
+        with self._lock:
+            for name in sorted(self._counters):
+                lines.extend(self._header(name, "counter"))
+                for key, value in sorted(self._counters[name].items()):
+                    lines.append(f"{name}{_labels(key)} {_number(value)}")
+            for name in sorted(self._histograms):
+                lines.extend(self._header(name, "histogram"))
+                for key, histogram in sorted(self._histograms[name].items()):
+                    cumulative = 0
+                    for bound, bucket_count in zip(histogram.buckets, histogram.counts, strict=True):
+                        cumulative += bucket_count
+                        lines.append(f"{name}_bucket{_labels(key + (('le', _number(bound)),))} {cumulative}")
+                    lines.append(f"{name}_bucket{_labels(key + (('le', '+Inf'),))} {histogram.count}")
+                    lines.append(f"{name}_sum{_labels(key)} {_number(histogram.total)}")
+                    lines.append(f"{name}_count{_labels(key)} {histogram.count}")
+        return lines
+
+    def _header(self, name: str, kind: str) -> List[str]:
+        lines = []
+        if name in self._help:
+            lines.append(f"# HELP {name} {self._help[name]}")
+        lines.append(f"# TYPE {name} {kind}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(key: Tuple[Tuple[str, str], ...]) -> str:
+    if not key:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in key) + "}"
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+metrics = MetricsRegistry()
+metrics.describe("zoltag_http_requests_total", "HTTP requests by route, method and status.")
+metrics.describe("zoltag_http_request_duration_seconds", "HTTP request latency.")
+metrics.describe("zoltag_request_phase_duration_seconds", "Time spent in named handler phases.")
+metrics.describe("zoltag_sql_statements_total", "SQL statements executed, by route.")
+metrics.describe("zoltag_sql_duration_seconds_total", "Time spent executing SQL, by route.")
+metrics.describe("zoltag_request_sql_statements", "SQL statements executed per request.")
+metrics.describe(
+    "zoltag_sql_repeated_statement_requests_total",
+    "Requests that ran one statement shape more often than the N+1 threshold.",
+)
+
+
+def record_request(profile: RequestProfile, *, method: str, status: int, seconds: float) -> None:
+    route = profile.route
+    metrics.inc("zoltag_http_requests_total", {"route": route, "method": method, "status": str(status)})
+    metrics.observe("zoltag_http_request_duration_seconds", {"route": route, "method": method}, seconds)
+    for name, phase_seconds in profile.spans.items():
+        metrics.observe("zoltag_request_phase_duration_seconds", {"route": route, "phase": name}, phase_seconds)
+    if profile.sql_count:
+        metrics.inc("zoltag_sql_statements_total", {"route": route}, profile.sql_count)
+        metrics.inc("zoltag_sql_duration_seconds_total", {"route": route}, profile.sql_seconds)
+    metrics.observe("zoltag_request_sql_statements", {"route": route}, profile.sql_count, SQL_COUNT_BUCKETS)
+    threshold = int(settings.sql_repeated_statement_warn or 0)
+    shape, repeats = profile.most_repeated_statement()
+    if threshold > 0 and repeats >= threshold:
+        metrics.inc("zoltag_sql_repeated_statement_requests_total", {"route": route})
+        logger.warning("%s %s ran one statement %d times (possible N+1): %s", method, route, repeats, shape[:300])
+
+
+def _gauge_lines(name: str, help_text: str, value: float) -> List[str]:
+    return [f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {_number(value)}"]
+
+
+def render_prometheus() -> str:
+    """Return all process metrics in the Prometheus text exposition format."""
+    from zoltag.activity import get_activity_sink_stats
+    from zoltag.concurrency import event_loop_lag_monitor
+
+    lines = metrics.render()
+    lag = event_loop_lag_monitor.stats()
+    lines.extend(_gauge_lines("zoltag_event_loop_lag_seconds", "Most recent event-loop wake-up delay.", lag["last_lag_ms"] / 1000))
+    lines.extend(_gauge_lines("zoltag_event_loop_max_lag_seconds", "Largest event-loop wake-up delay seen.", lag["max_lag_ms"] / 1000))
+    lines.append("# HELP zoltag_event_loop_lag_events_total Event-loop stalls above the warning threshold.")
+    lines.append("# TYPE zoltag_event_loop_lag_events_total counter")
+    lines.append(f"zoltag_event_loop_lag_events_total {lag['lag_events']}")
+    sink = get_activity_sink_stats()
+    if sink is not None:
+        lines.append("# HELP zoltag_activity_sink_events_total Activity events handled by the background sink.")
+        lines.append("# TYPE zoltag_activity_sink_events_total counter")
+        for outcome in ("enqueued", "written", "dropped", "failed"):
+            lines.append(f'zoltag_activity_sink_events_total{{outcome="{outcome}"}} {sink.get(outcome, 0)}')
+        lines.extend(_gauge_lines("zoltag_activity_sink_queued", "Activity events waiting to be written.", sink.get("queued", 0)))
+    return "\n".join(lines) + "\n"
+
+
+# --- request middleware ------------------------------------------------------------
+
+
+def _route_template(scope: dict) -> str:
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    # Unmatched paths are not used as labels: they would make series unbounded.
+    return path or "unmatched"
+
+
+class RequestMetricsMiddleware:
+    """ASGI middleware that profiles each HTTP request and reports it."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope.get("type") != "http":
+            await self.app(scope, receive, send)
+            return
+        profile = RequestProfile()
+        token = _current_profile.set(profile)
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = int(message.get("status") or 500)
+                timing = profile.server_timing()
+                if timing:
+                    message = dict(message)
+                    message["headers"] = list(message.get("headers") or []) + [
+                        (b"server-timing", timing.encode("latin-1"))
+                    ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_profile.reset(token)
+            profile.route = _route_template(scope)
+            record_request(
+                profile,
+                method=scope.get("method", "?"),
+                status=status,
+                seconds=time.perf_counter() - profile.started,
+            )
+
+
+# --- SQL statement timing ---------------------------------------------------------
+
+_SQL_TIMER_KEY = "zoltag_sql_started"
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _sql_before_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _current_profile.get() is not None:
+        conn.info.setdefault(_SQL_TIMER_KEY, []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _sql_after_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    profile = _current_profile.get()
+    if profile is None:
+        return
+    started = conn.info.get(_SQL_TIMER_KEY)
+    if not started:
+        return
+    profile.add_statement(statement, time.perf_counter() - started.pop())
+
+
+@event.listens_for(Engine, "handle_error")
+def _sql_failed(exception_context) -> None:
+    conn = exception_context.connection
+    started = conn.info.get(_SQL_TIMER_KEY) if conn is not None else None
+    if started:
+        started.pop()
+
+
+# --- sampling profiler ---------------------------------------------------------------
+
+
+class SamplingProfiler:
+    """Sample all thread stacks and aggregate them as collapsed stacks."""
+
+    def __init__(self, interval_seconds: float = 0.01):
+        self.interval_seconds = max(PROFILE_MIN_INTERVAL_SECONDS, float(interval_seconds))
+        self.samples = 0
+        self.stacks: Dict[str, int] = {}
+
+    def sample_once(self, skip_thread_ids: Sequence[int] = ()) -> None:
+        self.samples += 1
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id in skip_thread_ids:
+                continue
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if not names:
+                continue
+            key = ";".join(reversed(names))
+            self.stacks[key] = self.stacks.get(key, 0) + 1
+
+    def run(self, seconds: float) -> "SamplingProfiler":
+        """Sample for ``seconds`` (capped) on the calling thread, which is excluded."""
+        deadline = time.monotonic() + min(max(0.0, float(seconds)), PROFILE_MAX_SECONDS)
+        own_thread = threading.get_ident()
+        while time.monotonic() < deadline:
+            self.sample_once(skip_thread_ids=(own_thread,))
+            time.sleep(self.interval_seconds)
+        return self
+
+    def folded(self) -> str:
+        """Collapsed stacks (``frame;frame;frame count``), heaviest first."""
+        ordered = sorted(self.stacks.items(), key=lambda item: item[1], reverse=True)
+        return "".join(f"{stack} {count}\n" for stack, count in ordered)
+
+
+_profiler_lock = threading.Lock()
+
+
+def run_sampling_profile(seconds: float, interval_seconds: float) -> Optional[SamplingProfiler]:
+    """Run one profile at a time; returns None if another profile is in progress."""
+    if not _profiler_lock.acquire(blocking=False):
+        return None
+    try:
+        return SamplingProfiler(interval_seconds).run(seconds)
+    finally:
+        _profiler_lock.release()
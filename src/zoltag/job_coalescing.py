@@ -0,0 +1,150 @@
+"""Enqueue-side coalescing of per-asset jobs.
+
+Edits and uploads can produce a burst of jobs that each touch one asset. A
+``Job.dedupe_key`` only drops exact duplicates, and every job that remains
+costs a worker subprocess. ``enqueue_asset_job`` instead merges asset ids
+into a pending job of the same tenant, definition and base payload:
+
+- A new coalescing job is scheduled ``job_coalesce_window_seconds`` in the
+  future, so the worker does not pick it up while the burst is still arriving.
+- Later calls append their asset ids to that job's payload until it holds
+  ``job_coalesce_max_batch`` ids; further ids start a new job.
+- The merge target is locked ``FOR UPDATE`` and must still be ``queued``.
+  Workers claim with ``SKIP LOCKED`` and the CLI reads its payload only after
+  claiming, so ids are never added to a job that has already started.
+
+Only commands listed in ``ASSET_BATCH_COMMANDS`` can be coalesced; each maps
+to the repeatable CLI option that receives the asset ids.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from datetime import datetime, timedelta
+from typing import Any, Iterable, Optional
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from zoltag.job_profiles import resolve_definition_run_profile
+from zoltag.metadata import Job, JobDefinition
+from zoltag.settings import settings
+
+
+# Definition key -> payload field (a multiple=True CLI option) holding asset ids.
+ASSET_BATCH_COMMANDS: dict[str, str] = {
+    "build-renditions": "asset_id",
+    "rebuild-asset-text-index": "asset_id",
+    "refresh-metadata": "asset_id",
+}
+
+COALESCE_SOURCE_REF_PREFIX = "coalesce:"
+
+
+def coalesce_source_ref(definition_key: str, base_payload: dict[str, Any] | None) -> str:
+    """Jobs share a batch only when their definition and non-asset payload match."""
+    encoded = json.dumps(
+        {"key": definition_key, "payload": base_payload or {}},
+        sort_keys=True,
+        default=str,
+    )
+    return COALESCE_SOURCE_REF_PREFIX + hashlib.sha1(encoded.encode("utf-8")).hexdigest()[:16]
+
+
+def _unique_asset_ids(asset_ids: Iterable[Any]) -> list[str]:
+    return list(dict.fromkeys(str(asset_id) for asset_id in asset_ids if asset_id))
+
+
+def enqueue_asset_job(
+    db: Session,
+    *,
+    tenant_id: UUID | str,
+    definition_key: str,
+    asset_ids: Iterable[Any],
+    base_payload: Optional[dict[str, Any]] = None,
+    source: str = "system",
+    priority: int = 100,
+    created_by: Optional[UUID] = None,
+    window_seconds: Optional[int] = None,
+    max_batch: Optional[int] = None,
+) -> list[Job]:
+    """Add ``asset_ids`` to pending batched jobs, creating jobs as needed.
+
+    Returns the jobs that received ids (empty when there are no ids or the
+    definition is inactive). Flushes but does not commit; the caller owns the
+    transaction.
+    """
+    asset_field = ASSET_BATCH_COMMANDS.get(definition_key)
+    if asset_field is None:
+        raise ValueError(f"Job definition does not accept asset batches: {definition_key}")
+    pending = _unique_asset_ids(asset_ids)
+    if not pending:
+        return []
+
+    definition = db.query(JobDefinition).filter(
+        JobDefinition.key == definition_key,
+        JobDefinition.is_active.is_(True),
+    ).first()
+    if definition is None:
+        return []
+
+    tenant_uuid = UUID(str(tenant_id))
+    base = {key: value for key, value in (base_payload or {}).items() if key != asset_field}
+    source_ref = coalesce_source_ref(definition_key, base)
+    window = max(0, int(settings.job_coalesce_window_seconds if window_seconds is None else window_seconds))
+    capacity = max(1, int(settings.job_coalesce_max_batch if max_batch is None else max_batch))
+    now = datetime.utcnow()
+
+    candidates = (
+        db.query(Job)
+        .filter(
+            Job.tenant_id == tenant_uuid,
+            Job.definition_id == definition.id,
+            Job.status == "queued",
+            Job.source_ref == source_ref,
+        )
+        .order_by(Job.queued_at.asc(), Job.id.asc())
+        .with_for_update()
+        .all()
+    )
+
+    touched: list[Job] = []
+    for job in candidates:
+        existing = list((job.payload or {}).get(asset_field) or [])
+        known = set(existing)
+        pending = [asset_id for asset_id in pending if asset_id not in known]
+        if not pending:
+            touched = touched or [job]
+            break
+        room = capacity - len(existing)
+        if room <= 0:
+            continue
+        added, pending = pending[:room], pending[room:]
+        # Reassign so the JSON column is marked dirty.
+        job.payload = {**(job.payload or {}), asset_field: existing + added}
+        touched.append(job)
+        if not pending:
+            break
+
+    while pending:
+        chunk, pending = pending[:capacity], pending[capacity:]
+        job = Job(
+            tenant_id=tenant_uuid,
+            definition_id=definition.id,
+            source=source,
+            source_ref=source_ref,
+            status="queued",
+            run_profile=resolve_definition_run_profile(definition),
+            priority=priority,
+            payload={**base, asset_field: chunk},
+            scheduled_for=now + timedelta(seconds=window),
+            queued_at=now,
+            max_attempts=int(definition.max_attempts or 3),
+            created_by=created_by,
+        )
+        db.add(job)
+        touched.append(job)
+
+    db.flush()
+    return touched
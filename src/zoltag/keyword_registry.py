@@ -0,0 +1,325 @@
+"""Versioned per-tenant keyword/category registry.
+
+Keyword metadata is read on nearly every API request and by every CLI tagging
+command, but it changes rarely. The registry loads a tenant's keywords and
+categories once into compact column tuples and keeps them in-process until the
+tenant's row in ``keyword_registry_versions`` changes. Writers call
+``bump_keyword_registry_version`` inside their transaction; the local copy is
+dropped when that transaction commits, and other processes notice the new
+version on their next periodic version check. Lookups of ids the snapshot does
+not know (``get_keyword_registry_for_ids``) re-check the version early and
+reload only if it moved; ids still unknown are remembered for that version.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from zoltag.models.config import Keyword, KeywordCategory, KeywordRegistryVersion
+from zoltag.tenant_scope import parse_tenant_id, tenant_column_filter_for_values
+
+
+KEYWORD_REGISTRY_VERSION_CHECK_SECONDS = 5
+_PENDING_BUMPS_INFO_KEY = "zoltag_keyword_registry_bumps"
+_registry_lock = threading.Lock()
+_registry_cache: Dict[str, "KeywordRegistry"] = {}
+
+
+class CategoryEntry(NamedTuple):
+    id: int
+    name: str
+    parent_id: Optional[int]
+    sort_order: int
+    is_people_category: bool
+
+
+@dataclass
+class KeywordRegistry:
+    """Column-oriented snapshot of a tenant's keywords.
+
+    Keyword columns are parallel tuples; ``tree_order`` lists positions in the
+    category-tree order used by ``ConfigManager.get_all_keywords``.
+    """
+
+    tenant_id: str
+    version: int
+    ids: Tuple[int, ...]
+    names: Tuple[str, ...]
+    category_ids: Tuple[int, ...]
+    category_names: Tuple[str, ...]
+    category_paths: Tuple[Optional[str], ...]
+    prompts: Tuple[Optional[str], ...]
+    person_ids: Tuple[Optional[int], ...]
+    tag_types: Tuple[str, ...]
+    tree_order: Tuple[int, ...]
+    categories: Tuple[CategoryEntry, ...]
+    checked_at: float = 0.0
+    _position_by_id: Dict[int, int] = field(default_factory=dict, repr=False)
+    # Ids looked up and confirmed absent at this version (e.g. tags left by deleted keywords).
+    _unknown_ids: Set[int] = field(default_factory=set, repr=False)
+    _keyword_map: Optional[Mapping[int, Tuple[str, str]]] = field(default=None, repr=False)
+
+    def __post_init__(self) -> None:
+        self._position_by_id = {kw_id: pos for pos, kw_id in enumerate(self.ids)}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, keyword_id: object) -> bool:
+        return keyword_id in self._position_by_id
+
+    def position(self, keyword_id: int) -> Optional[int]:
+        return self._position_by_id.get(keyword_id)
+
+    def unseen_ids(self, keyword_ids: Iterable[int]) -> Set[int]:
+        """Ids that are neither in the snapshot nor known to be missing at this version."""
+        return {
+            int(kw_id) for kw_id in keyword_ids
+            if int(kw_id) not in self._position_by_id and int(kw_id) not in self._unknown_ids
+        }
+
+    def keyword_map(self) -> Mapping[int, Tuple[str, str]]:
+        """Return keyword_id -> (keyword, category name); built once and shared read-only."""
+        if self._keyword_map is None:
+            self._keyword_map = MappingProxyType(
+                dict(zip(self.ids, zip(self.names, self.category_names, strict=True), strict=True))
+            )
+        return self._keyword_map
+
+    def keywords_map(self, keyword_ids: Iterable[int]) -> Dict[int, Dict]:
+        """Return {keyword_id: {'keyword', 'category'}} for known ids."""
+        result = {}
+        for kw_id in keyword_ids:
+            pos = self._position_by_id.get(kw_id)
+            if pos is not None:
+                result[kw_id] = {"keyword": self.names[pos], "category": self.category_names[pos]}
+        return result
+
+    def info_by_name(self, keyword_names: Iterable[str]) -> Dict[str, Dict]:
+        """Return {keyword: {'id', 'category'}} for exact keyword names."""
+        wanted = set(keyword_names)
+        return {
+            name: {"id": kw_id, "category": category}
+            for kw_id, name, category in zip(self.ids, self.names, self.category_names, strict=True)
+            if name in wanted
+        }
+
+    def ids_for_names(self, keyword_names: Iterable[str]) -> List[int]:
+        wanted = set(keyword_names)
+        return [kw_id for kw_id, name in zip(self.ids, self.names, strict=True) if name in wanted]
+
+    def config_keywords(self, include_people: bool = False) -> List[dict]:
+        """Keyword dicts in category-tree order (``ConfigManager`` format)."""
+        result = []
+        for pos in self.tree_order:
+            tag_type = self.tag_types[pos]
+            if not include_people and tag_type == "person":
+                continue
+            result.append({
+                "keyword": self.names[pos],
+                "category": self.category_paths[pos],
+                "prompt": self.prompts[pos],
+                "person_id": self.person_ids[pos],
+                "tag_type": tag_type,
+            })
+        return result
+
+
+def _read_version(db: Session, tenant_id: str) -> int:
+    if parse_tenant_id(tenant_id) is None:
+        return 0
+    version = db.query(KeywordRegistryVersion.version).filter(
+        tenant_column_filter_for_values(KeywordRegistryVersion, tenant_id)
+    ).scalar()
+    return int(version or 0)
+
+
+def _load_registry(db: Session, tenant_id: str, version: int) -> KeywordRegistry:
+    category_rows = db.query(
+        KeywordCategory.id,
+        KeywordCategory.name,
+        KeywordCategory.parent_id,
+        KeywordCategory.sort_order,
+        KeywordCategory.is_people_category,
+    ).filter(
+        tenant_column_filter_for_values(KeywordCategory, tenant_id)
+    ).order_by(
+        KeywordCategory.sort_order,
+        KeywordCategory.id,
+    ).all()
+    categories = tuple(
+        CategoryEntry(int(row[0]), row[1], row[2], int(row[3] or 0), bool(row[4]))
+        for row in category_rows
+    )
+    category_by_id = {entry.id: entry for entry in categories}
+
+    keyword_rows = [
+        row for row in db.query(
+            Keyword.id,
+            Keyword.keyword,
+            Keyword.category_id,
+            Keyword.prompt,
+            Keyword.person_id,
+            Keyword.tag_type,
+        ).filter(
+            tenant_column_filter_for_values(Keyword, tenant_id)
+        ).order_by(
+            Keyword.sort_order,
+            Keyword.id,
+        ).all()
+        if row[2] in category_by_id
+    ]
+
+    # Resolve full category paths and the tree traversal order.
+    children: Dict[Optional[int], List[CategoryEntry]] = {}
+    for entry in categories:
+        children.setdefault(entry.parent_id, []).append(entry)
+    positions_by_category: Dict[int, List[int]] = {}
+    for pos, row in enumerate(keyword_rows):
+        positions_by_category.setdefault(row[2], []).append(pos)
+
+    path_by_category: Dict[int, str] = {}
+    tree_order: List[int] = []
+    stack = [(entry, "") for entry in reversed(children.get(None, []))]
+    while stack:
+        entry, parent_path = stack.pop()
+        if entry.id in path_by_category:
+            continue
+        path = f"{parent_path}/{entry.name}" if parent_path else entry.name
+        path_by_category[entry.id] = path
+        tree_order.extend(positions_by_category.get(entry.id, []))
+        stack.extend((child, path) for child in reversed(children.get(entry.id, [])))
+
+    return KeywordRegistry(
+        tenant_id=str(tenant_id),
+        version=version,
+        ids=tuple(int(row[0]) for row in keyword_rows),
+        names=tuple(row[1] for row in keyword_rows),
+        category_ids=tuple(int(row[2]) for row in keyword_rows),
+        category_names=tuple(category_by_id[row[2]].name for row in keyword_rows),
+        category_paths=tuple(path_by_category.get(row[2]) for row in keyword_rows),
+        prompts=tuple(row[3] for row in keyword_rows),
+        person_ids=tuple(row[4] for row in keyword_rows),
+        tag_types=tuple(row[5] or "keyword" for row in keyword_rows),
+        tree_order=tuple(tree_order),
+        categories=categories,
+    )
+
+
+def get_keyword_registry(db: Session, tenant_id: str, refresh: bool = False) -> KeywordRegistry:
+    """Return the keyword registry for a tenant, reloading it only when its version changed."""
+    key = str(tenant_id)
+    now = time.time()
+    with _registry_lock:
+        cached = _registry_cache.get(key)
+    if cached is not None and not refresh and (now - cached.checked_at) < KEYWORD_REGISTRY_VERSION_CHECK_SECONDS:
+        return cached
+
+    version = _read_version(db, key)
+    if cached is not None and not refresh and cached.version == version:
+        cached.checked_at = now
+        return cached
+
+    return _store_registry(_load_registry(db, key, version), now)
+
+
+def get_keyword_registry_for_ids(db: Session, tenant_id: str, keyword_ids: Iterable[int]) -> KeywordRegistry:
+    """Return the registry, making sure it is current for ``keyword_ids``.
+
+    An id the snapshot has not seen (for example a keyword created on another
+    instance since the last version check) re-reads the stored version right
+    away, and the registry is reloaded only if that version changed. Ids that
+    are still missing are cached as unknown for this version, so orphaned tag
+    rows do not cost a version query on every page.
+    """
+    key = str(tenant_id)
+    registry = get_keyword_registry(db, key)
+    missing = registry.unseen_ids(keyword_ids)
+    if not missing:
+        return registry
+
+    now = time.time()
+    version = _read_version(db, key)
+    if version == registry.version:
+        registry.checked_at = now
+    else:
+        registry = _store_registry(_load_registry(db, key, version), now)
+        missing = registry.unseen_ids(missing)
+    registry._unknown_ids.update(missing)
+    return registry
+
+
+def _store_registry(registry: KeywordRegistry, now: float) -> KeywordRegistry:
+    registry.checked_at = now
+    with _registry_lock:
+        _registry_cache[registry.tenant_id] = registry
+    return registry
+
+
+def invalidate_keyword_registry(tenant_id: Optional[str] = None) -> None:
+    """Drop the in-process registry for one tenant (or all tenants)."""
+    with _registry_lock:
+        if tenant_id is None:
+            _registry_cache.clear()
+        else:
+            _registry_cache.pop(str(tenant_id), None)
+
+
+def bump_keyword_registry_version(db: Session, tenant_id: str) -> None:
+    """Increment the tenant's registry version inside the caller's transaction.
+
+    Call before ``db.commit()`` in any code path that creates, renames, moves or
+    deletes keywords or categories.
+    """
+    key = str(tenant_id)
+    db.info.setdefault(_PENDING_BUMPS_INFO_KEY, set()).add(key)
+    invalidate_keyword_registry(key)
+
+    parsed_tenant_id = parse_tenant_id(tenant_id)
+    if parsed_tenant_id is None:
+        return
+    now = datetime.utcnow()
+    if db.bind and db.bind.dialect.name == "postgresql":
+        stmt = pg_insert(KeywordRegistryVersion).values(
+            tenant_id=parsed_tenant_id,
+            version=1,
+            updated_at=now,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[KeywordRegistryVersion.tenant_id],
+            set_={
+                "version": KeywordRegistryVersion.version + 1,
+                "updated_at": now,
+            },
+        )
+        db.execute(stmt)
+        return
+
+    row = db.query(KeywordRegistryVersion).filter(
+        KeywordRegistryVersion.tenant_id == parsed_tenant_id
+    ).first()
+    if row is None:
+        db.add(KeywordRegistryVersion(tenant_id=parsed_tenant_id, version=1, updated_at=now))
+        return
+    row.version = int(row.version or 0) + 1
+    row.updated_at = now
+
+
+@event.listens_for(Session, "after_commit")
+def _drop_committed_registries(session: Session) -> None:
+    for key in session.info.pop(_PENDING_BUMPS_INFO_KEY, ()):
+        invalidate_keyword_registry(key)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_bumps(session: Session) -> None:
+    session.info.pop(_PENDING_BUMPS_INFO_KEY, None)
@@ -0,0 +1,490 @@
+"""Incremental library indexer for local desktop mode.
+
+A full scan used to walk every sync folder and run every file through the
+sync pipeline. The indexer instead keeps a manifest of
+``(path, size, mtime_ns, inode)`` for every file it has ingested, in a small
+SQLite file in the local data directory. A scan only stats files and hands
+new or changed ones to a bounded worker pool. Each worker uses its own
+database session. Once a scan has run, a filesystem watcher (``watchdog``,
+when installed) feeds changes in as they happen, so the app does not have to
+walk the library again after every start.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence
+
+from zoltag.settings import settings
+from zoltag.storage.local_provider import IMAGE_EXTENSIONS, LocalFilesystemProvider
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # optional desktop dependency
+    FileSystemEventHandler = object
+    Observer = None
+
+
+logger = logging.getLogger(__name__)
+
+LOCAL_INDEX_MANIFEST_NAME = "library-manifest.sqlite"
+LOCAL_INDEX_WATCH_DEBOUNCE_SECONDS = 2.0
+_MANIFEST_COMMIT_EVERY = 500
+
+
+class FileFingerprint(NamedTuple):
+    size: int
+    mtime_ns: int
+    inode: int
+
+    @classmethod
+    def from_stat(cls, stat: os.stat_result) -> "FileFingerprint":
+        return cls(int(stat.st_size), int(stat.st_mtime_ns), int(stat.st_ino))
+
+
+def is_indexable_path(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() in IMAGE_EXTENSIONS
+
+
+class LibraryManifest:
+    """Persistent ``path -> fingerprint`` map of files already ingested.
+
+    Rows are grouped by parent directory so a scan compares one directory at
+    a time and never holds the whole library in memory.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._pending_writes = 0
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            " path TEXT PRIMARY KEY, dir TEXT NOT NULL,"
+            " size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, inode INTEGER NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_files_dir ON files (dir)")
+        self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return int(self._conn.execute("SELECT count(*) FROM files").fetchone()[0])
+
+    def get(self, path: str) -> Optional[FileFingerprint]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime_ns, inode FROM files WHERE path = ?", (path,)
+            ).fetchone()
+        return FileFingerprint(*row) if row else None
+
+    def directory(self, directory: str) -> Dict[str, FileFingerprint]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT path, size, mtime_ns, inode FROM files WHERE dir = ?", (directory,)
+            ).fetchall()
+        return {row[0]: FileFingerprint(row[1], row[2], row[3]) for row in rows}
+
+    def directories(self) -> List[str]:
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT DISTINCT dir FROM files").fetchall()]
+
+    def record(self, path: str, fingerprint: FileFingerprint) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO files (path, dir, size, mtime_ns, inode) VALUES (?, ?, ?, ?, ?)",
+                (path, os.path.dirname(path), *fingerprint),
+            )
+            self._note_write()
+
+    def remove(self, paths: Sequence[str]) -> None:
+        if not paths:
+            return
+        with self._lock:
+            self._conn.executemany("DELETE FROM files WHERE path = ?", [(path,) for path in paths])
+            self._note_write(len(paths))
+
+    def remove_directory(self, directory: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM files WHERE dir = ?", (directory,))
+            self._note_write()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._conn.commit()
+            self._pending_writes = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
+
+    def _note_write(self, count: int = 1) -> None:
+        self._pending_writes += count
+        if self._pending_writes >= _MANIFEST_COMMIT_EVERY:
+            self._conn.commit()
+            self._pending_writes = 0
+
+
+def iter_changed_files(manifest: LibraryManifest, roots: Sequence[str]) -> Iterator[tuple[str, FileFingerprint]]:
+    """Yield ``(path, fingerprint)`` for files that are new or differ from the manifest.
+
+    Files (and whole directories) under ``roots`` that no longer exist are
+    dropped from the manifest as the walk goes.
+    """
+    visited = set()
+    root_paths = []
+    for root in roots:
+        root_path = os.path.realpath(root)
+        if not os.path.isdir(root_path):
+            continue
+        root_paths.append(root_path)
+        stack = [root_path]
+        while stack:
+            directory = stack.pop()
+            if directory in visited:
+                continue
+            visited.add(directory)
+            known = manifest.directory(directory)
+            seen = set()
+            try:
+                with os.scandir(directory) as it:
+                    entries = list(it)
+            except OSError as exc:
+                logger.warning("Local index: cannot read %s: %s", directory, exc)
+                continue
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                        continue
+                    if not entry.is_file() or not is_indexable_path(entry.name):
+                        continue
+                    path = entry.path
+                    fingerprint = FileFingerprint.from_stat(entry.stat())
+                except OSError:
+                    continue
+                seen.add(path)
+                if known.get(path) != fingerprint:
+                    yield path, fingerprint
+            manifest.remove([path for path in known if path not in seen])
+
+    for directory in manifest.directories():
+        if directory in visited:
+            continue
+        if any(directory == root or directory.startswith(root + os.sep) for root in root_paths):
+            manifest.remove_directory(directory)
+    manifest.flush()
+
+
+class _WatchHandler(FileSystemEventHandler):
+    def __init__(self, indexer: "LocalLibraryIndexer"):
+        self._indexer = indexer
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self._indexer.notify_changed(event.src_path)
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self._indexer.notify_changed(event.src_path)
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self._indexer.notify_removed(event.src_path)
+            self._indexer.notify_changed(event.dest_path)
+
+    def on_deleted(self, event):
+        if not event.is_directory:
+            self._indexer.notify_removed(event.src_path)
+
+
+def _default_session_factory():
+    from zoltag.database import SessionLocal
+
+    return SessionLocal()
+
+
+class LocalLibraryIndexer:
+    """Ingest new/changed local files through the sync pipeline, incrementally."""
+
+    def __init__(
+        self,
+        tenant: Any,
+        sync_folders: Sequence[str],
+        *,
+        data_dir: Optional[Path] = None,
+        max_workers: Optional[int] = None,
+        session_factory: Callable[[], Any] = _default_session_factory,
+    ):
+        data_dir = Path(data_dir if data_dir is not None else settings.local_data_dir)
+        self.tenant = tenant
+        self.sync_folders = [str(folder) for folder in sync_folders]
+        self.manifest = LibraryManifest(data_dir / LOCAL_INDEX_MANIFEST_NAME)
+        self.max_workers = max(1, int(max_workers or settings.local_index_workers))
+        self._session_factory = session_factory
+
+        thumbnail_dir = data_dir / "thumbnails"
+        self.provider = LocalFilesystemProvider(thumbnail_dir=thumbnail_dir)
+        from zoltag.routers.local import _LocalThumbnailBucket
+
+        self.bucket = _LocalThumbnailBucket(thumbnail_dir)
+
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="zoltag-local-index")
+        # Bounds queued work so a 500k-file first scan doesn't hold 500k futures.
+        self._slots = threading.BoundedSemaphore(self.max_workers * 4)
+        self._state_lock = threading.Lock()
+        self._inflight = 0
+        self._idle = threading.Condition(self._state_lock)
+        self._pending_lock = threading.Lock()
+        self._pending_changes: Dict[str, float] = {}
+        self._observer = None
+        self._debounce_thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._scan_finished = threading.Event()
+        self._scan_finished.set()
+        self.state: Dict[str, Any] = {
+            "running": False,
+            "total": 0,
+            "processed": 0,
+            "skipped": 0,
+            "errors": 0,
+            "started_at": None,
+            "finished_at": None,
+            "last_error": None,
+            "watching": False,
+        }
+
+    # --- scanning ---------------------------------------------------------
+
+    def scan(self) -> Dict[str, Any]:
+        """Dispatch every new or changed file under the sync folders and wait for them.
+
+        Stops dispatching early once :meth:`stop` is called; files not reached
+        are still missing from the manifest and are picked up by the next scan.
+        """
+        self._scan_finished.clear()
+        with self._state_lock:
+            self.state.update(
+                running=True,
+                total=0,
+                processed=0,
+                skipped=0,
+                errors=0,
+                started_at=datetime.utcnow().isoformat(),
+                finished_at=None,
+                last_error=None,
+            )
+        try:
+            for path, fingerprint in iter_changed_files(self.manifest, self.sync_folders):
+                if self._stop_event.is_set():
+                    break
+                with self._state_lock:
+                    self.state["total"] += 1
+                self._submit(path, fingerprint)
+            self.wait_idle()
+        except Exception as exc:
+            with self._state_lock:
+                self.state["last_error"] = str(exc)
+            logger.exception("Local scan failed")
+        finally:
+            self.manifest.flush()
+            with self._state_lock:
+                self.state["running"] = False
+                self.state["finished_at"] = datetime.utcnow().isoformat()
+            self._scan_finished.set()
+        return dict(self.state)
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._idle:
+            while self._inflight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+        return True
+
+    def _submit(self, path: str, fingerprint: FileFingerprint, *, block: bool = True) -> bool:
+        """Queue ``path`` for processing; with ``block=False``, return False if every slot is taken."""
+        if not self._slots.acquire(blocking=block):
+            return False
+        with self._state_lock:
+            self._inflight += 1
+        try:
+            self._executor.submit(self._process_path, path, fingerprint)
+        except BaseException:
+            self._task_done()
+            raise
+        return True
+
+    def _task_done(self) -> None:
+        self._slots.release()
+        with self._idle:
+            self._inflight -= 1
+            if not self._inflight:
+                self._idle.notify_all()
+
+    def _process_path(self, path: str, fingerprint: FileFingerprint) -> None:
+        from zoltag.sync_pipeline import process_storage_entry
+
+        db = self._session_factory()
+        try:
+            entry = self.provider.get_entry(path)
+            result = process_storage_entry(
+                db=db,
+                tenant=self.tenant,
+                entry=entry,
+                provider=self.provider,
+                thumbnail_bucket=self.bucket,
+            )
+            db.commit()
+            # Only remember files that made it in, so failures are retried next scan.
+            self.manifest.record(path, fingerprint)
+            with self._state_lock:
+                self.state["skipped" if getattr(result, "skipped", False) else "processed"] += 1
+        except Exception as exc:
+            try:
+                db.rollback()
+            except Exception:
+                pass
+            with self._state_lock:
+                self.state["errors"] += 1
+                self.state["last_error"] = str(exc)
+            logger.warning("Local scan: failed to process %s: %s", path, exc)
+        finally:
+            db.close()
+            self._task_done()
+
+    # --- watching ---------------------------------------------------------
+
+    def start_watching(self) -> bool:
+        """Follow filesystem changes under the sync folders. Returns False if unavailable."""
+        if self._observer is not None:
+            return True
+        if self._stop_event.is_set():
+            return False
+        if Observer is None:
+            logger.info("watchdog is not installed; local library changes are picked up on the next scan")
+            return False
+        observer = Observer()
+        handler = _WatchHandler(self)
+        for folder in self.sync_folders:
+            # Same root the scan walks, so event paths match manifest keys.
+            root = os.path.realpath(folder)
+            if os.path.isdir(root):
+                observer.schedule(handler, root, recursive=True)
+        observer.daemon = True
+        observer.start()
+        self._observer = observer
+        self._debounce_thread = threading.Thread(
+            target=self._debounce_loop, name="zoltag-local-index-watch", daemon=True
+        )
+        self._debounce_thread.start()
+        with self._state_lock:
+            self.state["watching"] = True
+        return True
+
+    def notify_changed(self, path: str) -> None:
+        if is_indexable_path(path):
+            with self._pending_lock:
+                self._pending_changes[os.path.abspath(path)] = time.monotonic()
+
+    def notify_removed(self, path: str) -> None:
+        if is_indexable_path(path):
+            path = os.path.abspath(path)
+            with self._pending_lock:
+                self._pending_changes.pop(path, None)
+            self.manifest.remove([path])
+
+    def dispatch_settled_changes(self, *, settle_seconds: float = LOCAL_INDEX_WATCH_DEBOUNCE_SECONDS) -> int:
+        """Process watched files that have stopped changing (files are often written in bursts)."""
+        cutoff = time.monotonic() - settle_seconds
+        with self._pending_lock:
+            ready = [path for path, seen_at in self._pending_changes.items() if seen_at <= cutoff]
+            for path in ready:
+                del self._pending_changes[path]
+        dispatched = 0
+        for index, path in enumerate(ready):
+            try:
+                fingerprint = FileFingerprint.from_stat(os.stat(path))
+            except OSError:
+                continue
+            if self.manifest.get(path) == fingerprint:
+                continue
+            # Never block the watcher thread behind a busy scan: requeue the
+            # rest and try again on the next tick.
+            if not self._submit(path, fingerprint, block=False):
+                with self._pending_lock:
+                    for deferred in ready[index:]:
+                        self._pending_changes.setdefault(deferred, cutoff)
+                break
+            dispatched += 1
+        return dispatched
+
+    def _debounce_loop(self) -> None:
+        while not self._stop_event.wait(LOCAL_INDEX_WATCH_DEBOUNCE_SECONDS / 2):
+            try:
+                self.dispatch_settled_changes()
+            except Exception:
+                logger.exception("Local index watcher dispatch failed")
+
+    def stop(self) -> None:
+        """Stop watching, let an in-flight scan wind down, then release the pool and manifest."""
+        self._stop_event.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout=5)
+            self._observer = None
+        if self._debounce_thread is not None:
+            self._debounce_thread.join(timeout=5)
+            self._debounce_thread = None
+        # A scan running on another thread must stop submitting before the
+        # executor is shut down underneath it.
+        self._scan_finished.wait()
+        self._executor.shutdown(wait=True)
+        self.manifest.close()
+        with self._state_lock:
+            self.state["watching"] = False
+
+
+_indexer_lock = threading.Lock()
+_indexer: Optional[LocalLibraryIndexer] = None
+
+
+def get_local_indexer(tenant: Any, sync_folders: Sequence[str]) -> LocalLibraryIndexer:
+    """Return the process-wide indexer, rebuilding it if the tenant or folders changed."""
+    global _indexer
+    with _indexer_lock:
+        folders = [str(folder) for folder in sync_folders]
+        current = _indexer
+        if current is not None and (
+            str(current.tenant.id) != str(tenant.id) or current.sync_folders != folders
+        ):
+            current.stop()
+            current = None
+        if current is None:
+            current = LocalLibraryIndexer(tenant, folders)
+        _indexer = current
+        return current
+
+
+def current_local_indexer() -> Optional[LocalLibraryIndexer]:
+    return _indexer
+
+
+def stop_local_indexer() -> None:
+    global _indexer
+    with _indexer_lock:
+        if _indexer is not None:
+            _indexer.stop()
+            _indexer = None
@@ -0,0 +1,162 @@
+"""Leader election for fleet-wide maintenance ticks.
+
+Lease reclaim, workflow reconciliation and schedule fan-out only need to run
+in one place at a time. Workers compete for a Postgres session-level advisory
+lock held on a dedicated autocommit connection: the holder is the leader, the
+lease is renewed by periodically checking that connection is still alive, and
+if the leader dies its connection (and therefore the lock) goes away so
+another worker takes over on its next attempt. Non-Postgres databases
+(SQLite/local mode) have a single process, which is always the leader.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from sqlalchemy import text
+
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary application-wide advisory lock key ("ZOLTAGM" as bytes).
+MAINTENANCE_LOCK_KEY = 0x5A4F4C5441474D
+MAINTENANCE_LEADER_RENEW_SECONDS = 15.0
+
+
+def _default_engine():
+    from zoltag.database import engine
+
+    return engine
+
+
+def _is_postgres(engine) -> bool:
+    return engine.dialect.name == "postgresql"
+
+
+def _close_connection(conn, *, invalidate: bool) -> None:
+    """Close a lock connection; ``invalidate`` drops it instead of returning it to the pool.
+
+    A session-level advisory lock belongs to the DBAPI connection, not the
+    SQLAlchemy checkout. Returning a connection whose unlock (or lock
+    attempt) failed to the pool would let another checkout inherit the lock.
+    """
+    try:
+        if invalidate:
+            conn.invalidate()
+        conn.close()
+    except Exception:
+        pass
+
+
+class AdvisoryLockLeader:
+    """Hold (or keep trying to take) the maintenance advisory lock."""
+
+    def __init__(
+        self,
+        engine=None,
+        *,
+        lock_key: int = MAINTENANCE_LOCK_KEY,
+        renew_seconds: float = MAINTENANCE_LEADER_RENEW_SECONDS,
+    ):
+        self._engine = engine
+        self.lock_key = int(lock_key)
+        self.renew_seconds = float(renew_seconds)
+        self._conn = None
+        self._last_renewed = 0.0
+        self._last_attempt = float("-inf")
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            self._engine = _default_engine()
+        return self._engine
+
+    def is_leader(self) -> bool:
+        """Return True if this process currently holds the lock, renewing/acquiring as due."""
+        if not _is_postgres(self.engine):
+            return True
+        now = time.monotonic()
+        if self._conn is not None:
+            if now - self._last_renewed < self.renew_seconds:
+                return True
+            try:
+                self._conn.execute(text("SELECT 1"))
+                self._last_renewed = now
+                return True
+            except Exception:
+                logger.warning("Lost maintenance leadership (lock connection failed)", exc_info=True)
+                self._discard_connection(invalidate=True)
+
+        if now - self._last_attempt < self.renew_seconds:
+            return False
+        self._last_attempt = now
+        conn = None
+        try:
+            conn = self.engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+            acquired = bool(conn.execute(
+                text("SELECT pg_try_advisory_lock(:key)"), {"key": self.lock_key}
+            ).scalar())
+        except Exception:
+            logger.warning("Maintenance leader election attempt failed", exc_info=True)
+            if conn is not None:
+                _close_connection(conn, invalidate=True)
+            return False
+        if not acquired:
+            _close_connection(conn, invalidate=False)
+            return False
+        self._conn = conn
+        self._last_renewed = now
+        logger.info("Acquired maintenance leadership")
+        return True
+
+    def release(self) -> None:
+        if self._conn is None:
+            return
+        unlocked = False
+        try:
+            unlocked = bool(
+                self._conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self.lock_key}).scalar()
+            )
+        except Exception:
+            logger.debug("Advisory unlock failed; invalidating the connection releases it", exc_info=True)
+        self._discard_connection(invalidate=not unlocked)
+        logger.info("Released maintenance leadership")
+
+    def _discard_connection(self, *, invalidate: bool = True) -> None:
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            _close_connection(conn, invalidate=invalidate)
+
+
+@contextmanager
+def maintenance_lock(engine=None, *, lock_key: int = MAINTENANCE_LOCK_KEY) -> Iterator[bool]:
+    """Try to hold the maintenance lock for one block; yields whether it was acquired."""
+    engine = engine if engine is not None else _default_engine()
+    if not _is_postgres(engine):
+        yield True
+        return
+    try:
+        conn = engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+    except Exception:
+        logger.warning("Could not connect to take the maintenance lock", exc_info=True)
+        yield False
+        return
+    clean = True
+    try:
+        acquired = bool(conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": int(lock_key)}).scalar())
+    except Exception:
+        logger.warning("Maintenance lock attempt failed", exc_info=True)
+        acquired = clean = False
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            try:
+                clean = bool(conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": int(lock_key)}).scalar())
+            except Exception:
+                logger.debug("Advisory unlock failed; invalidating the connection releases it", exc_info=True)
+                clean = False
+        _close_connection(conn, invalidate=not clean)
@@ -264,6 +264,7 @@ class ImageMetadata(Base):
     capture_timestamp = Column(DateTime, index=True)
     gps_latitude = Column(Float)
     gps_longitude = Column(Float)
+    geohash = Column(String(12))  # Maintained by zoltag.geo from the GPS columns
 
     # Dropbox custom properties
     dropbox_properties = Column(JSONB)  # Dropbox file properties and tags
@@ -286,11 +287,59 @@ class ImageMetadata(Base):
         Index("idx_tenant_modified", "tenant_id", "modified_time"),
         Index("idx_tenant_capture", "tenant_id", "capture_timestamp"),
         Index("idx_tenant_location", "tenant_id", "gps_latitude", "gps_longitude"),
+        Index("idx_image_metadata_tenant_geohash", "tenant_id", "geohash"),
         Index("idx_image_metadata_tenant_rating", "tenant_id", "rating"),
         Index("uq_image_metadata_asset_id", "asset_id", unique=True),
     )
 
 
+class GeoCell(Base):
+    """Precomputed count of geotagged images per tenant, geohash precision and cell.
+
+    Maintained incrementally by ``zoltag.geo``; ``lat_sum``/``lon_sum`` give the
+    centroid of the images in the cell.
+    """
+
+    __tablename__ = "geo_cells"
+
+    tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id", ondelete="CASCADE"), primary_key=True)
+    precision = Column(Integer, primary_key=True)
+    cell = Column(String(12), primary_key=True)
+    center_lat = Column(Float, nullable=False)
+    center_lon = Column(Float, nullable=False)
+    image_count = Column(Integer, nullable=False, default=0)
+    lat_sum = Column(Float, nullable=False, default=0.0)
+    lon_sum = Column(Float, nullable=False, default=0.0)
+
+    __table_args__ = (
+        Index("idx_geo_cells_tenant_precision_center", "tenant_id", "precision", "center_lat", "center_lon"),
+    )
+
+
+class GeoCellDelta(Base):
+    """Journal of pending ``geo_cells`` changes, one row per image location change.
+
+    Appended inside the ingest transaction and folded into ``geo_cells`` by
+    the worker (``zoltag.geo.fold_geo_cell_deltas``), so writers never lock the
+    coarse cells every image in a tenant shares.
+    """
+
+    __tablename__ = "geo_cell_deltas"
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False)
+    # Finest cluster cell; coarser cells are its prefixes.
+    cell = Column(String(12), nullable=False)
+    image_count = Column(Integer, nullable=False)
+    lat_sum = Column(Float, nullable=False)
+    lon_sum = Column(Float, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index("idx_geo_cell_deltas_tenant", "tenant_id", "id"),
+    )
+
+
 class Permatag(Base):
     """Permanent human-verified tags with positive/negative polarity."""
 
@@ -365,6 +414,27 @@ class DropboxCursor(Base):
     last_sync = Column(DateTime, default=datetime.utcnow)
 
 
+class ProviderSyncCursor(Base):
+    """Incremental listing position for one provider integration.
+
+    For Google Drive ``cursor`` is a changes page token and ``state`` holds the
+    sync folders and folder paths it was recorded against.
+    """
+
+    __tablename__ = "provider_sync_cursors"
+
+    provider_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("tenant_provider_integrations.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False, index=True)
+    provider_type = Column(String(32), nullable=False)
+    cursor = Column(Text, nullable=False)
+    state = Column(JSONB, nullable=False, default=dict)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
 class ImageEmbedding(Base):
     """Store ML embeddings for visual similarity search."""
     
@@ -725,12 +795,16 @@ class JobAttempt(Base):
     stdout_tail = Column(Text)
     stderr_tail = Column(Text)
     error_text = Column(Text)
+    # Worker-supplied idempotency keys: the claim that started this attempt and the result that ended it.
+    claim_key = Column(Text)
+    result_key = Column(Text)
 
     job = relationship("Job", back_populates="attempts")
 
     __table_args__ = (
         UniqueConstraint("job_id", "attempt_no", name="uq_job_attempts_job_attempt"),
         Index("idx_job_attempts_job_started", "job_id", "started_at"),
+        Index("idx_job_attempts_worker_claim_key", "worker_id", "claim_key"),
         CheckConstraint(
             "status in ('running','succeeded','failed','timeout','canceled')",
             name="ck_job_attempts_status",
@@ -847,3 +921,60 @@ class WorkflowStepRun(Base):
             name="ck_workflow_step_runs_status",
         ),
     )
+
+
+class EmailOutbox(Base):
+    """Outgoing email awaiting delivery.
+
+    Rows are written in the transaction that triggers the email and sent in
+    batches by the worker (``zoltag.email.process_email_outbox``).
+    """
+
+    __tablename__ = "email_outbox"
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id", ondelete="CASCADE"), nullable=True)
+    kind = Column(Text, nullable=False)
+    to_email = Column(Text, nullable=False)
+    subject = Column(Text, nullable=False)
+    html_body = Column(Text, nullable=True)
+    text_body = Column(Text, nullable=True)
+    status = Column(Text, nullable=False, default="pending")
+    attempt_count = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=5)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    last_error = Column(Text, nullable=True)
+    provider_message_id = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    sent_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("idx_email_outbox_status_next_attempt", "status", "next_attempt_at"),
+        Index("idx_email_outbox_tenant_sent", "tenant_id", "sent_at"),
+        CheckConstraint("status in ('pending','sent','failed')", name="ck_email_outbox_status"),
+    )
+
+
+class WorkflowJobEvent(Base):
+    """Outbox of workflow child-job state changes awaiting step advancement.
+
+    Rows are written in the same transaction as the job status change and
+    deleted once consumed, in id order, by ``process_workflow_job_events``.
+    """
+
+    __tablename__ = "workflow_job_events"
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    workflow_run_id = Column(UUID(as_uuid=True), nullable=False)
+    step_key = Column(Text, nullable=False)
+    job_id = Column(UUID(as_uuid=True), nullable=False)
+    job_status = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index("idx_workflow_job_events_run", "workflow_run_id", "id"),
+    )
+
+
+# Registers the ORM hooks that keep ``ImageMetadata.geohash`` and ``geo_cells`` current.
+from zoltag import geo as _geo  # noqa: E402,F401
@@ -79,6 +79,16 @@ class Keyword(Base):
     )
 
 
+class KeywordRegistryVersion(Base):
+    """Per-tenant version counter bumped whenever keywords or categories change."""
+
+    __tablename__ = "keyword_registry_versions"
+
+    tenant_id = Column(sa.UUID(as_uuid=True), primary_key=True)
+    version = Column(sa.BigInteger, nullable=False, default=0, server_default=sa.text('0'))
+    updated_at = Column(DateTime, nullable=False, server_default=func.now(), onupdate=func.now())
+
+
 
 # ...existing code...
 
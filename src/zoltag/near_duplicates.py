@@ -0,0 +1,388 @@
+"""Near-duplicate grouping over 64-bit perceptual hashes.
+
+Exact duplicate detection only catches byte-identical files. Re-exports,
+resizes and recompressions of one photo have different content hashes, but
+their ``ImageMetadata.perceptual_hash`` values differ by only a few bits. Per
+(database, tenant), this module keeps an in-memory index of those hashes and
+of every pair of distinct hashes within ``MAX_NEAR_DUPLICATE_DISTANCE`` bits:
+
+- Images with the same hash share one slot, so exact copies and blank frames
+  cost nothing extra.
+- New slots are matched by multi-index hashing. The 64 bits split into four
+  16-bit substrings, and two hashes within 7 bits agree on at least one
+  substring up to a single flipped bit. Candidates come from ``searchsorted``
+  over the sorted substring tables, so no step compares every pair.
+- The index grows with rows added since its (count, max id) watermark. It is
+  rebuilt when rows disappear, when a hash is rewritten in this process, or
+  when it is older than ``NEAR_DUPLICATE_MAX_AGE_SECONDS``.
+
+``near_duplicate_groups`` unions the stored pairs under the caller's distance
+threshold. It can also keep only the pairs whose image embeddings agree.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+import time
+import uuid
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import sqlalchemy as sa
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from zoltag.metadata import ImageEmbedding, ImageMetadata
+
+
+logger = logging.getLogger(__name__)
+
+MAX_NEAR_DUPLICATE_DISTANCE = 7
+DEFAULT_NEAR_DUPLICATE_DISTANCE = 4
+NEAR_DUPLICATE_RECHECK_SECONDS = 5.0
+NEAR_DUPLICATE_MAX_AGE_SECONDS = 3600.0
+_SUBSTRINGS = 4
+_SUBSTRING_BITS = 16
+_QUERY_BLOCK = 16384
+_LOAD_BATCH = 5000
+_EMBEDDING_BATCH = 1000
+
+# Each substring is probed as-is and with every single bit flipped.
+_PROBE_MASKS = [np.uint16(0)] + [np.uint16(1 << bit) for bit in range(_SUBSTRING_BITS)]
+_SUBSTRING_MASK = np.uint64((1 << _SUBSTRING_BITS) - 1)
+
+if hasattr(np, "bitwise_count"):
+    def _popcount(values: np.ndarray) -> np.ndarray:
+        return np.bitwise_count(values).astype(np.uint8)
+else:  # NumPy < 2.0
+    _BYTE_POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+    def _popcount(values: np.ndarray) -> np.ndarray:
+        octets = np.ascontiguousarray(values, dtype=np.uint64).view(np.uint8)
+        return _BYTE_POPCOUNT[octets].reshape(-1, 8).sum(axis=1, dtype=np.uint8)
+
+
+def parse_phash(value: object) -> Optional[int]:
+    """Parse a stored hex perceptual hash into a 64-bit integer."""
+    text = str(value or "").strip().lower()
+    if not text or len(text) > 16:
+        return None
+    try:
+        return int(text, 16)
+    except ValueError:
+        return None
+
+
+class PerceptualHashIndex:
+    """Slots of identical hashes plus the near pairs between slots."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.reset()
+
+    def __len__(self) -> int:
+        return len(self._slot_by_image)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.hashes = np.zeros(0, dtype=np.uint64)
+            self.slot_image_ids: List[List[int]] = []
+            self._slot_by_hash: Dict[int, int] = {}
+            self._slot_by_image: Dict[int, int] = {}
+            self._edges_a = np.zeros(0, dtype=np.int32)
+            self._edges_b = np.zeros(0, dtype=np.int32)
+            self._edges_distance = np.zeros(0, dtype=np.uint8)
+            self._groups_cache: Dict[int, List[List[int]]] = {}
+            self.watermark: Optional[list] = None
+            self.unusable_rows = 0
+            self.checked_at = 0.0
+            self.built_at = time.monotonic()
+            self.stale = False
+
+    @property
+    def edge_count(self) -> int:
+        return int(self._edges_a.size)
+
+    def add(self, rows: Iterable[Tuple[int, object]]) -> int:
+        """Index ``(image_id, hex hash)`` rows; returns how many were usable."""
+        added = 0
+        with self._lock:
+            new_hashes: List[int] = []
+            for image_id, value in rows:
+                image_id = int(image_id)
+                phash = parse_phash(value)
+                if phash is None or image_id in self._slot_by_image:
+                    continue
+                slot = self._slot_by_hash.get(phash)
+                if slot is None:
+                    slot = self._slot_by_hash[phash] = len(self.slot_image_ids)
+                    self.slot_image_ids.append([])
+                    new_hashes.append(phash)
+                self.slot_image_ids[slot].append(image_id)
+                self._slot_by_image[image_id] = slot
+                added += 1
+            if new_hashes:
+                first_new = self.hashes.size
+                self.hashes = np.concatenate([self.hashes, np.array(new_hashes, dtype=np.uint64)])
+                self._match_new_slots(first_new)
+            if added:
+                self._groups_cache.clear()
+        return added
+
+    def _match_new_slots(self, first_new: int) -> None:
+        hashes = self.hashes
+        total = hashes.size
+        found_a: List[np.ndarray] = []
+        found_b: List[np.ndarray] = []
+        for substring in range(_SUBSTRINGS):
+            values = ((hashes >> np.uint64(substring * _SUBSTRING_BITS)) & _SUBSTRING_MASK).astype(np.uint16)
+            order = np.argsort(values, kind="stable")
+            sorted_hashes = hashes[order]
+            # bucket_start[v]:bucket_start[v + 1] is the slice of ``order`` holding substring v.
+            bucket_start = np.zeros((1 << _SUBSTRING_BITS) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(values, minlength=1 << _SUBSTRING_BITS), out=bucket_start[1:])
+            for block_start in range(first_new, total, _QUERY_BLOCK):
+                block = np.arange(block_start, min(total, block_start + _QUERY_BLOCK))
+                for mask in _PROBE_MASKS:
+                    # On a full build both ends of a one-bit pair are queries, so probe only
+                    # from the end that has the bit set.
+                    one_sided = first_new == 0 and bool(mask)
+                    queries = block[(values[block] & mask) != 0] if one_sided else block
+                    probes = values[queries] ^ mask
+                    # Sorted probes walk the substring table in order, keeping the gathers sequential.
+                    probe_order = np.argsort(probes, kind="stable")
+                    probes = probes[probe_order]
+                    queries = queries[probe_order]
+                    left = bucket_start[probes]
+                    counts = bucket_start[probes.astype(np.int64) + 1] - left
+                    matches = int(counts.sum())
+                    if not matches:
+                        continue
+                    positions = np.repeat(left - (np.cumsum(counts) - counts), counts) + np.arange(matches)
+                    distance = _popcount(np.repeat(hashes[queries], counts) ^ sorted_hashes[positions])
+                    near = np.flatnonzero(distance <= MAX_NEAR_DUPLICATE_DISTANCE)
+                    if not near.size:
+                        continue
+                    a = np.repeat(queries, counts)[near]
+                    b = order[positions[near]]
+                    if one_sided:
+                        found_a.append(np.maximum(a, b))
+                        found_b.append(np.minimum(a, b))
+                    else:
+                        # The later slot finds the earlier one, so each pair is kept from one side.
+                        keep = b < a
+                        found_a.append(a[keep])
+                        found_b.append(b[keep])
+        if not found_a:
+            return
+        a = np.concatenate(found_a).astype(np.int64)
+        b = np.concatenate(found_b).astype(np.int64)
+        # The same pair can match on several substrings.
+        _, unique = np.unique(a * total + b, return_index=True)
+        a, b = a[unique], b[unique]
+        self._edges_a = np.concatenate([self._edges_a, a.astype(np.int32)])
+        self._edges_b = np.concatenate([self._edges_b, b.astype(np.int32)])
+        self._edges_distance = np.concatenate([self._edges_distance, _popcount(hashes[a] ^ hashes[b])])
+
+    def groups(self, max_distance: int = DEFAULT_NEAR_DUPLICATE_DISTANCE) -> List[List[int]]:
+        """Image id groups (2+ images) connected within ``max_distance`` bits, largest first."""
+        max_distance = max(0, min(MAX_NEAR_DUPLICATE_DISTANCE, int(max_distance)))
+        with self._lock:
+            cached = self._groups_cache.get(max_distance)
+            if cached is not None:
+                return cached
+            parent = list(range(len(self.slot_image_ids)))
+
+            def find(slot: int) -> int:
+                while parent[slot] != slot:
+                    parent[slot] = parent[parent[slot]]
+                    slot = parent[slot]
+                return slot
+
+            within = self._edges_distance <= max_distance
+            for a, b in zip(self._edges_a[within].tolist(), self._edges_b[within].tolist(), strict=True):
+                root_a, root_b = find(a), find(b)
+                if root_a != root_b:
+                    parent[max(root_a, root_b)] = min(root_a, root_b)
+
+            members: Dict[int, List[int]] = {}
+            for slot, image_ids in enumerate(self.slot_image_ids):
+                members.setdefault(find(slot), []).extend(image_ids)
+            result = sorted(
+                (sorted(image_ids) for image_ids in members.values() if len(image_ids) > 1),
+                key=lambda image_ids: (-len(image_ids), image_ids[0]),
+            )
+            self._groups_cache[max_distance] = result
+            return result
+
+
+# --- database-backed indexes ----------------------------------------------------
+
+_indexes_lock = threading.Lock()
+_indexes: Dict[Tuple[str, str], PerceptualHashIndex] = {}
+
+
+def _database_key(db: Session) -> str:
+    engine = db.get_bind().engine
+    # In-memory databases share a URL, so the engine identity is part of the key.
+    return hashlib.sha256(f"{id(engine)}:{engine.url}".encode("utf-8")).hexdigest()[:12]
+
+
+def _watermark(db: Session, tenant_id: uuid.UUID) -> list:
+    count, max_id = db.query(sa.func.count(ImageMetadata.id), sa.func.max(ImageMetadata.id)).filter(
+        ImageMetadata.tenant_id == tenant_id,
+        ImageMetadata.perceptual_hash.is_not(None),
+    ).one()
+    return [int(count or 0), int(max_id or 0)]
+
+
+def _source_rows(db: Session, tenant_id: uuid.UUID, since: Optional[int] = None):
+    query = db.query(ImageMetadata.id, ImageMetadata.perceptual_hash).filter(
+        ImageMetadata.tenant_id == tenant_id,
+        ImageMetadata.perceptual_hash.is_not(None),
+    )
+    if since is not None:
+        query = query.filter(ImageMetadata.id > since)
+    return query.order_by(ImageMetadata.id.asc()).yield_per(_LOAD_BATCH)
+
+
+def _refresh(db: Session, index: PerceptualHashIndex, tenant_id: uuid.UUID) -> None:
+    current = _watermark(db, tenant_id)
+    previous = index.watermark
+    expired = time.monotonic() - index.built_at >= NEAR_DUPLICATE_MAX_AGE_SECONDS
+    if previous == current and not index.stale and not expired:
+        return
+    incremental = (
+        previous is not None
+        and not index.stale
+        and not expired
+        and current[0] >= previous[0]
+        and current[1] >= previous[1]
+    )
+    if incremental:
+        rows = list(_source_rows(db, tenant_id, since=previous[1]))
+        index.unusable_rows += len(rows) - index.add(rows)
+    if not incremental or len(index) + index.unusable_rows != current[0]:
+        index.reset()
+        index.add(_source_rows(db, tenant_id))
+        index.unusable_rows = max(0, current[0] - len(index))
+        logger.info(
+            "Rebuilt perceptual hash index for tenant %s (%s images, %s slots, %s near pairs)",
+            tenant_id,
+            len(index),
+            index.hashes.size,
+            index.edge_count,
+        )
+    index.watermark = current
+
+
+def get_phash_index(db: Session, tenant_id: object) -> PerceptualHashIndex:
+    """Return the tenant's index, brought up to date with the database."""
+    tenant_uuid = tenant_id if isinstance(tenant_id, uuid.UUID) else uuid.UUID(str(tenant_id))
+    cache_key = (_database_key(db), str(tenant_uuid))
+    with _indexes_lock:
+        index = _indexes.get(cache_key)
+        if index is None:
+            index = _indexes[cache_key] = PerceptualHashIndex()
+    now = time.monotonic()
+    if index.stale or now - index.checked_at >= NEAR_DUPLICATE_RECHECK_SECONDS:
+        with index._lock:
+            if index.stale or now - index.checked_at >= NEAR_DUPLICATE_RECHECK_SECONDS:
+                _refresh(db, index, tenant_uuid)
+                index.stale = False
+                index.checked_at = now
+    return index
+
+
+def reset_phash_indexes() -> None:
+    """Forget every loaded index."""
+    with _indexes_lock:
+        _indexes.clear()
+
+
+def _unit_embeddings(db: Session, tenant_id: uuid.UUID, image_ids: Sequence[int]) -> Dict[int, np.ndarray]:
+    vectors: Dict[int, np.ndarray] = {}
+    for start in range(0, len(image_ids), _EMBEDDING_BATCH):
+        batch = list(image_ids[start:start + _EMBEDDING_BATCH])
+        rows = db.query(ImageMetadata.id, ImageEmbedding.embedding).join(
+            ImageEmbedding,
+            sa.and_(
+                ImageEmbedding.asset_id == ImageMetadata.asset_id,
+                ImageEmbedding.tenant_id == tenant_id,
+            ),
+        ).filter(
+            ImageMetadata.tenant_id == tenant_id,
+            ImageMetadata.id.in_(batch),
+        ).all()
+        for image_id, embedding in rows:
+            vector = np.asarray(embedding if embedding is not None else [], dtype=np.float32).reshape(-1)
+            norm = float(np.linalg.norm(vector)) if vector.size else 0.0
+            if norm > 1e-12:
+                vectors[int(image_id)] = vector / norm
+    return vectors
+
+
+def _confirm_group(image_ids: List[int], vectors: Dict[int, np.ndarray], min_cosine: float) -> List[List[int]]:
+    members = [image_id for image_id in image_ids if image_id in vectors]
+    if len(members) < 2 or len({vectors[image_id].size for image_id in members}) != 1:
+        return []
+    matrix = np.stack([vectors[image_id] for image_id in members])
+    similar = (matrix @ matrix.T) >= float(min_cosine)
+    parent = list(range(len(members)))
+
+    def find(item: int) -> int:
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    for a, b in zip(*np.nonzero(np.triu(similar, k=1)), strict=True):
+        root_a, root_b = find(int(a)), find(int(b))
+        if root_a != root_b:
+            parent[max(root_a, root_b)] = min(root_a, root_b)
+    confirmed: Dict[int, List[int]] = {}
+    for position, image_id in enumerate(members):
+        confirmed.setdefault(find(position), []).append(image_id)
+    return [group for group in confirmed.values() if len(group) > 1]
+
+
+def near_duplicate_groups(
+    db: Session,
+    tenant_id: object,
+    *,
+    max_distance: int = DEFAULT_NEAR_DUPLICATE_DISTANCE,
+    min_cosine: Optional[float] = None,
+) -> List[List[int]]:
+    """Groups of near-duplicate image ids for a tenant, largest first.
+
+    With ``min_cosine``, a hash group is split into the images whose
+    embeddings are at least that similar; images without an embedding drop out.
+    """
+    tenant_uuid = tenant_id if isinstance(tenant_id, uuid.UUID) else uuid.UUID(str(tenant_id))
+    groups = get_phash_index(db, tenant_uuid).groups(max_distance)
+    if min_cosine is None or not groups:
+        return groups
+    vectors = _unit_embeddings(db, tenant_uuid, [image_id for group in groups for image_id in group])
+    confirmed = [subgroup for group in groups for subgroup in _confirm_group(group, vectors, min_cosine)]
+    return sorted(confirmed, key=lambda image_ids: (-len(image_ids), image_ids[0]))
+
+
+# --- invalidation from ORM sessions ----------------------------------------------
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_rewritten_hashes(session, flush_context) -> None:
+    if not _indexes:
+        return
+    tenants = set()
+    for obj in session.dirty:
+        if isinstance(obj, ImageMetadata) and sa.inspect(obj).attrs.perceptual_hash.history.has_changes():
+            tenants.add(str(obj.tenant_id))
+    if not tenants:
+        return
+    with _indexes_lock:
+        for (_, tenant_key), index in _indexes.items():
+            if tenant_key in tenants:
+                index.stale = True
@@ -1,6 +1,235 @@
-"""Rate limiting setup using slowapi (in-memory, suitable for single-instance Cloud Run)."""
+"""Rate limiting.
 
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+Token buckets keyed by route and caller, stored in a shared Postgres unlogged
+table so limits hold across autoscaled instances. Expensive tenant endpoints
+use ``tenant_rate_limit`` (one bucket per tenant); auth and admin endpoints
+use ``ip_rate_limit`` (one bucket per client IP). Local/SQLite deployments
+(and Postgres outages) fall back to in-process buckets.
+"""
 
-limiter = Limiter(key_func=get_remote_address)
+from __future__ import annotations
+
+import logging
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Protocol, Tuple
+
+from fastapi import Depends, HTTPException, Request
+from sqlalchemy import text
+
+from zoltag.settings import settings
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_BUCKET_TABLE = "rate_limit_buckets"
+# Buckets untouched for this long are full again and can be dropped.
+RATE_LIMIT_EVICT_INTERVAL_SECONDS = 300
+RATE_LIMIT_MEMORY_MAX_BUCKETS = 50000
+
+
+@dataclass(frozen=True)
+class BucketPolicy:
+    """Token bucket shape: ``capacity`` burst, refilled at ``refill_per_second``."""
+
+    capacity: float
+    refill_per_second: float
+
+    @classmethod
+    def per_minute(cls, count: float, burst: Optional[float] = None) -> "BucketPolicy":
+        return cls(capacity=float(burst or count), refill_per_second=float(count) / 60.0)
+
+    @classmethod
+    def per_hour(cls, count: float, burst: Optional[float] = None) -> "BucketPolicy":
+        return cls(capacity=float(burst or count), refill_per_second=float(count) / 3600.0)
+
+    @property
+    def idle_seconds(self) -> float:
+        """Time after which an untouched bucket is full (and safe to evict)."""
+        if self.refill_per_second <= 0:
+            return float(RATE_LIMIT_EVICT_INTERVAL_SECONDS)
+        return self.capacity / self.refill_per_second
+
+
+@dataclass(frozen=True)
+class BucketDecision:
+    allowed: bool
+    remaining: float
+    retry_after_seconds: float = 0.0
+
+
+def _decision(tokens: float, allowed: bool, policy: BucketPolicy, cost: float) -> BucketDecision:
+    if allowed:
+        return BucketDecision(True, max(0.0, tokens))
+    if policy.refill_per_second <= 0:
+        return BucketDecision(False, max(0.0, tokens), float(RATE_LIMIT_EVICT_INTERVAL_SECONDS))
+    return BucketDecision(False, max(0.0, tokens), max(0.0, (cost - tokens) / policy.refill_per_second))
+
+
+class TokenBucketBackend(Protocol):
+    def take(self, key: str, policy: BucketPolicy, cost: float = 1.0) -> BucketDecision:
+        ...
+
+
+class InMemoryTokenBucketBackend:
+    """Process-local token buckets (local mode and fallback)."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic, max_buckets: int = RATE_LIMIT_MEMORY_MAX_BUCKETS):
+        self._clock = clock
+        self._max_buckets = max_buckets
+        self._lock = threading.Lock()
+        # key -> (tokens, updated_at, idle_seconds)
+        self._buckets: Dict[str, Tuple[float, float, float]] = {}
+        self._last_evict = clock()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def take(self, key: str, policy: BucketPolicy, cost: float = 1.0) -> BucketDecision:
+        now = self._clock()
+        with self._lock:
+            tokens, updated_at, _ = self._buckets.get(key, (policy.capacity, now, policy.idle_seconds))
+            tokens = min(policy.capacity, tokens + max(0.0, now - updated_at) * policy.refill_per_second)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now, policy.idle_seconds)
+            if (
+                now - self._last_evict >= RATE_LIMIT_EVICT_INTERVAL_SECONDS
+                or len(self._buckets) > self._max_buckets
+            ):
+                self._evict(now)
+        return _decision(tokens, allowed, policy, cost)
+
+    def _evict(self, now: float) -> None:
+        self._buckets = {
+            key: entry for key, entry in self._buckets.items()
+            if now - entry[1] < entry[2]
+        }
+        self._last_evict = now
+
+
+_REFILLED_SQL = (
+    "LEAST(:capacity, b.tokens + GREATEST(0, EXTRACT(EPOCH FROM (now() - b.updated_at))) * :refill)"
+)
+_TAKE_SQL = text(f"""
+    INSERT INTO {RATE_LIMIT_BUCKET_TABLE} AS b (bucket_key, tokens, last_allowed, updated_at, expires_at)
+    VALUES (:key, :capacity - :cost, true, now(), now() + make_interval(secs => :idle))
+    ON CONFLICT (bucket_key) DO UPDATE SET
+        tokens = CASE WHEN {_REFILLED_SQL} >= :cost THEN {_REFILLED_SQL} - :cost ELSE {_REFILLED_SQL} END,
+        last_allowed = {_REFILLED_SQL} >= :cost,
+        updated_at = now(),
+        expires_at = now() + make_interval(secs => :idle)
+    RETURNING tokens, last_allowed
+""")
+_EVICT_SQL = text(f"DELETE FROM {RATE_LIMIT_BUCKET_TABLE} WHERE expires_at < now()")
+
+
+class PostgresTokenBucketBackend:
+    """Shared buckets in an unlogged Postgres table, updated with one atomic upsert.
+
+    If the table is unreachable the request is checked against an in-process
+    bucket instead, so limits degrade to per-instance rather than failing.
+    """
+
+    def __init__(self, engine, fallback: Optional[InMemoryTokenBucketBackend] = None):
+        self._engine = engine
+        self._fallback = fallback or InMemoryTokenBucketBackend()
+        self._last_evict = 0.0
+        self._evict_lock = threading.Lock()
+
+    def take(self, key: str, policy: BucketPolicy, cost: float = 1.0) -> BucketDecision:
+        params = {
+            "key": key,
+            "capacity": policy.capacity,
+            "refill": policy.refill_per_second,
+            "cost": cost,
+            "idle": policy.idle_seconds,
+        }
+        try:
+            with self._engine.begin() as conn:
+                tokens, allowed = conn.execute(_TAKE_SQL, params).one()
+                self._maybe_evict(conn)
+        except Exception:
+            logger.warning("Shared rate limit backend unavailable; using in-process bucket for %s", key, exc_info=True)
+            return self._fallback.take(key, policy, cost)
+        return _decision(float(tokens), bool(allowed), policy, cost)
+
+    def _maybe_evict(self, conn) -> None:
+        now = time.monotonic()
+        if now - self._last_evict < RATE_LIMIT_EVICT_INTERVAL_SECONDS:
+            return
+        if not self._evict_lock.acquire(blocking=False):
+            return
+        try:
+            self._last_evict = now
+            conn.execute(_EVICT_SQL)
+        finally:
+            self._evict_lock.release()
+
+
+_backend_lock = threading.Lock()
+_backend: Optional[TokenBucketBackend] = None
+
+
+def get_token_bucket_backend() -> TokenBucketBackend:
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            choice = str(settings.rate_limit_backend or "auto").strip().lower()
+            use_postgres = choice == "postgres" or (
+                choice == "auto"
+                and settings.database_url.startswith("postgresql")
+                and not settings.local_mode
+            )
+            if use_postgres:
+                from zoltag.database import engine
+
+                _backend = PostgresTokenBucketBackend(engine)
+            else:
+                _backend = InMemoryTokenBucketBackend()
+        return _backend
+
+
+def set_token_bucket_backend(backend: Optional[TokenBucketBackend]) -> None:
+    """Override (or reset with ``None``) the process-wide backend."""
+    global _backend
+    with _backend_lock:
+        _backend = backend
+
+
+def check_rate_limit(route: str, subject: object, policy: BucketPolicy, cost: float = 1.0) -> None:
+    """Take ``cost`` tokens from ``subject``'s bucket for ``route`` or raise 429.
+
+    ``subject`` is a tenant id, or ``ip:<address>`` for per-client limits.
+    """
+    decision = get_token_bucket_backend().take(f"{route}:{subject}", policy, cost)
+    if not decision.allowed:
+        retry_after = max(1, int(math.ceil(decision.retry_after_seconds)))
+        raise HTTPException(
+            status_code=429,
+            detail="Rate limit exceeded. Please try again later.",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+def tenant_rate_limit(route: str, policy: BucketPolicy) -> Callable:
+    """FastAPI dependency enforcing a per-tenant, per-route token bucket."""
+    from zoltag.dependencies import get_tenant
+    from zoltag.tenant import Tenant
+
+    def dependency(tenant: Tenant = Depends(get_tenant)) -> None:
+        check_rate_limit(route, tenant.id, policy)
+
+    return dependency
+
+
+def ip_rate_limit(route: str, policy: BucketPolicy) -> Callable:
+    """FastAPI dependency enforcing a per-client-IP, per-route token bucket."""
+
+    def dependency(request: Request) -> None:
+        client_ip = request.client.host if request.client else "127.0.0.1"
+        check_rate_limit(route, f"ip:{client_ip}", policy)
+
+    return dependency
@@ -0,0 +1,212 @@
+"""Cached display renditions for full-image views.
+
+Opening an image in the lightbox used to download the original from the
+source provider on every view (and convert HEIC each time). A rendition is a
+size-bounded JPEG or WebP derivative generated once and stored next to the
+thumbnails, keyed by asset, size, format and a source revision token. A new
+``source_rev`` (or modified time) therefore produces a new key and stale
+renditions are simply never read again.
+
+Renditions are built lazily by ``load_or_build_rendition`` on first request,
+or ahead of time with the ``build-renditions`` CLI command / job.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import logging
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional
+
+from PIL import Image, ImageOps
+
+from zoltag.image import ImageProcessor
+from zoltag.settings import settings
+from zoltag.tenant import Tenant
+
+logger = logging.getLogger(__name__)
+
+RENDITION_SIZES = (1600, 2560)
+RENDITION_FORMATS = {
+    "jpeg": ("JPEG", "image/jpeg", "jpg"),
+    "webp": ("WEBP", "image/webp", "webp"),
+}
+_JPEG_QUALITY = 85
+_WEBP_QUALITY = 82
+
+_build_locks: dict[str, threading.Lock] = {}
+_build_locks_guard = threading.Lock()
+_gcs_client = None
+_gcs_client_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class Rendition:
+    key: str
+    data: bytes
+    content_type: str
+    etag: str
+
+
+def snap_rendition_size(requested: Optional[int]) -> int:
+    """Smallest configured size that covers ``requested`` (largest when none does)."""
+    if not requested or requested <= 0:
+        return RENDITION_SIZES[-1]
+    for size in RENDITION_SIZES:
+        if size >= requested:
+            return size
+    return RENDITION_SIZES[-1]
+
+
+def preferred_rendition_format(accept_header: Optional[str]) -> str:
+    return "webp" if "image/webp" in str(accept_header or "").lower() else "jpeg"
+
+
+def source_revision_token(image, asset) -> str:
+    """Stable token for the current source content of an asset."""
+    revision = (
+        str(getattr(asset, "source_rev", None) or "").strip()
+        or str(getattr(image, "content_hash", None) or "").strip()
+        or str(getattr(image, "modified_time", None) or "")
+    )
+    return hashlib.sha1(revision.encode("utf-8")).hexdigest()[:12]
+
+
+def rendition_key(tenant: Tenant, asset_id, *, size: int, fmt: str, revision: str) -> str:
+    extension = RENDITION_FORMATS[fmt][2]
+    return tenant.get_asset_thumbnail_key(str(asset_id), f"display-{size}-{revision}.{extension}")
+
+
+def render_display_rendition(source_bytes: bytes, *, size: int, fmt: str) -> bytes:
+    """Decode an original (HEIC included), bound its longest side to ``size`` and re-encode."""
+    pil_format = RENDITION_FORMATS[fmt][0]
+    image = ImageOps.exif_transpose(ImageProcessor().load_image(source_bytes))
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    if max(image.size) > size:
+        image.thumbnail((size, size), Image.Resampling.LANCZOS)
+    buffer = io.BytesIO()
+    if pil_format == "JPEG":
+        image.save(buffer, format="JPEG", quality=_JPEG_QUALITY, optimize=True, progressive=True)
+    else:
+        image.save(buffer, format="WEBP", quality=_WEBP_QUALITY, method=4)
+    return buffer.getvalue()
+
+
+class _GcsRenditionStore:
+    def __init__(self, bucket_name: str):
+        global _gcs_client
+        with _gcs_client_lock:
+            if _gcs_client is None:
+                from google.cloud import storage
+
+                _gcs_client = storage.Client(project=settings.gcp_project_id)
+        self._bucket = _gcs_client.bucket(bucket_name)
+
+    def read(self, key: str) -> Optional[bytes]:
+        from google.api_core.exceptions import NotFound
+
+        try:
+            return self._bucket.blob(key).download_as_bytes()
+        except NotFound:
+            return None
+
+    def write(self, key: str, data: bytes, content_type: str) -> None:
+        blob = self._bucket.blob(key)
+        blob.cache_control = "public, max-age=31536000, immutable"
+        blob.upload_from_string(data, content_type=content_type)
+
+
+class _LocalRenditionStore:
+    def __init__(self, root: Path):
+        self._root = root
+
+    def _path(self, key: str) -> Path:
+        return self._root / key
+
+    def read(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        return path.read_bytes() if path.exists() else None
+
+    def write(self, key: str, data: bytes, content_type: str) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_bytes(data)
+        tmp_path.replace(path)
+
+
+def get_rendition_store(tenant: Tenant):
+    """Renditions live in the tenant thumbnail bucket (or under local_data_dir in local mode)."""
+    if settings.local_mode:
+        return _LocalRenditionStore(Path(settings.local_data_dir) / "renditions")
+    return _GcsRenditionStore(tenant.get_thumbnail_bucket(settings))
+
+
+def _build_lock(key: str) -> threading.Lock:
+    with _build_locks_guard:
+        lock = _build_locks.get(key)
+        if lock is None:
+            if len(_build_locks) > 1024:
+                _build_locks.clear()
+            lock = _build_locks[key] = threading.Lock()
+        return lock
+
+
+def load_or_build_rendition(
+    store,
+    *,
+    key: str,
+    fmt: str,
+    size: int,
+    download_source: Callable[[], bytes],
+) -> Rendition:
+    """Return the stored rendition, generating and storing it on a miss.
+
+    Concurrent requests for the same key in this process wait for one build
+    instead of each downloading the original.
+    """
+    content_type = RENDITION_FORMATS[fmt][1]
+    data = store.read(key)
+    if data is None:
+        with _build_lock(key):
+            data = store.read(key)
+            if data is None:
+                data = render_display_rendition(download_source(), size=size, fmt=fmt)
+                try:
+                    store.write(key, data, content_type)
+                except Exception as exc:  # noqa: BLE001 - serving the bytes matters more than caching them
+                    logger.warning("Failed to store rendition %s: %s", key, exc)
+    return Rendition(key=key, data=data, content_type=content_type, etag=rendition_etag(key))
+
+
+def rendition_etag(key: str) -> str:
+    """ETag of the rendition stored at ``key``; known without reading or building it."""
+    return '"' + hashlib.sha1(key.encode("utf-8")).hexdigest()[:20] + '"'
+
+
+def asset_rendition_key(tenant: Tenant, image, asset, *, size: int, fmt: str) -> str:
+    """Storage key of ``asset``'s rendition for a requested size and format."""
+    return rendition_key(
+        tenant, asset.id, size=snap_rendition_size(size), fmt=fmt, revision=source_revision_token(image, asset)
+    )
+
+
+def rendition_for_asset(
+    store,
+    tenant: Tenant,
+    image,
+    asset,
+    *,
+    size: int,
+    fmt: str,
+    download_source: Callable[[], bytes],
+) -> Rendition:
+    """Fetch or build the rendition of ``asset`` at a configured size."""
+    key = asset_rendition_key(tenant, image, asset, size=size, fmt=fmt)
+    return load_or_build_rendition(
+        store, key=key, fmt=fmt, size=snap_rendition_size(size), download_source=download_source
+    )
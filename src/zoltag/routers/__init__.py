@@ -21,6 +21,7 @@ from . import config
 from . import people
 from . import nl_search
 from . import jobs
+from . import metrics
 from . import sentinel
 
 __all__ = [
@@ -45,5 +46,6 @@ __all__ = [
     "config",
     "nl_search",
     "jobs",
+    "metrics",
     "sentinel",
 ]
@@ -12,6 +12,7 @@ from sqlalchemy.orm import Session
 
 from zoltag.auth.dependencies import require_tenant_permission_from_header
 from zoltag.dependencies import get_db, get_tenant
+from zoltag.keyword_registry import bump_keyword_registry_version
 from zoltag.metadata import Person
 from zoltag.models.config import KeywordCategory, Keyword
 from zoltag.settings import settings
@@ -439,6 +440,7 @@ async def create_keyword_category(
     ), tenant)
 
     db.add(category)
+    bump_keyword_registry_version(db, tenant.id)
     db.commit()
     db.refresh(category)
 
@@ -484,6 +486,7 @@ async def update_keyword_category(
         category.is_attribution = category_data["is_attribution"]
 
     category.updated_at = datetime.utcnow()
+    bump_keyword_registry_version(db, tenant.id)
     db.commit()
     db.refresh(category)
 
@@ -521,6 +524,7 @@ async def delete_keyword_category(
 
     # Delete the category
     db.delete(category)
+    bump_keyword_registry_version(db, tenant.id)
     db.commit()
 
     return {"status": "deleted", "category_id": category_id}
@@ -596,6 +600,7 @@ async def create_keyword(
     ), tenant)
 
     db.add(keyword)
+    bump_keyword_registry_version(db, tenant.id)
     db.commit()
     db.refresh(keyword)
 
@@ -658,6 +663,7 @@ async def update_keyword(
         keyword.person_id = None
 
     keyword.updated_at = datetime.utcnow()
+    bump_keyword_registry_version(db, tenant.id)
     db.commit()
     db.refresh(keyword)
 
@@ -686,6 +692,7 @@ async def delete_keyword(
         raise HTTPException(status_code=404, detail="Keyword not found")
 
     db.delete(keyword)
+    bump_keyword_registry_version(db, tenant.id)
     db.commit()
 
     return {"status": "deleted", "keyword_id": keyword_id}
@@ -68,6 +68,7 @@ TENANT_PURGE_PRIORITY_TABLES = (
     "keywords",
     "keyword_categories",
     "dropbox_cursors",
+    "provider_sync_cursors",
     "workflow_runs",
     "jobs",
     "job_triggers",
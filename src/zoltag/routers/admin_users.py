@@ -8,7 +8,7 @@ from sqlalchemy.orm import Session, joinedload
 from typing import List, Optional
 import secrets
 
-from zoltag.ratelimit import limiter
+from zoltag.ratelimit import BucketPolicy, ip_rate_limit
 
 from zoltag.database import get_db
 from zoltag.activity import EVENT_AUTH_LOGIN
@@ -499,8 +499,11 @@ async def list_tenant_users(
     return result
 
 
-@router.post("/users/{supabase_uid}/approve", response_model=dict)
-@limiter.limit("10/minute")
+@router.post(
+    "/users/{supabase_uid}/approve",
+    response_model=dict,
+    dependencies=[Depends(ip_rate_limit("admin.approve_user", BucketPolicy.per_minute(10)))],
+)
 async def approve_user(
     request: Request,
     supabase_uid: str,
@@ -1040,8 +1043,12 @@ async def set_super_admin(
 # ============================================================================
 
 
-@router.post("/invitations", response_model=dict, status_code=201)
-@limiter.limit("20/minute")
+@router.post(
+    "/invitations",
+    response_model=dict,
+    status_code=201,
+    dependencies=[Depends(ip_rate_limit("admin.create_invitation", BucketPolicy.per_minute(20)))],
+)
 async def create_invitation(
     request: Request,
     body: CreateInvitationRequest,
@@ -46,7 +46,7 @@ from zoltag.auth.schemas import (
     TenantMembershipResponse,
 )
 from zoltag.metadata import Tenant as TenantModel
-from zoltag.ratelimit import limiter
+from zoltag.ratelimit import BucketPolicy, ip_rate_limit
 
 
 router = APIRouter(prefix="/api/v1/auth", tags=["auth"])
@@ -58,8 +58,12 @@ def _legacy_role_from_key(role_key: Optional[str]) -> str:
     return normalized if normalized in _LEGACY_ROLE_KEYS else "user"
 
 
-@router.post("/register", response_model=dict, status_code=201)
-@limiter.limit("120/minute")
+@router.post(
+    "/register",
+    response_model=dict,
+    status_code=201,
+    dependencies=[Depends(ip_rate_limit("auth.register", BucketPolicy.per_minute(120)))],
+)
 async def register(
     request: Request,
     body: RegisterRequest,
@@ -273,8 +277,11 @@ async def get_current_user_info(
     )
 
 
-@router.post("/accept-invitation", response_model=LoginResponse)
-@limiter.limit("20/minute")
+@router.post(
+    "/accept-invitation",
+    response_model=LoginResponse,
+    dependencies=[Depends(ip_rate_limit("auth.accept_invitation", BucketPolicy.per_minute(20)))],
+)
 async def accept_invitation(
     request: Request,
     body: AcceptInvitationRequest,
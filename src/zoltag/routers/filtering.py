@@ -22,8 +22,17 @@ from zoltag.tenant import Tenant
 from zoltag.metadata import Asset, ImageMetadata, MachineTag, Permatag
 from zoltag.models.config import PhotoList, PhotoListItem, Keyword, KeywordCategory
 from zoltag.dependencies import get_tenant_setting
+from zoltag.geo import GeoFilter
 from zoltag.machine_tag_types import normalize_ml_tag_type
 from zoltag.routers.filter_builder import FilterBuilder
+from zoltag.tag_hydration import (
+    UNKNOWN_KEYWORD,
+    get_keyword_lookup,
+    keyword_ids_in,
+    load_tag_rows_for_image_ids,
+    resolve_keyword_ids_by_name,
+    sum_machine_tag_confidence,
+)
 from zoltag.tenant_scope import tenant_column_filter
 
 
@@ -277,78 +286,15 @@ def compute_current_tags_for_images(
     if not image_ids:
         return {}
 
-    image_asset_rows = db.query(ImageMetadata.id, ImageMetadata.asset_id).filter(
-        tenant_column_filter(ImageMetadata, tenant),
-        ImageMetadata.id.in_(image_ids),
-        ImageMetadata.asset_id.is_not(None),
-    ).all()
-    image_id_to_asset = {row[0]: row[1] for row in image_asset_rows}
-    asset_id_to_image_id = {row[1]: row[0] for row in image_asset_rows}
-    asset_ids = list(asset_id_to_image_id.keys())
-
-    if not asset_ids:
-        return {img_id: [] for img_id in image_ids}
-
-    # Get all machine tags for these assets (from primary algorithm only)
-    all_tags = db.query(MachineTag).filter(
-        tenant_column_filter(MachineTag, tenant),
-        MachineTag.asset_id.in_(asset_ids),
-        MachineTag.tag_type == active_tag_type
-    ).all()
-
-    # Get all permatags for these assets
-    all_permatags = db.query(Permatag).filter(
-        tenant_column_filter(Permatag, tenant),
-        Permatag.asset_id.in_(asset_ids)
-    ).all()
-
-    # Load all keywords to get names
-    keyword_ids = set()
-    for tag in all_tags:
-        keyword_ids.add(tag.keyword_id)
-    for p in all_permatags:
-        keyword_ids.add(p.keyword_id)
-
-    keywords_map = {}
-    if keyword_ids:
-        keywords = db.query(Keyword).filter(Keyword.id.in_(keyword_ids)).all()
-        keywords_map = {kw.id: kw.keyword for kw in keywords}
-
-    # Build permatag map by image_id and keyword_id
-    permatag_map = {}
-    for p in all_permatags:
-        image_id = asset_id_to_image_id.get(p.asset_id)
-        if image_id is None:
-            continue
-        if image_id not in permatag_map:
-            permatag_map[image_id] = {}
-        permatag_map[image_id][p.keyword_id] = p.signum
-
-    # Initialize current tags for ALL images (not just ones with tags)
-    current_tags_by_image = {img_id: [] for img_id in image_ids}
-
-    # Add machine tags for each image
-    for tag in all_tags:
-        image_id = asset_id_to_image_id.get(tag.asset_id)
-        if image_id is None:
-            continue
-        # Include machine tag only if not negatively permatagged
-        if image_id in permatag_map and permatag_map[image_id].get(tag.keyword_id) == -1:
-            continue  # Skip negatively permatagged machine tags
-        keyword_name = keywords_map.get(tag.keyword_id, "unknown")
-        current_tags_by_image[image_id].append(keyword_name)
-
-    # Add positive permatags
-    for p in all_permatags:
-        image_id = asset_id_to_image_id.get(p.asset_id)
-        if image_id is None:
-            continue
-        if p.signum == 1:
-            keyword_name = keywords_map.get(p.keyword_id, "unknown")
-            # Only add if not already in machine tags
-            if keyword_name not in current_tags_by_image[image_id]:
-                current_tags_by_image[image_id].append(keyword_name)
+    rows_by_image = load_tag_rows_for_image_ids(db, tenant, image_ids, active_tag_type)
+    keywords_map = get_keyword_lookup(db, tenant.id, keyword_ids_in(rows_by_image))
 
+    current_tags_by_image = {}
+    for image_id, entry in rows_by_image.items():
+        names = {}
+        for keyword_id in entry.current_keyword_ids():
+            names[keywords_map.get(keyword_id, (UNKNOWN_KEYWORD,))[0]] = None
+        current_tags_by_image[image_id] = list(names)
     return current_tags_by_image
 
 
@@ -570,42 +516,10 @@ def calculate_relevance_scores(
     Returns:
         Dict mapping image_id to relevance score
     """
-    # Look up keyword IDs for the given keyword names
-    keyword_ids = db.query(Keyword.id).filter(
-        Keyword.keyword.in_(keywords),
-        tenant_column_filter(Keyword, tenant)
-    ).all()
-    keyword_id_list = [kw[0] for kw in keyword_ids]
-
-    if not keyword_id_list:
+    keyword_ids = resolve_keyword_ids_by_name(db, tenant.id, keywords)
+    if not keyword_ids:
         return {}
-
-    image_asset_rows = db.query(ImageMetadata.id, ImageMetadata.asset_id).filter(
-        tenant_column_filter(ImageMetadata, tenant),
-        ImageMetadata.id.in_(image_ids),
-        ImageMetadata.asset_id.is_not(None),
-    ).all()
-    image_id_by_asset_id = {row[1]: row[0] for row in image_asset_rows}
-    asset_ids = list(image_id_by_asset_id.keys())
-    if not asset_ids:
-        return {}
-
-    image_tags = db.query(
-        MachineTag.asset_id,
-        func.sum(MachineTag.confidence).label('relevance_score')
-    ).filter(
-        MachineTag.asset_id.in_(asset_ids),
-        MachineTag.keyword_id.in_(keyword_id_list),
-        tenant_column_filter(MachineTag, tenant),
-        MachineTag.tag_type == active_tag_type
-    ).group_by(
-        MachineTag.asset_id
-    ).all()
-    return {
-        image_id_by_asset_id[asset_id]: float(score)
-        for asset_id, score in image_tags
-        if asset_id in image_id_by_asset_id
-    }
+    return sum_machine_tag_confidence(db, tenant, image_ids, keyword_ids, active_tag_type)
 
 
 # ============================================================================
@@ -948,6 +862,7 @@ def build_image_query_with_subqueries(
     ml_tag_type: Optional[str] = None,
     ml_min_confidence: Optional[float] = None,
     apply_ml_tag_filter: bool = True,
+    geo_filter: Optional[GeoFilter] = None,
 ) -> tuple:
     """Build a query with combined subquery filters (non-materialized).
 
@@ -977,6 +892,7 @@ def build_image_query_with_subqueries(
         ml_keyword: Optional ML keyword to filter by (for zero-shot tagging)
         ml_tag_type: Optional ML tag type (e.g., 'siglip', 'clip') to use with ml_keyword
         apply_ml_tag_filter: Whether to apply explicit ML keyword/type filter subquery
+        geo_filter: Optional bounding box / radius location filter
 
     Returns:
         Tuple of (base_query, subqueries_list, is_empty)
@@ -1037,6 +953,10 @@ def build_image_query_with_subqueries(
             or_(ImageMetadata.rating != 0, ImageMetadata.rating.is_(None))
         )
     
+    # Location filters are geohash ranges on the base query's own index.
+    if geo_filter is not None:
+        base_query = base_query.filter(*geo_filter.conditions())
+
     # Apply reviewed filter if provided
     if reviewed is not None:
         reviewed_subquery = apply_reviewed_filter_subquery(db, tenant, reviewed)
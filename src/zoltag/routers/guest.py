@@ -10,17 +10,17 @@ from datetime import datetime, timezone
 from typing import Optional
 from urllib.parse import urlencode
 
-from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
 from fastapi.responses import StreamingResponse
 from jose import JWTError
 from pydantic import BaseModel
 from sqlalchemy import func, or_
 from sqlalchemy.orm import Session
-from starlette.concurrency import run_in_threadpool
 
 from zoltag.asset_helpers import bulk_preload_thumbnail_urls, load_assets_for_images
 from zoltag.auth.models import UserProfile
 from zoltag.auth.jwt import verify_supabase_jwt
+from zoltag.concurrency import offload
 from zoltag.dependencies import get_db, get_secret
 from zoltag.image import ImageProcessor
 from zoltag.integrations import TenantIntegrationRepository
@@ -29,7 +29,11 @@ from zoltag.models.sharing import ListShare, MemberComment, MemberRating
 from zoltag.metadata import ImageMetadata
 from zoltag.metadata import Tenant as TenantModel
 from zoltag.routers.images._shared import _resolve_provider_ref, _resolve_storage_or_409
-from zoltag.ratelimit import limiter
+from zoltag.routers.images.file_serving import (
+    _load_image_rendition,
+    _rendition_not_modified,
+    _rendition_response,
+)
 from zoltag.settings import settings
 from zoltag.storage import create_storage_provider
 from zoltag.tenant import Tenant
@@ -188,7 +192,8 @@ class RatingUpsertRequest(BaseModel):
 # ---------------------------------------------------------------------------
 
 @router.get("/lists")
-async def get_guest_lists(
+@offload("guest")
+def get_guest_lists(
     guest: GuestIdentity = Depends(_get_guest_identity),
     db: Session = Depends(get_db),
 ):
@@ -285,7 +290,8 @@ async def get_guest_lists(
 
 
 @router.get("/lists/{list_id}")
-async def get_guest_list(
+@offload("guest")
+def get_guest_list(
     list_id: int,
     guest: GuestIdentity = Depends(_get_guest_identity),
     db: Session = Depends(get_db),
@@ -394,13 +400,16 @@ async def get_guest_list(
 
 
 @router.get("/lists/{list_id}/assets/{asset_id}/full")
-async def get_guest_asset_full(
+@offload("guest.full")
+def get_guest_asset_full(
     list_id: int,
     asset_id: uuid.UUID,
+    request: Request,
+    size: Optional[int] = Query(default=None, ge=1, le=10000),
     guest: GuestIdentity = Depends(_get_guest_identity),
     db: Session = Depends(get_db),
 ):
-    """Stream full-size bytes for an asset in a guest-shared list."""
+    """Stream full-size bytes for an asset in a guest-shared list (or a display rendition with ``size``)."""
     share = _get_active_share(list_id=list_id, guest=guest, db=db)
     tenant_id = share.tenant_id
     _assert_asset_in_list(asset_id, list_id, db)
@@ -427,14 +436,31 @@ async def get_guest_asset_full(
     if not source_ref:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image source is unavailable.")
 
+    if size:
+        not_modified = _rendition_not_modified(
+            tenant=tenant, image=image, storage_info=storage_info, size=size, request=request
+        )
+        if not_modified is not None:
+            return not_modified
+        rendition = _load_image_rendition(
+            tenant=tenant,
+            image=image,
+            storage_info=storage_info,
+            provider_name=provider_name,
+            source_ref=source_ref,
+            size=size,
+            accept_header=request.headers.get("accept"),
+        )
+        if rendition is not None:
+            return _rendition_response(rendition, request, image.filename or "image")
+
     try:
-        provider = await run_in_threadpool(
-            create_storage_provider,
+        provider = create_storage_provider(
             provider_name,
             tenant=tenant,
             get_secret=get_secret,
         )
-        file_bytes = await run_in_threadpool(provider.download_file, source_ref)
+        file_bytes = provider.download_file(source_ref)
     except Exception as exc:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error fetching image: {exc}")
 
@@ -446,7 +472,7 @@ async def get_guest_asset_full(
     # mirroring the primary app full-image endpoint behavior.
     if filename.lower().endswith((".heic", ".heif")):
         try:
-            file_bytes = await run_in_threadpool(_convert_heic_bytes_to_jpeg, file_bytes)
+            file_bytes = _convert_heic_bytes_to_jpeg(file_bytes)
             filename = filename.rsplit(".", 1)[0] + ".jpg"
             media_type = "image/jpeg"
         except Exception as exc:
@@ -463,7 +489,8 @@ async def get_guest_asset_full(
 
 
 @router.post("/lists/{list_id}/comments", status_code=status.HTTP_201_CREATED)
-async def create_comment(
+@offload("guest")
+def create_comment(
     list_id: int,
     body: CommentCreateRequest,
     guest: GuestIdentity = Depends(_get_guest_identity),
@@ -501,7 +528,8 @@ async def create_comment(
 
 
 @router.delete("/lists/{list_id}/comments/{comment_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_comment(
+@offload("guest")
+def delete_comment(
     list_id: int,
     comment_id: uuid.UUID,
     guest: GuestIdentity = Depends(_get_guest_identity),
@@ -528,7 +556,8 @@ async def delete_comment(
 
 
 @router.post("/lists/{list_id}/reactions", status_code=status.HTTP_200_OK)
-async def upsert_rating(
+@offload("guest")
+def upsert_rating(
     list_id: int,
     body: RatingUpsertRequest,
     guest: GuestIdentity = Depends(_get_guest_identity),
@@ -581,7 +610,8 @@ async def upsert_rating(
 
 
 @router.get("/lists/{list_id}/my-reactions")
-async def get_my_reactions(
+@offload("guest")
+def get_my_reactions(
     list_id: int,
     guest: GuestIdentity = Depends(_get_guest_identity),
     db: Session = Depends(get_db),
@@ -658,7 +688,8 @@ async def get_my_reactions(
 
 
 @router.post("/lists/{list_id}/download/thumbs", status_code=status.HTTP_202_ACCEPTED)
-async def download_thumbs(
+@offload("guest")
+def download_thumbs(
     list_id: int,
     guest: GuestIdentity = Depends(_get_guest_identity),
     db: Session = Depends(get_db),
@@ -672,7 +703,8 @@ async def download_thumbs(
 
 
 @router.post("/lists/{list_id}/download/originals", status_code=status.HTTP_202_ACCEPTED)
-async def download_originals(
+@offload("guest")
+def download_originals(
     list_id: int,
     guest: GuestIdentity = Depends(_get_guest_identity),
     db: Session = Depends(get_db),
@@ -756,30 +788,33 @@ async def request_magic_link(
         logger.warning(f"📧 redirect_to: {redirect_to}")
         logger.warning(f"📧 action_link: {magic_link}")
 
-        from zoltag.email import send_guest_magic_link_email
-        result = await send_guest_magic_link_email(
-            to_email=email,
-            magic_link=magic_link,
-            otp_code=otp_code,
-        )
-        logger.warning(f"📧 Email send result: {result}")
-
-        if result:
-            logger.warning(f"✅ Sent magic link email to {email}")
-        else:
+        from zoltag.email import email_delivery_available, queue_guest_magic_link_email
+        if not email_delivery_available():
             if settings.is_development:
-                logger.warning("⚠️ Resend unavailable or email send failed in dev; returning action_link directly")
+                logger.warning("⚠️ Email delivery unavailable in dev; returning action_link directly")
                 return {
                     "success": True,
                     "message": "Magic link generated (email delivery unavailable locally).",
                     "dev_magic_link": magic_link,
                 }
-            logger.warning(f"❌ Failed to send magic link email to {email}")
+            logger.warning(f"❌ Email delivery unavailable; cannot send magic link to {email}")
             return {
                 "success": False,
                 "message": "Could not send the sign-in email right now. Please try again.",
             }
+
+        # The worker sends it from the outbox within a few seconds.
+        queue_guest_magic_link_email(
+            db,
+            to_email=email,
+            magic_link=magic_link,
+            otp_code=otp_code,
+            tenant_id=tenant_id,
+        )
+        db.commit()
+        logger.warning(f"✅ Queued magic link email to {email}")
     except Exception as exc:
+        db.rollback()
         logger.error(f"❌ Exception sending magic link to {email}: {exc}")
         import traceback
         traceback.print_exc()
@@ -14,10 +14,12 @@ from sqlalchemy.orm import Session, load_only
 from google.cloud import storage
 import numpy as np
 
+from zoltag.concurrency import offload
 from zoltag.dependencies import get_db, get_tenant, get_tenant_setting
 from zoltag.activity import EVENT_SEARCH_IMAGES, extract_client_ip, record_activity_event
 from zoltag.auth.dependencies import get_current_user, require_tenant_permission_from_header
 from zoltag.auth.models import UserProfile
+from zoltag.instrumentation import PhaseTimer, current_profile, traced
 from zoltag.list_visibility import is_tenant_admin_user
 from zoltag.asset_helpers import load_assets_for_images, bulk_preload_thumbnail_urls
 from zoltag.tenant import Tenant
@@ -41,7 +43,28 @@ from zoltag.models.config import Keyword, PhotoListItem
 from zoltag.tagging import calculate_tags, get_tagger
 from zoltag.config.db_utils import load_keywords_map
 from zoltag.settings import settings
+from zoltag.tag_hydration import (
+    UNKNOWN_KEYWORD,
+    get_keyword_lookup,
+    keyword_ids_in,
+    load_tag_rows_for_assets,
+)
 from zoltag.tenant_scope import tenant_column_filter
+from zoltag.geo import (
+    CLUSTER_PRECISIONS,
+    cluster_cells,
+    decode_bounds,
+    parse_bbox,
+    parse_geo_filter,
+    precision_for_zoom,
+    release_image_location,
+)
+from zoltag.near_duplicates import (
+    DEFAULT_NEAR_DUPLICATE_DISTANCE,
+    MAX_NEAR_DUPLICATE_DISTANCE,
+    near_duplicate_groups,
+)
+from zoltag.vector_store import KIND_IMAGE, KIND_TEXT, get_vector_store
 from zoltag.routers.images._shared import (
     _build_source_url,
     _resolve_storage_or_409,
@@ -217,10 +240,21 @@ def _log_images_search_event(
             "offset": int(offset or 0),
             "result_total": int(total or 0),
             "result_count": int(returned_count or 0),
+            "phase_ms": _phase_milliseconds(),
         },
     )
 
 
+def _phase_milliseconds() -> Optional[Dict[str, float]]:
+    profile = current_profile()
+    if profile is None:
+        return None
+    phases = {name: round(seconds * 1000, 1) for name, seconds in profile.spans.items()}
+    phases["sql"] = round(profile.sql_seconds * 1000, 1)
+    phases["sql_statements"] = profile.sql_count
+    return phases
+
+
 def _build_similarity_index(
     db: Session,
     tenant: Tenant,
@@ -650,6 +684,7 @@ def _is_asset_text_index_pgvector_ready(db: Session) -> bool:
         return False
 
 
+@traced("seed_fetch")
 def _fetch_text_index_vector_seed_image_ids(
     db: Session,
     tenant: Tenant,
@@ -659,7 +694,7 @@ def _fetch_text_index_vector_seed_image_ids(
     if query_vector is None or int(getattr(query_vector, "size", 0) or 0) <= 0:
         return []
     if not _is_asset_text_index_pgvector_ready(db):
-        return []
+        return _fetch_text_index_local_seed_image_ids(db, tenant, query_vector, max_rows)
 
     query_vec_literal = _to_pgvector_literal(query_vector)
     candidate_limit = max(1, int(max_rows or 1))
@@ -702,6 +737,28 @@ def _fetch_text_index_vector_seed_image_ids(
     return ordered_ids
 
 
+def _fetch_text_index_local_seed_image_ids(
+    db: Session,
+    tenant: Tenant,
+    query_vector: np.ndarray,
+    max_rows: int,
+) -> List[int]:
+    store = get_vector_store(db, tenant.id, KIND_TEXT)
+    if store is None:
+        return []
+    candidates = store.search(query_vector, max(1, int(max_rows or 1)))
+    image_by_asset = _image_ids_by_asset_key(db, tenant, [key for key, _score in candidates])
+    ordered_ids: List[int] = []
+    seen = set()
+    for asset_key, _score in candidates:
+        image_info = image_by_asset.get(asset_key)
+        if not image_info or image_info[0] in seen:
+            continue
+        seen.add(image_info[0])
+        ordered_ids.append(image_info[0])
+    return ordered_ids
+
+
 def _tokenize_text_query(text_query: str) -> Tuple[str, List[str]]:
     normalized = " ".join(str(text_query or "").strip().lower().split())
     if not normalized:
@@ -736,9 +793,11 @@ def _get_text_query_embedding(
     if not hasattr(tagger, "build_text_embeddings"):
         raise RuntimeError(f"Tagger {model_name} does not support text embeddings")
 
-    _, text_embeddings = tagger.build_text_embeddings([
-        {"keyword": normalized_query, "prompt": normalized_query},
-    ])
+    # Free-form queries have their own TTL cache; keep them out of the prompt store.
+    _, text_embeddings = tagger.build_text_embeddings(
+        [{"keyword": normalized_query, "prompt": normalized_query}],
+        use_cache=False,
+    )
     if text_embeddings is None:
         raise RuntimeError("Text embedding generation returned no tensor")
 
@@ -1022,6 +1081,7 @@ def _compute_text_index_scores_for_candidates(
     return lexical_scores, semantic_scores
 
 
+@traced("hybrid_rank")
 def _rank_candidates_with_hybrid_scores(
     db: Session,
     tenant: Tenant,
@@ -1162,6 +1222,7 @@ def _rank_candidates_with_hybrid_scores(
     return ordered_ids, hybrid_scores, semantic_scores, lexical_scores
 
 
+@traced("similarity_knn")
 def _fetch_similar_ids_with_pgvector(
     db: Session,
     tenant: Tenant,
@@ -1284,8 +1345,89 @@ def _fetch_similar_ids_with_pgvector(
     return top_image_ids, score_by_image_id
 
 
+def _image_ids_by_asset_key(db: Session, tenant: Tenant, asset_keys: List[str]) -> Dict[str, Tuple[int, str]]:
+    asset_ids = []
+    for key in asset_keys:
+        try:
+            asset_ids.append(UUID(str(key)))
+        except (TypeError, ValueError):
+            continue
+    if not asset_ids:
+        return {}
+    rows = db.query(
+        ImageMetadata.id.label("image_id"),
+        ImageMetadata.asset_id.label("asset_id"),
+        func.lower(func.coalesce(Asset.media_type, "image")).label("media_type"),
+    ).outerjoin(
+        Asset,
+        and_(
+            Asset.id == ImageMetadata.asset_id,
+            tenant_column_filter(Asset, tenant),
+        ),
+    ).filter(
+        tenant_column_filter(ImageMetadata, tenant),
+        ImageMetadata.asset_id.in_(asset_ids),
+    ).all()
+    image_by_asset: Dict[str, Tuple[int, str]] = {}
+    for row in rows:
+        key = str(row.asset_id)
+        if key not in image_by_asset:
+            image_by_asset[key] = (int(row.image_id), str(row.media_type or "image"))
+    return image_by_asset
+
+
+@traced("similarity_knn")
+def _fetch_similar_ids_with_local_store(
+    db: Session,
+    tenant: Tenant,
+    source_image_id: int,
+    source_asset_id,
+    source_vector: np.ndarray,
+    limit: int,
+    min_score: Optional[float],
+    media_type: Optional[str],
+) -> Optional[Tuple[List[int], Dict[int, float]]]:
+    """KNN over the on-disk vector store (SQLite/local mode); None when unavailable."""
+    store = get_vector_store(db, tenant.id, KIND_IMAGE)
+    if store is None:
+        return None
+
+    media_filter = media_type.lower() if media_type else None
+    candidate_limit = max(int(limit) * 4, 120)
+    top_image_ids: List[int] = []
+    score_by_image_id: Dict[int, float] = {}
+    while True:
+        candidates = store.search(source_vector, candidate_limit, exclude=[source_asset_id])
+        image_by_asset = _image_ids_by_asset_key(db, tenant, [key for key, _score in candidates])
+        top_image_ids = []
+        score_by_image_id = {}
+        for asset_key, score in candidates:
+            if min_score is not None and score < float(min_score):
+                break
+            image_info = image_by_asset.get(asset_key)
+            if not image_info:
+                continue
+            image_id, candidate_media_type = image_info
+            if image_id == int(source_image_id) or image_id in score_by_image_id:
+                continue
+            if media_filter and candidate_media_type != media_filter:
+                continue
+            top_image_ids.append(image_id)
+            score_by_image_id[image_id] = round(float(score), 4)
+            if len(top_image_ids) >= int(limit):
+                break
+        if len(top_image_ids) >= int(limit) or len(candidates) < candidate_limit:
+            break
+        if candidates and min_score is not None and candidates[-1][1] < float(min_score):
+            break
+        candidate_limit *= 2
+
+    return top_image_ids, score_by_image_id
+
+
 @router.get("/images", response_model=dict, operation_id="list_images")
-async def list_images(
+@offload("images.list")
+def list_images(
     request: Request,
     tenant: Tenant = Depends(get_tenant),
     current_user: UserProfile = Depends(get_current_user),
@@ -1327,15 +1469,29 @@ async def list_images(
     ml_similarity_similar_count: Optional[int] = None,
     ml_similarity_dedupe: bool = True,
     ml_similarity_random: bool = True,
+    bbox: Optional[str] = None,
+    near: Optional[str] = None,
+    radius_km: Optional[float] = None,
     db: Session = Depends(get_db)
 ):
-    """List images for tenant with optional faceted search by keywords."""
+    """List images for tenant with optional faceted search by keywords.
+
+    ``bbox`` ("west,south,east,north") and ``near`` ("lat,lon") with
+    ``radius_km`` restrict results to geotagged images in that area.
+    """
     from ..filtering import (
         apply_category_filters,
         calculate_relevance_scores,
         build_image_query_with_subqueries
     )
 
+    phases = PhaseTimer()
+
+    try:
+        geo_filter = parse_geo_filter(bbox=bbox, near=near, radius_km=radius_km)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
     ml_keyword_id = None
     normalized_ml_tag_type = normalize_ml_tag_type(ml_tag_type)
     if ml_keyword:
@@ -1419,7 +1575,9 @@ async def list_images(
         ml_tag_type=normalized_ml_tag_type,
         ml_min_confidence=resolved_ml_min_confidence,
         apply_ml_tag_filter=not constrain_to_ml_matches,
+        geo_filter=geo_filter,
     )
+    phases.lap("filter")
     # If any filter resulted in empty set, return empty response
     if has_empty_filter:
         result = {
@@ -2040,6 +2198,7 @@ async def list_images(
                     ml_keyword=ml_keyword,
                     ml_tag_type=normalized_ml_tag_type,
                     apply_ml_tag_filter=False,
+                    geo_filter=geo_filter,
                 )
 
                 if seed_has_empty_filter or candidate_has_empty_filter:
@@ -2290,6 +2449,7 @@ async def list_images(
             query = query.order_by(*order_by_clauses)
             offset = resolve_anchor_offset(query, offset)
             images = query.limit(limit).offset(offset).all() if limit else query.offset(offset).all()
+    phases.lap("rank")
     # Get tags for all images
     image_ids = [img.id for img in images]
     asset_id_to_image_id = {img.asset_id: img.id for img in images if img.asset_id is not None}
@@ -2300,17 +2460,8 @@ async def list_images(
         tag_type_filter = normalized_ml_tag_type
     else:
         tag_type_filter = get_tenant_setting(db, tenant.id, 'active_machine_tag_type', default='siglip')
-    tags = db.query(MachineTag).filter(
-        MachineTag.asset_id.in_(asset_ids),
-        tenant_column_filter(MachineTag, tenant),
-        MachineTag.tag_type == tag_type_filter
-    ).all() if asset_ids else []
-
-    # Get permatags for all images
-    permatags = db.query(Permatag).filter(
-        Permatag.asset_id.in_(asset_ids),
-        tenant_column_filter(Permatag, tenant)
-    ).all() if asset_ids else []
+    # Machine tags + permatags for the whole page in one column-only query.
+    tag_rows_by_image = load_tag_rows_for_assets(db, tenant, asset_id_to_image_id, tag_type_filter)
     variant_count_by_asset = {
         asset_id: int(count or 0)
         for asset_id, count in (
@@ -2323,54 +2474,38 @@ async def list_images(
             ).group_by(AssetDerivative.asset_id).all() if asset_ids else []
         )
     }
-    # Load all keywords to avoid N+1 queries
-    keyword_ids = set()
-    for tag in tags:
-        keyword_ids.add(tag.keyword_id)
-    for permatag in permatags:
-        keyword_ids.add(permatag.keyword_id)
+    keywords_map = get_keyword_lookup(db, tenant.id, keyword_ids_in(tag_rows_by_image))
+    unknown_keyword = (UNKNOWN_KEYWORD, UNKNOWN_KEYWORD)
 
-    # Build keyword lookup map using utility function
-    keywords_map = load_keywords_map(db, tenant.id, keyword_ids)
-
-    # Group tags by image_id
     tags_by_image = {}
-    for tag in tags:
-        image_id = asset_id_to_image_id.get(tag.asset_id)
-        if image_id is None:
-            continue
-        if image_id not in tags_by_image:
-            tags_by_image[image_id] = []
-        kw_info = keywords_map.get(tag.keyword_id, {"keyword": "unknown", "category": "unknown"})
-        tags_by_image[image_id].append({
-            "keyword": kw_info["keyword"],
-            "category": kw_info["category"],
-            "confidence": round(tag.confidence, 2)
-        })
-
-    # Group permatags by image_id
     permatags_by_image = {}
     reviewed_at_by_image = {}
-    for permatag in permatags:
-        image_id = asset_id_to_image_id.get(permatag.asset_id)
-        if image_id is None:
-            continue
-        if image_id not in permatags_by_image:
-            permatags_by_image[image_id] = []
-        kw_info = keywords_map.get(permatag.keyword_id, {"keyword": "unknown", "category": "unknown"})
-        permatags_by_image[image_id].append({
-            "id": permatag.id,
-            "keyword": kw_info["keyword"],
-            "category": kw_info["category"],
-            "signum": permatag.signum
-        })
-        if permatag.created_at:
-            current_latest = reviewed_at_by_image.get(image_id)
-            if current_latest is None or permatag.created_at > current_latest:
-                reviewed_at_by_image[image_id] = permatag.created_at
+    for image_id, entry in tag_rows_by_image.items():
+        image_tags = []
+        for keyword_id, confidence in entry.machine_tags:
+            kw_name, kw_category = keywords_map.get(keyword_id, unknown_keyword)
+            image_tags.append({
+                "keyword": kw_name,
+                "category": kw_category,
+                "confidence": round(confidence, 2)
+            })
+        tags_by_image[image_id] = image_tags
+        image_permatags = []
+        for permatag_id, keyword_id, signum, _ in entry.permatags:
+            kw_name, kw_category = keywords_map.get(keyword_id, unknown_keyword)
+            image_permatags.append({
+                "id": permatag_id,
+                "keyword": kw_name,
+                "category": kw_category,
+                "signum": signum
+            })
+        permatags_by_image[image_id] = image_permatags
+        reviewed_at_by_image[image_id] = entry.reviewed_at()
 
     assets_by_id = load_assets_for_images(db, images)
+    phases.lap("hydrate")
     preloaded_urls = bulk_preload_thumbnail_urls(images, tenant, assets_by_id)
+    phases.lap("sign")
     images_list = []
     for idx, img in enumerate(images):
         storage_info = _resolve_storage_or_409(
@@ -2431,6 +2566,7 @@ async def list_images(
             image_payload["similarity_seed_image_id"] = entry_meta.get("similarity_seed_image_id")
             image_payload["similarity_score"] = float(entry_meta.get("similarity_score", 0.0))
         images_list.append(image_payload)
+    phases.lap("serialize")
     result = {
         "tenant_id": tenant.id,
         "images": images_list,
@@ -2474,95 +2610,140 @@ async def list_images(
 
 
 @router.get("/images/duplicates", response_model=dict, operation_id="list_duplicate_images")
-async def list_duplicate_images(
+@offload("images.duplicates")
+def list_duplicate_images(
     tenant: Tenant = Depends(get_tenant),
     limit: int = 100,
     offset: int = 0,
     date_order: str = "desc",
     filename_query: Optional[str] = None,
     include_total: bool = False,
+    match: str = "exact",
+    max_distance: int = DEFAULT_NEAR_DUPLICATE_DISTANCE,
+    min_cosine: Optional[float] = None,
     db: Session = Depends(get_db),
 ):
-    """List duplicate assets using embedding hash (preferred) or content hash fallback."""
+    """List duplicate assets.
+
+    ``match=exact`` groups by content hash (embedding hash when no content
+    hash is stored). ``match=near`` groups images whose perceptual hashes are
+    within ``max_distance`` bits (``0`` for identical perceptual hashes),
+    optionally confirmed by embedding cosine ``min_cosine``.
+    """
     date_order = (date_order or "desc").lower()
     if date_order not in ("asc", "desc"):
         date_order = "desc"
+    match = (match or "exact").strip().lower()
+    if match not in ("exact", "near"):
+        raise HTTPException(status_code=400, detail="match must be 'exact' or 'near'")
+    if not 0 <= int(max_distance) <= MAX_NEAR_DUPLICATE_DISTANCE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"max_distance must be between 0 and {MAX_NEAR_DUPLICATE_DISTANCE}",
+        )
+    if min_cosine is not None and not -1.0 <= float(min_cosine) <= 1.0:
+        raise HTTPException(status_code=400, detail="min_cosine must be between -1 and 1")
+    requested_limit = max(1, int(limit or 100))
+    offset = max(0, int(offset or 0))
+    filename_pattern = f"%{filename_query.strip()}%" if filename_query else "%%"
 
-    embedding_key_expr = case(
-        (
-            ImageEmbedding.id.is_not(None),
-            cast(literal("emb:"), Text) + func.md5(cast(ImageEmbedding.embedding, Text)),
-        ),
-        else_=None,
-    )
-    content_hash_key_expr = case(
-        (
-            ImageMetadata.content_hash.is_not(None),
-            cast(literal("sha:"), Text) + ImageMetadata.content_hash,
-        ),
-        else_=None,
-    )
-    # Prefer content hash so duplicate grouping matches upload dedup behavior.
-    # Fall back to embedding hash only when content hash is unavailable.
-    duplicate_key_expr = func.coalesce(content_hash_key_expr, embedding_key_expr)
+    if match == "near":
+        groups = near_duplicate_groups(db, tenant.id, max_distance=max_distance, min_cosine=min_cosine)
+        matching_ids = None
+        if filename_pattern != "%%":
+            matching_ids = {
+                image_id
+                for (image_id,) in db.query(ImageMetadata.id).filter(
+                    tenant_column_filter(ImageMetadata, tenant),
+                    ImageMetadata.filename.ilike(filename_pattern),
+                ).all()
+            }
+        # Largest groups first; ids stand in for creation order within a group.
+        all_rows = [
+            (image_id, f"near:{group[0]}", len(group))
+            for group in groups
+            for image_id in (group if date_order == "asc" else reversed(group))
+            if matching_ids is None or image_id in matching_ids
+        ]
+        rows = all_rows[offset:offset + requested_limit + 1]
+        has_more = len(rows) > requested_limit
+        rows = rows[:requested_limit]
+        total = len(all_rows)
+    else:
+        content_hash_key_expr = case(
+            (
+                ImageMetadata.content_hash.is_not(None),
+                cast(literal("sha:"), Text) + ImageMetadata.content_hash,
+            ),
+            else_=None,
+        )
+        embedding_key_expr = case(
+            (
+                ImageEmbedding.id.is_not(None),
+                cast(literal("emb:"), Text) + func.md5(cast(ImageEmbedding.embedding, Text)),
+            ),
+            else_=None,
+        )
+        # Prefer content hash so duplicate grouping matches upload dedup behavior.
+        # Fall back to embedding hash only when content hash is unavailable.
+        # Equal perceptual hashes are similar, not identical: that is match=near, max_distance=0.
+        duplicate_key_expr = func.coalesce(content_hash_key_expr, embedding_key_expr)
 
-    image_keys = db.query(
-        ImageMetadata.id.label("image_id"),
-        ImageMetadata.filename.label("filename"),
-        ImageMetadata.created_at.label("created_at"),
-        duplicate_key_expr.label("duplicate_key"),
-    ).outerjoin(
-        ImageEmbedding,
-        and_(
-            ImageEmbedding.asset_id == ImageMetadata.asset_id,
-            tenant_column_filter(ImageEmbedding, tenant),
-            ImageEmbedding.asset_id.is_not(None),
-        ),
-    ).filter(
-        tenant_column_filter(ImageMetadata, tenant),
-    ).subquery()
+        image_keys = db.query(
+            ImageMetadata.id.label("image_id"),
+            ImageMetadata.filename.label("filename"),
+            ImageMetadata.created_at.label("created_at"),
+            duplicate_key_expr.label("duplicate_key"),
+        ).outerjoin(
+            ImageEmbedding,
+            and_(
+                ImageEmbedding.asset_id == ImageMetadata.asset_id,
+                tenant_column_filter(ImageEmbedding, tenant),
+                ImageEmbedding.asset_id.is_not(None),
+            ),
+        ).filter(
+            tenant_column_filter(ImageMetadata, tenant),
+        ).subquery()
 
-    duplicate_groups = db.query(
-        image_keys.c.duplicate_key.label("duplicate_key"),
-        func.count(image_keys.c.image_id).label("duplicate_count"),
-    ).filter(
-        image_keys.c.duplicate_key.is_not(None),
-    ).group_by(
-        image_keys.c.duplicate_key,
-    ).having(
-        func.count(image_keys.c.image_id) > 1,
-    ).subquery()
-
-    base_query = db.query(
-        image_keys.c.image_id.label("image_id"),
-        duplicate_groups.c.duplicate_key.label("duplicate_key"),
-        duplicate_groups.c.duplicate_count.label("duplicate_count"),
-        image_keys.c.created_at.label("created_at"),
-    ).join(
-        duplicate_groups,
-        image_keys.c.duplicate_key == duplicate_groups.c.duplicate_key,
-    )
-    if filename_query:
-        filename_pattern = f"%{filename_query.strip()}%"
+        duplicate_groups = db.query(
+            image_keys.c.duplicate_key.label("duplicate_key"),
+            func.count(image_keys.c.image_id).label("duplicate_count"),
+        ).filter(
+            image_keys.c.duplicate_key.is_not(None),
+        ).group_by(
+            image_keys.c.duplicate_key,
+        ).having(
+            func.count(image_keys.c.image_id) > 1,
+        ).subquery()
+
+        base_query = db.query(
+            image_keys.c.image_id.label("image_id"),
+            duplicate_groups.c.duplicate_key.label("duplicate_key"),
+            duplicate_groups.c.duplicate_count.label("duplicate_count"),
+            image_keys.c.created_at.label("created_at"),
+        ).join(
+            duplicate_groups,
+            image_keys.c.duplicate_key == duplicate_groups.c.duplicate_key,
+        )
         if filename_pattern != "%%":
             base_query = base_query.filter(image_keys.c.filename.ilike(filename_pattern))
 
-    created_order = image_keys.c.created_at.desc() if date_order == "desc" else image_keys.c.created_at.asc()
-    id_order = image_keys.c.image_id.desc() if date_order == "desc" else image_keys.c.image_id.asc()
-    requested_limit = max(1, int(limit or 100))
-    rows = base_query.order_by(
-        duplicate_groups.c.duplicate_count.desc(),
-        duplicate_groups.c.duplicate_key.asc(),
-        created_order,
-        id_order,
-    ).limit(requested_limit + 1).offset(offset).all()
-    has_more = len(rows) > requested_limit
-    if has_more:
-        rows = rows[:requested_limit]
-
-    total = int(base_query.order_by(None).count() or 0) if include_total else (offset + len(rows) + (1 if has_more else 0))
-
-    image_ids = [row.image_id for row in rows]
+        created_order = image_keys.c.created_at.desc() if date_order == "desc" else image_keys.c.created_at.asc()
+        id_order = image_keys.c.image_id.desc() if date_order == "desc" else image_keys.c.image_id.asc()
+        rows = base_query.order_by(
+            duplicate_groups.c.duplicate_count.desc(),
+            duplicate_groups.c.duplicate_key.asc(),
+            created_order,
+            id_order,
+        ).limit(requested_limit + 1).offset(offset).all()
+        has_more = len(rows) > requested_limit
+        if has_more:
+            rows = rows[:requested_limit]
+        rows = [(row.image_id, row.duplicate_key, row.duplicate_count) for row in rows]
+
+        total = int(base_query.order_by(None).count() or 0) if include_total else (offset + len(rows) + (1 if has_more else 0))
+
+    image_ids = [image_id for image_id, _, _ in rows]
     images = db.query(ImageMetadata).filter(
         ImageMetadata.id.in_(image_ids)
     ).options(
@@ -2575,11 +2756,11 @@ async def list_duplicate_images(
     asset_id_to_image_id = {img.asset_id: img.id for img in ordered_images if img.asset_id is not None}
     asset_ids = list(asset_id_to_image_id.keys())
     duplicate_meta_by_image_id = {
-        row.image_id: {
-            "duplicate_key": row.duplicate_key,
-            "duplicate_count": int(row.duplicate_count or 0),
+        image_id: {
+            "duplicate_key": duplicate_key,
+            "duplicate_count": int(duplicate_count or 0),
         }
-        for row in rows
+        for image_id, duplicate_key, duplicate_count in rows
     }
 
     permatags = db.query(Permatag).filter(
@@ -2630,7 +2811,12 @@ async def list_duplicate_images(
         dup_meta = duplicate_meta_by_image_id.get(img.id, {})
         image_permatags = permatags_by_image.get(img.id, [])
         duplicate_key = dup_meta.get("duplicate_key")
-        duplicate_basis = "embedding" if (duplicate_key or "").startswith("emb:") else "content_hash"
+        if (duplicate_key or "").startswith("near:"):
+            duplicate_basis = "perceptual_hash"
+        elif (duplicate_key or "").startswith("emb:"):
+            duplicate_basis = "embedding"
+        else:
+            duplicate_basis = "content_hash"
         images_list.append({
             "id": img.id,
             "asset_id": storage_info.asset_id,
@@ -2668,6 +2854,63 @@ async def list_duplicate_images(
     }
 
 
+@router.get("/images/geo/clusters", response_model=dict, operation_id="list_geo_clusters")
+@offload("images.geo_clusters")
+def list_geo_clusters(
+    bbox: str,
+    zoom: int = 3,
+    max_cells: int = 1000,
+    tenant: Tenant = Depends(get_tenant),
+    db: Session = Depends(get_db),
+):
+    """Image counts per map cell for a viewport, from the precomputed ``geo_cells``.
+
+    ``bbox`` is "west,south,east,north" (``west > east`` crosses the
+    antimeridian); ``zoom`` is the web-map zoom level, which picks the geohash
+    precision. Each cell reports its count, the centroid of its images and its
+    bounds.
+    """
+    try:
+        west, south, east, north = parse_bbox(bbox)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if not 0 <= int(zoom) <= 30:
+        raise HTTPException(status_code=400, detail="zoom must be between 0 and 30")
+    max_cells = max(1, min(int(max_cells or 1000), 5000))
+    precision = min(precision_for_zoom(int(zoom)), CLUSTER_PRECISIONS[-1])
+
+    cells, truncated = cluster_cells(
+        db,
+        tenant.id,
+        west=west,
+        south=south,
+        east=east,
+        north=north,
+        precision=precision,
+        max_cells=max_cells,
+    )
+    clusters = []
+    for cell in cells:
+        count = int(cell.image_count or 0)
+        if count <= 0:
+            continue
+        clusters.append({
+            "cell": cell.cell,
+            "count": count,
+            "latitude": cell.lat_sum / count,
+            "longitude": cell.lon_sum / count,
+            "bounds": list(decode_bounds(cell.cell)),
+        })
+    return {
+        "tenant_id": tenant.id,
+        "zoom": int(zoom),
+        "precision": precision,
+        "clusters": clusters,
+        "total": sum(cluster["count"] for cluster in clusters),
+        "truncated": truncated,
+    }
+
+
 @router.get("/images/{image_id}/similar", response_model=dict, operation_id="get_similar_images")
 def get_similar_images(
     image_id: int,
@@ -2724,6 +2967,17 @@ def get_similar_images(
         min_score=min_score,
         media_type=similarity_media_type,
     )
+    if pgvector_ranked is None:
+        pgvector_ranked = _fetch_similar_ids_with_local_store(
+            db=db,
+            tenant=tenant,
+            source_image_id=int(source_image.id),
+            source_asset_id=source_image.asset_id,
+            source_vector=source_unit_vector,
+            limit=requested_limit,
+            min_score=min_score,
+            media_type=similarity_media_type,
+        )
 
     if pgvector_ranked is not None:
         top_image_ids, score_by_image_id = pgvector_ranked
@@ -3136,6 +3390,7 @@ async def delete_image(
             AssetDerivative.asset_id == asset_id
         ).delete(synchronize_session=False)
 
+    release_image_location(db, image)
     db.query(ImageMetadata).filter(
         ImageMetadata.id == image_id,
         tenant_column_filter(ImageMetadata, tenant),
@@ -3259,6 +3514,7 @@ async def batch_delete_images(
                 AssetDerivative.asset_id == asset_id
             ).delete(synchronize_session=False)
 
+        release_image_location(db, image)
         db.query(ImageMetadata).filter(
             ImageMetadata.id == image_id,
             tenant_column_filter(ImageMetadata, tenant),
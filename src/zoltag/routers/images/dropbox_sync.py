@@ -107,11 +107,6 @@ async def refresh_image_metadata(
     except Exception:
         entry = None
 
-    try:
-        image_bytes = provider.download_file(source_ref)
-    except Exception as exc:
-        raise HTTPException(status_code=500, detail=f"Error downloading {provider_name} image: {exc}")
-
     source_mime = (
         (entry.mime_type if entry else None)
         or getattr(getattr(storage_info, "asset", None), "mime_type", None)
@@ -122,10 +117,32 @@ async def refresh_image_metadata(
         or is_supported_video_file(image.filename or "", mime_type=source_mime)
     )
 
+    # Videos are probed straight from the provider when it exposes a seekable URL.
+    stream_source = None
+    if is_video:
+        try:
+            stream_source = provider.get_stream_source(source_ref)
+        except Exception:
+            stream_source = None
+
+    image_bytes = None
+    if stream_source is None:
+        try:
+            image_bytes = provider.download_file(source_ref)
+        except Exception as exc:
+            raise HTTPException(status_code=500, detail=f"Error downloading {provider_name} image: {exc}")
+
     try:
         if is_video:
             processor = VideoProcessor(thumbnail_size=(settings.thumbnail_size, settings.thumbnail_size))
-            features = processor.extract_features(image_bytes, filename=image.filename or "video")
+            if stream_source is not None:
+                features = processor.extract_features_from_source(
+                    stream_source.url,
+                    filename=image.filename or "video",
+                    headers=stream_source.headers,
+                )
+            else:
+                features = processor.extract_features(image_bytes, filename=image.filename or "video")
             exif = {}
             capture_timestamp = None
             gps_latitude = None
@@ -8,21 +8,30 @@ from datetime import datetime, timedelta, timezone
 
 logger = logging.getLogger(__name__)
 
-import httpx
 
-from fastapi import APIRouter, Depends, HTTPException, Request
-from fastapi.responses import RedirectResponse, StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import RedirectResponse, Response, StreamingResponse
 from google.cloud import storage
 from sqlalchemy.orm import Session
 from starlette.concurrency import run_in_threadpool
 
+from zoltag.concurrency import offload
 from zoltag.dependencies import get_db, get_secret, get_tenant
 from zoltag.integrations import TenantIntegrationRepository
 from zoltag.image import ImageProcessor
 from zoltag.metadata import ImageMetadata, Tenant as TenantModel
+from zoltag.renditions import (
+    RENDITION_FORMATS,
+    Rendition,
+    asset_rendition_key,
+    get_rendition_store,
+    preferred_rendition_format,
+    rendition_etag,
+    rendition_for_asset,
+)
 from zoltag.routers.images._shared import _resolve_provider_ref, _resolve_storage_or_409
 from zoltag.settings import settings
-from zoltag.storage import create_storage_provider
+from zoltag.storage import create_storage_provider, http_client
 from zoltag.tenant import Tenant
 from zoltag.tenant_scope import tenant_column_filter
 
@@ -105,13 +114,111 @@ def _convert_heic_bytes_to_jpeg(file_bytes: bytes) -> bytes:
     return buffer.getvalue()
 
 
+def _serves_renditions(image: ImageMetadata, storage_info) -> bool:
+    return getattr(storage_info, "asset", None) is not None and _infer_media_type(image, storage_info) == "image"
+
+
+def _load_image_rendition(
+    *,
+    tenant: Tenant,
+    image: ImageMetadata,
+    storage_info,
+    provider_name: str,
+    source_ref: str,
+    size: int,
+    accept_header: str | None,
+) -> Rendition | None:
+    """Blocking: fetch or build a display rendition. None means serve the original instead."""
+    if not _serves_renditions(image, storage_info):
+        return None
+
+    def _download_original() -> bytes:
+        provider = create_storage_provider(provider_name, tenant=tenant, get_secret=get_secret)
+        return provider.download_file(source_ref)
+
+    try:
+        return rendition_for_asset(
+            get_rendition_store(tenant),
+            tenant,
+            image,
+            storage_info.asset,
+            size=size,
+            fmt=preferred_rendition_format(accept_header),
+            download_source=_download_original,
+        )
+    except Exception as exc:  # noqa: BLE001 - fall back to streaming the original
+        logger.warning("Rendition unavailable for image %s: %s", image.id, exc)
+        return None
+
+
+def _rendition_headers(etag: str, content_type: str, filename: str) -> dict:
+    stem = (filename or "image").rsplit(".", 1)[0]
+    extension = "webp" if content_type == "image/webp" else "jpg"
+    return {
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "private, max-age=3600",
+        "Content-Disposition": f'inline; filename="{stem}.{extension}"',
+        "ETag": etag,
+        "Vary": "Accept",
+    }
+
+
+def _etag_matches(etag: str, request: Request) -> bool:
+    if_none_match = request.headers.get("if-none-match") or ""
+    return etag in {tag.strip() for tag in if_none_match.split(",")} or if_none_match.strip() == "*"
+
+
+def _rendition_not_modified(
+    *, tenant: Tenant, image: ImageMetadata, storage_info, size: int, request: Request
+) -> Response | None:
+    """304 for a revalidation of the current rendition, decided from its key alone.
+
+    The ETag is derived from the rendition key (asset, size, format and
+    source revision), so a client holding the current one is answered
+    without reading the rendition or downloading the original.
+    """
+    if not request.headers.get("if-none-match") or not _serves_renditions(image, storage_info):
+        return None
+    fmt = preferred_rendition_format(request.headers.get("accept"))
+    key = asset_rendition_key(tenant, image, storage_info.asset, size=size, fmt=fmt)
+    etag = rendition_etag(key)
+    if not _etag_matches(etag, request):
+        return None
+    return Response(status_code=304, headers=_rendition_headers(etag, RENDITION_FORMATS[fmt][1], image.filename))
+
+
+def _rendition_response(rendition: Rendition, request: Request, filename: str) -> Response:
+    """Serve rendition bytes with ETag revalidation and single-range support."""
+    headers = _rendition_headers(rendition.etag, rendition.content_type, filename)
+    if _etag_matches(rendition.etag, request):
+        return Response(status_code=304, headers=headers)
+
+    data = rendition.data
+    total_size = len(data)
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and total_size > 0 and (not if_range or if_range.strip() == rendition.etag):
+        try:
+            start, end = _parse_single_range_header(range_header, total_size)
+        except ValueError:
+            raise HTTPException(
+                status_code=416,
+                detail="Requested range is not satisfiable",
+                headers={"Content-Range": f"bytes */{total_size}"},
+            )
+        headers["Content-Range"] = f"bytes {start}-{end}/{total_size}"
+        return Response(content=data[start:end + 1], status_code=206, media_type=rendition.content_type, headers=headers)
+    return Response(content=data, media_type=rendition.content_type, headers=headers)
+
+
 def _build_expiry_timestamp(ttl_seconds: int) -> str:
     expires = datetime.now(timezone.utc) + timedelta(seconds=max(60, int(ttl_seconds or 300)))
     return expires.isoformat().replace("+00:00", "Z")
 
 
 @router.get("/images/{image_id}/thumbnail", operation_id="get_thumbnail")
-async def get_thumbnail(
+@offload("images.thumbnail")
+def get_thumbnail(
     image_id: int,
     db: Session = Depends(get_db)
 ):
@@ -172,13 +279,12 @@ async def get_thumbnail(
         variants = ("maxresdefault", "sddefault", "hqdefault", "mqdefault", "default")
         chosen_url = None
         try:
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                for variant in variants:
-                    url = f"https://i.ytimg.com/vi/{video_id}/{variant}.jpg"
-                    resp = await client.head(url)
-                    if resp.status_code == 200:
-                        chosen_url = url
-                        break
+            for variant in variants:
+                url = f"https://i.ytimg.com/vi/{video_id}/{variant}.jpg"
+                resp = http_client.request("ytimg", "HEAD", url, timeout=5.0)
+                if resp.status_code == 200:
+                    chosen_url = url
+                    break
         except Exception:
             pass
         if not chosen_url:
@@ -240,10 +346,16 @@ async def get_thumbnail(
 @router.get("/images/{image_id}/full", operation_id="get_full_image")
 async def get_full_image(
     image_id: int,
+    request: Request,
+    size: int | None = Query(default=None, ge=1, le=10000),
     tenant: Tenant = Depends(get_tenant),
     db: Session = Depends(get_db)
 ):
-    """Stream full-size image from configured storage provider without persisting it."""
+    """Stream full-size image from configured storage provider without persisting it.
+
+    With ``size``, serve a cached display rendition bounded to that size
+    instead of the original (generated on first request).
+    """
     image = db.query(ImageMetadata).filter(
         ImageMetadata.id == image_id,
         tenant_column_filter(ImageMetadata, tenant),
@@ -268,6 +380,26 @@ async def get_full_image(
     if source_ref and "thumbnail-only" in source_ref:
         raise HTTPException(status_code=404, detail="Full-size image not available — this file was uploaded in thumbnail-only mode")
 
+    if size:
+        not_modified = _rendition_not_modified(
+            tenant=tenant, image=image, storage_info=storage_info, size=size, request=request
+        )
+        if not_modified is not None:
+            return not_modified
+        rendition = await run_in_threadpool(
+            lambda: _load_image_rendition(
+                tenant=tenant,
+                image=image,
+                storage_info=storage_info,
+                provider_name=provider_name,
+                source_ref=source_ref,
+                size=size,
+                accept_header=request.headers.get("accept"),
+            )
+        )
+        if rendition is not None:
+            return _rendition_response(rendition, request, image.filename or "image")
+
     try:
         provider = await run_in_threadpool(
             create_storage_provider,
@@ -16,6 +16,8 @@ from zoltag.config.db_config import ConfigManager
 from zoltag.config.db_utils import load_keywords_map
 from zoltag.auth.dependencies import require_tenant_permission_from_header
 from zoltag.auth.models import UserProfile
+from zoltag.job_coalescing import enqueue_asset_job
+from zoltag.settings import settings
 from zoltag.text_index import rebuild_asset_text_index
 from zoltag.tenant_scope import assign_tenant_scope, tenant_column_filter
 
@@ -39,7 +41,24 @@ def _refresh_asset_text_index_for_asset(db: Session, tenant: Tenant, asset_id) -
 
 
 def _refresh_asset_text_index_for_assets(db: Session, tenant: Tenant, asset_ids) -> None:
-    for asset_id in set(asset_ids or []):
+    unique_asset_ids = {asset_id for asset_id in (asset_ids or []) if asset_id}
+    if len(unique_asset_ids) > settings.text_index_inline_max_assets:
+        # Bulk edits: hand the assets to one coalesced background job instead of rebuilding inline.
+        try:
+            jobs = enqueue_asset_job(
+                db,
+                tenant_id=tenant.id,
+                definition_key="rebuild-asset-text-index",
+                asset_ids=unique_asset_ids,
+                base_payload={"include_embeddings": False},
+            )
+            db.commit()
+            if jobs:
+                return
+        except Exception as exc:  # noqa: BLE001
+            db.rollback()
+            logger.warning("Failed to enqueue asset_text_index refresh; rebuilding inline: %s", exc)
+    for asset_id in unique_asset_ids:
         _refresh_asset_text_index_for_asset(db, tenant, asset_id)
 
 
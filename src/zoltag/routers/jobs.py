@@ -7,7 +7,8 @@ from datetime import datetime, timedelta, timezone
 from uuid import UUID
 
 # Debounce reconcile calls from API endpoints — only run at most once per N seconds.
-_RECONCILE_DEBOUNCE_SECONDS = 30.0
+# Steps advance from the job event outbox; this scan is only a safety net.
+_RECONCILE_DEBOUNCE_SECONDS = 900.0
 _last_api_reconcile_at: float = 0.0
 
 
@@ -23,8 +24,17 @@ def _maybe_reconcile(db) -> None:
     except Exception:
         db.rollback()
 
+
+def _advance_workflows(db) -> None:
+    """Consume recorded job state changes after the job update has committed."""
+    try:
+        process_workflow_job_events(db)
+        db.commit()
+    except Exception:
+        db.rollback()
+
 from fastapi import APIRouter, Body, Depends, HTTPException, Query
-from sqlalchemy import func
+from sqlalchemy import and_, func, update
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session, joinedload
@@ -38,6 +48,7 @@ from zoltag.cli.introspection import (
 )
 from zoltag.database import get_db
 from zoltag.dependencies import get_tenant
+from zoltag.job_coalescing import ASSET_BATCH_COMMANDS, enqueue_asset_job
 from zoltag.job_profiles import (
     RUN_PROFILE_LIGHT,
     normalize_run_profile,
@@ -58,10 +69,11 @@ from zoltag.tenant import Tenant
 from zoltag.tenant_scope import tenant_column_filter
 from zoltag.workflow_queue import (
     cancel_workflow_run,
-    handle_workflow_job_state_change,
     mark_workflow_step_running,
     parse_workflow_source_ref,
+    process_workflow_job_events,
     reconcile_running_workflows,
+    record_workflow_job_state_change,
     start_workflow_run,
     validate_workflow_steps,
 )
@@ -75,6 +87,8 @@ _VALID_RETRY_FROM_STATUSES = {"failed", "dead_letter", "canceled"}
 _VALID_TRIGGER_TYPES = {"event", "schedule"}
 _VALID_WORKFLOW_STATUSES = {"running", "succeeded", "failed", "canceled"}
 _VALID_WORKFLOW_FAILURE_POLICIES = {"fail_fast", "continue"}
+_MAX_WORKER_BATCH = 200
+_MAX_IDEMPOTENCY_KEY_LENGTH = 200
 
 
 def _now_utc() -> datetime:
@@ -555,6 +569,31 @@ async def enqueue_job(
     correlation_id = str((body or {}).get("correlation_id") or "").strip() or None
     run_profile = resolve_definition_run_profile(definition)
 
+    if bool((body or {}).get("coalesce")):
+        asset_field = ASSET_BATCH_COMMANDS.get(str(definition.key or "").strip())
+        if not asset_field or not payload.get(asset_field):
+            raise HTTPException(
+                status_code=400,
+                detail="coalesce requires a definition that accepts asset batches and a payload asset list",
+            )
+        jobs = enqueue_asset_job(
+            db,
+            tenant_id=tenant.id,
+            definition_key=definition.key,
+            asset_ids=payload[asset_field],
+            base_payload=payload,
+            source="manual",
+            priority=priority,
+            created_by=admin.supabase_uid,
+        )
+        db.commit()
+        for job in jobs:
+            job.definition = definition
+        return {
+            **_serialize_job(jobs[0]),
+            "coalesced_job_ids": [str(job.id) for job in jobs],
+        }
+
     job = Job(
         tenant_id=UUID(str(tenant.id)),
         definition_id=definition.id,
@@ -1228,8 +1267,9 @@ async def cancel_job(
             if reason:
                 attempt.error_text = reason
 
-    handle_workflow_job_state_change(db, job=job)
+    record_workflow_job_state_change(db, job=job)
     db.commit()
+    _advance_workflows(db)
     db.refresh(job)
     return {"job": _serialize_job(job), "changed": True}
 
@@ -1324,6 +1364,163 @@ async def retry_job(
     }
 
 
+def _worker_heartbeat_fields(body: dict, *, default_running_count: int) -> dict:
+    """Worker identity fields shared by heartbeat, complete and fail calls."""
+    return {
+        "hostname": str((body or {}).get("hostname") or "").strip() or "unknown",
+        "version": str((body or {}).get("version") or "").strip() or "",
+        "queues": [str(value).strip() for value in ((body or {}).get("queues") or []) if str(value).strip()],
+        "running_count": _to_int(
+            (body or {}).get("running_count"),
+            default=default_running_count,
+            minimum=0,
+            maximum=100000,
+            field_name="running_count",
+        ),
+        "metadata_json": (body or {}).get("metadata") if isinstance((body or {}).get("metadata"), dict) else {},
+    }
+
+
+def _parse_idempotency_key(value) -> str | None:
+    key = str(value or "").strip()
+    if len(key) > _MAX_IDEMPOTENCY_KEY_LENGTH:
+        raise HTTPException(
+            status_code=400,
+            detail=f"idempotency_key must be at most {_MAX_IDEMPOTENCY_KEY_LENGTH} characters",
+        )
+    return key or None
+
+
+def _parse_job_result_or_400(item: dict, *, outcome: str) -> dict:
+    """Validate the fields of a complete/fail report before anything is written."""
+    if outcome == "succeeded":
+        return {
+            "exit_code": _to_int(item.get("exit_code"), default=0, minimum=0, maximum=255, field_name="exit_code"),
+            "stdout_tail": str(item.get("stdout_tail") or "")[:20000] or None,
+            "stderr_tail": str(item.get("stderr_tail") or "")[:20000] or None,
+            "result_key": _parse_idempotency_key(item.get("idempotency_key")),
+        }
+    attempt_status = str(item.get("attempt_status") or "failed").strip().lower()
+    if attempt_status not in _VALID_ATTEMPT_STATUSES - {"running", "succeeded"}:
+        raise HTTPException(status_code=400, detail="attempt_status must be one of failed, timeout, canceled")
+    return {
+        "attempt_status": attempt_status,
+        "retryable": bool(item.get("retryable", True)),
+        "exit_code": _to_int(item.get("exit_code"), default=1, minimum=0, maximum=255, field_name="exit_code"),
+        "stdout_tail": str(item.get("stdout_tail") or "")[:20000] or None,
+        "stderr_tail": str(item.get("stderr_tail") or "")[:20000] or None,
+        "error_text": str(item.get("error_text") or "").strip() or "Job execution failed",
+        "result_key": _parse_idempotency_key(item.get("idempotency_key")),
+    }
+
+
+def _current_attempt(db: Session, job: Job) -> JobAttempt | None:
+    return db.query(JobAttempt).filter(
+        JobAttempt.job_id == job.id,
+        JobAttempt.attempt_no == job.attempt_count,
+    ).first()
+
+
+def _is_replayed_result(job: Job, attempt: JobAttempt | None, result_key: str | None) -> bool:
+    """True when this report was already applied to the job's current attempt."""
+    return bool(
+        result_key
+        and attempt is not None
+        and attempt.result_key == result_key
+        and job.status != "running"
+    )
+
+
+def _check_job_claimed_by(job: Job, worker_id: str) -> str | None:
+    if job.status != "running":
+        return "Job is not running"
+    if (job.claimed_by_worker or "").strip() != worker_id:
+        return "Job is claimed by a different worker"
+    return None
+
+
+def _apply_job_success(
+    db: Session,
+    job: Job,
+    attempt: JobAttempt | None,
+    *,
+    now: datetime,
+    exit_code: int,
+    stdout_tail: str | None,
+    stderr_tail: str | None,
+    result_key: str | None,
+) -> None:
+    job.status = "succeeded"
+    job.finished_at = now
+    job.lease_expires_at = None
+    job.claimed_by_worker = None
+    job.last_error = None
+    if attempt:
+        attempt.status = "succeeded"
+        attempt.finished_at = now
+        attempt.exit_code = exit_code
+        attempt.stdout_tail = stdout_tail
+        attempt.stderr_tail = stderr_tail
+        attempt.result_key = result_key
+    record_workflow_job_state_change(db, job=job)
+
+
+def _apply_job_failure(
+    db: Session,
+    job: Job,
+    attempt: JobAttempt | None,
+    *,
+    now: datetime,
+    attempt_status: str,
+    retryable: bool,
+    exit_code: int,
+    stdout_tail: str | None,
+    stderr_tail: str | None,
+    error_text: str,
+    result_key: str | None,
+) -> bool:
+    """Record a failed attempt; requeue with backoff while attempts remain. Returns True if requeued."""
+    attempts_used = int(job.attempt_count or 0)
+    max_attempts = int(job.max_attempts or 1)
+    should_requeue = retryable and attempts_used < max_attempts
+
+    if attempt:
+        attempt.status = attempt_status
+        attempt.finished_at = now
+        attempt.exit_code = exit_code
+        attempt.stdout_tail = stdout_tail
+        attempt.stderr_tail = stderr_tail
+        attempt.error_text = error_text
+        attempt.result_key = result_key
+
+    if should_requeue:
+        delay_seconds = min(300 * (2 ** max(attempts_used - 1, 0)), 3600)
+        job.status = "queued"
+        job.scheduled_for = now + timedelta(seconds=delay_seconds)
+        job.started_at = None
+        job.finished_at = None
+        job.lease_expires_at = None
+        job.claimed_by_worker = None
+        job.last_error = error_text
+    else:
+        job.status = "dead_letter"
+        job.finished_at = now
+        job.lease_expires_at = None
+        job.claimed_by_worker = None
+        job.last_error = error_text
+
+    record_workflow_job_state_change(db, job=job)
+    return should_requeue
+
+
+def _parse_job_ids_or_400(values, *, field_name: str) -> list[UUID]:
+    if not isinstance(values, list):
+        raise HTTPException(status_code=400, detail=f"{field_name} must be an array")
+    if len(values) > _MAX_WORKER_BATCH:
+        raise HTTPException(status_code=400, detail=f"{field_name} must contain at most {_MAX_WORKER_BATCH} items")
+    return list(dict.fromkeys(_parse_uuid_or_400(value) for value in values))
+
+
 @router.post("/worker/claim")
 async def worker_claim_jobs(
     body: dict = Body(default_factory=dict),
@@ -1331,12 +1528,18 @@ async def worker_claim_jobs(
     _super_admin: UserProfile = Depends(require_super_admin),
     db: Session = Depends(get_db),
 ):
-    """Claim queued jobs for a worker (tenant-scoped, skip-locked semantics)."""
+    """Claim queued jobs for a worker (tenant-scoped, skip-locked semantics).
+
+    With an ``idempotency_key``, a retried claim (e.g. after a lost response)
+    returns the jobs that key already claimed instead of claiming more.
+    """
     worker_id = str((body or {}).get("worker_id") or "").strip()
     if not worker_id:
         raise HTTPException(status_code=400, detail="worker_id is required")
 
-    batch_size = _to_int((body or {}).get("batch_size"), default=1, minimum=1, maximum=50, field_name="batch_size")
+    batch_size = _to_int(
+        (body or {}).get("batch_size"), default=1, minimum=1, maximum=_MAX_WORKER_BATCH, field_name="batch_size"
+    )
     lease_seconds = _to_int((body or {}).get("lease_seconds"), default=300, minimum=30, maximum=3600, field_name="lease_seconds")
     pid = _to_int((body or {}).get("pid"), default=0, minimum=0, field_name="pid")
     hostname = str((body or {}).get("hostname") or "").strip() or "unknown"
@@ -1352,6 +1555,27 @@ async def worker_claim_jobs(
     metadata_json = (body or {}).get("metadata") or {}
     if not isinstance(metadata_json, dict):
         raise HTTPException(status_code=400, detail="metadata must be an object")
+    claim_key = _parse_idempotency_key((body or {}).get("idempotency_key"))
+
+    if claim_key:
+        replayed_jobs = db.query(Job).options(joinedload(Job.definition)).join(
+            JobAttempt,
+            and_(JobAttempt.job_id == Job.id, JobAttempt.attempt_no == Job.attempt_count),
+        ).filter(
+            tenant_column_filter(Job, tenant),
+            Job.status == "running",
+            Job.claimed_by_worker == worker_id,
+            JobAttempt.worker_id == worker_id,
+            JobAttempt.claim_key == claim_key,
+        ).order_by(Job.priority.asc(), Job.queued_at.asc(), Job.id.asc()).all()
+        if replayed_jobs:
+            return {
+                "tenant_id": tenant.id,
+                "worker_id": worker_id,
+                "claimed": len(replayed_jobs),
+                "replayed": True,
+                "jobs": [_serialize_job(job) for job in replayed_jobs],
+            }
 
     now = _now_utc()
     query = db.query(Job).options(joinedload(Job.definition)).filter(
@@ -1383,6 +1607,7 @@ async def worker_claim_jobs(
             pid=(pid or None),
             started_at=now,
             status="running",
+            claim_key=claim_key,
         ))
 
     _upsert_worker_heartbeat(
@@ -1400,10 +1625,137 @@ async def worker_claim_jobs(
         "tenant_id": tenant.id,
         "worker_id": worker_id,
         "claimed": len(claimed_jobs),
+        "replayed": False,
         "jobs": [_serialize_job(job) for job in claimed_jobs],
     }
 
 
+@router.post("/worker/heartbeat")
+async def worker_batch_heartbeat(
+    body: dict = Body(default_factory=dict),
+    tenant: Tenant = Depends(get_tenant),
+    _super_admin: UserProfile = Depends(require_super_admin),
+    db: Session = Depends(get_db),
+):
+    """Extend the leases of many running jobs in one statement.
+
+    Jobs that are no longer running or are claimed by another worker are
+    returned in ``lost`` so the worker can stop executing them. Repeating the
+    call only moves the lease expiry forward, so it is safe to retry.
+    """
+    worker_id = str((body or {}).get("worker_id") or "").strip()
+    if not worker_id:
+        raise HTTPException(status_code=400, detail="worker_id is required")
+    lease_seconds = _to_int((body or {}).get("lease_seconds"), default=300, minimum=30, maximum=3600, field_name="lease_seconds")
+    job_ids = _parse_job_ids_or_400((body or {}).get("job_ids") or [], field_name="job_ids")
+    heartbeat_fields = _worker_heartbeat_fields(body, default_running_count=len(job_ids))
+
+    lease_expires_at = _now_utc() + timedelta(seconds=lease_seconds)
+    extended: list[UUID] = []
+    if job_ids:
+        stmt = (
+            update(Job)
+            .where(
+                tenant_column_filter(Job, tenant),
+                Job.id.in_(job_ids),
+                Job.status == "running",
+                Job.claimed_by_worker == worker_id,
+            )
+            .values(lease_expires_at=lease_expires_at)
+            .returning(Job.id)
+            .execution_options(synchronize_session=False)
+        )
+        extended = list(db.execute(stmt).scalars())
+
+    _upsert_worker_heartbeat(db, worker_id=worker_id, **heartbeat_fields)
+    db.commit()
+    extended_set = set(extended)
+    return {
+        "worker_id": worker_id,
+        "lease_expires_at": lease_expires_at if extended else None,
+        "extended": [str(job_id) for job_id in job_ids if job_id in extended_set],
+        "lost": [str(job_id) for job_id in job_ids if job_id not in extended_set],
+    }
+
+
+@router.post("/worker/results")
+async def worker_report_results(
+    body: dict = Body(default_factory=dict),
+    tenant: Tenant = Depends(get_tenant),
+    _super_admin: UserProfile = Depends(require_super_admin),
+    db: Session = Depends(get_db),
+):
+    """Report completion or failure for many jobs in one transaction.
+
+    Each item is ``{"job_id", "status": "succeeded"|"failed", "idempotency_key", ...}``
+    with the same fields as the single-job complete/fail calls. Items are
+    applied independently: one that no longer belongs to the worker is
+    reported as a ``conflict`` without failing the rest. An item whose
+    idempotency key was already applied is reported as ``duplicate``.
+    """
+    worker_id = str((body or {}).get("worker_id") or "").strip()
+    if not worker_id:
+        raise HTTPException(status_code=400, detail="worker_id is required")
+    items = (body or {}).get("results") or []
+    if not isinstance(items, list):
+        raise HTTPException(status_code=400, detail="results must be an array")
+    if len(items) > _MAX_WORKER_BATCH:
+        raise HTTPException(status_code=400, detail=f"results must contain at most {_MAX_WORKER_BATCH} items")
+
+    reports: list[tuple[UUID, str, dict]] = []
+    for item in items:
+        if not isinstance(item, dict):
+            raise HTTPException(status_code=400, detail="each result must be an object")
+        outcome = str(item.get("status") or "").strip().lower()
+        if outcome not in {"succeeded", "failed"}:
+            raise HTTPException(status_code=400, detail="result status must be succeeded or failed")
+        reports.append((_parse_uuid_or_400(item.get("job_id")), outcome, _parse_job_result_or_400(item, outcome=outcome)))
+    heartbeat_fields = _worker_heartbeat_fields(body, default_running_count=0)
+
+    job_ids = list({job_id for job_id, _outcome, _fields in reports})
+    jobs_by_id = {
+        job.id: job
+        for job in db.query(Job).filter(tenant_column_filter(Job, tenant), Job.id.in_(job_ids)).all()
+    } if job_ids else {}
+    # Only each job's current attempt is needed, not its whole retry history.
+    attempts_by_key = {
+        (attempt.job_id, attempt.attempt_no): attempt
+        for attempt in db.query(JobAttempt).join(Job, Job.id == JobAttempt.job_id).filter(
+            JobAttempt.job_id.in_(list(jobs_by_id)),
+            JobAttempt.attempt_no == Job.attempt_count,
+        ).all()
+    } if jobs_by_id else {}
+
+    now = _now_utc()
+    results = []
+    for job_id, outcome, fields in reports:
+        job = jobs_by_id.get(job_id)
+        if job is None:
+            results.append({"job_id": str(job_id), "outcome": "not_found", "detail": "Job not found"})
+            continue
+        attempt = attempts_by_key.get((job.id, job.attempt_count))
+        if _is_replayed_result(job, attempt, fields["result_key"]):
+            results.append({"job_id": str(job_id), "outcome": "duplicate", "status": job.status})
+            continue
+        conflict = _check_job_claimed_by(job, worker_id)
+        if conflict:
+            results.append({"job_id": str(job_id), "outcome": "conflict", "status": job.status, "detail": conflict})
+            continue
+        entry = {"job_id": str(job_id), "outcome": "applied"}
+        if outcome == "succeeded":
+            _apply_job_success(db, job, attempt, now=now, **fields)
+        else:
+            entry["requeued"] = _apply_job_failure(db, job, attempt, now=now, **fields)
+        entry["status"] = job.status
+        results.append(entry)
+
+    _upsert_worker_heartbeat(db, worker_id=worker_id, **heartbeat_fields)
+    db.commit()
+    if any(entry["outcome"] == "applied" for entry in results):
+        _advance_workflows(db)
+    return {"worker_id": worker_id, "results": results}
+
+
 @router.post("/worker/{job_id}/heartbeat")
 async def worker_heartbeat(
     job_id: str,
@@ -1417,25 +1769,17 @@ async def worker_heartbeat(
     if not worker_id:
         raise HTTPException(status_code=400, detail="worker_id is required")
     lease_seconds = _to_int((body or {}).get("lease_seconds"), default=300, minimum=30, maximum=3600, field_name="lease_seconds")
+    heartbeat_fields = _worker_heartbeat_fields(body, default_running_count=1)
 
     job = _job_or_404(db, tenant, job_id)
-    if job.status != "running":
-        raise HTTPException(status_code=409, detail="Job is not running")
-    if (job.claimed_by_worker or "").strip() != worker_id:
-        raise HTTPException(status_code=409, detail="Job is claimed by a different worker")
+    conflict = _check_job_claimed_by(job, worker_id)
+    if conflict:
+        raise HTTPException(status_code=409, detail=conflict)
 
     now = _now_utc()
     job.lease_expires_at = now + timedelta(seconds=lease_seconds)
 
-    _upsert_worker_heartbeat(
-        db,
-        worker_id=worker_id,
-        hostname=str((body or {}).get("hostname") or "").strip() or "unknown",
-        version=str((body or {}).get("version") or "").strip() or "",
-        queues=[str(value).strip() for value in ((body or {}).get("queues") or []) if str(value).strip()],
-        running_count=_to_int((body or {}).get("running_count"), default=1, minimum=0, maximum=100000, field_name="running_count"),
-        metadata_json=(body or {}).get("metadata") if isinstance((body or {}).get("metadata"), dict) else {},
-    )
+    _upsert_worker_heartbeat(db, worker_id=worker_id, **heartbeat_fields)
     db.commit()
     return {
         "job_id": str(job.id),
@@ -1456,46 +1800,22 @@ async def worker_complete_job(
     worker_id = str((body or {}).get("worker_id") or "").strip()
     if not worker_id:
         raise HTTPException(status_code=400, detail="worker_id is required")
-    exit_code = _to_int((body or {}).get("exit_code"), default=0, minimum=0, maximum=255, field_name="exit_code")
-    stdout_tail = str((body or {}).get("stdout_tail") or "")[:20000] or None
-    stderr_tail = str((body or {}).get("stderr_tail") or "")[:20000] or None
+    fields = _parse_job_result_or_400(body or {}, outcome="succeeded")
+    heartbeat_fields = _worker_heartbeat_fields(body, default_running_count=0)
 
     job = _job_or_404(db, tenant, job_id)
-    if job.status != "running":
-        raise HTTPException(status_code=409, detail="Job is not running")
-    if (job.claimed_by_worker or "").strip() != worker_id:
-        raise HTTPException(status_code=409, detail="Job is claimed by a different worker")
+    attempt = _current_attempt(db, job)
+    if _is_replayed_result(job, attempt, fields["result_key"]):
+        return {"job": _serialize_job(job), "replayed": True}
+    conflict = _check_job_claimed_by(job, worker_id)
+    if conflict:
+        raise HTTPException(status_code=409, detail=conflict)
 
-    now = _now_utc()
-    job.status = "succeeded"
-    job.finished_at = now
-    job.lease_expires_at = None
-    job.claimed_by_worker = None
-    job.last_error = None
+    _apply_job_success(db, job, attempt, now=_now_utc(), **fields)
 
-    attempt = db.query(JobAttempt).filter(
-        JobAttempt.job_id == job.id,
-        JobAttempt.attempt_no == job.attempt_count,
-    ).first()
-    if attempt:
-        attempt.status = "succeeded"
-        attempt.finished_at = now
-        attempt.exit_code = exit_code
-        attempt.stdout_tail = stdout_tail
-        attempt.stderr_tail = stderr_tail
-
-    handle_workflow_job_state_change(db, job=job)
-
-    _upsert_worker_heartbeat(
-        db,
-        worker_id=worker_id,
-        hostname=str((body or {}).get("hostname") or "").strip() or "unknown",
-        version=str((body or {}).get("version") or "").strip() or "",
-        queues=[str(value).strip() for value in ((body or {}).get("queues") or []) if str(value).strip()],
-        running_count=_to_int((body or {}).get("running_count"), default=0, minimum=0, maximum=100000, field_name="running_count"),
-        metadata_json=(body or {}).get("metadata") if isinstance((body or {}).get("metadata"), dict) else {},
-    )
+    _upsert_worker_heartbeat(db, worker_id=worker_id, **heartbeat_fields)
     db.commit()
+    _advance_workflows(db)
     db.refresh(job)
     return {"job": _serialize_job(job)}
 
@@ -1512,68 +1832,22 @@ async def worker_fail_job(
     worker_id = str((body or {}).get("worker_id") or "").strip()
     if not worker_id:
         raise HTTPException(status_code=400, detail="worker_id is required")
-
-    attempt_status = str((body or {}).get("attempt_status") or "failed").strip().lower()
-    if attempt_status not in _VALID_ATTEMPT_STATUSES - {"running", "succeeded"}:
-        raise HTTPException(status_code=400, detail="attempt_status must be one of failed, timeout, canceled")
-
-    retryable = bool((body or {}).get("retryable", True))
-    exit_code = _to_int((body or {}).get("exit_code"), default=1, minimum=0, maximum=255, field_name="exit_code")
-    stdout_tail = str((body or {}).get("stdout_tail") or "")[:20000] or None
-    stderr_tail = str((body or {}).get("stderr_tail") or "")[:20000] or None
-    error_text = str((body or {}).get("error_text") or "").strip() or "Job execution failed"
+    fields = _parse_job_result_or_400(body or {}, outcome="failed")
+    heartbeat_fields = _worker_heartbeat_fields(body, default_running_count=0)
 
     job = _job_or_404(db, tenant, job_id)
-    if job.status != "running":
-        raise HTTPException(status_code=409, detail="Job is not running")
-    if (job.claimed_by_worker or "").strip() != worker_id:
-        raise HTTPException(status_code=409, detail="Job is claimed by a different worker")
-
-    now = _now_utc()
-    attempts_used = int(job.attempt_count or 0)
-    max_attempts = int(job.max_attempts or 1)
-    should_requeue = retryable and attempts_used < max_attempts
-
-    attempt = db.query(JobAttempt).filter(
-        JobAttempt.job_id == job.id,
-        JobAttempt.attempt_no == job.attempt_count,
-    ).first()
-    if attempt:
-        attempt.status = attempt_status
-        attempt.finished_at = now
-        attempt.exit_code = exit_code
-        attempt.stdout_tail = stdout_tail
-        attempt.stderr_tail = stderr_tail
-        attempt.error_text = error_text
+    attempt = _current_attempt(db, job)
+    if _is_replayed_result(job, attempt, fields["result_key"]):
+        return {"job": _serialize_job(job), "requeued": job.status == "queued", "replayed": True}
+    conflict = _check_job_claimed_by(job, worker_id)
+    if conflict:
+        raise HTTPException(status_code=409, detail=conflict)
 
-    if should_requeue:
-        delay_seconds = min(300 * (2 ** max(attempts_used - 1, 0)), 3600)
-        job.status = "queued"
-        job.scheduled_for = now + timedelta(seconds=delay_seconds)
-        job.started_at = None
-        job.finished_at = None
-        job.lease_expires_at = None
-        job.claimed_by_worker = None
-        job.last_error = error_text
-    else:
-        job.status = "dead_letter"
-        job.finished_at = now
-        job.lease_expires_at = None
-        job.claimed_by_worker = None
-        job.last_error = error_text
-
-    handle_workflow_job_state_change(db, job=job)
+    should_requeue = _apply_job_failure(db, job, attempt, now=_now_utc(), **fields)
 
-    _upsert_worker_heartbeat(
-        db,
-        worker_id=worker_id,
-        hostname=str((body or {}).get("hostname") or "").strip() or "unknown",
-        version=str((body or {}).get("version") or "").strip() or "",
-        queues=[str(value).strip() for value in ((body or {}).get("queues") or []) if str(value).strip()],
-        running_count=_to_int((body or {}).get("running_count"), default=0, minimum=0, maximum=100000, field_name="running_count"),
-        metadata_json=(body or {}).get("metadata") if isinstance((body or {}).get("metadata"), dict) else {},
-    )
+    _upsert_worker_heartbeat(db, worker_id=worker_id, **heartbeat_fields)
     db.commit()
+    _advance_workflows(db)
     db.refresh(job)
     return {
         "job": _serialize_job(job),
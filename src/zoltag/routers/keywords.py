@@ -5,12 +5,14 @@ from sqlalchemy import func, distinct, and_, or_
 from sqlalchemy.orm import Session
 from typing import Optional, List
 
+from zoltag.concurrency import offload
 from zoltag.dependencies import get_db, get_tenant, get_tenant_setting
 from zoltag.auth.dependencies import get_current_user
 from zoltag.auth.models import UserProfile
 from zoltag.asset_helpers import bulk_preload_thumbnail_urls, load_assets_for_images
 from zoltag.list_visibility import can_view_list, is_tenant_admin_user
 from zoltag.config.db_config import ConfigManager
+from zoltag.keyword_registry import get_keyword_registry
 from zoltag.tenant import Tenant
 from zoltag.metadata import Asset, ImageMetadata, Permatag, KeywordModel, MachineTag
 from zoltag.models.config import PhotoList, PhotoListItem, Keyword, KeywordCategory
@@ -550,30 +552,15 @@ async def get_ai_tagfinder2_summary(
 
 
 @router.get("/tag-stats")
-async def get_tag_stats(
+@offload("keywords.tag_stats")
+def get_tag_stats(
     tenant: Tenant = Depends(get_tenant),
     db: Session = Depends(get_db)
 ):
     """Get tag counts by category for different tag sources."""
-    # Fetch keywords from database with IDs for FK mapping
-    keywords_data = db.query(
-        Keyword.id,
-        Keyword.keyword,
-        KeywordCategory.name.label("category")
-    ).join(
-        KeywordCategory, Keyword.category_id == KeywordCategory.id
-    ).filter(
-        tenant_column_filter(Keyword, tenant)
-    ).all()
-
-    # Build mapping from keyword_id to keyword info
-    keyword_id_to_info = {
-        row.id: {
-            "keyword": row.keyword,
-            "category": row.category
-        }
-        for row in keywords_data
-    }
+    # Keyword metadata comes from the shared tenant registry.
+    registry = get_keyword_registry(db, tenant.id)
+    keyword_id_to_info = registry.keywords_map(registry.ids)
 
     # Get zero-shot (SigLIP) tags from machine_tags
     zero_shot_rows = db.query(
@@ -639,7 +626,7 @@ async def get_tag_stats(
 
     def permatags_to_by_category_all():
         by_category = {}
-        for keyword_id, keyword, category in keywords_data:
+        for keyword_id, keyword, category in zip(registry.ids, registry.names, registry.category_names, strict=True):
             label = category or "uncategorized"
             by_category.setdefault(label, []).append({
                 "keyword": keyword,
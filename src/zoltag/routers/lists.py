@@ -18,9 +18,9 @@ from PIL import Image, UnidentifiedImageError
 from sqlalchemy import func, and_, or_
 from sqlalchemy.orm import Session
 from starlette.background import BackgroundTask
-from starlette.concurrency import run_in_threadpool
 
 from zoltag.asset_helpers import AssetReadinessError, load_assets_for_images, resolve_image_storage
+from zoltag.concurrency import offload
 from zoltag.dependencies import get_db, get_secret, get_tenant, get_tenant_setting
 from zoltag.list_visibility import (
     can_edit_list,
@@ -37,6 +37,7 @@ from zoltag.models.sharing import PresentationTemplate
 from zoltag.metadata import AssetDerivative, ImageMetadata, MachineTag, Permatag
 from zoltag.tagging import calculate_tags
 from zoltag.models.requests import AddPhotoRequest, ReorderListItemsRequest
+from zoltag.ratelimit import BucketPolicy, tenant_rate_limit
 from zoltag.settings import settings
 from zoltag.auth.dependencies import get_current_user
 from zoltag.auth.models import UserProfile
@@ -57,6 +58,7 @@ PPTX_SLIDE_HEIGHT_IN = 7.5
 PPTX_SLIDE_MARGIN_IN = 0.2
 PPTX_TEMPLATE_MAX_UPLOAD_BYTES = 50 * 1024 * 1024
 PPTX_TEMPLATE_ALLOWED_VISIBILITY = {"shared", "private"}
+PPTX_EXPORT_RATE_LIMIT = BucketPolicy.per_hour(20, burst=3)
 
 
 def _refresh_asset_text_index_for_asset(db: Session, tenant: Tenant, asset_id) -> None:
@@ -1010,8 +1012,12 @@ async def get_list_items(
     return response_items
 
 
-@router.get("/{list_id:int}/export/pptx")
-async def export_list_pptx(
+@router.get(
+    "/{list_id:int}/export/pptx",
+    dependencies=[Depends(tenant_rate_limit("lists.export_pptx", PPTX_EXPORT_RATE_LIMIT))],
+)
+@offload("lists.export_pptx")
+def export_list_pptx(
     list_id: int,
     template_id: Optional[str] = Query(default=None),
     tenant: Tenant = Depends(get_tenant),
@@ -1114,8 +1120,7 @@ async def export_list_pptx(
             raise HTTPException(status_code=500, detail=f"Failed to load template: {exc}")
 
     try:
-        temp_path, added_count, skipped_count = await run_in_threadpool(
-            _build_list_pptx_file,
+        temp_path, added_count, skipped_count = _build_list_pptx_file(
             export_rows=export_rows,
             tenant=tenant,
             template_path=template_temp_path,
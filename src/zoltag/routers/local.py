@@ -5,26 +5,23 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
-from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
 
-from zoltag.dependencies import get_db, get_tenant
+from zoltag.dependencies import get_tenant
+from zoltag.local_indexer import current_local_indexer, get_local_indexer
 from zoltag.settings import settings
-from zoltag.storage.local_provider import LocalFilesystemProvider
-from zoltag.sync_pipeline import process_storage_entry
 from zoltag.tenant import Tenant
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1/local", tags=["local"])
 
-# Module-level scan state (single scan at a time per process).
-_scan_state: Dict[str, Any] = {
+# Reported before the first scan has created the indexer.
+_IDLE_SCAN_STATE: Dict[str, Any] = {
     "running": False,
     "total": 0,
     "processed": 0,
@@ -33,6 +30,7 @@ _scan_state: Dict[str, Any] = {
     "started_at": None,
     "finished_at": None,
     "last_error": None,
+    "watching": False,
 }
 
 
@@ -77,84 +75,42 @@ class _LocalBlob:
         self._path.write_bytes(data)
 
 
-def _do_scan(tenant: Tenant, db: Session) -> None:
-    """Walk configured sync folders and ingest new/changed images."""
-    global _scan_state
-    _scan_state.update(
-        running=True,
-        total=0,
-        processed=0,
-        skipped=0,
-        errors=0,
-        started_at=datetime.utcnow().isoformat(),
-        finished_at=None,
-        last_error=None,
-    )
-
-    try:
-        cfg = _load_config()
-        sync_folders: List[str] = cfg.get("sync_folders") or []
-        if not sync_folders:
-            logger.warning("Local scan: no sync_folders configured")
-            return
-
-        thumbnail_dir = Path(settings.local_data_dir) / "thumbnails"
-        provider = LocalFilesystemProvider(thumbnail_dir=thumbnail_dir)
-        bucket = _LocalThumbnailBucket(thumbnail_dir)
-
-        entries = provider.list_image_entries(sync_folders=sync_folders)
-        _scan_state["total"] = len(entries)
-
-        for entry in entries:
-            try:
-                result = process_storage_entry(
-                    db=db,
-                    tenant=tenant,
-                    entry=entry,
-                    provider=provider,
-                    thumbnail_bucket=bucket,
-                )
-                if result.skipped:
-                    _scan_state["skipped"] += 1
-                else:
-                    _scan_state["processed"] += 1
-                db.commit()
-            except Exception as exc:
-                _scan_state["errors"] += 1
-                _scan_state["last_error"] = str(exc)
-                logger.warning("Local scan: failed to process %s: %s", entry.source_key, exc)
-                try:
-                    db.rollback()
-                except Exception:
-                    pass
-
-    except Exception as exc:
-        _scan_state["last_error"] = str(exc)
-        logger.exception("Local scan failed")
-    finally:
-        _scan_state["running"] = False
-        _scan_state["finished_at"] = datetime.utcnow().isoformat()
+def _do_scan(tenant: Tenant) -> None:
+    """Ingest new/changed images under the configured sync folders, then keep watching them."""
+    cfg = _load_config()
+    sync_folders: List[str] = cfg.get("sync_folders") or []
+    if not sync_folders:
+        logger.warning("Local scan: no sync_folders configured")
+        return
+
+    indexer = get_local_indexer(tenant, sync_folders)
+    indexer.scan()
+    indexer.start_watching()
+
+
+def _scan_status() -> Dict[str, Any]:
+    indexer = current_local_indexer()
+    return dict(indexer.state) if indexer is not None else dict(_IDLE_SCAN_STATE)
 
 
 @router.post("/scan", response_model=dict)
 async def trigger_scan(
     tenant: Tenant = Depends(get_tenant),
-    db: Session = Depends(get_db),
 ):
     """Walk configured sync folders and ingest new or changed images."""
-    if _scan_state["running"]:
+    if _scan_status()["running"]:
         raise HTTPException(status_code=409, detail="Scan already in progress")
 
     # Run in a background thread to avoid blocking the event loop.
     loop = asyncio.get_event_loop()
-    loop.run_in_executor(None, _do_scan, tenant, db)
+    loop.run_in_executor(None, _do_scan, tenant)
     return {"status": "started"}
 
 
 @router.get("/scan/status", response_model=dict)
 async def scan_status():
     """Return current scan progress."""
-    return dict(_scan_state)
+    return _scan_status()
 
 
 @router.get("/config", response_model=dict)
@@ -0,0 +1,52 @@
+"""Prometheus metrics export and the super-admin sampling profiler."""
+
+from __future__ import annotations
+
+import hmac
+from typing import Optional
+
+import anyio.to_thread
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from zoltag.auth.dependencies import require_super_admin
+from zoltag.auth.models import UserProfile
+from zoltag.instrumentation import PROFILE_MAX_SECONDS, render_prometheus, run_sampling_profile
+from zoltag.settings import settings
+
+router = APIRouter(tags=["metrics"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics", include_in_schema=False)
+async def prometheus_metrics(authorization: Optional[str] = Header(default=None)):
+    """Request, phase, SQL, event-loop and activity-sink metrics in Prometheus text format."""
+    token = settings.metrics_token
+    if not token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    scheme, _, supplied = str(authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(supplied.strip(), token):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return PlainTextResponse(render_prometheus(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+@router.get("/api/v1/admin/profiling/profile", response_class=PlainTextResponse)
+async def sample_profile(
+    seconds: float = Query(default=10.0, gt=0, le=PROFILE_MAX_SECONDS),
+    interval_ms: float = Query(default=10.0, ge=1, le=1000),
+    _super_admin: UserProfile = Depends(require_super_admin),
+):
+    """Sample every thread's stack and return collapsed stacks for flamegraph tools.
+
+    Each line is ``frame;frame;...;frame count``, outermost frame first.
+    """
+    if not settings.profiling_enabled:
+        raise HTTPException(status_code=403, detail="Profiling is disabled (set PROFILING_ENABLED)")
+    profiler = await anyio.to_thread.run_sync(run_sampling_profile, seconds, interval_ms / 1000.0)
+    if profiler is None:
+        raise HTTPException(status_code=409, detail="A profile is already running")
+    return PlainTextResponse(
+        profiler.folded(),
+        headers={"X-Profile-Samples": str(profiler.samples)},
+    )
@@ -14,14 +14,16 @@ from zoltag.activity import EVENT_SEARCH_NL, extract_client_ip, record_activity_
 from zoltag.auth.dependencies import get_current_user
 from zoltag.auth.models import UserProfile
 from zoltag.dependencies import get_db, get_tenant
+from zoltag.keyword_registry import get_keyword_registry
 from zoltag.metadata import Person
-from zoltag.models.config import Keyword, KeywordCategory
+from zoltag.ratelimit import BucketPolicy, tenant_rate_limit
 from zoltag.settings import settings
 from zoltag.tenant import Tenant
 from zoltag.tenant_scope import tenant_column_filter
 
 
 router = APIRouter(prefix="/api/v1/search", tags=["search"])
+NL_SEARCH_RATE_LIMIT = BucketPolicy.per_minute(30, burst=10)
 
 
 class NLSearchRequest(BaseModel):
@@ -67,37 +69,16 @@ def _wants_quality_sort(query: str) -> bool:
 
 
 def _build_vocab(db: Session, tenant: Tenant) -> Dict[str, Any]:
-    categories = db.query(
-        KeywordCategory.id,
-        KeywordCategory.name,
-        KeywordCategory.is_people_category,
-    ).filter(
-        tenant_column_filter(KeywordCategory, tenant)
-    ).order_by(
-        KeywordCategory.sort_order,
-        KeywordCategory.name,
-    ).all()
-
-    category_by_id = {row.id: row for row in categories}
-
-    keyword_rows = db.query(
-        Keyword.keyword,
-        Keyword.category_id,
-        Keyword.person_id,
-    ).filter(
-        tenant_column_filter(Keyword, tenant)
-    ).order_by(
-        Keyword.keyword
-    ).all()
+    registry = get_keyword_registry(db, tenant.id)
+    categories = sorted(registry.categories, key=lambda entry: (entry.sort_order, entry.name))
 
     category_keywords: Dict[str, List[str]] = {}
     people_keywords: List[Dict[str, str]] = []
 
-    for keyword, category_id, person_id in keyword_rows:
-        category_row = category_by_id.get(category_id)
-        if not category_row:
-            continue
-        category_name = category_row.name
+    for pos in sorted(range(len(registry)), key=lambda idx: registry.names[idx]):
+        keyword = registry.names[pos]
+        category_name = registry.category_names[pos]
+        person_id = registry.person_ids[pos]
         category_keywords.setdefault(category_name, []).append(keyword)
 
         if person_id:
@@ -351,7 +332,7 @@ def _apply_quality_defaults(response: Dict[str, Any], query: str) -> Dict[str, A
     return response
 
 
-@router.post("/nl")
+@router.post("/nl", dependencies=[Depends(tenant_rate_limit("search.nl", NL_SEARCH_RATE_LIMIT))])
 async def nl_search(
     http_request: Request,
     request: NLSearchRequest,
@@ -16,6 +16,7 @@ from zoltag.dependencies import get_db, get_tenant
 from zoltag.tenant import Tenant
 from zoltag.metadata import Asset, Person, PersonReferenceImage, Permatag
 from zoltag.models.config import Keyword, KeywordCategory
+from zoltag.keyword_registry import bump_keyword_registry_version
 from zoltag.tenant_scope import assign_tenant_scope, tenant_column_filter, tenant_column_filter_for_values
 from zoltag.settings import settings
 
@@ -216,6 +217,7 @@ async def create_person(
             tag_type="person"
         ), tenant)
         db.add(keyword)
+        bump_keyword_registry_version(db, tenant.id)
         db.commit()
         db.refresh(person)
 
@@ -638,6 +640,8 @@ async def update_person(
         if request.instagram_url is not None:
             person.instagram_url = request.instagram_url
 
+        if keyword and request.name is not None:
+            bump_keyword_registry_version(db, tenant.id)
         db.commit()
         db.refresh(person)
 
@@ -693,6 +697,8 @@ async def delete_person(
 
         # Delete person
         db.delete(person)
+        if keyword:
+            bump_keyword_registry_version(db, tenant.id)
         db.commit()
 
         return {"status": "deleted", "person_id": person_id}
@@ -792,6 +798,7 @@ def get_or_create_person_keyword(
     else:
         keyword.tenant_id = tenant
     db.add(keyword)
+    bump_keyword_registry_version(db, tenant.id if isinstance(tenant, Tenant) else tenant)
     db.commit()
 
     return keyword
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import uuid
 from datetime import datetime, timedelta, timezone
@@ -16,6 +17,7 @@ from sqlalchemy.orm import Session
 from zoltag.auth.dependencies import get_current_user
 from zoltag.auth.models import UserProfile
 from zoltag.dependencies import get_db, get_tenant
+from zoltag.email import queue_guest_invite_email
 from zoltag.list_visibility import can_edit_list, is_tenant_admin_user
 from zoltag.models.config import PhotoList, PhotoListItem
 from zoltag.models.sharing import GuestIdentity, ListShare, MemberComment, MemberRating
@@ -32,6 +34,8 @@ router = APIRouter(
 )
 
 _VALID_EXPIRES_IN_DAYS = {7, 30, 90}
+# Concurrent Supabase admin calls while resolving share recipients.
+_SHARE_SUPABASE_CONCURRENCY = 8
 
 
 # ---------------------------------------------------------------------------
@@ -203,87 +207,89 @@ async def create_shares(
 
     logger.warning(f"🔍 FINAL app_url: {app_url}")
 
-    results = []
-    invite_links = {}  # Store invite links by email
+    emails = list(dict.fromkeys(
+        email_str for email_str in (_normalize_guest_email(email) for email in body.emails) if email_str
+    ))
+    # Prefer an existing app user identity for each email when available.
+    # This keeps guest shares aligned with real-user Supabase UIDs.
+    app_uids = {
+        str(email).lower(): supabase_uid
+        for email, supabase_uid in db.query(UserProfile.email, UserProfile.supabase_uid)
+        .filter(func.lower(UserProfile.email).in_(emails), UserProfile.supabase_uid.is_not(None))
+        .all()
+    }
+    supabase_slots = asyncio.Semaphore(_SHARE_SUPABASE_CONCURRENCY)
 
-    for email in body.emails:
-        email_str = _normalize_guest_email(email)
-        if not email_str:
-            continue
+    async def _prepare_guest(email_str: str) -> tuple[uuid.UUID, str]:
+        """Resolve the guest UID and one-time invite link for one recipient."""
         logger.warning(f"🚀 Processing invite for {email_str}")
-
-        # Prefer an existing app user identity for this email when available.
-        # This keeps guest shares aligned with real-user Supabase UIDs.
-        app_profile = (
-            db.query(UserProfile)
-            .filter(func.lower(UserProfile.email) == email_str)
-            .first()
-        )
-        if app_profile and app_profile.supabase_uid:
-            guest_uid = uuid.UUID(str(app_profile.supabase_uid))
-            logger.warning(f"🚀 Using existing app user UID for {email_str}: {guest_uid}")
-        else:
-            # Create (or fetch existing) Supabase guest user.
-            try:
-                from zoltag.supabase_admin import create_guest_user
-                logger.warning(f"🚀 Calling create_guest_user for {email_str}")
-                user_data = await create_guest_user(email_str, str(tenant.id))
-                guest_uid = uuid.UUID(user_data["id"])
-                logger.warning(f"🚀 Guest user created/fetched: {guest_uid}")
-            except Exception as exc:
-                logger.error(f"❌ Supabase user creation failed for {email_str}: {exc}")
-                raise HTTPException(
-                    status_code=status.HTTP_502_BAD_GATEWAY,
-                    detail=f"Failed to create guest user {email_str}: {exc}",
-                )
-
-        # Build guest landing URL with context. Supabase redirects here after magic-link verification.
-        guest_redirect_to = f"{app_url}/guest?{urlencode({'list_id': str(list_id), 'email': email_str})}"
-        invite_link = guest_redirect_to
-
-        # Generate one-time magic link now so invite is a single email flow.
-        try:
-            from zoltag.supabase_admin import generate_magic_link
-            link_data = await generate_magic_link(email_str, guest_redirect_to)
-            action_link = (link_data or {}).get("action_link")
-            if action_link:
-                invite_link = str(action_link)
-                logger.warning(f"✅ Generated one-time invite magic link for {email_str}")
+        async with supabase_slots:
+            if email_str in app_uids:
+                guest_uid = uuid.UUID(str(app_uids[email_str]))
+                logger.warning(f"🚀 Using existing app user UID for {email_str}: {guest_uid}")
             else:
-                logger.warning(f"⚠️ Missing action_link for {email_str}; falling back to guest landing URL")
-        except Exception as magic_exc:
-            logger.error(f"❌ Failed to generate invite magic link for {email_str}: {magic_exc}")
-            # Keep fallback behavior so shares can still be created.
+                # Create (or fetch existing) Supabase guest user.
+                try:
+                    from zoltag.supabase_admin import create_guest_user
+                    logger.warning(f"🚀 Calling create_guest_user for {email_str}")
+                    user_data = await create_guest_user(email_str, str(tenant.id))
+                    guest_uid = uuid.UUID(user_data["id"])
+                    logger.warning(f"🚀 Guest user created/fetched: {guest_uid}")
+                except Exception as exc:
+                    logger.error(f"❌ Supabase user creation failed for {email_str}: {exc}")
+                    raise HTTPException(
+                        status_code=status.HTTP_502_BAD_GATEWAY,
+                        detail=f"Failed to create guest user {email_str}: {exc}",
+                    )
+
+            # Build guest landing URL with context. Supabase redirects here after magic-link verification.
+            guest_redirect_to = f"{app_url}/guest?{urlencode({'list_id': str(list_id), 'email': email_str})}"
             invite_link = guest_redirect_to
 
+            # Generate one-time magic link now so invite is a single email flow.
+            try:
+                from zoltag.supabase_admin import generate_magic_link
+                link_data = await generate_magic_link(email_str, guest_redirect_to)
+                action_link = (link_data or {}).get("action_link")
+                if action_link:
+                    invite_link = str(action_link)
+                    logger.warning(f"✅ Generated one-time invite magic link for {email_str}")
+                else:
+                    logger.warning(f"⚠️ Missing action_link for {email_str}; falling back to guest landing URL")
+            except Exception as magic_exc:
+                logger.error(f"❌ Failed to generate invite magic link for {email_str}: {magic_exc}")
+                # Keep fallback behavior so shares can still be created.
+                invite_link = guest_redirect_to
+        return guest_uid, invite_link
+
+    # Recipients are resolved concurrently; emails go to the outbox and are
+    # sent by the worker, so the request does not wait on the mail provider.
+    prepared = await asyncio.gather(*(_prepare_guest(email_str) for email_str in emails), return_exceptions=True)
+    for outcome in prepared:
+        if isinstance(outcome, BaseException):
+            raise outcome
+
+    photo_list = db.query(PhotoList).filter(PhotoList.id == list_id).first()
+    list_name = photo_list.title if photo_list else None
+    inviter_name = current_user.display_name or current_user.email
+
+    results = []
+    invite_links = {}  # Store invite links by email
+
+    for email_str, (guest_uid, invite_link) in zip(emails, prepared, strict=True):
         invite_links[email_str] = invite_link
 
         _upsert_guest_identity(db, email_str, guest_uid)
 
-        # Send invite email via Resend
-        try:
-            logger.warning(f"📧 About to send email to {email_str}")
-            from zoltag.email import send_guest_invite_email
-            photo_list = db.query(PhotoList).filter(PhotoList.id == list_id).first()
-            list_name = photo_list.title if photo_list else None
-            inviter_name = current_user.display_name or current_user.email
-
-            logger.warning(f"📧 Sending invite email to {email_str}")
-            email_sent = send_guest_invite_email(
-                to_email=email_str,
-                invite_link=invite_link,
-                list_name=list_name,
-                inviter_name=inviter_name,
-                tenant_name=tenant.name,
-            )
-            if email_sent:
-                logger.warning(f"✅ Email sent successfully to {email_str}")
-            else:
-                logger.warning(f"❌ Failed to send email to {email_str}, but guest user was created")
-        except Exception as email_exc:
-            logger.error(f"❌ Exception sending email to {email_str}: {email_exc}")
-            import traceback
-            traceback.print_exc()
+        queue_guest_invite_email(
+            db,
+            to_email=email_str,
+            invite_link=invite_link,
+            list_name=list_name,
+            inviter_name=inviter_name,
+            tenant_name=tenant.name,
+            tenant_id=tenant.id,
+        )
 
         # Upsert list_shares row
         share = (
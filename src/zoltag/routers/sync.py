@@ -15,12 +15,12 @@ from zoltag.integrations import (
     normalize_sync_folders,
     normalize_sync_items,
 )
-from zoltag.metadata import Asset, Tenant as TenantModel
+from zoltag.metadata import Tenant as TenantModel
 from zoltag.settings import settings
-from zoltag.storage import ProviderEntry, create_storage_provider
-from zoltag.sync_pipeline import GLOBAL_SOURCE_KEY_DEDUPE_PROVIDERS, process_storage_entry
+from zoltag.storage import GoogleDriveStorageProvider, create_storage_provider
+from zoltag.sync_cursors import DriveSyncListing
+from zoltag.sync_pipeline import PendingEntry, iter_pending_entries, process_storage_entry
 from zoltag.tenant import Tenant
-from zoltag.tenant_scope import tenant_column_filter
 
 router = APIRouter(
     prefix="/api/v1",
@@ -173,22 +173,7 @@ async def trigger_sync(
         except Exception as exc:
             raise HTTPException(status_code=400, detail=f"Unable to initialize {provider_name} provider: {exc}")
 
-        import uuid as _uuid_mod
-        _pid_uuid = _uuid_mod.UUID(record_provider_id) if record_provider_id else None
-
-        processed_paths = set()
-        if not reprocess_existing:
-            q = (
-                db.query(Asset.source_key)
-                .filter(
-                    tenant_column_filter(Asset, tenant),
-                    Asset.source_provider == storage_provider.provider_name,
-                )
-            )
-            if _pid_uuid is not None and storage_provider.provider_name not in GLOBAL_SOURCE_KEY_DEDUPE_PROVIDERS:
-                q = q.filter(Asset.provider_id == _pid_uuid)
-            processed_paths = set(row[0] for row in q.all() if row[0])
-
+        drive_listing: DriveSyncListing | None = None
         try:
             if provider_name == "gphotos" and selected_record is not None:
                 config_json = dict(selected_record.config_json or {})
@@ -213,23 +198,42 @@ async def trigger_sync(
                         picked_media_item_ids=selected_item_ids or None,
                     )
                 else:
-                    file_entries = storage_provider.list_image_entries(sync_folders=sync_folders)
+                    file_entries = storage_provider.iter_image_entries(sync_folders=sync_folders)
+            elif isinstance(storage_provider, GoogleDriveStorageProvider):
+                # Streams the folder walk (or the changes delta once a cursor is stored).
+                drive_listing = DriveSyncListing(
+                    db,
+                    storage_provider,
+                    tenant_id=tenant.id,
+                    provider_id=record_provider_id,
+                    sync_folders=sync_folders,
+                    reprocess_existing=reprocess_existing,
+                )
+                file_entries = drive_listing
             else:
-                file_entries = storage_provider.list_image_entries(sync_folders=sync_folders)
+                file_entries = storage_provider.iter_image_entries(sync_folders=sync_folders)
+
+            # Existing assets are resolved a batch of listed entries at a time.
+            pending_entries = iter_pending_entries(
+                db,
+                tenant,
+                (entry for entry in file_entries if is_supported_media_file(entry.name, entry.mime_type)),
+                provider_name=storage_provider.provider_name,
+                provider_id=record_provider_id,
+                reprocess_existing=reprocess_existing,
+            )
+            pending: PendingEntry | None = next(pending_entries, None)
+            has_more = pending is not None and any(
+                other.entry.source_key != pending.entry.source_key for other in pending_entries
+            )
         except HTTPException:
             raise
         except Exception as exc:
             raise HTTPException(status_code=500, detail=f"Failed to list {storage_provider.provider_name} files: {exc}")
 
-        candidate: ProviderEntry | None = None
-        for entry in file_entries:
-            if not is_supported_media_file(entry.name, entry.mime_type):
-                continue
-            if reprocess_existing or entry.source_key not in processed_paths:
-                candidate = entry
-                break
-
-        if candidate is None:
+        if pending is None:
+            if drive_listing is not None and drive_listing.mark_complete():
+                db.commit()
             return {
                 "tenant_id": tenant.id,
                 "provider": storage_provider.provider_name,
@@ -238,6 +242,7 @@ async def trigger_sync(
                 "has_more": False,
             }
 
+        candidate = pending.entry
         storage_client = storage.Client(project=settings.gcp_project_id)
         thumbnail_bucket = storage_client.bucket(tenant.get_thumbnail_bucket(settings))
 
@@ -250,6 +255,7 @@ async def trigger_sync(
                 thumbnail_bucket=thumbnail_bucket,
                 reprocess_existing=reprocess_existing,
                 provider_id=record_provider_id,
+                pending=pending,
                 log=print,
             )
         except Exception as exc:
@@ -260,13 +266,6 @@ async def trigger_sync(
         processed = 1 if result.status == "processed" else 0
         message = f"{candidate.name}: metadata + thumbnail stored" if processed else f"{candidate.name}: already synced"
 
-        has_more = any(
-            is_supported_media_file(entry.name, entry.mime_type)
-            and (reprocess_existing or entry.source_key not in processed_paths)
-            and entry.source_key != candidate.source_key
-            for entry in file_entries
-        )
-
         return {
             "tenant_id": tenant.id,
             "provider": storage_provider.provider_name,
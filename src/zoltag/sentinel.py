@@ -11,6 +11,7 @@ from sqlalchemy import func
 
 from zoltag.database import SessionLocal
 from zoltag.job_profiles import RUN_PROFILE_LIGHT, RUN_PROFILE_ML
+from zoltag.maintenance_leader import maintenance_lock
 from zoltag.metadata import Job
 from zoltag.settings import settings
 from zoltag.worker import _fire_due_schedule_triggers, _now_utc, _reclaim_stale_leases, _reconcile_workflows_once
@@ -166,32 +167,37 @@ def run_sentinel_tick(*, dry_run: bool = False) -> dict[str, Any]:
     maintenance_errors: list[str] = []
     maintenance: dict[str, str] = {}
 
-    if bool(settings.sentinel_enable_lease_reclaim):
-        try:
-            _reclaim_stale_leases()
-            maintenance["lease_reclaim"] = "ok"
-        except Exception as exc:  # noqa: BLE001
-            maintenance["lease_reclaim"] = "error"
-            maintenance_errors.append(f"lease_reclaim: {exc}")
-            logger.exception("Sentinel lease reclaim failed")
-
-    if bool(settings.sentinel_enable_workflow_reconcile):
-        try:
-            _reconcile_workflows_once(limit_runs=max(1, int(settings.sentinel_workflow_reconcile_limit or 25)))
-            maintenance["workflow_reconcile"] = "ok"
-        except Exception as exc:  # noqa: BLE001
-            maintenance["workflow_reconcile"] = "error"
-            maintenance_errors.append(f"workflow_reconcile: {exc}")
-            logger.exception("Sentinel workflow reconcile failed")
-
-    if bool(settings.sentinel_enable_schedule_tick):
-        try:
-            _fire_due_schedule_triggers()
-            maintenance["schedule_tick"] = "ok"
-        except Exception as exc:  # noqa: BLE001
-            maintenance["schedule_tick"] = "error"
-            maintenance_errors.append(f"schedule_tick: {exc}")
-            logger.exception("Sentinel schedule tick failed")
+    # Overlapping ticks (or a worker running maintenance) hold the shared lock.
+    with maintenance_lock() as is_maintenance_leader:
+        if not is_maintenance_leader:
+            maintenance["leader"] = "skipped"
+        else:
+            if bool(settings.sentinel_enable_lease_reclaim):
+                try:
+                    _reclaim_stale_leases()
+                    maintenance["lease_reclaim"] = "ok"
+                except Exception as exc:  # noqa: BLE001
+                    maintenance["lease_reclaim"] = "error"
+                    maintenance_errors.append(f"lease_reclaim: {exc}")
+                    logger.exception("Sentinel lease reclaim failed")
+
+            if bool(settings.sentinel_enable_workflow_reconcile):
+                try:
+                    _reconcile_workflows_once(limit_runs=max(1, int(settings.sentinel_workflow_reconcile_limit or 25)))
+                    maintenance["workflow_reconcile"] = "ok"
+                except Exception as exc:  # noqa: BLE001
+                    maintenance["workflow_reconcile"] = "error"
+                    maintenance_errors.append(f"workflow_reconcile: {exc}")
+                    logger.exception("Sentinel workflow reconcile failed")
+
+            if bool(settings.sentinel_enable_schedule_tick):
+                try:
+                    _fire_due_schedule_triggers()
+                    maintenance["schedule_tick"] = "ok"
+                except Exception as exc:  # noqa: BLE001
+                    maintenance["schedule_tick"] = "error"
+                    maintenance_errors.append(f"schedule_tick: {exc}")
+                    logger.exception("Sentinel schedule tick failed")
 
     queue = _collect_queue_snapshot()
     dispatch_profiles: dict[str, dict[str, Any]] = {}
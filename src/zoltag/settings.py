@@ -48,6 +48,12 @@ class Settings(BaseSettings):
     worker_db_statement_timeout_ms: int = 45000
     worker_db_lock_timeout_ms: int = 3000
     worker_db_idle_in_transaction_session_timeout_ms: int = 15000
+    # Per-asset jobs enqueued within this many seconds are merged into one queued job (see job_coalescing).
+    job_coalesce_window_seconds: int = 30
+    # Maximum asset ids carried by one coalesced job; further ids start a new job.
+    job_coalesce_max_batch: int = 500
+    # Edits touching more assets than this refresh the text index from a coalesced job instead of inline.
+    text_index_inline_max_assets: int = 5
 
     # Sentinel / burst worker dispatch
     sentinel_auth_token: Optional[str] = None
@@ -118,11 +124,23 @@ class Settings(BaseSettings):
     face_recognition_min_references: int = 3
     # Confidence threshold [0-1] for writing face-recognition suggestions.
     face_recognition_suggest_threshold: float = 0.45
+    # Directory for the persistent keyword-prompt text embedding cache. None = <local_data_dir>/text-embeddings.
+    text_embedding_cache_dir: Optional[str] = None
+    # Maximum prompts kept per model in the text embedding cache (least recently used are dropped on save).
+    text_embedding_cache_max_entries: int = 20000
     
     # API
+    # Token-bucket backend for tenant rate limits: 'auto' (Postgres unless local/SQLite), 'postgres' or 'memory'.
+    rate_limit_backend: str = "auto"
     api_host: str = "0.0.0.0"
     api_port: int = 8080
     api_workers: int = 4
+    # Bearer token for the Prometheus /metrics endpoint. None = endpoint disabled.
+    metrics_token: Optional[str] = None
+    # Allow super admins to run the sampling profiler (/api/v1/admin/profiling/profile).
+    profiling_enabled: bool = False
+    # Warn (and count) when one SQL statement shape runs this many times in a request. 0 = off.
+    sql_repeated_statement_warn: int = 25
     
     # Application URL (for OAuth redirects)
     app_url: str = "http://localhost:8080"  # Update for production
@@ -148,11 +166,28 @@ class Settings(BaseSettings):
     # Email (Resend)
     email_resend_api_key: Optional[str] = None
     email_from_address: str = "Zoltag <info@zoltag.com>"
+    # "resend", or "file" to write outgoing mail to email_file_sink_dir instead of sending it.
+    email_transport: str = "resend"
+    # None = <local_data_dir>/email-outbox
+    email_file_sink_dir: Optional[str] = None
+    # Messages per worker send (Resend's batch API accepts at most 100).
+    email_outbox_batch_size: int = 100
+    email_outbox_max_attempts: int = 5
+    # Sent and failed outbox rows are deleted after this many days. 0 = keep them.
+    email_outbox_retention_days: int = 7
+    # Per-tenant send rate; excess mail waits in the outbox. 0 = unlimited.
+    email_tenant_max_per_minute: int = 120
 
     # Local / Desktop mode
     local_mode: bool = False
     local_data_dir: str = str(Path.home() / ".zoltag")
     local_tenant_id: Optional[str] = None
+    # Threads ingesting new/changed files in local mode (each has its own DB session).
+    local_index_workers: int = 2
+    # Memory-mapped vector store used for similarity search when pgvector is unavailable.
+    local_vector_store_enabled: bool = True
+    # Directory for vector store files. None = <local_data_dir>/vector-store.
+    local_vector_store_dir: Optional[str] = None
 
     @property
     def thumbnail_bucket(self) -> str:
@@ -3,7 +3,9 @@
 from .providers import (
     StorageProvider,
     ProviderEntry,
+    ProviderListingPage,
     ProviderMediaMetadata,
+    ProviderStreamSource,
     DropboxStorageProvider,
     GoogleDriveStorageProvider,
     YouTubeStorageProvider,
@@ -15,7 +17,9 @@ from .providers import (
 __all__ = [
     "StorageProvider",
     "ProviderEntry",
+    "ProviderListingPage",
     "ProviderMediaMetadata",
+    "ProviderStreamSource",
     "DropboxStorageProvider",
     "GoogleDriveStorageProvider",
     "YouTubeStorageProvider",
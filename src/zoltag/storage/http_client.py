@@ -0,0 +1,289 @@
+"""Shared HTTP plumbing for storage providers.
+
+Providers used to open a fresh ``httpx.Client`` (or OAuth session) per API
+call, paying a TCP + TLS handshake every time. This module keeps one pooled,
+keep-alive client per provider for the whole process (HTTP/2 when ``h2`` is
+installed), bounds how many requests each provider has in flight, retries
+throttled responses honouring ``Retry-After``, and caches OAuth access tokens
+across provider instances until shortly before they expire.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple, TypeVar
+
+import httpx
+
+try:
+    import h2  # noqa: F401
+
+    HTTP2_SUPPORTED = True
+except ImportError:
+    HTTP2_SUPPORTED = False
+
+
+DEFAULT_PROVIDER_CONCURRENCY = 8
+PROVIDER_CONCURRENCY_LIMITS: Dict[str, int] = {
+    "gdrive": 8,
+    "gphotos": 8,
+    "youtube": 4,
+    "flickr": 4,
+    "dropbox": 8,
+    "ytimg": 8,
+    "oauth": 4,
+}
+
+RETRY_STATUS_CODES = frozenset({429, 503})
+MAX_RETRIES = 4
+BACKOFF_BASE_SECONDS = 0.5
+MAX_BACKOFF_SECONDS = 30.0
+# Refresh tokens this long before the provider says they expire.
+TOKEN_EXPIRY_MARGIN_SECONDS = 60
+
+_POOL_LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=16, keepalive_expiry=60)
+
+_lock = threading.Lock()
+_clients: Dict[str, httpx.Client] = {}
+_async_clients: Dict[Tuple[int, str], Tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = {}
+_semaphores: Dict[str, threading.BoundedSemaphore] = {}
+_oauth1_sessions: Dict[Tuple[str, ...], Any] = {}
+
+ResponseT = TypeVar("ResponseT")
+
+
+def get_client(provider: str) -> httpx.Client:
+    """Return the process-wide pooled client for ``provider``."""
+    with _lock:
+        client = _clients.get(provider)
+        if client is None or client.is_closed:
+            client = httpx.Client(
+                http2=HTTP2_SUPPORTED,
+                limits=_POOL_LIMITS,
+                timeout=60,
+                follow_redirects=True,
+            )
+            _clients[provider] = client
+        return client
+
+
+def get_async_client(provider: str) -> httpx.AsyncClient:
+    """Return a pooled async client for ``provider`` bound to the running loop.
+
+    Async connection pools cannot be shared across event loops, so one client
+    is kept per loop; clients of closed loops are dropped.
+    """
+    loop = asyncio.get_running_loop()
+    with _lock:
+        for key, (owner, _) in list(_async_clients.items()):
+            if owner.is_closed():
+                del _async_clients[key]
+        entry = _async_clients.get((id(loop), provider))
+        if entry is None or entry[0] is not loop or entry[1].is_closed:
+            client = httpx.AsyncClient(
+                http2=HTTP2_SUPPORTED,
+                limits=_POOL_LIMITS,
+                timeout=60,
+                follow_redirects=True,
+            )
+            entry = (loop, client)
+            _async_clients[(id(loop), provider)] = entry
+        return entry[1]
+
+
+def close_clients() -> None:
+    """Close pooled sync clients and forget async ones (CLI exit and tests)."""
+    with _lock:
+        clients = list(_clients.values())
+        _clients.clear()
+        _async_clients.clear()
+        sessions = list(_oauth1_sessions.values())
+        _oauth1_sessions.clear()
+    for client in clients:
+        client.close()
+    for session in sessions:
+        session.close()
+
+
+async def aclose_clients() -> None:
+    """Close every pooled client, awaiting async clients of the running loop."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        async_clients = [client for owner, client in _async_clients.values() if owner is loop]
+    close_clients()
+    for client in async_clients:
+        await client.aclose()
+
+
+@contextmanager
+def provider_slot(provider: str) -> Iterator[None]:
+    """Hold one of ``provider``'s concurrent request slots."""
+    with _lock:
+        semaphore = _semaphores.get(provider)
+        if semaphore is None:
+            semaphore = threading.BoundedSemaphore(
+                PROVIDER_CONCURRENCY_LIMITS.get(provider, DEFAULT_PROVIDER_CONCURRENCY)
+            )
+            _semaphores[provider] = semaphore
+    with semaphore:
+        yield
+
+
+def _retry_after_seconds(headers: Any) -> Optional[float]:
+    value = headers.get("Retry-After") if headers is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _backoff_seconds(attempt: int, response: Any) -> float:
+    delay = _retry_after_seconds(getattr(response, "headers", None))
+    if delay is None:
+        delay = BACKOFF_BASE_SECONDS * (2 ** attempt)
+        delay += random.uniform(0, delay / 2)
+    return min(delay, MAX_BACKOFF_SECONDS)
+
+
+def send_with_backoff(provider: str, send: Callable[[], ResponseT], *, max_retries: int = MAX_RETRIES) -> ResponseT:
+    """Call ``send`` inside a provider slot, retrying 429/503 with backoff.
+
+    ``send`` may return any response object exposing ``status_code`` and
+    ``headers`` (httpx or requests). The slot is released while sleeping so a
+    throttled provider does not starve its own queue. The last response is
+    returned as-is once retries are exhausted.
+    """
+    attempt = 0
+    while True:
+        with provider_slot(provider):
+            response = send()
+        if response.status_code not in RETRY_STATUS_CODES or attempt >= max_retries:
+            return response
+        time.sleep(_backoff_seconds(attempt, response))
+        attempt += 1
+
+
+def request(
+    provider: str,
+    method: str,
+    url: str,
+    *,
+    token: Optional["OAuthRefreshToken"] = None,
+    headers: Optional[Dict[str, str]] = None,
+    **kwargs: Any,
+) -> httpx.Response:
+    """Send a request on the provider's pooled client with throttling and retries.
+
+    When ``token`` is given its bearer token is attached; a 401 invalidates the
+    cached token and the request is retried once with a fresh one.
+    """
+    client = get_client(provider)
+
+    def send() -> httpx.Response:
+        request_headers = dict(headers or {})
+        if token is not None:
+            request_headers["Authorization"] = f"Bearer {token.get()}"
+        return client.request(method, url, headers=request_headers, **kwargs)
+
+    response = send_with_backoff(provider, send)
+    if response.status_code == 401 and token is not None:
+        token.invalidate()
+        response = send_with_backoff(provider, send)
+    return response
+
+
+class OAuthRefreshToken:
+    """An OAuth2 refresh-token grant whose access tokens are cached per process.
+
+    Instances built from the same credentials share one cached access token, so
+    short-lived provider objects (one per request or sync job) stop refreshing
+    on every construction.
+    """
+
+    _cache: Dict[Tuple[str, str, str], Tuple[str, float]] = {}
+    _key_locks: Dict[Tuple[str, str, str], threading.Lock] = {}
+
+    def __init__(self, *, token_url: str, client_id: str, client_secret: str, refresh_token: str, label: str):
+        self.token_url = token_url
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.refresh_token = refresh_token
+        self.label = label
+        self._key = (token_url, client_id, refresh_token)
+
+    def _cached(self) -> Optional[str]:
+        cached = self._cache.get(self._key)
+        if cached and time.time() < cached[1]:
+            return cached[0]
+        return None
+
+    def get(self) -> str:
+        """Return a valid access token, refreshing it at most once across threads."""
+        token = self._cached()
+        if token:
+            return token
+        with _lock:
+            key_lock = self._key_locks.setdefault(self._key, threading.Lock())
+        with key_lock:
+            token = self._cached()
+            if token:
+                return token
+            return self._refresh()
+
+    def invalidate(self) -> None:
+        self._cache.pop(self._key, None)
+
+    def _refresh(self) -> str:
+        response = request(
+            "oauth",
+            "POST",
+            self.token_url,
+            data={
+                "client_id": self.client_id,
+                "client_secret": self.client_secret,
+                "refresh_token": self.refresh_token,
+                "grant_type": "refresh_token",
+            },
+            timeout=30,
+        )
+        if response.status_code >= 400:
+            raise RuntimeError(f"Failed to refresh {self.label} access token: {response.text}")
+
+        payload = response.json()
+        access_token = payload.get("access_token")
+        expires_in = int(payload.get("expires_in") or 3600)
+        if not access_token:
+            raise RuntimeError(f"{self.label} token response missing access_token")
+
+        expires_at = time.time() + max(0, expires_in - TOKEN_EXPIRY_MARGIN_SECONDS)
+        self._cache[self._key] = (access_token, expires_at)
+        return access_token
+
+
+def get_oauth1_session(*, client_key: str, client_secret: str, resource_owner_key: str, resource_owner_secret: str):
+    """Return a shared, keep-alive OAuth 1.0a session for one set of credentials."""
+    key = (client_key, client_secret, resource_owner_key, resource_owner_secret)
+    with _lock:
+        session = _oauth1_sessions.get(key)
+        if session is None:
+            from requests_oauthlib import OAuth1Session
+
+            session = OAuth1Session(
+                client_key=client_key,
+                client_secret=client_secret,
+                resource_owner_key=resource_owner_key,
+                resource_owner_secret=resource_owner_secret,
+            )
+            _oauth1_sessions[key] = session
+        return session
@@ -6,11 +6,13 @@ import hashlib
 import mimetypes
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Sequence
+from typing import Iterator, Optional, Sequence
 
 from zoltag.storage.providers import (
     ProviderEntry,
+    ProviderListingPage,
     ProviderMediaMetadata,
+    ProviderStreamSource,
     StorageProvider,
 )
 
@@ -30,16 +32,19 @@ class LocalFilesystemProvider(StorageProvider):
     """
 
     provider_name = "local"
+    supports_range_reads = True
+    LIST_PAGE_SIZE = 500
 
     def __init__(self, thumbnail_dir: Path):
         self._thumbnail_dir = thumbnail_dir
         self._thumbnail_dir.mkdir(parents=True, exist_ok=True)
 
-    def list_image_entries(
-        self, sync_folders: Optional[Sequence[str]] = None
-    ) -> list[ProviderEntry]:
-        """Walk configured sync folders and return one entry per image file."""
-        entries: list[ProviderEntry] = []
+    def iter_entry_pages(
+        self, sync_folders: Optional[Sequence[str]] = None, checkpoint: Optional[str] = None
+    ) -> Iterator[ProviderListingPage]:
+        """Walk configured sync folders, yielding image entries in fixed-size batches."""
+        _ = checkpoint  # Directory walks are cheap to restart.
+        batch: list[ProviderEntry] = []
         for folder in sync_folders or []:
             root = Path(folder)
             if not root.is_dir():
@@ -47,13 +52,14 @@ class LocalFilesystemProvider(StorageProvider):
             for path in root.rglob("*"):
                 if path.is_file() and path.suffix.lower() in IMAGE_EXTENSIONS:
                     try:
-                        entries.append(self._entry_from_path(path))
+                        batch.append(self._entry_from_path(path))
                     except OSError:
-                        pass
-        entries.sort(
-            key=lambda e: e.modified_time or datetime.min, reverse=True
-        )
-        return entries
+                        continue
+                    if len(batch) >= self.LIST_PAGE_SIZE:
+                        yield ProviderListingPage(entries=batch)
+                        batch = []
+        if batch:
+            yield ProviderListingPage(entries=batch)
 
     def get_entry(self, source_key: str) -> ProviderEntry:
         return self._entry_from_path(Path(source_key))
@@ -65,6 +71,14 @@ class LocalFilesystemProvider(StorageProvider):
     def download_file(self, source_key: str) -> bytes:
         return Path(source_key).read_bytes()
 
+    def read_range(self, source_key: str, start: int, length: int) -> bytes:
+        with open(source_key, "rb") as handle:
+            handle.seek(start)
+            return handle.read(max(0, length))
+
+    def get_stream_source(self, source_key: str) -> Optional[ProviderStreamSource]:
+        return ProviderStreamSource(url=source_key)
+
     def get_thumbnail(self, source_key: str, size: str = "w640h480") -> Optional[bytes]:
         thumbnail_path = self._thumbnail_path(source_key)
         if thumbnail_path.exists():
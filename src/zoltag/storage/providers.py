@@ -4,19 +4,27 @@ from __future__ import annotations
 
 import mimetypes
 import json
+import sys
 from abc import ABC, abstractmethod
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
-from typing import Any, Callable, Dict, Optional, Sequence
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional, Sequence
 
+import anyio
 import httpx
 
 from zoltag.settings import settings
+from zoltag.storage import http_client
 
 
-@dataclass
+@dataclass(slots=True)
 class ProviderEntry:
-    """Normalized storage file metadata used by ingestion/sync paths."""
+    """Normalized storage file metadata used by ingestion/sync paths.
+
+    Slotted, with the provider and MIME type strings interned, because full
+    library listings create one of these per file.
+    """
 
     provider: str
     source_key: str
@@ -30,6 +38,24 @@ class ProviderEntry:
     mime_type: Optional[str] = None
     no_download: bool = False
 
+    def __post_init__(self) -> None:
+        self.provider = sys.intern(self.provider)
+        if self.mime_type is not None:
+            self.mime_type = sys.intern(self.mime_type)
+
+
+@dataclass
+class ProviderListingPage:
+    """One provider page of listing results.
+
+    Passing ``checkpoint`` back to ``iter_entry_pages`` resumes the listing
+    right after this page. It is None on the last page and for listings that
+    cannot be resumed mid-way.
+    """
+
+    entries: list[ProviderEntry]
+    checkpoint: Optional[str] = None
+
 
 @dataclass
 class ProviderMediaMetadata:
@@ -39,14 +65,69 @@ class ProviderMediaMetadata:
     provider_properties: Dict[str, Any] = field(default_factory=dict)
 
 
+@dataclass
+class ProviderStreamSource:
+    """A URL (or local path) that ffmpeg-style readers can open and seek directly."""
+
+    url: str
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
 class StorageProvider(ABC):
     """Abstract storage provider contract."""
 
     provider_name: str
+    # True when read_range fetches only the requested bytes instead of the whole file.
+    supports_range_reads: bool = False
 
     @abstractmethod
+    def iter_entry_pages(
+        self,
+        sync_folders: Optional[Sequence[str]] = None,
+        checkpoint: Optional[str] = None,
+    ) -> Iterator[ProviderListingPage]:
+        """Yield candidate entries for sync one provider page at a time."""
+
+    def iter_image_entries(
+        self,
+        sync_folders: Optional[Sequence[str]] = None,
+        checkpoint: Optional[str] = None,
+    ) -> Iterator[ProviderEntry]:
+        """Yield candidate entries as pages arrive, in provider order."""
+        for page in self.iter_entry_pages(sync_folders, checkpoint=checkpoint):
+            yield from page.entries
+
+    async def aiter_entry_pages(
+        self,
+        sync_folders: Optional[Sequence[str]] = None,
+        checkpoint: Optional[str] = None,
+    ) -> AsyncIterator[ProviderListingPage]:
+        """Async ``iter_entry_pages``; each page is fetched on a worker thread."""
+        pages = self.iter_entry_pages(sync_folders, checkpoint=checkpoint)
+        while True:
+            page = await anyio.to_thread.run_sync(next, pages, None)
+            if page is None:
+                return
+            yield page
+
+    async def aiter_image_entries(
+        self,
+        sync_folders: Optional[Sequence[str]] = None,
+        checkpoint: Optional[str] = None,
+    ) -> AsyncIterator[ProviderEntry]:
+        async for page in self.aiter_entry_pages(sync_folders, checkpoint=checkpoint):
+            for entry in page.entries:
+                yield entry
+
     def list_image_entries(self, sync_folders: Optional[Sequence[str]] = None) -> list[ProviderEntry]:
-        """List candidate image entries for sync."""
+        """List every candidate entry, newest first.
+
+        This holds the whole library in memory; sync paths should stream
+        ``iter_image_entries`` instead.
+        """
+        entries = list(self.iter_image_entries(sync_folders))
+        entries.sort(key=lambda item: item.modified_time or datetime.min, reverse=True)
+        return entries
 
     @abstractmethod
     def get_entry(self, source_key: str) -> ProviderEntry:
@@ -60,6 +141,13 @@ class StorageProvider(ABC):
     def download_file(self, source_key: str) -> bytes:
         """Download full file bytes."""
 
+    def read_range(self, source_key: str, start: int, length: int) -> bytes:
+        """Read ``length`` bytes from ``start``; shorter at end of file.
+
+        Providers without ranged reads download the whole file.
+        """
+        return self.download_file(source_key)[start:start + length]
+
     @abstractmethod
     def get_thumbnail(self, source_key: str, size: str = "w640h480") -> Optional[bytes]:
         """Fetch a thumbnail if available; return None when unsupported."""
@@ -70,6 +158,14 @@ class StorageProvider(ABC):
         _ = expires_seconds
         return None
 
+    def get_stream_source(self, source_key: str) -> Optional[ProviderStreamSource]:
+        """Return a seekable source for server-side media probing, or None.
+
+        Callers fall back to ``download_file`` when this returns None.
+        """
+        _ = source_key
+        return None
+
     def resolve_source_key(self, source_key: Optional[str], image: Any = None) -> Optional[str]:
         """Resolve source key from storage data with optional legacy fallback."""
         value = (source_key or "").strip()
@@ -80,10 +176,85 @@ class StorageProvider(ABC):
         return value
 
 
+def _ranged_get(
+    provider: str,
+    url: str,
+    start: int,
+    length: int,
+    headers: Optional[Dict[str, str]] = None,
+    token: Optional[http_client.OAuthRefreshToken] = None,
+) -> bytes:
+    """GET ``length`` bytes from ``start`` with an HTTP Range header."""
+    if length <= 0:
+        return b""
+    request_headers = dict(headers or {})
+    request_headers["Range"] = f"bytes={start}-{start + length - 1}"
+    response = http_client.request(provider, "GET", url, headers=request_headers, token=token)
+    if response.status_code == 416:
+        return b""
+    if response.status_code >= 400:
+        raise RuntimeError(f"Ranged read failed with HTTP {response.status_code}: {response.text[:200]}")
+    if response.status_code == 206:
+        return response.content
+    # The server ignored the Range header and sent the whole file.
+    return response.content[start:start + length]
+
+
+def _encode_checkpoint(source_index: int, page_token: Optional[str]) -> str:
+    return json.dumps({"source": source_index, "page": page_token}, separators=(",", ":"))
+
+
+def _decode_checkpoint(checkpoint: Optional[str]) -> tuple[int, Optional[str]]:
+    if not checkpoint:
+        return 0, None
+    try:
+        payload = json.loads(checkpoint)
+        return int(payload.get("source") or 0), payload.get("page") or None
+    except (TypeError, ValueError, AttributeError) as exc:
+        raise ValueError(f"Invalid listing checkpoint: {checkpoint!r}") from exc
+
+
+def _iter_source_pages(
+    sources: Sequence[Any],
+    fetch_page: Callable[[Any, Optional[str]], tuple[list[ProviderEntry], Optional[str]]],
+    checkpoint: Optional[str] = None,
+) -> Iterator[ProviderListingPage]:
+    """Chain the paged listings of several sources (folders, albums, playlists).
+
+    ``fetch_page(source, page_token)`` returns ``(entries, next_page_token)``.
+    With more than one source, entries already yielded under an earlier source
+    are dropped.
+    """
+    start_index, page_token = _decode_checkpoint(checkpoint)
+    seen: Optional[set[str]] = set() if len(sources) > 1 else None
+    for index in range(start_index, len(sources)):
+        while True:
+            entries, next_page_token = fetch_page(sources[index], page_token)
+            if seen is not None:
+                entries = [entry for entry in entries if entry.source_key not in seen]
+                seen.update(entry.source_key for entry in entries)
+            if next_page_token:
+                next_checkpoint = _encode_checkpoint(index, next_page_token)
+            elif index + 1 < len(sources):
+                next_checkpoint = _encode_checkpoint(index + 1, None)
+            else:
+                next_checkpoint = None
+            yield ProviderListingPage(entries=entries, checkpoint=next_checkpoint)
+            if not next_page_token:
+                break
+            page_token = next_page_token
+        page_token = None
+
+
 class DropboxStorageProvider(StorageProvider):
     """Dropbox-backed storage provider."""
 
     provider_name = "dropbox"
+    supports_range_reads = True
+    # Dropbox temporary links live for four hours; reuse them well inside that.
+    _TEMPORARY_LINK_TTL = timedelta(hours=1)
+    # Page size used when regrouping a DropboxClient wrapper's streamed listing.
+    LIST_PAGE_SIZE = 1000
 
     def __init__(
         self,
@@ -93,6 +264,7 @@ class DropboxStorageProvider(StorageProvider):
         app_secret: Optional[str] = None,
         client: Optional[Any] = None,
     ):
+        self._temporary_links: Dict[str, tuple[str, datetime]] = {}
         if client is not None:
             self._client = client
             return
@@ -109,10 +281,6 @@ class DropboxStorageProvider(StorageProvider):
     def _files_list_folder(self, path: str, recursive: bool) -> Any:
         if hasattr(self._client, "files_list_folder"):
             return self._client.files_list_folder(path, recursive=recursive)
-        if hasattr(self._client, "list_folder"):
-            # DropboxClient wrapper yields FileMetadata entries directly.
-            entries = list(self._client.list_folder(path, recursive=recursive))
-            return type("ListFolderResult", (), {"entries": entries, "has_more": False, "cursor": None})
         raise RuntimeError("Dropbox client does not support folder listing")
 
     def _files_list_folder_continue(self, cursor: str) -> Any:
@@ -148,30 +316,48 @@ class DropboxStorageProvider(StorageProvider):
             mime_type=mimetypes.guess_type(getattr(metadata, "name", source_key.rsplit("/", 1)[-1]))[0],
         )
 
-    def list_image_entries(self, sync_folders: Optional[Sequence[str]] = None) -> list[ProviderEntry]:
+    def iter_entry_pages(
+        self,
+        sync_folders: Optional[Sequence[str]] = None,
+        checkpoint: Optional[str] = None,
+    ) -> Iterator[ProviderListingPage]:
+        """Yield one page per list_folder call; checkpoints carry the Dropbox cursor."""
         from dropbox.files import FileMetadata
 
         folders = [folder for folder in (sync_folders or []) if isinstance(folder, str)]
         if not folders:
             folders = [""]
 
-        entries: list[ProviderEntry] = []
-        for folder in folders:
-            result = self._files_list_folder(folder, recursive=True)
-            for metadata in getattr(result, "entries", []) or []:
-                if isinstance(metadata, FileMetadata):
-                    entries.append(self._entry_from_dropbox_metadata(metadata))
+        if not hasattr(self._client, "files_list_folder") and hasattr(self._client, "list_folder"):
+            # DropboxClient wrapper pages internally and yields FileMetadata
+            # entries directly; regroup them into pages (not resumable).
+            for folder in folders:
+                batch: list[ProviderEntry] = []
+                for metadata in self._client.list_folder(folder, recursive=True):
+                    if isinstance(metadata, FileMetadata):
+                        batch.append(self._entry_from_dropbox_metadata(metadata))
+                    if len(batch) >= self.LIST_PAGE_SIZE:
+                        yield ProviderListingPage(entries=batch)
+                        batch = []
+                if batch:
+                    yield ProviderListingPage(entries=batch)
+            return
 
+        def fetch_page(folder: str, cursor: Optional[str]) -> tuple[list[ProviderEntry], Optional[str]]:
+            if cursor:
+                result = self._files_list_folder_continue(cursor)
+            else:
+                result = self._files_list_folder(folder, recursive=True)
+            entries = [
+                self._entry_from_dropbox_metadata(metadata)
+                for metadata in getattr(result, "entries", []) or []
+                if isinstance(metadata, FileMetadata)
+            ]
             # Preserve existing behavior: avoid paginating root sync by default.
-            should_paginate = bool(folder)
-            while should_paginate and getattr(result, "has_more", False):
-                result = self._files_list_folder_continue(result.cursor)
-                for metadata in getattr(result, "entries", []) or []:
-                    if isinstance(metadata, FileMetadata):
-                        entries.append(self._entry_from_dropbox_metadata(metadata))
+            has_more = bool(folder) and getattr(result, "has_more", False)
+            return entries, (result.cursor if has_more else None)
 
-        entries.sort(key=lambda item: item.modified_time or datetime.min, reverse=True)
-        return entries
+        yield from _iter_source_pages(folders, fetch_page, checkpoint)
 
     def get_entry(self, source_key: str) -> ProviderEntry:
         metadata = self._get_metadata(source_key, include_media_info=False)
@@ -239,6 +425,28 @@ class DropboxStorageProvider(StorageProvider):
             return self._client.download_file(source_key)
         raise RuntimeError("Dropbox client does not support file download")
 
+    def read_range(self, source_key: str, start: int, length: int) -> bytes:
+        # files_download has no Range support; a temporary link does.
+        link = self._temporary_link(source_key)
+        if not link:
+            return super().read_range(source_key, start, length)
+        return _ranged_get(self.provider_name, link, start, length)
+
+    def get_stream_source(self, source_key: str) -> Optional[ProviderStreamSource]:
+        link = self._temporary_link(source_key)
+        return ProviderStreamSource(url=link) if link else None
+
+    def _temporary_link(self, source_key: str) -> Optional[str]:
+        cached = self._temporary_links.get(source_key)
+        if cached and cached[1] > datetime.utcnow():
+            return cached[0]
+        link = self.get_playback_url(source_key)
+        if link:
+            if len(self._temporary_links) >= 256:
+                self._temporary_links.clear()
+            self._temporary_links[source_key] = (link, datetime.utcnow() + self._TEMPORARY_LINK_TTL)
+        return link
+
     def get_thumbnail(self, source_key: str, size: str = "w640h480") -> Optional[bytes]:
         if hasattr(self._client, "get_thumbnail"):
             return self._client.get_thumbnail(source_key, size=size)
@@ -302,9 +510,21 @@ class GoogleDriveStorageProvider(StorageProvider):
     """Google Drive-backed storage provider (OAuth refresh-token flow)."""
 
     provider_name = "gdrive"
+    supports_range_reads = True
 
     _drive_base_url = "https://www.googleapis.com/drive/v3"
     _token_url = "https://oauth2.googleapis.com/token"
+    _token_label = "Google Drive"
+    _MEDIA_QUERY = "(mimeType contains 'image/' or mimeType contains 'video/')"
+    _FOLDER_MIME_TYPE = "application/vnd.google-apps.folder"
+    _FILE_FIELDS = (
+        "id,name,mimeType,size,md5Checksum,modifiedTime,createdTime,version,"
+        "imageMediaMetadata(width,height,time,location),"
+        "videoMediaMetadata(width,height,durationMillis),"
+        "appProperties,properties"
+    )
+    # Folder pages fetched concurrently while walking sync folders.
+    LIST_CONCURRENCY = 8
 
     def __init__(self, *, client_id: str, client_secret: str, refresh_token: str):
         if not client_id or not client_secret or not refresh_token:
@@ -312,93 +532,180 @@ class GoogleDriveStorageProvider(StorageProvider):
         self._client_id = client_id
         self._client_secret = client_secret
         self._refresh_token = refresh_token
-        self._access_token: Optional[str] = None
-        self._access_token_expires_at: Optional[datetime] = None
+        self._token = http_client.OAuthRefreshToken(
+            token_url=self._token_url,
+            client_id=client_id,
+            client_secret=client_secret,
+            refresh_token=refresh_token,
+            label=self._token_label,
+        )
+        # Folder id -> display path for every folder reached by the last listing.
+        self.folder_paths: Dict[str, str] = {}
+        self.next_changes_token: Optional[str] = None
 
-    def list_image_entries(self, sync_folders: Optional[Sequence[str]] = None) -> list[ProviderEntry]:
+    def iter_entry_pages(
+        self,
+        sync_folders: Optional[Sequence[str]] = None,
+        checkpoint: Optional[str] = None,
+    ) -> Iterator[ProviderListingPage]:
+        """Yield image/video entries page by page as Drive returns them.
+
+        Sync folders are walked breadth-first with up to ``LIST_CONCURRENCY``
+        folder pages in flight; ``folder_paths`` records every folder reached
+        so a later ``iter_changed_entries`` call can scope deltas to them.
+        Only the flat (no sync folders) listing carries checkpoints; folder
+        walks resume through the changes feed instead.
+        """
         folders = [folder.strip() for folder in (sync_folders or []) if isinstance(folder, str) and folder.strip()]
-        deduped: Dict[str, ProviderEntry] = {}
+        self.folder_paths = {}
         if not folders:
             # No sync folders configured — flat listing; display_path stays as filename only
-            media_query = "(mimeType contains 'image/' or mimeType contains 'video/')"
-            for item in self._list_files(f"trashed = false and {media_query}"):
-                deduped[item.source_key] = item
-        else:
-            for folder_id in folders:
-                # Resolve the top-level folder name to seed the path chain
-                try:
-                    folder_meta = self._get_file(folder_id)
-                    folder_name = folder_meta.get("name", folder_id)
-                except Exception:
-                    folder_name = folder_id
-                for item in self._list_files_recursive(folder_id, _path_segments=[folder_name]):
-                    deduped[item.source_key] = item
-
-        entries = list(deduped.values())
-        entries.sort(key=lambda item: item.modified_time or datetime.min, reverse=True)
-        return entries
+            query = f"trashed = false and {self._MEDIA_QUERY}"
+            yield from _iter_source_pages([query], self._list_files_page, checkpoint)
+            return
 
-    def _list_files_recursive(
+        roots = []
+        for folder_id in folders:
+            # Resolve the top-level folder name to seed the path chain
+            try:
+                folder_name = self._get_file(folder_id).get("name", folder_id)
+            except Exception:
+                folder_name = folder_id
+            roots.append((folder_id, f"/{folder_name}"))
+        yield from self._walk_folders(roots, seen_files=set())
+
+    def get_changes_start_token(self) -> str:
+        """Return the Drive changes token marking "now", taken before a full walk."""
+        response = self._request("GET", "/changes/startPageToken", params={"supportsAllDrives": "true"})
+        token = response.json().get("startPageToken")
+        if not token:
+            raise RuntimeError("Google Drive did not return a changes start page token")
+        return str(token)
+
+    def iter_changed_entries(
         self,
-        folder_id: str,
-        _visited: Optional[set] = None,
-        _path_segments: Optional[list] = None,
-    ) -> list[ProviderEntry]:
-        """Recursively list all image/video files under folder_id, building display paths."""
-        if _visited is None:
-            _visited = set()
-        if folder_id in _visited:
-            return []
-        _visited.add(folder_id)
-
-        current_segments = _path_segments or []
-        media_query = "(mimeType contains 'image/' or mimeType contains 'video/')"
-        raw_entries = self._list_files(f"'{folder_id}' in parents and trashed = false and {media_query}")
-
-        entries = []
-        for entry in raw_entries:
-            folder_prefix = "/" + "/".join(current_segments) if current_segments else ""
-            entry.display_path = f"{folder_prefix}/{entry.name}"
-            entries.append(entry)
-
-        subfolder_query = (
-            f"'{folder_id}' in parents and trashed = false"
-            " and mimeType = 'application/vnd.google-apps.folder'"
-        )
-        for subfolder_id, subfolder_name in self._list_folder_children(subfolder_query):
-            entries.extend(
-                self._list_files_recursive(
-                    subfolder_id,
-                    _visited=_visited,
-                    _path_segments=current_segments + [subfolder_name],
-                )
+        page_token: str,
+        folder_paths: Optional[Dict[str, str]] = None,
+    ) -> Iterator[ProviderEntry]:
+        """Yield image/video entries changed since ``page_token``.
+
+        With ``folder_paths`` (folder id -> display path from the last walk),
+        only files directly inside known folders are yielded; folders newly
+        created or moved under them are walked in full and added. Once the
+        feed is exhausted ``next_changes_token`` holds the token to store.
+        """
+        self.folder_paths = folder_paths if folder_paths is not None else {}
+        self.next_changes_token = None
+        seen_files: set = set()
+        next_page_token: Optional[str] = page_token
+        while next_page_token:
+            response = self._request(
+                "GET",
+                "/changes",
+                params={
+                    "pageToken": next_page_token,
+                    "fields": f"nextPageToken,newStartPageToken,changes(fileId,removed,file({self._FILE_FIELDS},parents,trashed))",
+                    "pageSize": "1000",
+                    "spaces": "drive",
+                    "includeItemsFromAllDrives": "true",
+                    "supportsAllDrives": "true",
+                },
             )
-
-        return entries
-
-    def _list_folder_children(self, query: str) -> list:
-        """Return (id, name) pairs for folders matching query."""
-        results = []
-        next_page_token: Optional[str] = None
-        while True:
-            params: Dict[str, str] = {
-                "q": query,
-                "fields": "nextPageToken,files(id,name)",
-                "pageSize": "1000",
-                "includeItemsFromAllDrives": "true",
-                "supportsAllDrives": "true",
-            }
-            if next_page_token:
-                params["pageToken"] = next_page_token
-            response = self._request("GET", "/files", params=params)
             payload = response.json()
-            for item in payload.get("files", []) or []:
-                if item.get("id"):
-                    results.append((item["id"], item.get("name", item["id"])))
+            for change in payload.get("changes") or []:
+                item = change.get("file") or {}
+                if change.get("removed") or not item.get("id") or item.get("trashed"):
+                    continue
+                parent_path = None
+                if folder_paths is not None:
+                    parent_path = next(
+                        (self.folder_paths[parent] for parent in item.get("parents") or [] if parent in self.folder_paths),
+                        None,
+                    )
+                    if parent_path is None:
+                        continue
+                mime_type = str(item.get("mimeType") or "")
+                if mime_type == self._FOLDER_MIME_TYPE:
+                    if folder_paths is not None:
+                        folder_path = f"{parent_path}/{item.get('name', item['id'])}"
+                        if item["id"] in self.folder_paths:
+                            self.folder_paths[item["id"]] = folder_path
+                        else:
+                            for page in self._walk_folders([(item["id"], folder_path)], seen_files=seen_files):
+                                yield from page.entries
+                    continue
+                if not mime_type.startswith(("image/", "video/")) or item["id"] in seen_files:
+                    continue
+                seen_files.add(item["id"])
+                entry = self._entry_from_file(item)
+                if parent_path is not None:
+                    entry.display_path = f"{parent_path}/{entry.name}"
+                yield entry
             next_page_token = payload.get("nextPageToken")
-            if not next_page_token:
-                break
-        return results
+            if payload.get("newStartPageToken"):
+                self.next_changes_token = str(payload["newStartPageToken"])
+
+    def _walk_folders(self, roots: Sequence[tuple[str, str]], seen_files: set) -> Iterator[ProviderListingPage]:
+        """Walk folder trees concurrently, yielding each folder page's media as it lands."""
+        with ThreadPoolExecutor(max_workers=self.LIST_CONCURRENCY, thread_name_prefix="gdrive-list") as pool:
+            pending: Dict[Future, tuple[str, str]] = {}
+
+            def submit(folder_id: str, path: str, page_token: Optional[str] = None) -> None:
+                pending[pool.submit(self._list_folder_page, folder_id, page_token)] = (folder_id, path)
+
+            for folder_id, path in roots:
+                if folder_id not in self.folder_paths:
+                    self.folder_paths[folder_id] = path
+                    submit(folder_id, path)
+            try:
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        folder_id, path = pending.pop(future)
+                        items, next_page_token = future.result()
+                        if next_page_token:
+                            submit(folder_id, path, next_page_token)
+                        entries: list[ProviderEntry] = []
+                        for item in items:
+                            item_id = item.get("id")
+                            if not item_id:
+                                continue
+                            if item.get("mimeType") == self._FOLDER_MIME_TYPE:
+                                if item_id not in self.folder_paths:
+                                    child_path = f"{path}/{item.get('name', item_id)}"
+                                    self.folder_paths[item_id] = child_path
+                                    submit(item_id, child_path)
+                                continue
+                            if item_id in seen_files:
+                                continue
+                            seen_files.add(item_id)
+                            entry = self._entry_from_file(item)
+                            entry.display_path = f"{path}/{entry.name}"
+                            entries.append(entry)
+                        if entries:
+                            yield ProviderListingPage(entries=entries)
+            finally:
+                # The consumer may stop early; do not start queued folder pages.
+                for future in pending:
+                    future.cancel()
+
+    def _list_folder_page(self, folder_id: str, page_token: Optional[str]) -> tuple[list[Dict[str, Any]], Optional[str]]:
+        """Fetch one page of a folder's media files and subfolders (subfolders first)."""
+        params: Dict[str, str] = {
+            "q": (
+                f"'{folder_id}' in parents and trashed = false"
+                f" and ({self._MEDIA_QUERY} or mimeType = '{self._FOLDER_MIME_TYPE}')"
+            ),
+            "fields": f"nextPageToken,files({self._FILE_FIELDS})",
+            "orderBy": "folder,modifiedTime desc",
+            "pageSize": "1000",
+            "includeItemsFromAllDrives": "true",
+            "supportsAllDrives": "true",
+        }
+        if page_token:
+            params["pageToken"] = page_token
+        payload = self._request("GET", "/files", params=params).json()
+        return list(payload.get("files") or []), payload.get("nextPageToken")
 
     def get_entry(self, source_key: str) -> ProviderEntry:
         file_obj = self._get_file(source_key)
@@ -463,6 +770,21 @@ class GoogleDriveStorageProvider(StorageProvider):
         )
         return response.content
 
+    def read_range(self, source_key: str, start: int, length: int) -> bytes:
+        return _ranged_get(
+            self.provider_name,
+            f"{self._drive_base_url}/files/{source_key}?alt=media&supportsAllDrives=true",
+            start,
+            length,
+            token=self._token,
+        )
+
+    def get_stream_source(self, source_key: str) -> Optional[ProviderStreamSource]:
+        return ProviderStreamSource(
+            url=f"{self._drive_base_url}/files/{source_key}?alt=media&supportsAllDrives=true",
+            headers={"Authorization": f"Bearer {self._get_access_token()}"},
+        )
+
     def get_thumbnail(self, source_key: str, size: str = "w640h480") -> Optional[bytes]:
         _ = size
         # Drive does not expose a stable equivalent to Dropbox thumbnail size controls.
@@ -479,11 +801,11 @@ class GoogleDriveStorageProvider(StorageProvider):
         req_headers = {"Authorization": f"Bearer {access_token}"}
         if range_header:
             req_headers["Range"] = range_header
-        async with httpx.AsyncClient(timeout=60, follow_redirects=True) as client:
-            async with client.stream("GET", url, headers=req_headers) as response:
-                yield response.status_code, dict(response.headers)
-                async for chunk in response.aiter_bytes(chunk_size=256 * 1024):
-                    yield chunk
+        client = http_client.get_async_client(self.provider_name)
+        async with client.stream("GET", url, headers=req_headers) as response:
+            yield response.status_code, dict(response.headers)
+            async for chunk in response.aiter_bytes(chunk_size=256 * 1024):
+                yield chunk
 
     def resolve_source_key(self, source_key: Optional[str], image: Any = None) -> Optional[str]:
         value = (source_key or "").strip()
@@ -493,51 +815,29 @@ class GoogleDriveStorageProvider(StorageProvider):
             return None
         return value
 
-    def _list_files(self, query: str) -> list[ProviderEntry]:
-        entries: list[ProviderEntry] = []
-        next_page_token: Optional[str] = None
-
-        while True:
-            params = {
-                "q": query,
-                "fields": (
-                    "nextPageToken,files("
-                    "id,name,mimeType,size,md5Checksum,modifiedTime,createdTime,version,"
-                    "imageMediaMetadata(width,height,time,location),"
-                    "videoMediaMetadata(width,height,durationMillis),"
-                    "appProperties,properties"
-                    ")"
-                ),
-                "orderBy": "modifiedTime desc",
-                "pageSize": "1000",
-                "includeItemsFromAllDrives": "true",
-                "supportsAllDrives": "true",
-            }
-            if next_page_token:
-                params["pageToken"] = next_page_token
-
-            response = self._request("GET", "/files", params=params)
-            payload = response.json()
-            for item in payload.get("files", []) or []:
-                entries.append(self._entry_from_file(item))
-
-            next_page_token = payload.get("nextPageToken")
-            if not next_page_token:
-                break
+    def _list_files_page(self, query: str, page_token: Optional[str]) -> tuple[list[ProviderEntry], Optional[str]]:
+        params = {
+            "q": query,
+            "fields": f"nextPageToken,files({self._FILE_FIELDS})",
+            "orderBy": "modifiedTime desc",
+            "pageSize": "1000",
+            "includeItemsFromAllDrives": "true",
+            "supportsAllDrives": "true",
+        }
+        if page_token:
+            params["pageToken"] = page_token
 
-        return entries
+        response = self._request("GET", "/files", params=params)
+        payload = response.json()
+        entries = [self._entry_from_file(item) for item in payload.get("files", []) or []]
+        return entries, payload.get("nextPageToken")
 
     def _get_file(self, source_key: str) -> Dict[str, Any]:
         response = self._request(
             "GET",
             f"/files/{source_key}",
             params={
-                "fields": (
-                    "id,name,mimeType,size,md5Checksum,modifiedTime,createdTime,version,"
-                    "imageMediaMetadata(width,height,time,location),"
-                    "videoMediaMetadata(width,height,durationMillis),"
-                    "appProperties,properties"
-                ),
+                "fields": self._FILE_FIELDS,
                 "supportsAllDrives": "true",
             },
         )
@@ -593,15 +893,14 @@ class GoogleDriveStorageProvider(StorageProvider):
         params: Optional[Dict[str, str]] = None,
         timeout: int = 60,
     ) -> httpx.Response:
-        access_token = self._get_access_token()
-        headers = {"Authorization": f"Bearer {access_token}"}
-        with httpx.Client(timeout=timeout) as client:
-            response = client.request(
-                method,
-                f"{self._drive_base_url}{path}",
-                headers=headers,
-                params=params,
-            )
+        response = http_client.request(
+            self.provider_name,
+            method,
+            f"{self._drive_base_url}{path}",
+            token=self._token,
+            params=params,
+            timeout=timeout,
+        )
         if response.status_code >= 400:
             detail = response.text
             raise RuntimeError(
@@ -610,33 +909,7 @@ class GoogleDriveStorageProvider(StorageProvider):
         return response
 
     def _get_access_token(self) -> str:
-        if self._access_token and self._access_token_expires_at:
-            if datetime.utcnow() + timedelta(seconds=30) < self._access_token_expires_at:
-                return self._access_token
-
-        with httpx.Client(timeout=30) as client:
-            response = client.post(
-                self._token_url,
-                data={
-                    "client_id": self._client_id,
-                    "client_secret": self._client_secret,
-                    "refresh_token": self._refresh_token,
-                    "grant_type": "refresh_token",
-                },
-            )
-
-        if response.status_code >= 400:
-            raise RuntimeError(f"Failed to refresh Google Drive access token: {response.text}")
-
-        payload = response.json()
-        access_token = payload.get("access_token")
-        expires_in = int(payload.get("expires_in") or 3600)
-        if not access_token:
-            raise RuntimeError("Google Drive token response missing access_token")
-
-        self._access_token = access_token
-        self._access_token_expires_at = datetime.utcnow() + timedelta(seconds=expires_in)
-        return access_token
+        return self._token.get()
 
 
 class YouTubeStorageProvider(StorageProvider):
@@ -646,6 +919,7 @@ class YouTubeStorageProvider(StorageProvider):
 
     _youtube_base_url = "https://www.googleapis.com/youtube/v3"
     _token_url = "https://oauth2.googleapis.com/token"
+    _token_label = "YouTube"
 
     def __init__(self, *, client_id: str, client_secret: str, refresh_token: str):
         if not client_id or not client_secret or not refresh_token:
@@ -653,29 +927,43 @@ class YouTubeStorageProvider(StorageProvider):
         self._client_id = client_id
         self._client_secret = client_secret
         self._refresh_token = refresh_token
-        self._access_token: Optional[str] = None
-        self._access_token_expires_at: Optional[datetime] = None
+        self._token = http_client.OAuthRefreshToken(
+            token_url=self._token_url,
+            client_id=client_id,
+            client_secret=client_secret,
+            refresh_token=refresh_token,
+            label=self._token_label,
+        )
 
-    def list_image_entries(self, sync_folders: Optional[Sequence[str]] = None) -> list[ProviderEntry]:
-        """List YouTube video entries. sync_folders = playlist IDs (empty = all uploads)."""
+    def iter_entry_pages(
+        self,
+        sync_folders: Optional[Sequence[str]] = None,
+        checkpoint: Optional[str] = None,
+    ) -> Iterator[ProviderListingPage]:
+        """Yield YouTube video pages. sync_folders = playlist IDs (empty = all uploads)."""
         playlist_ids = [p.strip() for p in (sync_folders or []) if isinstance(p, str) and p.strip()]
-        deduped: Dict[str, ProviderEntry] = {}
 
         if not playlist_ids:
             # No playlist filter — fetch uploads playlist for the channel
             uploads_playlist_id = self._get_uploads_playlist_id()
-            if uploads_playlist_id:
-                for entry in self._list_playlist_items(uploads_playlist_id):
-                    deduped[entry.source_key] = entry
+            if not uploads_playlist_id:
+                return
+            playlists = [(uploads_playlist_id, self._get_channel_title())]
         else:
-            for playlist_id in playlist_ids:
-                playlist_name = self._get_playlist_name(playlist_id)
-                for entry in self._list_playlist_items(playlist_id, playlist_name=playlist_name):
-                    deduped[entry.source_key] = entry
+            # Names are resolved lazily so a resumed listing skips finished playlists.
+            playlists = [(playlist_id, None) for playlist_id in playlist_ids]
 
-        entries = list(deduped.values())
-        entries.sort(key=lambda e: e.modified_time or datetime.min, reverse=True)
-        return entries
+        names: Dict[str, str] = {}
+
+        def fetch_page(playlist: tuple[str, Optional[str]], page_token: Optional[str]):
+            playlist_id, playlist_name = playlist
+            if playlist_name is None:
+                if playlist_id not in names:
+                    names[playlist_id] = self._get_playlist_name(playlist_id)
+                playlist_name = names[playlist_id]
+            return self._list_playlist_page(playlist_id, playlist_name=playlist_name, page_token=page_token)
+
+        yield from _iter_source_pages(playlists, fetch_page, checkpoint)
 
     def _get_uploads_playlist_id(self) -> Optional[str]:
         """Return the uploads playlist ID for the authenticated channel."""
@@ -722,57 +1010,47 @@ class YouTubeStorageProvider(StorageProvider):
             pass
         return "YouTube"
 
-    def _list_playlist_items(
+    def _list_playlist_page(
         self,
         playlist_id: str,
         *,
-        playlist_name: Optional[str] = None,
-    ) -> list[ProviderEntry]:
-        """List all videos in a playlist as ProviderEntry objects."""
-        if playlist_name is None:
-            playlist_name = self._get_channel_title()
-
-        entries: list[ProviderEntry] = []
-        next_page_token: Optional[str] = None
-
-        while True:
-            params: Dict[str, str] = {
-                "part": "snippet",
-                "playlistId": playlist_id,
-                "maxResults": "50",
-            }
-            if next_page_token:
-                params["pageToken"] = next_page_token
+        playlist_name: str,
+        page_token: Optional[str] = None,
+    ) -> tuple[list[ProviderEntry], Optional[str]]:
+        """Fetch one page of a playlist's videos as ProviderEntry objects."""
+        params: Dict[str, str] = {
+            "part": "snippet",
+            "playlistId": playlist_id,
+            "maxResults": "50",
+        }
+        if page_token:
+            params["pageToken"] = page_token
 
-            response = self._request("GET", "/playlistItems", params=params)
-            payload = response.json()
+        response = self._request("GET", "/playlistItems", params=params)
+        payload = response.json()
 
-            for item in payload.get("items") or []:
-                snippet = item.get("snippet") or {}
-                resource = snippet.get("resourceId") or {}
-                video_id = resource.get("videoId")
-                if not video_id:
-                    continue
-                title = snippet.get("title") or video_id
-                published_at = _parse_iso_datetime(snippet.get("publishedAt"))
-                entries.append(
-                    ProviderEntry(
-                        provider=self.provider_name,
-                        source_key=video_id,
-                        file_id=video_id,
-                        name=title,
-                        display_path=f"/{playlist_name}/{title}",
-                        modified_time=published_at,
-                        mime_type="video/youtube",
-                        no_download=True,
-                    )
+        entries: list[ProviderEntry] = []
+        for item in payload.get("items") or []:
+            snippet = item.get("snippet") or {}
+            resource = snippet.get("resourceId") or {}
+            video_id = resource.get("videoId")
+            if not video_id:
+                continue
+            title = snippet.get("title") or video_id
+            published_at = _parse_iso_datetime(snippet.get("publishedAt"))
+            entries.append(
+                ProviderEntry(
+                    provider=self.provider_name,
+                    source_key=video_id,
+                    file_id=video_id,
+                    name=title,
+                    display_path=f"/{playlist_name}/{title}",
+                    modified_time=published_at,
+                    mime_type="video/youtube",
+                    no_download=True,
                 )
-
-            next_page_token = payload.get("nextPageToken")
-            if not next_page_token:
-                break
-
-        return entries
+            )
+        return entries, payload.get("nextPageToken")
 
     def list_folders(self) -> list[dict]:
         """List the authenticated user's playlists (YouTube's folder equivalent)."""
@@ -860,15 +1138,14 @@ class YouTubeStorageProvider(StorageProvider):
         params: Optional[Dict[str, str]] = None,
         timeout: int = 30,
     ) -> httpx.Response:
-        access_token = self._get_access_token()
-        headers = {"Authorization": f"Bearer {access_token}"}
-        with httpx.Client(timeout=timeout) as client:
-            response = client.request(
-                method,
-                f"{self._youtube_base_url}{path}",
-                headers=headers,
-                params=params,
-            )
+        response = http_client.request(
+            self.provider_name,
+            method,
+            f"{self._youtube_base_url}{path}",
+            token=self._token,
+            params=params,
+            timeout=timeout,
+        )
         if response.status_code >= 400:
             raise RuntimeError(
                 f"YouTube API error {response.status_code} for {path}: {response.text}"
@@ -876,33 +1153,7 @@ class YouTubeStorageProvider(StorageProvider):
         return response
 
     def _get_access_token(self) -> str:
-        if self._access_token and self._access_token_expires_at:
-            if datetime.utcnow() + timedelta(seconds=30) < self._access_token_expires_at:
-                return self._access_token
-
-        with httpx.Client(timeout=30) as client:
-            response = client.post(
-                self._token_url,
-                data={
-                    "client_id": self._client_id,
-                    "client_secret": self._client_secret,
-                    "refresh_token": self._refresh_token,
-                    "grant_type": "refresh_token",
-                },
-            )
-
-        if response.status_code >= 400:
-            raise RuntimeError(f"Failed to refresh YouTube access token: {response.text}")
-
-        payload = response.json()
-        access_token = payload.get("access_token")
-        expires_in = int(payload.get("expires_in") or 3600)
-        if not access_token:
-            raise RuntimeError("YouTube token response missing access_token")
-
-        self._access_token = access_token
-        self._access_token_expires_at = datetime.utcnow() + timedelta(seconds=expires_in)
-        return access_token
+        return self._token.get()
 
 
 class GooglePhotosStorageProvider(StorageProvider):
@@ -913,6 +1164,7 @@ class GooglePhotosStorageProvider(StorageProvider):
     _photos_base_url = "https://photoslibrary.googleapis.com/v1"
     _picker_base_url = "https://photospicker.googleapis.com/v1"
     _token_url = "https://oauth2.googleapis.com/token"
+    _token_label = "Google Photos"
 
     def __init__(self, *, client_id: str, client_secret: str, refresh_token: str):
         if not client_id or not client_secret or not refresh_token:
@@ -920,69 +1172,68 @@ class GooglePhotosStorageProvider(StorageProvider):
         self._client_id = client_id
         self._client_secret = client_secret
         self._refresh_token = refresh_token
-        self._access_token: Optional[str] = None
-        self._access_token_expires_at: Optional[datetime] = None
+        self._token = http_client.OAuthRefreshToken(
+            token_url=self._token_url,
+            client_id=client_id,
+            client_secret=client_secret,
+            refresh_token=refresh_token,
+            label=self._token_label,
+        )
         self._picker_session_id: Optional[str] = None
         self._picker_media_cache: Dict[str, Dict[str, Any]] = {}
 
-    def list_image_entries(self, sync_folders: Optional[Sequence[str]] = None) -> list[ProviderEntry]:
-        """List media items. sync_folders = album IDs (empty = all media items)."""
+    def iter_entry_pages(
+        self,
+        sync_folders: Optional[Sequence[str]] = None,
+        checkpoint: Optional[str] = None,
+    ) -> Iterator[ProviderListingPage]:
+        """Yield media item pages. sync_folders = album IDs (empty = all media items)."""
         album_ids = [a.strip() for a in (sync_folders or []) if isinstance(a, str) and a.strip()]
-        deduped: Dict[str, ProviderEntry] = {}
-
         if not album_ids:
-            for entry in self._list_media_items():
-                deduped[entry.source_key] = entry
-        else:
-            for album_id in album_ids:
+            yield from _iter_source_pages([None], lambda _, token: self._list_media_items_page(token), checkpoint)
+            return
+
+        titles: Dict[str, str] = {}
+
+        def fetch_page(album_id: str, page_token: Optional[str]):
+            if album_id not in titles:
                 try:
-                    album_title = self._get_album_title(album_id)
+                    titles[album_id] = self._get_album_title(album_id)
                 except Exception:
-                    album_title = album_id
-                for entry in self._list_album_items(album_id, album_title=album_title):
-                    deduped[entry.source_key] = entry
+                    titles[album_id] = album_id
+            return self._list_album_items_page(album_id, album_title=titles[album_id], page_token=page_token)
 
-        entries = list(deduped.values())
-        entries.sort(key=lambda e: e.modified_time or datetime.min, reverse=True)
-        return entries
+        yield from _iter_source_pages(album_ids, fetch_page, checkpoint)
 
-    def _list_media_items(self) -> list[ProviderEntry]:
-        """Page through all media items in the library."""
-        entries: list[ProviderEntry] = []
-        next_page_token: Optional[str] = None
-        while True:
-            params: Dict[str, str] = {"pageSize": "100"}
-            if next_page_token:
-                params["pageToken"] = next_page_token
-            response = self._request("GET", "/mediaItems", params=params)
-            payload = response.json()
-            for item in payload.get("mediaItems") or []:
-                entry = self._entry_from_item(item)
-                if entry:
-                    entries.append(entry)
-            next_page_token = payload.get("nextPageToken")
-            if not next_page_token:
-                break
-        return entries
+    def _list_media_items_page(self, page_token: Optional[str]) -> tuple[list[ProviderEntry], Optional[str]]:
+        """Fetch one page of media items from the whole library."""
+        params: Dict[str, str] = {"pageSize": "100"}
+        if page_token:
+            params["pageToken"] = page_token
+        response = self._request("GET", "/mediaItems", params=params)
+        payload = response.json()
+        entries = [entry for entry in map(self._entry_from_item, payload.get("mediaItems") or []) if entry]
+        return entries, payload.get("nextPageToken")
 
-    def _list_album_items(self, album_id: str, *, album_title: str) -> list[ProviderEntry]:
-        """Page through all media items in one album."""
+    def _list_album_items_page(
+        self,
+        album_id: str,
+        *,
+        album_title: str,
+        page_token: Optional[str] = None,
+    ) -> tuple[list[ProviderEntry], Optional[str]]:
+        """Fetch one page of media items in one album."""
+        body: Dict[str, Any] = {"albumId": album_id, "pageSize": 100}
+        if page_token:
+            body["pageToken"] = page_token
+        response = self._request("POST", "/mediaItems:search", json=body)
+        payload = response.json()
         entries: list[ProviderEntry] = []
-        next_page_token: Optional[str] = None
-        while True:
-            body: Dict[str, Any] = {"albumId": album_id, "pageSize": 100}
-            if next_page_token:
-                body["pageToken"] = next_page_token
-            response = self._request("POST", "/mediaItems:search", json=body)
-            payload = response.json()
-            for item in payload.get("mediaItems") or []:
-                entry = self._entry_from_item(item, album_title=album_title)
-                if entry:
-                    entries.append(entry)
-            next_page_token = payload.get("nextPageToken")
-            if not next_page_token:
-                break
-        return entries
+        for item in payload.get("mediaItems") or []:
+            entry = self._entry_from_item(item, album_title=album_title)
+            if entry:
+                entries.append(entry)
+        return entries, payload.get("nextPageToken")
 
     def _get_album_title(self, album_id: str) -> str:
         try:
@@ -1254,11 +1505,9 @@ class GooglePhotosStorageProvider(StorageProvider):
         mime_type = str(item.get("mime_type") or item.get("mimeType") or "").strip().lower()
         download_suffix = "dv" if mime_type.startswith("video/") else "d"
         download_url = f"{base_url}={download_suffix}"
-        headers = {"Authorization": f"Bearer {self._get_access_token()}"}
-        with httpx.Client(timeout=120, follow_redirects=True) as client:
-            dl_response = client.get(download_url, headers=headers)
-            if dl_response.status_code >= 400:
-                dl_response = client.get(download_url)
+        dl_response = http_client.request(self.provider_name, "GET", download_url, token=self._token, timeout=120)
+        if dl_response.status_code >= 400:
+            dl_response = http_client.request(self.provider_name, "GET", download_url, timeout=120)
         if dl_response.status_code >= 400:
             raise RuntimeError(f"Failed to download Google Photos item: HTTP {dl_response.status_code}")
         return dl_response.content
@@ -1294,16 +1543,15 @@ class GooglePhotosStorageProvider(StorageProvider):
         json: Optional[Dict[str, Any]] = None,
         timeout: int = 60,
     ) -> httpx.Response:
-        access_token = self._get_access_token()
-        headers = {"Authorization": f"Bearer {access_token}"}
-        with httpx.Client(timeout=timeout) as client:
-            response = client.request(
-                method,
-                f"{self._picker_base_url}{path}",
-                headers=headers,
-                params=params,
-                json=json,
-            )
+        response = http_client.request(
+            self.provider_name,
+            method,
+            f"{self._picker_base_url}{path}",
+            token=self._token,
+            params=params,
+            json=json,
+            timeout=timeout,
+        )
         if response.status_code >= 400:
             raise RuntimeError(
                 f"Google Photos Picker API error {response.status_code} for {path}: {response.text}"
@@ -1319,16 +1567,15 @@ class GooglePhotosStorageProvider(StorageProvider):
         json: Optional[Dict[str, Any]] = None,
         timeout: int = 60,
     ) -> httpx.Response:
-        access_token = self._get_access_token()
-        headers = {"Authorization": f"Bearer {access_token}"}
-        with httpx.Client(timeout=timeout) as client:
-            response = client.request(
-                method,
-                f"{self._photos_base_url}{path}",
-                headers=headers,
-                params=params,
-                json=json,
-            )
+        response = http_client.request(
+            self.provider_name,
+            method,
+            f"{self._photos_base_url}{path}",
+            token=self._token,
+            params=params,
+            json=json,
+            timeout=timeout,
+        )
         if response.status_code >= 400:
             raise RuntimeError(
                 f"Google Photos API error {response.status_code} for {path}: {response.text}"
@@ -1336,33 +1583,7 @@ class GooglePhotosStorageProvider(StorageProvider):
         return response
 
     def _get_access_token(self) -> str:
-        if self._access_token and self._access_token_expires_at:
-            if datetime.utcnow() + timedelta(seconds=30) < self._access_token_expires_at:
-                return self._access_token
-
-        with httpx.Client(timeout=30) as client:
-            response = client.post(
-                self._token_url,
-                data={
-                    "client_id": self._client_id,
-                    "client_secret": self._client_secret,
-                    "refresh_token": self._refresh_token,
-                    "grant_type": "refresh_token",
-                },
-            )
-
-        if response.status_code >= 400:
-            raise RuntimeError(f"Failed to refresh Google Photos access token: {response.text}")
-
-        payload = response.json()
-        access_token = payload.get("access_token")
-        expires_in = int(payload.get("expires_in") or 3600)
-        if not access_token:
-            raise RuntimeError("Google Photos token response missing access_token")
-
-        self._access_token = access_token
-        self._access_token_expires_at = datetime.utcnow() + timedelta(seconds=expires_in)
-        return access_token
+        return self._token.get()
 
 
 class FlickrStorageProvider(StorageProvider):
@@ -1391,22 +1612,25 @@ class FlickrStorageProvider(StorageProvider):
         self._oauth_token_secret = oauth_token_secret
         self._user_nsid = str(user_nsid or "").strip() or None
 
-    def list_image_entries(self, sync_folders: Optional[Sequence[str]] = None) -> list[ProviderEntry]:
+    def iter_entry_pages(
+        self,
+        sync_folders: Optional[Sequence[str]] = None,
+        checkpoint: Optional[str] = None,
+    ) -> Iterator[ProviderListingPage]:
+        """Yield photo pages. sync_folders = album (photoset) IDs (empty = all photos)."""
         album_ids = [str(album_id or "").strip() for album_id in (sync_folders or []) if str(album_id or "").strip()]
-        deduped: Dict[str, ProviderEntry] = {}
-
         if not album_ids:
-            for entry in self._list_user_photos():
-                deduped[entry.source_key] = entry
-        else:
-            for album_id in album_ids:
-                album_title = self._album_title(album_id) or album_id
-                for entry in self._list_album_photos(album_id, album_title=album_title):
-                    deduped[entry.source_key] = entry
+            yield from _iter_source_pages([None], lambda _, page: self._list_user_photos_page(page), checkpoint)
+            return
 
-        entries = list(deduped.values())
-        entries.sort(key=lambda e: e.modified_time or datetime.min, reverse=True)
-        return entries
+        titles: Dict[str, str] = {}
+
+        def fetch_page(album_id: str, page: Optional[str]):
+            if album_id not in titles:
+                titles[album_id] = self._album_title(album_id) or album_id
+            return self._list_album_photos_page(album_id, album_title=titles[album_id], page=page)
+
+        yield from _iter_source_pages(album_ids, fetch_page, checkpoint)
 
     def list_albums(self, *, limit: int = 2000) -> list[dict]:
         user_id = self._resolve_user_nsid()
@@ -1494,8 +1718,7 @@ class FlickrStorageProvider(StorageProvider):
         download_url = self._select_photo_url(source_key, purpose="download")
         if not download_url:
             raise RuntimeError(f"Flickr photo has no downloadable URL: {source_key}")
-        with httpx.Client(timeout=120, follow_redirects=True) as client:
-            response = client.get(download_url)
+        response = http_client.request(self.provider_name, "GET", download_url, timeout=120)
         if response.status_code >= 400:
             raise RuntimeError(f"Flickr download failed ({response.status_code}): {source_key}")
         return response.content
@@ -1505,60 +1728,55 @@ class FlickrStorageProvider(StorageProvider):
         thumb_url = self._select_photo_url(source_key, purpose="thumbnail")
         if not thumb_url:
             return None
-        with httpx.Client(timeout=60, follow_redirects=True) as client:
-            response = client.get(thumb_url)
+        response = http_client.request(self.provider_name, "GET", thumb_url)
         if response.status_code >= 400:
             return None
         return response.content
 
-    def _list_user_photos(self) -> list[ProviderEntry]:
-        user_id = self._resolve_user_nsid()
-        page = 1
-        entries: list[ProviderEntry] = []
-        while True:
-            payload = self._api_call(
-                "flickr.people.getPhotos",
-                user_id=user_id,
-                page=page,
-                per_page=500,
-                extras=self._photo_extras(),
-            )
-            photos_obj = payload.get("photos") or {}
-            photo_rows = photos_obj.get("photo") or []
-            for photo in photo_rows:
-                entry = self._entry_from_photo(photo, album_title=None)
-                if entry:
-                    entries.append(entry)
-            pages = int(photos_obj.get("pages") or 1)
-            if page >= pages:
-                break
-            page += 1
-        return entries
+    def _list_user_photos_page(self, page: Optional[str]) -> tuple[list[ProviderEntry], Optional[str]]:
+        """Fetch one page of the user's photos; the page token is Flickr's page number."""
+        page_number = int(page or 1)
+        payload = self._api_call(
+            "flickr.people.getPhotos",
+            user_id=self._resolve_user_nsid(),
+            page=page_number,
+            per_page=500,
+            extras=self._photo_extras(),
+        )
+        return self._photo_page(payload.get("photos") or {}, page_number, album_title=None)
 
-    def _list_album_photos(self, album_id: str, *, album_title: str) -> list[ProviderEntry]:
-        user_id = self._resolve_user_nsid()
-        page = 1
+    def _list_album_photos_page(
+        self,
+        album_id: str,
+        *,
+        album_title: str,
+        page: Optional[str] = None,
+    ) -> tuple[list[ProviderEntry], Optional[str]]:
+        page_number = int(page or 1)
+        payload = self._api_call(
+            "flickr.photosets.getPhotos",
+            photoset_id=album_id,
+            user_id=self._resolve_user_nsid(),
+            page=page_number,
+            per_page=500,
+            extras=self._photo_extras(),
+        )
+        return self._photo_page(payload.get("photoset") or {}, page_number, album_title=album_title)
+
+    def _photo_page(
+        self,
+        photos_obj: Dict[str, Any],
+        page_number: int,
+        *,
+        album_title: Optional[str],
+    ) -> tuple[list[ProviderEntry], Optional[str]]:
         entries: list[ProviderEntry] = []
-        while True:
-            payload = self._api_call(
-                "flickr.photosets.getPhotos",
-                photoset_id=album_id,
-                user_id=user_id,
-                page=page,
-                per_page=500,
-                extras=self._photo_extras(),
-            )
-            photoset_obj = payload.get("photoset") or {}
-            photo_rows = photoset_obj.get("photo") or []
-            for photo in photo_rows:
-                entry = self._entry_from_photo(photo, album_title=album_title)
-                if entry:
-                    entries.append(entry)
-            pages = int(photoset_obj.get("pages") or 1)
-            if page >= pages:
-                break
-            page += 1
-        return entries
+        for photo in photos_obj.get("photo") or []:
+            entry = self._entry_from_photo(photo, album_title=album_title)
+            if entry:
+                entries.append(entry)
+        pages = int(photos_obj.get("pages") or 1)
+        return entries, (str(page_number + 1) if page_number < pages else None)
 
     def _album_title(self, album_id: str) -> Optional[str]:
         try:
@@ -1681,9 +1899,7 @@ class FlickrStorageProvider(StorageProvider):
         ])
 
     def _oauth_session(self):
-        from requests_oauthlib import OAuth1Session
-
-        return OAuth1Session(
+        return http_client.get_oauth1_session(
             client_key=self._api_key,
             client_secret=self._api_secret,
             resource_owner_key=self._oauth_token,
@@ -1699,7 +1915,10 @@ class FlickrStorageProvider(StorageProvider):
         }
         query_params.update(params)
         session = self._oauth_session()
-        response = session.get(self._rest_base_url, params=query_params, timeout=60)
+        response = http_client.send_with_backoff(
+            self.provider_name,
+            lambda: session.get(self._rest_base_url, params=query_params, timeout=60),
+        )
         if response.status_code >= 400:
             raise RuntimeError(f"Flickr API HTTP {response.status_code} for {method_name}: {response.text}")
         payload = response.json()
@@ -1714,6 +1933,7 @@ class ManagedStorageProvider(StorageProvider):
     """Zoltag-managed objects stored directly in tenant GCS bucket."""
 
     provider_name = "managed"
+    supports_range_reads = True
 
     def __init__(self, *, bucket_name: str, project_id: Optional[str] = None, client: Optional[Any] = None):
         if not bucket_name:
@@ -1726,9 +1946,14 @@ class ManagedStorageProvider(StorageProvider):
 
         self._bucket = client.bucket(bucket_name)
 
-    def list_image_entries(self, sync_folders: Optional[Sequence[str]] = None) -> list[ProviderEntry]:
+    def iter_entry_pages(
+        self,
+        sync_folders: Optional[Sequence[str]] = None,
+        checkpoint: Optional[str] = None,
+    ) -> Iterator[ProviderListingPage]:
         _ = sync_folders
-        return []
+        _ = checkpoint
+        return iter(())
 
     def get_entry(self, source_key: str) -> ProviderEntry:
         blob = self._bucket.blob(source_key)
@@ -1758,6 +1983,17 @@ class ManagedStorageProvider(StorageProvider):
         blob = self._bucket.blob(source_key)
         return blob.download_as_bytes()
 
+    def read_range(self, source_key: str, start: int, length: int) -> bytes:
+        from google.api_core.exceptions import RequestRangeNotSatisfiable
+
+        if length <= 0:
+            return b""
+        try:
+            # ``end`` is inclusive.
+            return self._bucket.blob(source_key).download_as_bytes(start=start, end=start + length - 1)
+        except RequestRangeNotSatisfiable:
+            return b""
+
     def get_thumbnail(self, source_key: str, size: str = "w640h480") -> Optional[bytes]:
         _ = source_key
         _ = size
@@ -1775,6 +2011,10 @@ class ManagedStorageProvider(StorageProvider):
         except Exception:
             return None
 
+    def get_stream_source(self, source_key: str) -> Optional[ProviderStreamSource]:
+        url = self.get_playback_url(source_key, expires_seconds=900)
+        return ProviderStreamSource(url=url) if url else None
+
 
 def create_storage_provider(
     provider_name: str,
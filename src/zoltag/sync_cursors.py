@@ -0,0 +1,137 @@
+"""Incremental provider listings backed by persisted sync cursors.
+
+The first Google Drive sync of an integration walks its sync folders in full.
+A changes page token is taken *before* that walk starts. Once a run has
+consumed the whole listing without errors, the token is stored in
+``provider_sync_cursors``. Later runs then ask Drive only for changes since
+that token. The token is advanced only when a run gets through its whole delta,
+so files skipped by an interrupted run are listed again next time.
+"""
+
+from __future__ import annotations
+
+import logging
+import uuid
+from typing import Iterator, Optional, Sequence
+
+from sqlalchemy.orm import Session
+
+from zoltag.metadata import ProviderSyncCursor
+from zoltag.storage import GoogleDriveStorageProvider, ProviderEntry
+
+
+logger = logging.getLogger(__name__)
+
+
+def _as_uuid(value) -> Optional[uuid.UUID]:
+    if not value:
+        return None
+    try:
+        return value if isinstance(value, uuid.UUID) else uuid.UUID(str(value))
+    except ValueError:
+        return None
+
+
+def get_sync_cursor(db: Session, provider_id) -> Optional[ProviderSyncCursor]:
+    provider_uuid = _as_uuid(provider_id)
+    if provider_uuid is None:
+        return None
+    return db.get(ProviderSyncCursor, provider_uuid)
+
+
+def save_sync_cursor(db: Session, *, tenant_id, provider_id, provider_type: str, cursor: str, state: dict) -> None:
+    """Insert or replace the stored cursor; the caller commits."""
+    provider_uuid = _as_uuid(provider_id)
+    if provider_uuid is None:
+        return
+    row = db.get(ProviderSyncCursor, provider_uuid)
+    if row is None:
+        row = ProviderSyncCursor(provider_id=provider_uuid, tenant_id=_as_uuid(tenant_id), provider_type=provider_type)
+        db.add(row)
+    row.cursor = cursor
+    row.state = state
+    db.flush()
+
+
+class DriveSyncListing:
+    """One sync run's Drive listing: a full concurrent walk or a changes delta.
+
+    Iterate it to receive entries as they are listed. Call ``mark_complete``
+    after every yielded entry has been handled; the cursor is stored only if
+    iteration actually ran to the end.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        provider: GoogleDriveStorageProvider,
+        *,
+        tenant_id,
+        provider_id,
+        sync_folders: Optional[Sequence[str]] = None,
+        reprocess_existing: bool = False,
+    ):
+        self.db = db
+        self.provider = provider
+        self.tenant_id = tenant_id
+        self.provider_id = provider_id
+        self.sync_folders = sorted({str(folder).strip() for folder in (sync_folders or []) if str(folder).strip()})
+        self._cursor = None if reprocess_existing else self._usable_cursor()
+        self._start_token: Optional[str] = None
+        self._exhausted = False
+
+    @property
+    def is_incremental(self) -> bool:
+        return self._cursor is not None
+
+    def _usable_cursor(self) -> Optional[ProviderSyncCursor]:
+        cursor = get_sync_cursor(self.db, self.provider_id)
+        if cursor is None:
+            return None
+        # A cursor recorded for a different folder selection cannot scope deltas.
+        if sorted((cursor.state or {}).get("sync_folders") or []) != self.sync_folders:
+            return None
+        return cursor
+
+    def __iter__(self) -> Iterator[ProviderEntry]:
+        self._exhausted = False
+        if self._cursor is not None:
+            folder_paths = dict((self._cursor.state or {}).get("folder_paths") or {}) if self.sync_folders else None
+            yielded = False
+            try:
+                for entry in self.provider.iter_changed_entries(self._cursor.cursor, folder_paths=folder_paths):
+                    yielded = True
+                    yield entry
+                self._exhausted = True
+                return
+            except Exception as exc:
+                if yielded:
+                    raise
+                # Expired or revoked tokens: start over with a full walk.
+                logger.warning("Drive changes feed unavailable for provider %s, walking in full: %s", self.provider_id, exc)
+                self._cursor = None
+
+        try:
+            self._start_token = self.provider.get_changes_start_token()
+        except Exception as exc:
+            logger.warning("Could not fetch Drive changes start token for provider %s: %s", self.provider_id, exc)
+            self._start_token = None
+        yield from self.provider.iter_image_entries(self.sync_folders or None)
+        self._exhausted = True
+
+    def mark_complete(self) -> bool:
+        """Store the next cursor if the listing was consumed; return whether it was."""
+        if not self._exhausted:
+            return False
+        token = self.provider.next_changes_token if self._cursor is not None else self._start_token
+        if not token:
+            return False
+        save_sync_cursor(
+            self.db,
+            tenant_id=self.tenant_id,
+            provider_id=self.provider_id,
+            provider_type=self.provider.provider_name,
+            cursor=token,
+            state={"sync_folders": self.sync_folders, "folder_paths": dict(self.provider.folder_paths)},
+        )
+        return True
@@ -6,10 +6,10 @@ from dataclasses import dataclass
 import mimetypes
 import uuid as _uuid_module
 from datetime import datetime
-from typing import Any, Callable, Dict, Optional
-
-import httpx
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Sequence
 
+from sqlalchemy import String, any_, bindparam
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import Session
 
 from zoltag.exif import (
@@ -19,6 +19,7 @@ from zoltag.exif import (
     parse_exif_int,
     parse_exif_str,
 )
+from zoltag.exif_reader import read_provider_exif
 from zoltag.image import ImageProcessor, VideoProcessor, is_supported_video_file
 from zoltag.metadata import Asset, ImageMetadata
 from zoltag.settings import settings
@@ -26,6 +27,7 @@ from zoltag.storage import (
     DropboxStorageProvider,
     ProviderEntry,
     StorageProvider,
+    http_client,
 )
 from zoltag.tenant import Tenant
 from zoltag.tenant_scope import assign_tenant_scope, tenant_column_filter
@@ -43,8 +45,37 @@ class ProcessResult:
     used_full_download: bool = False
 
 
+@dataclass(slots=True)
+class ExistingAsset:
+    """An asset already stored for a listed source key."""
+
+    asset_id: _uuid_module.UUID
+    image_id: Optional[int]
+    source_rev: Optional[str]
+    content_hash: Optional[str] = None
+
+
+@dataclass(slots=True)
+class PendingEntry:
+    """A listed entry that needs processing, with the asset it updates if any."""
+
+    entry: ProviderEntry
+    existing: Optional[ExistingAsset] = None
+
+    @property
+    def revision_changed(self) -> bool:
+        return self.existing is not None and _revision_changed(self.existing, self.entry)
+
+
 MAX_VIDEO_THUMBNAIL_DOWNLOAD_BYTES = 250 * 1024 * 1024
 GLOBAL_SOURCE_KEY_DEDUPE_PROVIDERS = frozenset({"youtube", "gdrive", "gphotos", "dropbox", "flickr"})
+# Providers whose listed content_hash is what sync stores (Dropbox content_hash, Drive md5Checksum).
+CONTENT_HASH_PROVIDERS = frozenset({"dropbox", "gdrive"})
+# Providers whose revision changes only with the file's bytes (Dropbox rev, GCS generation, local
+# mtime). Drive's version and Flickr's lastupdate also move on renames, comments and metadata edits.
+CONTENT_REVISION_PROVIDERS = frozenset({"dropbox", "managed", "local"})
+# Listed entries resolved against existing assets per bulk lookup query.
+DEDUPE_BATCH_SIZE = 500
 
 
 def _log(log: Optional[Callable[[str], None]], message: str) -> None:
@@ -73,6 +104,216 @@ def _asset_identity_filters(
     return filters
 
 
+def _revision_changed(existing: ExistingAsset, entry: ProviderEntry) -> bool:
+    """Whether the listed entry's content differs from what was synced."""
+    if entry.provider in CONTENT_HASH_PROVIDERS and entry.content_hash and existing.content_hash:
+        return entry.content_hash != existing.content_hash
+    if entry.provider not in CONTENT_REVISION_PROVIDERS:
+        return False
+    # Rows synced before revisions were recorded are not treated as changed.
+    return bool(entry.revision and existing.source_rev and entry.revision != existing.source_rev)
+
+
+def lookup_existing_assets(
+    db: Session,
+    tenant: Tenant,
+    *,
+    provider_name: str,
+    source_keys: Sequence[str],
+    provider_id: Optional[str] = None,
+) -> Dict[str, ExistingAsset]:
+    """Resolve which source keys already have assets, in one query.
+
+    On PostgreSQL the keys travel as a single array parameter
+    (``source_key = ANY(:keys)``), served by the
+    ``(tenant_id, source_provider, source_key) INCLUDE (source_rev, ...)``
+    covering index. Where several assets share a key, the oldest wins, as in
+    the per-entry lookup.
+    """
+    keys = sorted({key for key in source_keys if key})
+    if not keys:
+        return {}
+    bind = db.get_bind()
+    if bind.dialect.name == "postgresql":
+        key_filter = Asset.source_key == any_(bindparam("source_keys", keys, type_=ARRAY(String)))
+    else:
+        key_filter = Asset.source_key.in_(keys)
+    query = (
+        db.query(Asset.source_key, Asset.id, Asset.source_rev, ImageMetadata.id, ImageMetadata.content_hash)
+        .outerjoin(ImageMetadata, ImageMetadata.asset_id == Asset.id)
+        .filter(
+            tenant_column_filter(Asset, tenant),
+            Asset.source_provider == provider_name,
+            key_filter,
+        )
+        .order_by(Asset.created_at.asc(), Asset.id.asc(), ImageMetadata.id.asc())
+    )
+    provider_uuid = _uuid_module.UUID(str(provider_id)) if provider_id else None
+    if provider_uuid is not None and provider_name not in GLOBAL_SOURCE_KEY_DEDUPE_PROVIDERS:
+        query = query.filter(Asset.provider_id == provider_uuid)
+
+    existing: Dict[str, ExistingAsset] = {}
+    for source_key, asset_id, source_rev, image_id, content_hash in query.all():
+        found = existing.get(source_key)
+        if found is None:
+            existing[source_key] = ExistingAsset(
+                asset_id=asset_id, image_id=image_id, source_rev=source_rev, content_hash=content_hash
+            )
+        elif found.image_id is None and image_id is not None:
+            # Match the per-entry lookup: any metadata row for the key counts.
+            found.image_id = image_id
+            found.content_hash = content_hash
+    return existing
+
+
+def plan_entry_page(
+    db: Session,
+    tenant: Tenant,
+    entries: Iterable[ProviderEntry],
+    *,
+    provider_name: str,
+    provider_id: Optional[str] = None,
+    reprocess_existing: bool = False,
+) -> list[PendingEntry]:
+    """Return the entries of one listing page that need processing.
+
+    New entries, entries whose content changed (see ``_revision_changed``),
+    and assets still missing metadata are kept; everything else is dropped
+    without a per-entry query.
+    """
+    page: Dict[str, ProviderEntry] = {}
+    for entry in entries:
+        page.setdefault(entry.source_key, entry)
+    existing = lookup_existing_assets(
+        db,
+        tenant,
+        provider_name=provider_name,
+        source_keys=list(page),
+        provider_id=provider_id,
+    )
+    pending: list[PendingEntry] = []
+    for source_key, entry in page.items():
+        found = existing.get(source_key)
+        if (
+            found is None
+            or reprocess_existing
+            or found.image_id is None
+            or _revision_changed(found, entry)
+        ):
+            pending.append(PendingEntry(entry=entry, existing=found))
+    return pending
+
+
+def iter_pending_entries(
+    db: Session,
+    tenant: Tenant,
+    entries: Iterable[ProviderEntry],
+    *,
+    provider_name: str,
+    provider_id: Optional[str] = None,
+    reprocess_existing: bool = False,
+    batch_size: int = DEDUPE_BATCH_SIZE,
+) -> Iterator[PendingEntry]:
+    """Stream the entries that need processing, deduped a batch at a time.
+
+    Each batch is planned only after the previous one has been consumed, so
+    assets created while processing it are seen by the next lookup.
+    """
+    batch: list[ProviderEntry] = []
+    for entry in entries:
+        batch.append(entry)
+        if len(batch) >= batch_size:
+            yield from plan_entry_page(
+                db, tenant, batch, provider_name=provider_name, provider_id=provider_id, reprocess_existing=reprocess_existing
+            )
+            batch = []
+    if batch:
+        yield from plan_entry_page(
+            db, tenant, batch, provider_name=provider_name, provider_id=provider_id, reprocess_existing=reprocess_existing
+        )
+
+
+def _load_existing(
+    db: Session,
+    tenant: Tenant,
+    *,
+    provider_name: str,
+    entry: ProviderEntry,
+    provider_uuid: Optional[_uuid_module.UUID],
+    pending: Optional[PendingEntry],
+) -> tuple[Optional[Asset], Optional[ImageMetadata]]:
+    """Return the stored asset and metadata for an entry.
+
+    Entries planned by ``plan_entry_page`` carry their lookup result and are
+    loaded by primary key; others fall back to an identity query. Callers
+    re-check planned-new entries with an identity query right before inserting
+    (see ``_recheck_new_entry``).
+    """
+    if pending is not None:
+        found = pending.existing
+        if found is None:
+            return None, None
+        metadata = db.get(ImageMetadata, found.image_id) if found.image_id is not None else None
+        return db.get(Asset, found.asset_id), metadata
+
+    identity_filters = _asset_identity_filters(
+        provider_name=provider_name,
+        source_key=entry.source_key,
+        provider_uuid=provider_uuid,
+    )
+    existing = (
+        db.query(ImageMetadata)
+        .join(Asset, Asset.id == ImageMetadata.asset_id)
+        .filter(
+            tenant_column_filter(ImageMetadata, tenant),
+            tenant_column_filter(Asset, tenant),
+            *identity_filters,
+        )
+        .order_by(ImageMetadata.id.asc())
+        .first()
+    )
+    asset = (
+        db.query(Asset)
+        .filter(
+            tenant_column_filter(Asset, tenant),
+            *identity_filters,
+        )
+        .order_by(Asset.created_at.asc(), Asset.id.asc())
+        .first()
+    )
+    return asset, existing
+
+
+def _recheck_new_entry(
+    db: Session,
+    tenant: Tenant,
+    *,
+    provider_name: str,
+    entry: ProviderEntry,
+    provider_uuid: Optional[_uuid_module.UUID],
+    pending: Optional[PendingEntry],
+    asset: Optional[Asset],
+    existing: Optional[ImageMetadata],
+) -> tuple[Optional[Asset], Optional[ImageMetadata]]:
+    """Look a planned-new entry up again just before its Asset is inserted.
+
+    The page was planned before any of it was downloaded, so an overlapping
+    sync of the same source may have created the asset in the meantime.
+    Source keys are not unique (assets may legitimately share one across
+    integrations), so this is a re-check rather than an upsert.
+    """
+    if asset is not None or pending is None:
+        return asset, existing
+    return _load_existing(
+        db,
+        tenant,
+        provider_name=provider_name,
+        entry=entry,
+        provider_uuid=provider_uuid,
+        pending=None,
+    )
+
+
 def _to_int(value: Any) -> Optional[int]:
     try:
         if value is None:
@@ -169,44 +410,38 @@ def _create_asset_record_only(
     thumbnail_bucket: Any = None,
     provider_id: Optional[str] = None,
     reprocess_existing: bool = False,
+    pending: Optional[PendingEntry] = None,
     log: Optional[Callable[[str], None]] = None,
 ) -> ProcessResult:
     """Create Asset + ImageMetadata without downloading file bytes (YouTube, etc.)."""
     provider_uuid = _uuid_module.UUID(str(provider_id)) if provider_id else None
-    identity_filters = _asset_identity_filters(
+    asset, existing = _load_existing(
+        db,
+        tenant,
         provider_name=provider.provider_name,
-        source_key=entry.source_key,
+        entry=entry,
         provider_uuid=provider_uuid,
+        pending=pending,
     )
-    existing = (
-        db.query(ImageMetadata)
-        .join(Asset, Asset.id == ImageMetadata.asset_id)
-        .filter(
-            tenant_column_filter(ImageMetadata, tenant),
-            tenant_column_filter(Asset, tenant),
-            *identity_filters,
-        )
-        .order_by(ImageMetadata.id.asc())
-        .first()
-    )
-    if existing and not reprocess_existing:
+    if existing and not reprocess_existing and pending is None:
         return ProcessResult(status="skipped", image_id=existing.id)
 
-    asset = (
-        db.query(Asset)
-        .filter(
-            tenant_column_filter(Asset, tenant),
-            *identity_filters,
-        )
-        .order_by(Asset.created_at.asc(), Asset.id.asc())
-        .first()
-    )
     # Placeholder CDN URL satisfies the DB NOT NULL constraint before we attempt GCS upload
     cdn_thumbnail_url = (
         f"https://i.ytimg.com/vi/{entry.source_key}/hqdefault.jpg"
         if provider.provider_name == "youtube" and entry.source_key
         else None
     )
+    asset, existing = _recheck_new_entry(
+        db,
+        tenant,
+        provider_name=provider.provider_name,
+        entry=entry,
+        provider_uuid=provider_uuid,
+        pending=pending,
+        asset=asset,
+        existing=existing,
+    )
     if asset is None:
         asset = assign_tenant_scope(Asset(
             filename=entry.name,
@@ -248,21 +483,20 @@ def _create_asset_record_only(
                     *(f"https://i.ytimg.com/vi_webp/{source_key}/{variant}.webp" for variant in webp_variants),
                 ]
                 request_headers = {"User-Agent": "Mozilla/5.0 (compatible; zoltag-sync/1.0)"}
-                with httpx.Client(timeout=15, follow_redirects=True, headers=request_headers) as client:
-                    for url in candidates:
-                        resp = client.get(url)
-                        if resp.status_code != 200 or not resp.content:
-                            failed_attempts.append(f"{url.rsplit('/', 1)[-1]}:{resp.status_code}")
-                            continue
-                        content_type = str(resp.headers.get("content-type") or "").lower()
-                        if content_type and "image" not in content_type:
-                            failed_attempts.append(f"{url.rsplit('/', 1)[-1]}:content-type={content_type}")
-                            continue
-                        thumb_bytes = resp.content
-                        if content_type:
-                            thumb_content_type = content_type
-                        selected_cdn_url = url
-                        break
+                for url in candidates:
+                    resp = http_client.request("ytimg", "GET", url, headers=request_headers, timeout=15)
+                    if resp.status_code != 200 or not resp.content:
+                        failed_attempts.append(f"{url.rsplit('/', 1)[-1]}:{resp.status_code}")
+                        continue
+                    content_type = str(resp.headers.get("content-type") or "").lower()
+                    if content_type and "image" not in content_type:
+                        failed_attempts.append(f"{url.rsplit('/', 1)[-1]}:content-type={content_type}")
+                        continue
+                    thumb_bytes = resp.content
+                    if content_type:
+                        thumb_content_type = content_type
+                    selected_cdn_url = url
+                    break
                 if thumb_bytes:
                     blob.cache_control = "public, max-age=31536000, immutable"
                     blob.upload_from_string(thumb_bytes, content_type=thumb_content_type)
@@ -311,9 +545,14 @@ def process_storage_entry(
     keyword_models: Optional[Dict[str, Any]] = None,
     reprocess_existing: bool = False,
     provider_id: Optional[str] = None,
+    pending: Optional[PendingEntry] = None,
     log: Optional[Callable[[str], None]] = None,
 ) -> ProcessResult:
-    """Process a provider entry into Asset + ImageMetadata."""
+    """Process a provider entry into Asset + ImageMetadata.
+
+    ``pending`` comes from ``iter_pending_entries``; such entries were already
+    found to need processing, so no existence query is made for them.
+    """
     _ = keywords_by_category
     _ = keyword_to_category
     _ = model_type
@@ -321,7 +560,20 @@ def process_storage_entry(
 
     # YouTube videos cannot be downloaded — create metadata-only record.
     if getattr(entry, "no_download", False) or entry.mime_type == "video/youtube":
-        return _create_asset_record_only(db=db, tenant=tenant, entry=entry, provider=provider, thumbnail_bucket=thumbnail_bucket, provider_id=provider_id, reprocess_existing=reprocess_existing, log=log)
+        return _create_asset_record_only(db=db, tenant=tenant, entry=entry, provider=provider, thumbnail_bucket=thumbnail_bucket, provider_id=provider_id, reprocess_existing=reprocess_existing, pending=pending, log=log)
+
+    provider_uuid = _uuid_module.UUID(str(provider_id)) if provider_id else None
+    asset, existing = _load_existing(
+        db,
+        tenant,
+        provider_name=provider.provider_name,
+        entry=entry,
+        provider_uuid=provider_uuid,
+        pending=pending,
+    )
+    # Checked before any download so already-synced entries cost one query.
+    if existing and not reprocess_existing and pending is None:
+        return ProcessResult(status="skipped", image_id=existing.id)
 
     processor = ImageProcessor()
     video_processor = VideoProcessor(thumbnail_size=(settings.thumbnail_size, settings.thumbnail_size))
@@ -368,25 +620,43 @@ def process_storage_entry(
         }
 
         if features["thumbnail"] is None:
-            entry_size = _to_int(entry.size)
-            should_download = entry_size is None or entry_size <= MAX_VIDEO_THUMBNAIL_DOWNLOAD_BYTES
-            if should_download:
+            video_features = None
+            stream_source = None
+            try:
+                stream_source = provider.get_stream_source(entry.source_key)
+            except Exception as exc:
+                _log(log, f"[Sync] Video stream source lookup failed: {exc}")
+            if stream_source is not None:
+                # ffmpeg reads only the index and the keyframes it seeks to.
                 try:
-                    video_data = provider.download_file(entry.source_key)
-                    used_full_download = True
-                    video_features = video_processor.extract_features(video_data, filename=entry.name)
-                    features["thumbnail"] = video_features.get("thumbnail")
-                    features["width"] = features.get("width") or video_features.get("width")
-                    features["height"] = features.get("height") or video_features.get("height")
-                    features["format"] = features.get("format") or video_features.get("format")
-                    duration_ms = duration_ms or video_features.get("duration_ms")
+                    video_features = video_processor.extract_features_from_source(
+                        stream_source.url,
+                        filename=entry.name,
+                        headers=stream_source.headers,
+                    )
                 except Exception as exc:
-                    _log(log, f"[Sync] Video frame extraction failed: {exc}")
+                    _log(log, f"[Sync] Streaming video frame extraction failed: {exc}")
             else:
-                _log(
-                    log,
-                    f"[Sync] Skipping full video download for thumbnail (size={entry_size} bytes, limit={MAX_VIDEO_THUMBNAIL_DOWNLOAD_BYTES}).",
-                )
+                entry_size = _to_int(entry.size)
+                should_download = entry_size is None or entry_size <= MAX_VIDEO_THUMBNAIL_DOWNLOAD_BYTES
+                if should_download:
+                    try:
+                        video_data = provider.download_file(entry.source_key)
+                        used_full_download = True
+                        video_features = video_processor.extract_features(video_data, filename=entry.name)
+                    except Exception as exc:
+                        _log(log, f"[Sync] Video frame extraction failed: {exc}")
+                else:
+                    _log(
+                        log,
+                        f"[Sync] Skipping full video download for thumbnail (size={entry_size} bytes, limit={MAX_VIDEO_THUMBNAIL_DOWNLOAD_BYTES}).",
+                    )
+            if video_features:
+                features["thumbnail"] = video_features.get("thumbnail")
+                features["width"] = features.get("width") or video_features.get("width")
+                features["height"] = features.get("height") or video_features.get("height")
+                features["format"] = features.get("format") or video_features.get("format")
+                duration_ms = duration_ms or video_features.get("duration_ms")
 
         if features["thumbnail"] is None:
             features["thumbnail"] = video_processor.create_placeholder_thumbnail()
@@ -413,19 +683,27 @@ def process_storage_entry(
             get_exif_value(exif, "DateTimeOriginal", "DateTime")
         )
         if capture_timestamp is None and not used_full_download:
-            try:
-                full_data = provider.download_file(entry.source_key)
-                used_full_download = True
-                full_features = processor.extract_features(full_data)
-                full_exif = full_features.get("exif", {}) or {}
-                if full_exif:
-                    full_exif.update(provider_exif)
-                    exif = full_exif
-                    capture_timestamp = parse_exif_datetime(
-                        get_exif_value(exif, "DateTimeOriginal", "DateTime")
-                    )
-            except Exception as exc:
-                _log(log, f"[Sync] Full EXIF download failed: {exc}")
+            full_exif = None
+            if provider.supports_range_reads:
+                # The original's header holds the same EXIF as the full file.
+                try:
+                    full_exif = read_provider_exif(provider, entry.source_key)
+                except Exception as exc:
+                    _log(log, f"[Sync] Header EXIF read failed, downloading full file: {exc}")
+            if full_exif is None:
+                try:
+                    full_data = provider.download_file(entry.source_key)
+                    used_full_download = True
+                    full_features = processor.extract_features(full_data)
+                    full_exif = full_features.get("exif", {}) or {}
+                except Exception as exc:
+                    _log(log, f"[Sync] Full EXIF download failed: {exc}")
+            if full_exif:
+                full_exif.update(provider_exif)
+                exif = full_exif
+                capture_timestamp = parse_exif_datetime(
+                    get_exif_value(exif, "DateTimeOriginal", "DateTime")
+                )
 
     gps_latitude = parse_exif_float(get_exif_value(exif, "GPSLatitude"))
     gps_longitude = parse_exif_float(get_exif_value(exif, "GPSLongitude"))
@@ -437,39 +715,20 @@ def process_storage_entry(
     camera_model = parse_exif_str(get_exif_value(exif, "Model"))
     lens_model = parse_exif_str(get_exif_value(exif, "LensModel", "Lens"))
 
-    provider_uuid = _uuid_module.UUID(str(provider_id)) if provider_id else None
-    identity_filters = _asset_identity_filters(
-        provider_name=provider.provider_name,
-        source_key=entry.source_key,
-        provider_uuid=provider_uuid,
-    )
-    existing = (
-        db.query(ImageMetadata)
-        .join(Asset, Asset.id == ImageMetadata.asset_id)
-        .filter(
-            tenant_column_filter(ImageMetadata, tenant),
-            tenant_column_filter(Asset, tenant),
-            *identity_filters,
-        )
-        .order_by(ImageMetadata.id.asc())
-        .first()
-    )
-    if existing and not reprocess_existing:
-        return ProcessResult(status="skipped", image_id=existing.id)
-
     guessed_mime_type = entry.mime_type or mimetypes.guess_type(entry.name)[0]
     mime_type = guessed_mime_type
     if not mime_type and features.get("format"):
         mime_type = f"{media_type}/{str(features.get('format')).lower()}"
 
-    asset = (
-        db.query(Asset)
-        .filter(
-            tenant_column_filter(Asset, tenant),
-            *identity_filters,
-        )
-        .order_by(Asset.created_at.asc(), Asset.id.asc())
-        .first()
+    asset, existing = _recheck_new_entry(
+        db,
+        tenant,
+        provider_name=provider.provider_name,
+        entry=entry,
+        provider_uuid=provider_uuid,
+        pending=pending,
+        asset=asset,
+        existing=existing,
     )
     if asset is None:
         asset = assign_tenant_scope(Asset(
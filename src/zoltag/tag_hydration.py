@@ -0,0 +1,233 @@
+"""Set-based tag hydration for image result pages.
+
+Gallery pages need machine tags, permatags and keyword names for every image
+on the page. Loading these as ORM objects (plus a separate keyword lookup)
+costs several round trips and a lot of object churn per page, so this module
+fetches all tag rows for a page in one UNION ALL query that selects plain
+columns, and resolves keyword ids through the tenant keyword registry.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+from sqlalchemy import Float, Integer, DateTime, String, func, literal, null, select, type_coerce, union_all
+from sqlalchemy.orm import Session
+
+from zoltag.keyword_registry import get_keyword_registry, get_keyword_registry_for_ids
+from zoltag.metadata import ImageMetadata, MachineTag, Permatag
+from zoltag.tenant import Tenant
+from zoltag.tenant_scope import tenant_column_filter
+
+
+UNKNOWN_KEYWORD = "unknown"
+
+_ROW_KIND_MACHINE = "m"
+_ROW_KIND_PERMATAG = "p"
+
+
+@dataclass
+class ImageTagRows:
+    """Raw tag rows for one image, keyed by keyword id."""
+
+    # (keyword_id, confidence)
+    machine_tags: List[Tuple[int, float]] = field(default_factory=list)
+    # (permatag_id, keyword_id, signum, created_at)
+    permatags: List[Tuple[int, int, int, Optional[datetime]]] = field(default_factory=list)
+
+    def current_keyword_ids(self) -> List[int]:
+        """Machine tags minus negative permatags, plus positive permatags (ordered, unique)."""
+        rejected = {keyword_id for _, keyword_id, signum, _ in self.permatags if signum == -1}
+        current: Dict[int, None] = {}
+        for keyword_id, _ in self.machine_tags:
+            if keyword_id not in rejected:
+                current[keyword_id] = None
+        for _, keyword_id, signum, _ in self.permatags:
+            if signum == 1:
+                current[keyword_id] = None
+        return list(current)
+
+    def relevance(self, keyword_ids: Set[int]) -> float:
+        """Sum of machine-tag confidences for the given keyword ids."""
+        return float(sum(confidence for keyword_id, confidence in self.machine_tags if keyword_id in keyword_ids))
+
+    def reviewed_at(self) -> Optional[datetime]:
+        """Latest permatag creation time, if the image has been reviewed."""
+        timestamps = [created_at for _, _, _, created_at in self.permatags if created_at]
+        return max(timestamps) if timestamps else None
+
+
+def get_keyword_lookup(
+    db: Session,
+    tenant_id: str,
+    required_ids: Optional[Iterable[int]] = None,
+) -> Mapping[int, Tuple[str, str]]:
+    """Return keyword_id -> (keyword, category) from the tenant keyword registry.
+
+    If any of ``required_ids`` is unknown, the registry version is re-checked
+    and the registry reloaded only when it changed (see
+    ``get_keyword_registry_for_ids``).
+    """
+    if required_ids is None:
+        return get_keyword_registry(db, tenant_id).keyword_map()
+    return get_keyword_registry_for_ids(db, tenant_id, required_ids).keyword_map()
+
+
+def resolve_keyword_ids_by_name(
+    db: Session,
+    tenant_id: str,
+    keyword_names: Iterable[str],
+) -> Set[int]:
+    """Resolve exact keyword names to ids using the keyword registry."""
+    names = {name for name in keyword_names if name}
+    if not names:
+        return set()
+    return set(get_keyword_registry(db, tenant_id).ids_for_names(names))
+
+
+def _tag_rows_statement(
+    tenant: Tenant,
+    tag_type: str,
+    *,
+    image_ids: Optional[List[int]] = None,
+    asset_ids: Optional[List] = None,
+):
+    """Build a UNION ALL of machine-tag and permatag rows for a page.
+
+    Rows are keyed by image id when ``image_ids`` is given (joining
+    image_metadata in the same statement), otherwise by asset id.
+    """
+    if image_ids is not None:
+        machine_owner = ImageMetadata.id
+        permatag_owner = ImageMetadata.id
+    else:
+        machine_owner = MachineTag.asset_id
+        permatag_owner = Permatag.asset_id
+
+    machine_rows = select(
+        machine_owner.label("owner_id"),
+        literal(_ROW_KIND_MACHINE, String).label("kind"),
+        MachineTag.keyword_id.label("keyword_id"),
+        type_coerce(MachineTag.confidence, Float).label("confidence"),
+        type_coerce(null(), Integer).label("signum"),
+        type_coerce(null(), Integer).label("permatag_id"),
+        type_coerce(null(), DateTime).label("created_at"),
+    ).where(
+        tenant_column_filter(MachineTag, tenant),
+        MachineTag.tag_type == tag_type,
+    )
+    permatag_rows = select(
+        permatag_owner.label("owner_id"),
+        literal(_ROW_KIND_PERMATAG, String).label("kind"),
+        Permatag.keyword_id.label("keyword_id"),
+        type_coerce(null(), Float).label("confidence"),
+        Permatag.signum.label("signum"),
+        Permatag.id.label("permatag_id"),
+        Permatag.created_at.label("created_at"),
+    ).where(
+        tenant_column_filter(Permatag, tenant),
+    )
+
+    if image_ids is not None:
+        machine_rows = machine_rows.join_from(
+            ImageMetadata, MachineTag, MachineTag.asset_id == ImageMetadata.asset_id
+        ).where(
+            tenant_column_filter(ImageMetadata, tenant),
+            ImageMetadata.id.in_(image_ids),
+        )
+        permatag_rows = permatag_rows.join_from(
+            ImageMetadata, Permatag, Permatag.asset_id == ImageMetadata.asset_id
+        ).where(
+            tenant_column_filter(ImageMetadata, tenant),
+            ImageMetadata.id.in_(image_ids),
+        )
+    else:
+        machine_rows = machine_rows.where(MachineTag.asset_id.in_(asset_ids))
+        permatag_rows = permatag_rows.where(Permatag.asset_id.in_(asset_ids))
+
+    return union_all(machine_rows, permatag_rows)
+
+
+def _collect_tag_rows(db: Session, statement) -> Dict[object, ImageTagRows]:
+    rows_by_owner: Dict[object, ImageTagRows] = {}
+    for owner_id, kind, keyword_id, confidence, signum, permatag_id, created_at in db.execute(statement):
+        entry = rows_by_owner.get(owner_id)
+        if entry is None:
+            entry = rows_by_owner[owner_id] = ImageTagRows()
+        if kind == _ROW_KIND_MACHINE:
+            entry.machine_tags.append((int(keyword_id), float(confidence or 0.0)))
+        else:
+            entry.permatags.append((int(permatag_id), int(keyword_id), int(signum), created_at))
+    return rows_by_owner
+
+
+def load_tag_rows_for_image_ids(
+    db: Session,
+    tenant: Tenant,
+    image_ids: List[int],
+    tag_type: str,
+) -> Dict[int, ImageTagRows]:
+    """Load machine tags and permatags for image ids in a single query."""
+    result = {image_id: ImageTagRows() for image_id in image_ids}
+    if not image_ids:
+        return result
+    statement = _tag_rows_statement(tenant, tag_type, image_ids=list(image_ids))
+    result.update(_collect_tag_rows(db, statement))
+    return result
+
+
+def load_tag_rows_for_assets(
+    db: Session,
+    tenant: Tenant,
+    asset_id_to_image_id: Dict[object, int],
+    tag_type: str,
+) -> Dict[int, ImageTagRows]:
+    """Load machine tags and permatags for already-loaded images in a single query."""
+    result = {image_id: ImageTagRows() for image_id in asset_id_to_image_id.values()}
+    if not asset_id_to_image_id:
+        return result
+    statement = _tag_rows_statement(tenant, tag_type, asset_ids=list(asset_id_to_image_id.keys()))
+    for asset_id, entry in _collect_tag_rows(db, statement).items():
+        image_id = asset_id_to_image_id.get(asset_id)
+        if image_id is not None:
+            result[image_id] = entry
+    return result
+
+
+def keyword_ids_in(rows_by_image: Dict[int, ImageTagRows]) -> Set[int]:
+    """Collect every keyword id referenced by a set of hydrated rows."""
+    keyword_ids: Set[int] = set()
+    for entry in rows_by_image.values():
+        keyword_ids.update(keyword_id for keyword_id, _ in entry.machine_tags)
+        keyword_ids.update(keyword_id for _, keyword_id, _, _ in entry.permatags)
+    return keyword_ids
+
+
+def sum_machine_tag_confidence(
+    db: Session,
+    tenant: Tenant,
+    image_ids: Iterable[int],
+    keyword_ids: Set[int],
+    tag_type: str,
+) -> Dict[int, float]:
+    """Sum machine-tag confidence per image for a keyword set in one query."""
+    image_id_list = list(image_ids)
+    if not image_id_list or not keyword_ids:
+        return {}
+    rows = db.query(
+        ImageMetadata.id,
+        func.sum(MachineTag.confidence),
+    ).join(
+        MachineTag, MachineTag.asset_id == ImageMetadata.asset_id
+    ).filter(
+        tenant_column_filter(ImageMetadata, tenant),
+        ImageMetadata.id.in_(image_id_list),
+        tenant_column_filter(MachineTag, tenant),
+        MachineTag.keyword_id.in_(list(keyword_ids)),
+        MachineTag.tag_type == tag_type,
+    ).group_by(
+        ImageMetadata.id
+    ).all()
+    return {int(image_id): float(score) for image_id, score in rows if score is not None}
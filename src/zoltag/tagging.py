@@ -8,6 +8,7 @@ import numpy as np
 import os
 
 from zoltag.settings import settings
+from zoltag.text_embedding_cache import get_text_embedding_cache
 
 # torch and transformers are optional — only needed when the AI model is in use.
 # Do not import them at module level so the app starts without them installed.
@@ -136,6 +137,8 @@ class SigLIPTagger:
         self.model.to(self.device)
         self.model.eval()
         self.model_type = "siglip"
+        # Load the persisted prompt embeddings now so the first tagging call does not pay for it.
+        get_text_embedding_cache(self._text_embedding_cache_key())
 
     @staticmethod
     def _extract_embedding_tensor(features, source: str) -> torch.Tensor:
@@ -193,65 +196,58 @@ class SigLIPTagger:
         if not candidate_keywords:
             return []
 
-        # Load image
-        image = Image.open(io.BytesIO(image_data))
-        if image.mode != "RGB":
-            image = image.convert("RGB")
-
-        # Create text prompts for each keyword
-        text_prompts = []
-        keywords = []
-        for kw in candidate_keywords:
-            keyword = kw['keyword']
-            prompt = kw.get('prompt') or f"a photo of {keyword}"
-            text_prompts.append(prompt)
-            keywords.append(keyword)
-
-        # Process inputs
+        # Text embeddings come from the persistent prompt cache, so only the
+        # image tower runs per image. Softmax over logits is unaffected by
+        # SigLIP's constant logit bias, so scores match a joint forward pass.
+        keywords, text_embeddings = self.build_text_embeddings(candidate_keywords)
+        return self.score_with_embedding(
+            self.image_embedding(image_data),
+            keywords,
+            text_embeddings,
+            threshold=threshold,
+        )
+
+    def _max_text_length(self) -> int:
+        max_text_length = 64
+        tokenizer = getattr(self.processor, "tokenizer", None)
+        tokenizer_limit = int(getattr(tokenizer, "model_max_length", max_text_length) or max_text_length)
+        if tokenizer_limit > 0:
+            max_text_length = min(max_text_length, tokenizer_limit)
+        return max_text_length
+
+    def _text_embedding_cache_key(self) -> str:
+        return f"{self.model_name}|max_length={self._max_text_length()}"
+
+    def _encode_text_prompts(self, text_prompts: List[str]) -> torch.Tensor:
+        """Run the text tower for prompts and return L2-normalized embeddings.
+
+        Prompts are padded to a fixed length (as SigLIP was trained) so each
+        prompt's embedding does not depend on the other prompts in the batch.
+        """
         with torch.no_grad():
+            max_text_length = self._max_text_length()
             inputs = self.processor(
                 text=text_prompts,
-                images=image,
                 return_tensors="pt",
-                padding=True
+                padding="max_length",
+                truncation=True,
+                max_length=max_text_length,
             )
             inputs = {k: v.to(self.device) for k, v in inputs.items()}
-
-            # Get similarity scores
-            outputs = self.model(**inputs)
-            # For SigLIP with AutoModel, access the logits directly
-            # The model returns logits_per_image or we compute from image/text embeddings
-            if hasattr(outputs, 'logits_per_image'):
-                logits_per_image = outputs.logits_per_image
-            else:
-                # Compute similarity from embeddings
-                image_embeds = outputs.image_embeds
-                text_embeds = outputs.text_embeds
-                # Normalize embeddings
-                image_embeds = image_embeds / image_embeds.norm(dim=-1, keepdim=True)
-                text_embeds = text_embeds / text_embeds.norm(dim=-1, keepdim=True)
-                # Compute cosine similarity
-                logits_per_image = torch.matmul(image_embeds, text_embeds.t())
-
-            # SigLIP: use softmax to convert logits to probabilities
-            # (similar to CLIP - the sigmoid is used during training, not inference)
-            probs = torch.softmax(logits_per_image[0], dim=0).cpu().numpy()
-
-        # Filter by threshold and return with confidence scores
-        results = []
-        for keyword, confidence in zip(keywords, probs):
-            if confidence >= threshold:
-                results.append((keyword, float(confidence)))
-
-        # Sort by confidence
-        results.sort(key=lambda x: x[1], reverse=True)
-        return results
+            text_outputs = self.model.get_text_features(**inputs)
+            text_embeds = self._extract_embedding_tensor(text_outputs, "text_features")
+            return self._normalize_embeddings(text_embeds)
 
     def build_text_embeddings(
         self,
-        candidate_keywords: List[dict]
+        candidate_keywords: List[dict],
+        use_cache: bool = True,
     ) -> Tuple[List[str], torch.Tensor]:
-        """Build normalized text embeddings for keyword prompts."""
+        """Build normalized text embeddings for keyword prompts.
+
+        Embeddings are served from the per-model prompt cache; only prompts
+        not seen before are encoded. Pass ``use_cache=False`` for one-off text.
+        """
         if not candidate_keywords:
             return [], torch.empty(0)
 
@@ -263,24 +259,15 @@ class SigLIPTagger:
             text_prompts.append(prompt)
             keywords.append(keyword)
 
-        with torch.no_grad():
-            max_text_length = 64
-            tokenizer = getattr(self.processor, "tokenizer", None)
-            tokenizer_limit = int(getattr(tokenizer, "model_max_length", max_text_length) or max_text_length)
-            if tokenizer_limit > 0:
-                max_text_length = min(max_text_length, tokenizer_limit)
-            inputs = self.processor(
-                text=text_prompts,
-                return_tensors="pt",
-                padding=True,
-                truncation=True,
-                max_length=max_text_length,
-            )
-            inputs = {k: v.to(self.device) for k, v in inputs.items()}
-            text_outputs = self.model.get_text_features(**inputs)
-            text_embeds = self._extract_embedding_tensor(text_outputs, "text_features")
-            text_embeds = self._normalize_embeddings(text_embeds)
+        if not use_cache:
+            return keywords, self._encode_text_prompts(text_prompts)
 
+        cache = get_text_embedding_cache(self._text_embedding_cache_key())
+        cached = cache.get_or_compute(
+            text_prompts,
+            lambda missing: self._encode_text_prompts(missing).cpu().numpy(),
+        )
+        text_embeds = torch.from_numpy(cached).to(self.device)
         return keywords, text_embeds
 
     def score_with_embedding(
@@ -0,0 +1,235 @@
+"""Persistent cache of text-tower embeddings for keyword prompts.
+
+Zero-shot tagging, the asset text index and text search all embed the same
+keyword prompts over and over, and each call used to run the text tower for
+every prompt. This module keeps one store per model (keyed by model name and
+tokenization settings) holding a contiguous float32 matrix plus a
+``sha256(prompt) -> row`` index. The store is loaded from the local data
+directory on first use, only prompts that are not in it yet are encoded, and
+new rows are written back to disk periodically and at process exit.
+"""
+
+from __future__ import annotations
+
+import atexit
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from zoltag.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+TEXT_EMBEDDING_CACHE_FORMAT_VERSION = 1
+TEXT_EMBEDDING_CACHE_FLUSH_INTERVAL_SECONDS = 30
+_INITIAL_CAPACITY = 256
+
+_stores_lock = threading.Lock()
+_stores: Dict[str, "TextEmbeddingCache"] = {}
+
+
+def prompt_hash(prompt: str) -> str:
+    """Stable key for a prompt string."""
+    return hashlib.sha256(str(prompt).encode("utf-8")).hexdigest()
+
+
+def _store_slug(model_key: str) -> str:
+    readable = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_key).strip("_")[:80]
+    digest = hashlib.sha256(model_key.encode("utf-8")).hexdigest()[:12]
+    return f"{readable}-{digest}-v{TEXT_EMBEDDING_CACHE_FORMAT_VERSION}"
+
+
+def default_cache_dir() -> Path:
+    configured = settings.text_embedding_cache_dir
+    if configured:
+        return Path(configured)
+    return Path(settings.local_data_dir) / "text-embeddings"
+
+
+class TextEmbeddingCache:
+    """Contiguous embedding matrix for one model, indexed by prompt hash."""
+
+    def __init__(
+        self,
+        model_key: str,
+        cache_dir: Optional[Path] = None,
+        max_entries: Optional[int] = None,
+    ):
+        self.model_key = model_key
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else default_cache_dir()
+        self.max_entries = int(max_entries if max_entries is not None else settings.text_embedding_cache_max_entries)
+        slug = _store_slug(model_key)
+        self.matrix_path = self.cache_dir / f"{slug}.npy"
+        self.index_path = self.cache_dir / f"{slug}.json"
+
+        self._lock = threading.Lock()
+        self._matrix: Optional[np.ndarray] = None
+        self._size = 0
+        self._row_by_hash: Dict[str, int] = {}
+        self._last_used: List[int] = []
+        self._use_counter = 0
+        self._dirty = False
+        self._last_flush = time.time()
+        self._load()
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def dim(self) -> Optional[int]:
+        return None if self._matrix is None else int(self._matrix.shape[1])
+
+    def _load(self) -> None:
+        if not (self.matrix_path.exists() and self.index_path.exists()):
+            return
+        try:
+            index = json.loads(self.index_path.read_text())
+            hashes = list(index.get("hashes") or [])
+            matrix = np.load(self.matrix_path)
+        except Exception as exc:  # noqa: BLE001 - a corrupt cache is just a cold cache
+            logger.warning("Ignoring unreadable text embedding cache %s: %s", self.matrix_path, exc)
+            return
+        if index.get("model_key") != self.model_key or matrix.ndim != 2 or matrix.shape[0] != len(hashes):
+            logger.warning("Ignoring mismatched text embedding cache %s", self.matrix_path)
+            return
+        self._matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+        self._size = len(hashes)
+        self._row_by_hash = {key: row for row, key in enumerate(hashes)}
+        self._last_used = list(range(self._size))
+        self._use_counter = self._size
+
+    def _append(self, hashes: Sequence[str], embeddings: np.ndarray) -> None:
+        count = len(hashes)
+        if self._matrix is None:
+            self._matrix = np.empty((max(_INITIAL_CAPACITY, count), embeddings.shape[1]), dtype=np.float32)
+        elif embeddings.shape[1] != self._matrix.shape[1]:
+            raise ValueError(
+                f"Embedding dimension {embeddings.shape[1]} does not match cache dimension {self._matrix.shape[1]}"
+            )
+        needed = self._size + count
+        if needed > self._matrix.shape[0]:
+            capacity = max(needed, self._matrix.shape[0] * 2)
+            grown = np.empty((capacity, self._matrix.shape[1]), dtype=np.float32)
+            grown[:self._size] = self._matrix[:self._size]
+            self._matrix = grown
+        self._matrix[self._size:needed] = embeddings
+        for offset, key in enumerate(hashes):
+            self._row_by_hash[key] = self._size + offset
+            self._last_used.append(0)
+        self._size = needed
+        self._dirty = True
+
+    def get_or_compute(
+        self,
+        prompts: Sequence[str],
+        encode: Callable[[List[str]], np.ndarray],
+    ) -> np.ndarray:
+        """Return embeddings for ``prompts`` in order, encoding only unseen prompts.
+
+        ``encode`` receives the missing prompts (deduplicated, in first-seen
+        order) and must return one row per prompt.
+        """
+        hashes = [prompt_hash(prompt) for prompt in prompts]
+        with self._lock:
+            missing: Dict[str, str] = {}
+            for key, prompt in zip(hashes, prompts, strict=True):
+                if key not in self._row_by_hash and key not in missing:
+                    missing[key] = prompt
+
+        if missing:
+            encoded = np.asarray(encode(list(missing.values())), dtype=np.float32)
+            if encoded.ndim != 2 or encoded.shape[0] != len(missing):
+                raise ValueError(f"Encoder returned shape {encoded.shape} for {len(missing)} prompts")
+
+        with self._lock:
+            if missing:
+                new_keys = [key for key in missing if key not in self._row_by_hash]
+                if new_keys:
+                    position = {key: idx for idx, key in enumerate(missing)}
+                    self._append(new_keys, encoded[[position[key] for key in new_keys]])
+            rows = [self._row_by_hash[key] for key in hashes]
+            self._use_counter += 1
+            for row in rows:
+                self._last_used[row] = self._use_counter
+            result = self._matrix[rows] if rows else np.empty((0, self.dim or 0), dtype=np.float32)
+            should_flush = self._dirty and (time.time() - self._last_flush) >= TEXT_EMBEDDING_CACHE_FLUSH_INTERVAL_SECONDS
+
+        if should_flush:
+            self.flush()
+        return result
+
+    def flush(self) -> None:
+        """Write the store to disk if it has unsaved rows (keeps the most recently used rows)."""
+        with self._lock:
+            if not self._dirty or self._matrix is None:
+                return
+            rows = np.arange(self._size)
+            if self._size > self.max_entries:
+                last_used = np.asarray(self._last_used[:self._size])
+                rows = np.sort(np.argsort(-last_used, kind="stable")[:self.max_entries])
+            hash_by_row = {row: key for key, row in self._row_by_hash.items()}
+            hashes = [hash_by_row[int(row)] for row in rows]
+            matrix = np.ascontiguousarray(self._matrix[rows])
+            if len(rows) < self._size:
+                self._matrix = matrix
+                self._size = len(rows)
+                self._row_by_hash = {key: row for row, key in enumerate(hashes)}
+                self._last_used = [self._last_used[int(row)] for row in rows]
+            self._dirty = False
+            self._last_flush = time.time()
+
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._atomic_write(self.matrix_path, lambda handle: np.save(handle, matrix))
+            index = {"model_key": self.model_key, "hashes": hashes}
+            self._atomic_write(self.index_path, lambda handle: handle.write(json.dumps(index).encode("utf-8")))
+        except OSError as exc:
+            logger.warning("Could not persist text embedding cache %s: %s", self.matrix_path, exc)
+
+    def _atomic_write(self, path: Path, write: Callable) -> None:
+        fd, tmp_name = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                write(handle)
+            os.replace(tmp_name, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+            raise
+
+
+def get_text_embedding_cache(model_key: str) -> TextEmbeddingCache:
+    """Return the process-wide store for a model, loading it from disk on first use."""
+    with _stores_lock:
+        store = _stores.get(model_key)
+        if store is None:
+            store = _stores[model_key] = TextEmbeddingCache(model_key)
+        return store
+
+
+def flush_text_embedding_caches() -> None:
+    with _stores_lock:
+        stores = list(_stores.values())
+    for store in stores:
+        store.flush()
+
+
+def reset_text_embedding_caches() -> None:
+    """Drop in-process stores without writing them (used by tests)."""
+    with _stores_lock:
+        _stores.clear()
+
+
+atexit.register(flush_text_embedding_caches)
@@ -301,6 +301,7 @@ def rebuild_asset_text_index(
     *,
     tenant_id: UUID | str,
     asset_id: UUID | str | None = None,
+    asset_ids: Iterable[UUID | str] | None = None,
     limit: int | None = None,
     offset: int = 0,
     include_embeddings: bool = True,
@@ -311,8 +312,9 @@ def rebuild_asset_text_index(
     safe_limit = None if limit is None else max(1, int(limit))
     refresh_mode = bool(refresh)
 
-    if asset_id is not None:
-        asset_ids = [_normalize_uuid(asset_id, field_name="asset_id")]
+    explicit_ids = ([] if asset_id is None else [asset_id]) + list(asset_ids or [])
+    if explicit_ids:
+        asset_ids = list(dict.fromkeys(_normalize_uuid(value, field_name="asset_id") for value in explicit_ids))
     else:
         query = db.query(ImageMetadata.asset_id).filter(
             tenant_column_filter_for_values(ImageMetadata, str(tenant_uuid)),
@@ -0,0 +1,438 @@
+"""Embedded vector store for SQLite/local mode.
+
+Without pgvector, similarity search used to load every JSON embedding for a
+tenant into an in-process NumPy matrix. Here each (database, tenant, kind)
+gets a store on disk:
+
+- a memory-mapped float16 matrix of unit vectors
+- a JSON id map (row -> asset id)
+- a watermark of the source table
+
+Searches scan the mapped file in fixed-size chunks, so resident memory stays
+bounded whatever the library size.
+
+Stores stay current in two ways. ORM writes to ``image_embeddings`` and
+``asset_text_index`` in this process are applied after commit. Before each
+search, a cheap count/max watermark query picks up rows written by other
+processes (CLI jobs), falling back to a rebuild when rows were removed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import heapq
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import sqlalchemy as sa
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from zoltag.metadata import AssetTextIndex, ImageEmbedding
+from zoltag.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+KIND_IMAGE = "image"
+KIND_TEXT = "text"
+
+VECTOR_STORE_FORMAT_VERSION = 1
+VECTOR_STORE_SEARCH_CHUNK_ROWS = 8192
+VECTOR_STORE_RECHECK_SECONDS = 5.0
+VECTOR_STORE_REBUILD_BATCH = 2000
+_INITIAL_CAPACITY = 1024
+_COMPACT_DEAD_RATIO = 0.25
+
+_PENDING_KEY = "zoltag_vector_store_pending"
+
+
+def _atomic_write_bytes(path: Path, data: bytes) -> None:
+    fd, tmp_name = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+def _unit(vector) -> Optional[np.ndarray]:
+    if vector is None:
+        return None
+    vec = np.asarray(vector, dtype=np.float32).reshape(-1)
+    if vec.size == 0:
+        return None
+    norm = float(np.linalg.norm(vec))
+    if not np.isfinite(norm) or norm <= 1e-12:
+        return None
+    return vec / norm
+
+
+class LocalVectorStore:
+    """Unit vectors keyed by asset id in a memory-mapped float16 matrix."""
+
+    def __init__(self, directory: Path, name: str):
+        self.directory = Path(directory)
+        self.name = name
+        self.matrix_path = self.directory / f"{name}.f16"
+        self.index_path = self.directory / f"{name}.json"
+        self._lock = threading.RLock()
+        self._matrix: Optional[np.memmap] = None
+        self._live = np.zeros(0, dtype=bool)
+        self._keys: List[Optional[str]] = []
+        self._row_by_key: Dict[str, int] = {}
+        self.dim: Optional[int] = None
+        self.watermark: Optional[list] = None
+        # Source rows that could not be stored (no/zero/wrong-size vector).
+        self.unusable_rows = 0
+        self.checked_at = 0.0
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._row_by_key)
+
+    def __contains__(self, key: object) -> bool:
+        return str(key) in self._row_by_key
+
+    # --- persistence ------------------------------------------------------
+
+    def _load(self) -> None:
+        if not (self.matrix_path.exists() and self.index_path.exists()):
+            return
+        try:
+            index = json.loads(self.index_path.read_text())
+            if index.get("version") != VECTOR_STORE_FORMAT_VERSION:
+                return
+            dim = int(index["dim"])
+            keys = list(index.get("keys") or [])
+            capacity = int(index.get("capacity") or len(keys))
+            self._open(capacity, dim)
+        except Exception as exc:  # noqa: BLE001 - an unreadable store is rebuilt from the database
+            logger.warning("Ignoring unreadable vector store %s: %s", self.matrix_path, exc)
+            self._matrix = None
+            return
+        self.dim = dim
+        self._keys = keys
+        self._row_by_key = {key: row for row, key in enumerate(keys) if key is not None}
+        self._live = np.zeros(capacity, dtype=bool)
+        for row in self._row_by_key.values():
+            self._live[row] = True
+        self.watermark = index.get("watermark")
+        self.unusable_rows = int(index.get("unusable_rows") or 0)
+
+    def _open(self, capacity: int, dim: int) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        size = int(capacity) * int(dim) * 2
+        mode = "r+b" if self.matrix_path.exists() else "w+b"
+        with open(self.matrix_path, mode) as handle:
+            handle.truncate(size)
+        self._matrix = np.memmap(self.matrix_path, dtype=np.float16, mode="r+", shape=(int(capacity), int(dim)))
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._matrix is not None:
+                self._matrix.flush()
+            if self.dim is None:
+                return
+            index = {
+                "version": VECTOR_STORE_FORMAT_VERSION,
+                "dim": self.dim,
+                "capacity": 0 if self._matrix is None else int(self._matrix.shape[0]),
+                "keys": self._keys,
+                "watermark": self.watermark,
+                "unusable_rows": self.unusable_rows,
+            }
+            _atomic_write_bytes(self.index_path, json.dumps(index).encode("utf-8"))
+
+    def reset(self, dim: Optional[int] = None) -> None:
+        """Drop every vector (and optionally change dimension)."""
+        with self._lock:
+            self._matrix = None
+            self._keys = []
+            self._row_by_key = {}
+            self._live = np.zeros(0, dtype=bool)
+            self.watermark = None
+            self.unusable_rows = 0
+            self.dim = dim
+            if self.matrix_path.exists():
+                self.matrix_path.unlink()
+            if dim is not None:
+                self._open(_INITIAL_CAPACITY, dim)
+                self._live = np.zeros(_INITIAL_CAPACITY, dtype=bool)
+
+    # --- mutation ---------------------------------------------------------
+
+    def upsert(self, items: Iterable[Tuple[object, object]]) -> int:
+        """Insert or replace vectors; empty/zero vectors remove the key. Returns rows written."""
+        written = 0
+        with self._lock:
+            for key, vector in items:
+                key = str(key)
+                unit = _unit(vector)
+                if unit is None:
+                    self.remove([key])
+                    continue
+                if self.dim is None or self._matrix is None:
+                    self.reset(int(unit.size))
+                if unit.size != self.dim:
+                    logger.debug("Skipping %s vector for %s with dimension %s (store is %s)", self.name, key, unit.size, self.dim)
+                    continue
+                row = self._row_by_key.get(key)
+                if row is None:
+                    row = len(self._keys)
+                    if row >= self._matrix.shape[0]:
+                        self._grow(max(row + 1, self._matrix.shape[0] * 2))
+                    self._keys.append(key)
+                    self._row_by_key[key] = row
+                    self._live[row] = True
+                self._matrix[row] = unit
+                written += 1
+        return written
+
+    def remove(self, keys: Sequence[object]) -> None:
+        with self._lock:
+            for key in keys:
+                row = self._row_by_key.pop(str(key), None)
+                if row is None:
+                    continue
+                self._keys[row] = None
+                self._live[row] = False
+            dead = len(self._keys) - len(self._row_by_key)
+            if self._keys and dead > _COMPACT_DEAD_RATIO * len(self._keys):
+                self._compact()
+
+    def _grow(self, capacity: int) -> None:
+        self._matrix.flush()
+        self._matrix = None
+        self._open(capacity, self.dim)
+        live = np.zeros(capacity, dtype=bool)
+        live[: self._live.size] = self._live
+        self._live = live
+
+    def _compact(self) -> None:
+        rows = sorted(self._row_by_key.values())
+        keys = [self._keys[row] for row in rows]
+        vectors = np.array(self._matrix[rows], dtype=np.float16) if rows else None
+        dim = self.dim
+        self.reset(dim)
+        if vectors is not None:
+            if len(rows) > self._matrix.shape[0]:
+                self._grow(len(rows))
+            self._matrix[: len(rows)] = vectors
+            self._keys = keys
+            self._row_by_key = {key: row for row, key in enumerate(keys)}
+            self._live[: len(rows)] = True
+
+    # --- search -----------------------------------------------------------
+
+    def search(
+        self,
+        query,
+        k: int,
+        *,
+        exclude: Sequence[object] = (),
+    ) -> List[Tuple[str, float]]:
+        """Return up to ``k`` ``(key, cosine)`` pairs, best first."""
+        unit = _unit(query)
+        if unit is None or self._matrix is None or unit.size != self.dim or k <= 0:
+            return []
+        with self._lock:
+            matrix = self._matrix
+            live = self._live
+            keys = list(self._keys)
+        excluded = {str(key) for key in exclude}
+        limit = int(k) + len(excluded)
+        count = len(keys)
+        best: List[Tuple[float, int]] = []
+        for start in range(0, count, VECTOR_STORE_SEARCH_CHUNK_ROWS):
+            end = min(count, start + VECTOR_STORE_SEARCH_CHUNK_ROWS)
+            scores = np.asarray(matrix[start:end], dtype=np.float32) @ unit
+            scores[~live[start:end]] = -np.inf
+            if scores.size > limit:
+                top = np.argpartition(scores, -limit)[-limit:]
+            else:
+                top = np.arange(scores.size)
+            for idx in top:
+                score = float(scores[idx])
+                if score == -np.inf:
+                    continue
+                item = (score, start + int(idx))
+                if len(best) < limit:
+                    heapq.heappush(best, item)
+                elif item > best[0]:
+                    heapq.heapreplace(best, item)
+        results = []
+        for score, row in sorted(best, reverse=True):
+            key = keys[row]
+            if key is None or key in excluded:
+                continue
+            results.append((key, score))
+            if len(results) >= k:
+                break
+        return results
+
+
+# --- database-backed stores ---------------------------------------------------
+
+_stores_lock = threading.Lock()
+_stores: Dict[Tuple[str, str, str], LocalVectorStore] = {}
+
+
+def default_store_dir() -> Path:
+    configured = settings.local_vector_store_dir
+    if configured:
+        return Path(configured)
+    return Path(settings.local_data_dir) / "vector-store"
+
+
+def _database_key(db: Session) -> Optional[str]:
+    bind = db.get_bind()
+    url = bind.engine.url
+    if bind.dialect.name == "postgresql" or not url.database or url.database == ":memory:":
+        return None
+    return hashlib.sha256(str(url).encode("utf-8")).hexdigest()[:12]
+
+
+def is_local_vector_store_enabled(db: Session) -> bool:
+    """True for file-backed non-Postgres databases (SQLite desktop mode)."""
+    return bool(settings.local_vector_store_enabled) and _database_key(db) is not None
+
+
+def _watermark(db: Session, tenant_id: uuid.UUID, kind: str) -> list:
+    if kind == KIND_IMAGE:
+        count, max_id = db.query(sa.func.count(ImageEmbedding.id), sa.func.max(ImageEmbedding.id)).filter(
+            ImageEmbedding.tenant_id == tenant_id,
+            ImageEmbedding.embedding.is_not(None),
+        ).one()
+        return [int(count or 0), int(max_id or 0)]
+    count, max_updated = db.query(sa.func.count(AssetTextIndex.asset_id), sa.func.max(AssetTextIndex.updated_at)).filter(
+        AssetTextIndex.tenant_id == tenant_id,
+        AssetTextIndex.search_embedding.is_not(None),
+    ).one()
+    return [int(count or 0), max_updated.isoformat() if max_updated is not None else None]
+
+
+def _source_rows(db: Session, tenant_id: uuid.UUID, kind: str, since: Optional[object] = None):
+    if kind == KIND_IMAGE:
+        query = db.query(ImageEmbedding.asset_id, ImageEmbedding.embedding).filter(
+            ImageEmbedding.tenant_id == tenant_id,
+            ImageEmbedding.embedding.is_not(None),
+        )
+        if since is not None:
+            query = query.filter(ImageEmbedding.id > since)
+        return query.order_by(ImageEmbedding.id.asc()).yield_per(VECTOR_STORE_REBUILD_BATCH)
+    query = db.query(AssetTextIndex.asset_id, AssetTextIndex.search_embedding).filter(
+        AssetTextIndex.tenant_id == tenant_id,
+        AssetTextIndex.search_embedding.is_not(None),
+    )
+    if since is not None:
+        query = query.filter(AssetTextIndex.updated_at >= datetime.fromisoformat(since))
+    return query.yield_per(VECTOR_STORE_REBUILD_BATCH)
+
+
+def _refresh(db: Session, store: LocalVectorStore, tenant_id: uuid.UUID, kind: str) -> None:
+    current = _watermark(db, tenant_id, kind)
+    previous = store.watermark
+    if previous == current:
+        return
+    incremental = (
+        previous is not None
+        and previous[1] is not None
+        and current[0] >= previous[0]
+        and current[1] is not None
+        and current[1] >= previous[1]
+    )
+    if incremental:
+        store.upsert((row[0], row[1]) for row in _source_rows(db, tenant_id, kind, since=previous[1]))
+    if not incremental or len(store) + store.unusable_rows != current[0]:
+        store.reset()
+        store.upsert((row[0], row[1]) for row in _source_rows(db, tenant_id, kind))
+        store.unusable_rows = max(0, current[0] - len(store))
+        logger.info("Rebuilt %s vector store for tenant %s (%s vectors)", kind, tenant_id, len(store))
+    store.watermark = current
+    store.flush()
+
+
+def get_vector_store(db: Session, tenant_id: object, kind: str) -> Optional[LocalVectorStore]:
+    """Return the tenant's store for ``kind``, brought up to date with the database."""
+    database_key = _database_key(db)
+    if database_key is None or not settings.local_vector_store_enabled:
+        return None
+    tenant_uuid = tenant_id if isinstance(tenant_id, uuid.UUID) else uuid.UUID(str(tenant_id))
+    tenant_key = str(tenant_uuid)
+    cache_key = (database_key, tenant_key, kind)
+    with _stores_lock:
+        store = _stores.get(cache_key)
+        if store is None:
+            store = _stores[cache_key] = LocalVectorStore(default_store_dir(), f"{kind}-{tenant_key}-{database_key}")
+    now = time.monotonic()
+    if now - store.checked_at >= VECTOR_STORE_RECHECK_SECONDS:
+        with store._lock:
+            if now - store.checked_at >= VECTOR_STORE_RECHECK_SECONDS:
+                _refresh(db, store, tenant_uuid, kind)
+                store.checked_at = now
+    return store
+
+
+def reset_vector_stores() -> None:
+    """Forget loaded stores (files are kept)."""
+    with _stores_lock:
+        _stores.clear()
+
+
+# --- write-through from ORM sessions -------------------------------------------
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_vector_writes(session, flush_context) -> None:
+    if not _stores:
+        return
+    pending = session.info.setdefault(_PENDING_KEY, [])
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, ImageEmbedding):
+            pending.append((str(obj.tenant_id), KIND_IMAGE, str(obj.asset_id), obj.embedding))
+        elif isinstance(obj, AssetTextIndex) and obj.search_embedding is not None:
+            pending.append((str(obj.tenant_id), KIND_TEXT, str(obj.asset_id), obj.search_embedding))
+    for obj in session.deleted:
+        if isinstance(obj, ImageEmbedding):
+            pending.append((str(obj.tenant_id), KIND_IMAGE, str(obj.asset_id), None))
+        elif isinstance(obj, AssetTextIndex):
+            pending.append((str(obj.tenant_id), KIND_TEXT, str(obj.asset_id), None))
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_vector_writes(session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    with _stores_lock:
+        stores = dict(_stores)
+    by_store: Dict[Tuple[str, str, str], list] = {}
+    for tenant_id, kind, asset_id, vector in pending:
+        for cache_key in stores:
+            if cache_key[1] == tenant_id and cache_key[2] == kind:
+                by_store.setdefault(cache_key, []).append((asset_id, vector))
+    for cache_key, items in by_store.items():
+        try:
+            stores[cache_key].upsert(items)
+        except Exception:  # noqa: BLE001 - the next watermark check repairs the store
+            logger.warning("Vector store write-through failed for %s", cache_key, exc_info=True)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_vector_writes(session) -> None:
+    session.info.pop(_PENDING_KEY, None)
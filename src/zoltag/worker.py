@@ -16,19 +16,24 @@ from threading import Event, Lock, Thread
 from typing import Any, Callable, Optional
 
 from cronsim import CronSim
+from sqlalchemy import Text, case, cast, literal, select, update
 from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import joinedload
 from zoltag.cli.introspection import build_queue_command_argv
 from zoltag.database import SessionLocal
+from zoltag.email import process_email_outbox, purge_email_outbox
+from zoltag.geo import fold_geo_cell_deltas
 from zoltag.job_profiles import RUN_PROFILE_LIGHT, normalize_run_profile
+from zoltag.maintenance_leader import AdvisoryLockLeader
 from zoltag.metadata import Job, JobAttempt, JobDefinition, JobTrigger, JobWorker, WorkflowRun
 from zoltag.metadata import Tenant as TenantModel
 from zoltag.auth.models import UserProfile
 from zoltag.workflow_queue import (
-    handle_workflow_job_state_change,
     mark_workflow_step_running,
+    process_workflow_job_events,
     reconcile_running_workflows,
-    start_workflow_run,
+    record_workflow_job_state_change,
+    start_workflow_runs,
 )
 
 # Ensure SQLAlchemy registers auth tables (notably user_profiles), which are
@@ -45,7 +50,12 @@ _DEFAULT_IDLE_HEARTBEAT_SECONDS = 30.0
 _DEFAULT_LOG_FLUSH_SECONDS = 2.0
 _DEFAULT_CANCEL_CHECK_SECONDS = 1.0
 _DEFAULT_LEASE_HEARTBEAT_SECONDS = 30.0
-_DEFAULT_WORKFLOW_RECONCILE_SECONDS = 60.0
+# Steps advance from the job event outbox; the full reconcile scan is only a safety net.
+_DEFAULT_WORKFLOW_RECONCILE_SECONDS = 900.0
+_DEFAULT_WORKFLOW_EVENT_DRAIN_SECONDS = 5.0
+_DEFAULT_WORKFLOW_EVENT_BATCH = 500
+_DEFAULT_EMAIL_DRAIN_SECONDS = 5.0
+_DEFAULT_GEO_FOLD_SECONDS = 5.0
 _DEFAULT_SCHEDULE_TICK_SECONDS = 60.0
 _DEFAULT_LEASE_RECLAIM_SECONDS = 120.0
 
@@ -734,7 +744,7 @@ def _finalize_job(
                 attempt.stderr_tail = result.stderr_tail
                 attempt.error_text = result.error_text
 
-        handle_workflow_job_state_change(db, job=job)
+        record_workflow_job_state_change(db, job=job)
         _upsert_worker_heartbeat(
             db,
             worker_id=worker_id,
@@ -757,59 +767,84 @@ def _build_worker_id() -> str:
 
 
 def _reclaim_stale_leases() -> None:
-    """Reset jobs whose lease has expired back to queued so they can be retried."""
+    """Reset jobs whose lease has expired back to queued so they can be retried.
+
+    Runs as one set-based ``UPDATE ... RETURNING`` over the running-lease
+    index instead of loading every stale job; rows another reclaimer already
+    holds are skipped.
+    """
     db = SessionLocal()
     try:
         now = _now_utc()
-        stale = (
-            db.query(Job)
-            .filter(
+        stale_ids = (
+            select(Job.id)
+            .where(
                 Job.status == "running",
                 Job.lease_expires_at.isnot(None),
                 Job.lease_expires_at < now,
             )
-            .all()
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
         )
-        if not stale:
+        exhausted = Job.attempt_count >= Job.max_attempts
+        attempts_text = cast(Job.attempt_count, Text)
+        retry_delays = [
+            (Job.attempt_count <= 1, now + timedelta(seconds=300)),
+            (Job.attempt_count == 2, now + timedelta(seconds=600)),
+            (Job.attempt_count == 3, now + timedelta(seconds=1200)),
+            (Job.attempt_count == 4, now + timedelta(seconds=2400)),
+        ]
+        reclaimed = db.execute(
+            update(Job)
+            .where(Job.id.in_(stale_ids))
+            .values(
+                status=case((exhausted, "dead_letter"), else_="queued"),
+                finished_at=case((exhausted, now), else_=None),
+                scheduled_for=case((exhausted, Job.scheduled_for), else_=case(*retry_delays, else_=now + timedelta(seconds=3600))),
+                started_at=case((exhausted, Job.started_at), else_=None),
+                last_error=case(
+                    (
+                        exhausted,
+                        literal("Lease expired after ") + attempts_text + literal(" attempt(s); no retries remaining"),
+                    ),
+                    else_=literal("Lease expired; requeued (attempt ")
+                    + attempts_text
+                    + literal("/")
+                    + cast(Job.max_attempts, Text)
+                    + literal(")"),
+                ),
+                lease_expires_at=None,
+                claimed_by_worker=None,
+            )
+            .returning(Job.id, Job.status, Job.attempt_count, Job.max_attempts, Job.source_ref)
+            .execution_options(synchronize_session=False)
+        ).all()
+        if not reclaimed:
+            db.rollback()
             return
-        stale_job_ids = [job.id for job in stale]
-        open_attempts = (
-            db.query(JobAttempt)
-            .filter(
-                JobAttempt.job_id.in_(stale_job_ids),
+        db.execute(
+            update(JobAttempt)
+            .where(
+                JobAttempt.job_id.in_([row.id for row in reclaimed]),
                 JobAttempt.status == "running",
             )
-            .all()
+            .values(status="failed", finished_at=now, error_text="Lease expired; worker presumed dead")
+            .execution_options(synchronize_session=False)
         )
-        for attempt in open_attempts:
-            attempt.status = "failed"
-            attempt.finished_at = now
-            attempt.error_text = "Lease expired; worker presumed dead"
-
-        for job in stale:
-            attempts_used = int(job.attempt_count or 0)
-            if attempts_used >= int(job.max_attempts or 1):
-                job.status = "dead_letter"
-                job.finished_at = now
-                job.last_error = f"Lease expired after {attempts_used} attempt(s); no retries remaining"
+        for row in reclaimed:
+            record_workflow_job_state_change(db, job=row)
+        db.commit()
+        for row in reclaimed:
+            if row.status == "dead_letter":
                 logger.warning(
                     "Job %s lease expired, moved to dead_letter (attempt %s/%s)",
-                    job.id, attempts_used, job.max_attempts,
+                    row.id, row.attempt_count, row.max_attempts,
                 )
             else:
-                delay_seconds = min(300 * (2 ** max(attempts_used - 1, 0)), 3600)
-                job.status = "queued"
-                job.scheduled_for = now + timedelta(seconds=delay_seconds)
-                job.started_at = None
-                job.finished_at = None
-                job.last_error = f"Lease expired; requeued (attempt {attempts_used}/{job.max_attempts})"
                 logger.warning(
-                    "Job %s lease expired, requeued in %ss (attempt %s/%s)",
-                    job.id, delay_seconds, attempts_used, job.max_attempts,
+                    "Job %s lease expired, requeued (attempt %s/%s)",
+                    row.id, row.attempt_count, row.max_attempts,
                 )
-            job.lease_expires_at = None
-            job.claimed_by_worker = None
-        db.commit()
     except Exception:
         db.rollback()
         logger.exception("Stale lease reclaim failed")
@@ -817,6 +852,67 @@ def _reclaim_stale_leases() -> None:
         db.close()
 
 
+def _drain_workflow_job_events(*, batch_size: int = _DEFAULT_WORKFLOW_EVENT_BATCH) -> int:
+    """Advance workflows for recorded child job state changes until the outbox is empty."""
+    drained = 0
+    db = SessionLocal()
+    try:
+        while True:
+            consumed = process_workflow_job_events(db, limit=batch_size)
+            db.commit()
+            drained += consumed
+            if consumed < batch_size:
+                break
+    except Exception:
+        db.rollback()
+        logger.exception("Workflow job event drain failed")
+    finally:
+        db.close()
+    return drained
+
+
+def _drain_email_outbox() -> int:
+    """Send due outbox email in batches until none are left, then purge expired finished rows."""
+    sent = 0
+    db = SessionLocal()
+    try:
+        while True:
+            attempted = process_email_outbox(db)
+            db.commit()
+            sent += attempted
+            if not attempted:
+                break
+        purged = purge_email_outbox(db)
+        db.commit()
+        if purged:
+            logger.info("Purged %s finished outbox email(s)", purged)
+    except Exception:
+        db.rollback()
+        logger.exception("Email outbox drain failed")
+    finally:
+        db.close()
+    return sent
+
+
+def _fold_geo_cell_deltas() -> int:
+    """Fold the geo cell journal into map clusters until it is empty."""
+    folded = 0
+    db = SessionLocal()
+    try:
+        while True:
+            consumed = fold_geo_cell_deltas(db)
+            db.commit()
+            folded += consumed
+            if not consumed:
+                break
+    except Exception:
+        db.rollback()
+        logger.exception("Geo cell journal fold failed")
+    finally:
+        db.close()
+    return folded
+
+
 def _reconcile_workflows_once(*, limit_runs: int = 25) -> None:
     db = SessionLocal()
     try:
@@ -837,7 +933,8 @@ def _fire_due_schedule_triggers() -> None:
     For each enabled global trigger (tenant_id IS NULL, trigger_type='schedule')
     whose cron expression fired within the last tick window, one WorkflowRun is
     created per active tenant — skipping any tenant that already has a run for
-    this workflow within the dedupe window.
+    this workflow within the dedupe window. The runs for one trigger are
+    inserted together as a single batch.
 
     Called from the worker loop on a configurable interval (default 60s).
     """
@@ -859,8 +956,11 @@ def _fire_due_schedule_triggers() -> None:
         if not triggers:
             return
 
-        tenants = db.query(TenantModel).filter(TenantModel.active.is_(True)).all()
-        if not tenants:
+        tenant_ids = [
+            tenant_id
+            for (tenant_id,) in db.query(TenantModel.id).filter(TenantModel.active.is_(True)).all()
+        ]
+        if not tenant_ids:
             return
 
         tick_seconds = _DEFAULT_SCHEDULE_TICK_SECONDS
@@ -889,42 +989,42 @@ def _fire_due_schedule_triggers() -> None:
                 continue  # not due this tick
 
             dedupe_window = int(trigger.dedupe_window_seconds or 300)
+            recent_tenant_ids = {
+                tenant_id
+                for (tenant_id,) in db.query(WorkflowRun.tenant_id)
+                .filter(
+                    WorkflowRun.workflow_definition_id == workflow_def.id,
+                    WorkflowRun.queued_at >= now - timedelta(seconds=dedupe_window),
+                )
+                .distinct()
+                .all()
+            }
+            due_tenant_ids = [tenant_id for tenant_id in tenant_ids if tenant_id not in recent_tenant_ids]
+            if not due_tenant_ids:
+                continue
 
-            for tenant in tenants:
-                try:
-                    existing = (
-                        db.query(WorkflowRun.id)
-                        .filter(
-                            WorkflowRun.tenant_id == tenant.id,
-                            WorkflowRun.workflow_definition_id == workflow_def.id,
-                            WorkflowRun.queued_at >= now - timedelta(seconds=dedupe_window),
-                        )
-                        .first()
-                    )
-                    if existing:
-                        continue
-
-                    start_workflow_run(
-                        db,
-                        tenant_id=tenant.id,
-                        workflow=workflow_def,
-                        created_by=None,
-                        priority=200,
-                    )
-                    db.commit()
-                    logger.info(
-                        "Schedule trigger %s fired workflow '%s' for tenant %s",
-                        trigger.id,
-                        workflow_def.key,
-                        tenant.id,
-                    )
-                except Exception:
-                    db.rollback()
-                    logger.exception(
-                        "Failed to start workflow for schedule trigger %s tenant %s",
-                        trigger.id,
-                        tenant.id,
-                    )
+            try:
+                runs = start_workflow_runs(
+                    db,
+                    tenant_ids=due_tenant_ids,
+                    workflow=workflow_def,
+                    created_by=None,
+                    priority=200,
+                )
+                db.commit()
+                logger.info(
+                    "Schedule trigger %s fired workflow '%s' for %s tenant(s)",
+                    trigger.id,
+                    workflow_def.key,
+                    len(runs),
+                )
+            except Exception:
+                db.rollback()
+                logger.exception(
+                    "Failed to start workflows for schedule trigger %s (%s tenant(s))",
+                    trigger.id,
+                    len(due_tenant_ids),
+                )
 
     except Exception:
         db.rollback()
@@ -955,15 +1055,25 @@ def run_loop(
         os.getenv("JOB_WORKFLOW_RECONCILE_SECONDS") or _DEFAULT_WORKFLOW_RECONCILE_SECONDS
     )
     workflow_reconcile_limit = int(os.getenv("JOB_WORKFLOW_RECONCILE_LIMIT") or 25)
+    workflow_event_drain_interval = float(
+        os.getenv("JOB_WORKFLOW_EVENT_DRAIN_SECONDS") or _DEFAULT_WORKFLOW_EVENT_DRAIN_SECONDS
+    )
     schedule_tick_interval = float(
         os.getenv("JOB_SCHEDULE_TICK_SECONDS") or _DEFAULT_SCHEDULE_TICK_SECONDS
     )
     lease_reclaim_interval = float(os.getenv("JOB_LEASE_RECLAIM_SECONDS") or _DEFAULT_LEASE_RECLAIM_SECONDS)
+    email_drain_interval = float(os.getenv("JOB_EMAIL_DRAIN_SECONDS") or _DEFAULT_EMAIL_DRAIN_SECONDS)
+    geo_fold_interval = float(os.getenv("JOB_GEO_FOLD_SECONDS") or _DEFAULT_GEO_FOLD_SECONDS)
     maintenance_enabled = _to_bool(os.getenv("JOB_WORKER_ENABLE_MAINTENANCE_TICKS") or "true")
     last_idle_heartbeat_at = 0.0
     last_workflow_reconcile_at = 0.0
+    last_workflow_event_drain_at = 0.0
     last_schedule_tick_at = 0.0
     last_lease_reclaim_at = 0.0
+    last_email_drain_at = 0.0
+    last_geo_fold_at = 0.0
+    # Only one worker in the fleet runs maintenance; others take over if it dies.
+    maintenance_leader = AdvisoryLockLeader() if maintenance_enabled else None
 
     logger.info(
         "Job worker started: worker_id=%s lease_seconds=%s run_profile=%s",
@@ -974,7 +1084,7 @@ def run_loop(
 
     while not stop.is_set():
         now_monotonic = time.monotonic()
-        if maintenance_enabled:
+        if maintenance_leader is not None and maintenance_leader.is_leader():
             if now_monotonic - last_lease_reclaim_at >= lease_reclaim_interval:
                 last_lease_reclaim_at = now_monotonic
                 _reclaim_stale_leases()
@@ -987,6 +1097,21 @@ def run_loop(
                 last_schedule_tick_at = now_monotonic
                 _fire_due_schedule_triggers()
 
+        # Any worker may drain the outbox; events are claimed with SKIP LOCKED.
+        if now_monotonic - last_workflow_event_drain_at >= workflow_event_drain_interval:
+            last_workflow_event_drain_at = now_monotonic
+            _drain_workflow_job_events()
+
+        # Like workflow events, outbox email is claimed with SKIP LOCKED.
+        if now_monotonic - last_email_drain_at >= email_drain_interval:
+            last_email_drain_at = now_monotonic
+            _drain_email_outbox()
+
+        # Journal rows are claimed with SKIP LOCKED too; cells are locked in key order.
+        if now_monotonic - last_geo_fold_at >= geo_fold_interval:
+            last_geo_fold_at = now_monotonic
+            _fold_geo_cell_deltas()
+
         try:
             claimed_job = _claim_next_job(
                 worker_id=worker_id,
@@ -1055,9 +1180,14 @@ def run_loop(
             version=version,
             queues=queues,
         )
+        # Start dependent workflow steps right away instead of on the next tick.
+        _drain_workflow_job_events()
+        last_workflow_event_drain_at = time.monotonic()
         if once:
             break
 
+    if maintenance_leader is not None:
+        maintenance_leader.release()
     logger.info("Job worker stopping: worker_id=%s", worker_id)
 
 
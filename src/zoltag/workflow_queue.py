@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
-from uuid import UUID
+from uuid import UUID, uuid4
 
 from sqlalchemy.orm import Session
 
@@ -13,6 +13,7 @@ from zoltag.metadata import (
     Job,
     JobDefinition,
     WorkflowDefinition,
+    WorkflowJobEvent,
     WorkflowRun,
     WorkflowStepRun,
 )
@@ -347,6 +348,27 @@ def start_workflow_run(
     payload: dict | None = None,
 ) -> WorkflowRun:
     steps = validate_workflow_steps(db, list(workflow.steps or []), require_active_definitions=True)
+    return _start_workflow_run(
+        db,
+        tenant_id=tenant_id,
+        workflow=workflow,
+        steps=steps,
+        created_by=created_by,
+        priority=priority,
+        payload=payload,
+    )
+
+
+def _start_workflow_run(
+    db: Session,
+    *,
+    tenant_id: UUID,
+    workflow: WorkflowDefinition,
+    steps: list[dict],
+    created_by: UUID | None,
+    priority: int,
+    payload: dict | None = None,
+) -> WorkflowRun:
     now = _now_utc()
     run = WorkflowRun(
         tenant_id=tenant_id,
@@ -390,6 +412,119 @@ def start_workflow_run(
     return run
 
 
+def start_workflow_runs(
+    db: Session,
+    *,
+    tenant_ids: list[UUID],
+    workflow: WorkflowDefinition,
+    created_by: UUID | None,
+    priority: int,
+    payload: dict | None = None,
+) -> list[WorkflowRun]:
+    """Start one run of ``workflow`` per tenant, inserting all rows in one flush.
+
+    Every fan-out run starts from the same state, so the steps are validated
+    and the initially ready steps resolved once; the runs, step runs and first
+    jobs for all tenants are then added together and written as multi-row
+    inserts instead of several round trips per tenant.
+    """
+    if not tenant_ids:
+        return []
+    steps = validate_workflow_steps(db, list(workflow.steps or []), require_active_definitions=True)
+    definitions = {
+        str(row.key): row
+        for row in db.query(JobDefinition).filter(
+            JobDefinition.key.in_([step["definition_key"] for step in steps])
+        ).all()
+    }
+    max_parallel = max(1, int(workflow.max_parallel_steps or 1))
+    ready_steps = sorted(
+        (step for step in steps if not step.get("depends_on")),
+        key=lambda step: step["step_key"],
+    )[:max_parallel]
+    try:
+        ready_payloads = {
+            step["step_key"]: normalize_queue_payload(step["definition_key"], step.get("payload") or {})
+            for step in ready_steps
+        }
+    except ValueError:
+        # Let the per-run path record the failing step on each run.
+        return [
+            _start_workflow_run(
+                db,
+                tenant_id=tenant_id,
+                workflow=workflow,
+                steps=steps,
+                created_by=created_by,
+                priority=priority,
+                payload=payload,
+            )
+            for tenant_id in tenant_ids
+        ]
+
+    now = _now_utc()
+    run_priority = int(priority or 100)
+    failure_policy = str(workflow.failure_policy or "fail_fast")
+    ready_keys = {step["step_key"] for step in ready_steps}
+    runs: list[WorkflowRun] = []
+    rows: list = []
+    for tenant_id in tenant_ids:
+        run = WorkflowRun(
+            id=uuid4(),
+            tenant_id=tenant_id,
+            workflow_definition_id=workflow.id,
+            status="running",
+            payload=dict(payload or {}),
+            priority=run_priority,
+            max_parallel_steps=max_parallel,
+            failure_policy=failure_policy,
+            queued_at=now,
+            started_at=now,
+            created_by=created_by,
+        )
+        runs.append(run)
+        rows.append(run)
+        for step in steps:
+            step_key = step["step_key"]
+            definition = definitions[step["definition_key"]]
+            step_run = WorkflowStepRun(
+                id=uuid4(),
+                workflow_run_id=run.id,
+                step_key=step_key,
+                definition_id=definition.id,
+                status="pending",
+                payload=step.get("payload") or {},
+                depends_on=step.get("depends_on") or [],
+            )
+            if step_key in ready_keys:
+                job = Job(
+                    id=uuid4(),
+                    tenant_id=tenant_id,
+                    definition_id=definition.id,
+                    source="system",
+                    source_ref=make_workflow_source_ref(run.id, step_key),
+                    status="queued",
+                    run_profile=resolve_definition_run_profile(definition),
+                    priority=run_priority,
+                    payload=dict(ready_payloads[step_key]),
+                    dedupe_key=f"workflow-step:{run.id}:{step_key}",
+                    correlation_id=f"workflow:{run.id}",
+                    scheduled_for=now,
+                    queued_at=now,
+                    max_attempts=int(definition.max_attempts or 3),
+                    created_by=created_by,
+                )
+                rows.append(job)
+                step_run.status = "queued"
+                step_run.queued_at = now
+                step_run.child_job_id = job.id
+            rows.append(step_run)
+
+    db.add_all(rows)
+    db.flush()
+    return runs
+
+
 def mark_workflow_step_running(db: Session, *, job: Job, started_at: datetime | None = None) -> None:
     parsed = parse_workflow_source_ref(job.source_ref)
     if not parsed:
@@ -414,83 +549,141 @@ def mark_workflow_step_running(db: Session, *, job: Job, started_at: datetime |
         step.started_at = started_at
 
 
-def handle_workflow_job_state_change(db: Session, *, job: Job) -> None:
-    parsed = parse_workflow_source_ref(job.source_ref)
-    if not parsed:
-        return
-    run_id, step_key = parsed
-    run = _lock_workflow_run(db, run_id)
-    if not run:
-        return
-
-    step = (
-        db.query(WorkflowStepRun)
-        .filter(
-            WorkflowStepRun.workflow_run_id == run.id,
-            WorkflowStepRun.step_key == step_key,
-        )
-        .first()
-    )
-    if not step:
-        return
-
+def _apply_job_state_to_step(run: WorkflowRun, step: WorkflowStepRun, job, now: datetime) -> bool:
+    """Copy a child job's state onto its step. Returns True when the step became terminal."""
     job_status = str(job.status or "").lower()
-    now = _now_utc()
-    if job_status == "running":
-        if str(step.status or "") not in _STEP_TERMINAL:
-            step.status = "running"
-            if not step.started_at:
-                step.started_at = job.started_at or now
-        return
-
     if job_status == "queued":
         if str(step.status or "") not in _STEP_TERMINAL:
             step.status = "queued"
-            if not step.queued_at:
-                step.queued_at = job.queued_at or now
-        return
+            step.queued_at = step.queued_at or job.queued_at or now
+        return False
+    if job_status == "running":
+        if str(step.status or "") not in _STEP_TERMINAL:
+            step.status = "running"
+            step.started_at = step.started_at or job.started_at or now
+        return False
 
     if job_status == "succeeded":
         step.status = "succeeded"
-        step.started_at = step.started_at or job.started_at or now
-        step.finished_at = job.finished_at or now
         step.last_error = None
     elif job_status in {"failed", "dead_letter"}:
         step.status = "failed"
-        step.started_at = step.started_at or job.started_at or now
-        step.finished_at = job.finished_at or now
         step.last_error = str(job.last_error or "").strip() or f"Job ended with {job_status}"
         run.last_error = step.last_error
     elif job_status == "canceled":
         step.status = "canceled"
-        step.started_at = step.started_at or job.started_at or now
-        step.finished_at = job.finished_at or now
         step.last_error = str(job.last_error or "").strip() or "Canceled"
         if str(run.last_error or "").strip() == "":
             run.last_error = step.last_error
     else:
-        return
+        return False
+    step.started_at = step.started_at or job.started_at or now
+    step.finished_at = job.finished_at or step.finished_at or now
+    return True
+
 
+def _advance_run(db: Session, run: WorkflowRun, finished_steps: list[WorkflowStepRun]) -> None:
+    """Apply fail-fast, enqueue newly ready steps and settle the run status."""
     if run.status in _RUN_TERMINAL:
         _reconcile_run_status(db, run)
         return
 
-    if str(step.status or "") in {"failed", "canceled"} and str(run.failure_policy or "fail_fast") == "fail_fast":
-        run.status = "failed" if step.status == "failed" else "canceled"
-        run.finished_at = now
-        _cancel_open_steps_for_run(db, run, reason=run.last_error or step.last_error)
-        _reconcile_run_status(db, run)
-        return
+    if str(run.failure_policy or "fail_fast") == "fail_fast":
+        stopped = [step for step in finished_steps if str(step.status or "") in {"failed", "canceled"}]
+        if stopped:
+            step = next((step for step in stopped if step.status == "failed"), stopped[0])
+            run.status = "failed" if step.status == "failed" else "canceled"
+            run.finished_at = _now_utc()
+            _cancel_open_steps_for_run(db, run, reason=run.last_error or step.last_error)
+            _reconcile_run_status(db, run)
+            return
 
     _enqueue_ready_steps(db, run)
     _reconcile_run_status(db, run)
 
 
+def record_workflow_job_state_change(db: Session, *, job) -> bool:
+    """Queue a workflow child job's state change for step advancement.
+
+    Only appends an outbox row, so it is cheap and takes no run lock; it
+    commits (or rolls back) together with the caller's job update. Call
+    ``process_workflow_job_events`` after committing to advance the workflow.
+    """
+    parsed = parse_workflow_source_ref(job.source_ref)
+    if not parsed:
+        return False
+    run_id, step_key = parsed
+    db.add(
+        WorkflowJobEvent(
+            workflow_run_id=run_id,
+            step_key=step_key,
+            job_id=job.id,
+            job_status=str(job.status or "").lower(),
+        )
+    )
+    return True
+
+
+def process_workflow_job_events(db: Session, *, limit: int = 500) -> int:
+    """Consume pending workflow job events in order, advancing each run once per batch.
+
+    Events are claimed with ``SKIP LOCKED`` so several workers can drain the
+    outbox concurrently; each affected run is locked, its steps are loaded
+    once, and every event for it is applied before ready steps are enqueued.
+    Steps take the child job's current state, so replays are harmless.
+    Returns the number of events consumed.
+    """
+    events = (
+        db.query(WorkflowJobEvent)
+        .order_by(WorkflowJobEvent.id.asc())
+        .limit(max(1, int(limit or 500)))
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    if not events:
+        return 0
+
+    events_by_run: dict[UUID, list[WorkflowJobEvent]] = {}
+    for event in events:
+        events_by_run.setdefault(event.workflow_run_id, []).append(event)
+    jobs_by_id = {
+        row.id: row
+        for row in db.query(Job).filter(Job.id.in_({event.job_id for event in events})).all()
+    }
+
+    now = _now_utc()
+    # Lock runs in id order so concurrent drainers cannot deadlock on each other.
+    for run_id in sorted(events_by_run):
+        run_events = events_by_run[run_id]
+        run = _lock_workflow_run(db, run_id)
+        if not run:
+            continue
+        steps_by_key = {str(step.step_key): step for step in _load_step_runs(db, run.id)}
+        finished_steps = []
+        for event in run_events:
+            step = steps_by_key.get(event.step_key)
+            job = jobs_by_id.get(event.job_id)
+            if step is None or job is None:
+                continue
+            if _apply_job_state_to_step(run, step, job, now):
+                finished_steps.append(step)
+        if finished_steps or run.status in _RUN_TERMINAL:
+            _advance_run(db, run, finished_steps)
+
+    (
+        db.query(WorkflowJobEvent)
+        .filter(WorkflowJobEvent.id.in_([event.id for event in events]))
+        .delete(synchronize_session=False)
+    )
+    return len(events)
+
+
 def reconcile_running_workflows(db: Session, *, limit_runs: int = 50) -> int:
     """Reconcile running workflows against current child job state.
 
-    This recovers workflows if a worker crashed between child job completion and
-    workflow callback handling.
+    Steps normally advance from the job event outbox; this full scan is a
+    safety net for changes made without recording an event (for example
+    manual edits), so it runs rarely.
     """
     run_ids = [
         row_id
@@ -504,7 +697,8 @@ def reconcile_running_workflows(db: Session, *, limit_runs: int = 50) -> int:
     ]
 
     processed = 0
-    for run_id in run_ids:
+    # Same lock order as process_workflow_job_events.
+    for run_id in sorted(run_ids):
         run = _lock_workflow_run(db, run_id)
         if not run or str(run.status or "") in _RUN_TERMINAL:
             continue
@@ -525,33 +719,7 @@ def reconcile_running_workflows(db: Session, *, limit_runs: int = 50) -> int:
             job = jobs_by_id.get(step.child_job_id)
             if job is None:
                 continue
-            job_status = str(job.status or "").lower()
-            if job_status == "queued":
-                if str(step.status or "") not in _STEP_TERMINAL:
-                    step.status = "queued"
-                    step.queued_at = step.queued_at or job.queued_at or now
-            elif job_status == "running":
-                if str(step.status or "") not in _STEP_TERMINAL:
-                    step.status = "running"
-                    step.started_at = step.started_at or job.started_at or now
-            elif job_status == "succeeded":
-                step.status = "succeeded"
-                step.started_at = step.started_at or job.started_at or now
-                step.finished_at = step.finished_at or job.finished_at or now
-                step.last_error = None
-            elif job_status in {"failed", "dead_letter"}:
-                step.status = "failed"
-                step.started_at = step.started_at or job.started_at or now
-                step.finished_at = step.finished_at or job.finished_at or now
-                step.last_error = str(job.last_error or "").strip() or f"Job ended with {job_status}"
-                run.last_error = step.last_error
-            elif job_status == "canceled":
-                step.status = "canceled"
-                step.started_at = step.started_at or job.started_at or now
-                step.finished_at = step.finished_at or job.finished_at or now
-                step.last_error = str(job.last_error or "").strip() or "Canceled"
-                if str(run.last_error or "").strip() == "":
-                    run.last_error = step.last_error
+            _apply_job_state_to_step(run, step, job, now)
 
         _enqueue_ready_steps(db, run)
         _reconcile_run_status(db, run)
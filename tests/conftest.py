@@ -1,12 +1,16 @@
 """Test configuration and fixtures."""
 
+import httpx
 import pytest
 import uuid
+from contextlib import contextmanager
 from pathlib import Path
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, Session
 
 from zoltag.metadata import Base
+from zoltag.storage import http_client
+from zoltag.storage.http_client import OAuthRefreshToken
 from zoltag.tenant import Tenant, TenantContext
 from zoltag.config import TenantConfig
 
@@ -15,6 +19,12 @@ from zoltag.config import TenantConfig
 def test_db():
     """Create test database."""
     from zoltag.models.config import Base as ConfigBase
+    from zoltag.auth.dependencies import invalidate_principal_cache
+    from zoltag.keyword_registry import invalidate_keyword_registry
+
+    # Keyword ids and tokens are reused across in-memory databases; drop process-level caches.
+    invalidate_keyword_registry()
+    invalidate_principal_cache()
 
     engine = create_engine("sqlite:///:memory:")
     Base.metadata.create_all(engine)
@@ -52,6 +62,54 @@ def test_tenant():
     TenantContext.clear()
 
 
+@pytest.fixture
+def mock_provider_http(monkeypatch):
+    """Route pooled provider HTTP clients through an in-process handler.
+
+    Call the fixture with a handler and the provider client names to route;
+    it returns the list of requests seen. Cached OAuth access tokens are reset.
+    """
+    calls = []
+
+    def install(handler, providers=("oauth", "gdrive")):
+        def record(request):
+            calls.append(request)
+            return handler(request)
+
+        transport = httpx.MockTransport(record)
+        monkeypatch.setattr(http_client, "_clients", {
+            name: httpx.Client(transport=transport) for name in providers
+        })
+        return calls
+
+    monkeypatch.setattr(OAuthRefreshToken, "_cache", {})
+    return install
+
+
+@pytest.fixture
+def capture_statements():
+    """Record the SQL an engine executes.
+
+    ``with capture_statements(engine) as statements:`` appends each statement,
+    with whitespace collapsed, to ``statements`` until the block exits.
+    """
+
+    @contextmanager
+    def capture(bind):
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(" ".join(statement.split()))
+
+        event.listen(bind, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(bind, "before_cursor_execute", record)
+
+    return capture
+
+
 @pytest.fixture
 def test_config(tmp_path: Path):
     """Create test configuration files."""
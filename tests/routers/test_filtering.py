@@ -256,6 +256,19 @@ class TestComputeCurrentTags:
         assert result[4] == []
         assert result[5] == []
 
+    def test_compute_tags_uses_constant_round_trips(
+        self, test_db: Session, test_tenant: Tenant, sample_images, sample_tags, sample_permatags, capture_statements
+    ):
+        with capture_statements(test_db.get_bind()) as cold:
+            compute_current_tags_for_images(test_db, test_tenant, [1, 2, 3, 4, 5], "siglip")
+        with capture_statements(test_db.get_bind()) as warm:
+            compute_current_tags_for_images(test_db, test_tenant, [1, 2, 3, 4, 5], "siglip")
+
+        # Tag rows + registry load (version, categories, keywords) when cold;
+        # tag rows only once the registry is cached.
+        assert len(cold) == 4
+        assert len(warm) == 1
+
 
 class TestCategoryFilters:
     def test_category_filters_or(self, test_db: Session, test_tenant: Tenant, sample_images, sample_tags):
@@ -4,13 +4,22 @@ import asyncio
 import uuid
 from datetime import datetime, timezone
 
+import pytest
 from starlette.requests import Request
-from sqlalchemy.orm import Session
-
-from zoltag.activity import EVENT_AUTH_LOGIN, EVENT_SEARCH_IMAGES, record_activity_event
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from zoltag.activity import (
+    EVENT_AUTH_LOGIN,
+    EVENT_SEARCH_IMAGES,
+    ActivityEventSink,
+    record_activity_event,
+    start_activity_sink,
+    stop_activity_sink,
+)
 from zoltag.auth.dependencies import get_current_user
 from zoltag.auth.models import UserProfile, UserTenant
-from zoltag.metadata import ActivityEvent, Tenant as TenantModel
+from zoltag.metadata import ActivityEvent, Base, Tenant as TenantModel
 
 
 def _build_request(path: str = "/api/v1/auth/me") -> Request:
@@ -260,3 +269,62 @@ def test_get_current_user_login_event_does_not_guess_multi_membership(test_db: S
     ).order_by(ActivityEvent.created_at.desc()).first()
     assert row is not None
     assert row.tenant_id is None
+
+
+@pytest.fixture
+def file_db(tmp_path):
+    """File-backed database so the sink thread and the test share one store."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'activity.db'}")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def test_activity_sink_batches_events_into_multi_row_inserts(file_db: Session, capture_statements):
+    with capture_statements(file_db.get_bind()) as statements:
+        start_activity_sink(batch_size=50, flush_interval_seconds=60)
+        try:
+            for idx in range(5):
+                record_activity_event(
+                    file_db,
+                    event_type=EVENT_SEARCH_IMAGES,
+                    request_path="/api/v1/images",
+                    details={"idx": idx},
+                )
+            assert file_db.query(ActivityEvent).count() == 0
+        finally:
+            stop_activity_sink()
+
+    rows = file_db.query(ActivityEvent).all()
+    assert sorted(row.details["idx"] for row in rows) == [0, 1, 2, 3, 4]
+    assert len([sql for sql in statements if sql.startswith("INSERT INTO activity_events")]) == 1
+
+
+def test_activity_sink_drops_events_when_queue_is_full(file_db: Session):
+    engine = file_db.get_bind()
+    sink = ActivityEventSink(max_queue_size=2, batch_size=10, flush_interval_seconds=60)
+
+    accepted = [
+        sink.submit(engine, {
+            "id": uuid.uuid4(),
+            "created_at": datetime.utcnow(),
+            "tenant_id": None,
+            "actor_supabase_uid": None,
+            "event_type": EVENT_SEARCH_IMAGES,
+            "request_path": None,
+            "client_ip": None,
+            "user_agent": None,
+            "details": {},
+        })
+        for _ in range(3)
+    ]
+    assert accepted == [True, True, False]
+
+    sink.stop()
+    stats = sink.stats()
+    assert stats["dropped"] == 1
+    assert stats["written"] == 2
+    assert stats["queued"] == 0
+    assert file_db.query(ActivityEvent).count() == 2
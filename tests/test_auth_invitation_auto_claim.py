@@ -8,7 +8,8 @@ from fastapi import HTTPException
 from starlette.requests import Request
 from sqlalchemy.orm import Session
 
-from zoltag.auth.dependencies import claim_pending_invitations_for_user
+from zoltag.auth import dependencies
+from zoltag.auth.dependencies import claim_pending_invitations_for_user, get_current_user
 from zoltag.auth.schemas import RegisterRequest
 from zoltag.auth.models import Invitation, UserProfile, UserTenant
 from zoltag.metadata import Tenant as TenantModel
@@ -232,3 +233,75 @@ def test_register_succeeds_with_pending_invitation(test_db: Session, monkeypatch
     ).first()
     assert created_profile is not None
     assert created_profile.email == "Invited-Register@example.com"
+
+
+def test_get_current_user_caches_principal_until_invitation_created(test_db: Session, monkeypatch, capture_statements):
+    tenant_id = _create_tenant(test_db)
+    inviter = _create_user(test_db, "cache-admin@example.com", is_active=True)
+    user = _create_user(test_db, "cached@example.com", is_active=True)
+    user.last_login_at = datetime.utcnow()
+    test_db.commit()
+    verify_calls = []
+
+    async def _fake_uid_from_token(token: str):
+        verify_calls.append(token)
+        return user.supabase_uid
+
+    monkeypatch.setattr("zoltag.auth.dependencies.get_supabase_uid_from_token", _fake_uid_from_token)
+    monkeypatch.setattr("zoltag.auth.dependencies.jose_jwt.get_unverified_claims", lambda _token: {})
+
+    def _call():
+        return asyncio.run(
+            get_current_user(
+                request=_build_request("/api/v1/images"),
+                authorization="Bearer cached-token",
+                db=test_db,
+            )
+        )
+
+    assert _call().supabase_uid == user.supabase_uid
+    with capture_statements(test_db.get_bind()) as statements:
+        assert _call().supabase_uid == user.supabase_uid
+    assert statements == []
+    assert verify_calls == ["cached-token"]
+
+    test_db.add(Invitation(
+        email="Cached@example.com",
+        tenant_id=tenant_id,
+        role="user",
+        invited_by=inviter.supabase_uid,
+        token="token-cached",
+        expires_at=datetime.utcnow() + timedelta(days=1),
+        accepted_at=None,
+    ))
+    test_db.commit()
+
+    _call()
+
+    membership = test_db.query(UserTenant).filter(
+        UserTenant.supabase_uid == user.supabase_uid,
+        UserTenant.tenant_id == tenant_id,
+    ).one()
+    assert membership.accepted_at is not None
+
+
+def test_principal_caches_sweep_expired_and_cap_entries(test_db: Session, monkeypatch):
+    user = _create_user(test_db, "swept@example.com", is_active=True)
+    clock = [dependencies.time.time()]
+    monkeypatch.setattr(dependencies.time, "time", lambda: clock[0])
+    monkeypatch.setattr(dependencies.jose_jwt, "get_unverified_claims", lambda _token: {})
+
+    dependencies._cache_principal("old-token", user)
+    dependencies._remember_no_pending_invitations("old@example.com")
+    clock[0] += dependencies.PRINCIPAL_CACHE_SWEEP_INTERVAL_SECONDS + 1
+    # Neither old key is looked up again; inserting new ones sweeps them.
+    dependencies._cache_principal("new-token", user)
+    dependencies._remember_no_pending_invitations("new@example.com")
+
+    assert list(dependencies._principal_cache) == [dependencies._token_cache_key("new-token")]
+    assert list(dependencies._no_pending_invitations_cache) == ["new@example.com"]
+
+    monkeypatch.setattr(dependencies, "PRINCIPAL_CACHE_MAX_ENTRIES", 2)
+    for index in range(3):
+        dependencies._remember_no_pending_invitations(f"live-{index}@example.com")
+    assert list(dependencies._no_pending_invitations_cache) == ["live-1@example.com", "live-2@example.com"]
@@ -0,0 +1,71 @@
+import pytest
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.cases import BenchContext
+from benchmarks.run import compare_to_baseline, run_case
+from benchmarks.synthetic import build_synthetic_tenant, create_schema, parse_scale
+from zoltag.metadata import Asset, ImageEmbedding, MachineTag
+
+
+@pytest.fixture
+def bench_context(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'bench.db'}")
+    create_schema(engine)
+    synthetic = build_synthetic_tenant(engine, 120, seed=3, embedding_dim=16)
+    ctx = BenchContext(session_factory=sessionmaker(bind=engine), synthetic=synthetic, work_dir=tmp_path)
+    yield ctx
+    ctx.close()
+    engine.dispose()
+
+
+def test_synthetic_tenant_is_deterministic(tmp_path, bench_context):
+    db = bench_context.session()
+    assert db.query(func.count(Asset.id)).scalar() == 120
+    assert db.query(func.count(MachineTag.id)).scalar() == 120 * 5
+    assert db.query(func.count(ImageEmbedding.id)).scalar() == 120
+
+    other = create_engine(f"sqlite:///{tmp_path / 'again.db'}")
+    create_schema(other)
+    again = build_synthetic_tenant(other, 120, seed=3, embedding_dim=16)
+    assert again.tenant_id == bench_context.synthetic.tenant_id
+    assert again.sample_image_ids == bench_context.synthetic.sample_image_ids
+    other.dispose()
+
+
+def test_run_case_reports_timings_and_sql(bench_context):
+    result = run_case(bench_context, "tags.current_for_page", repeat=2, warmup=0)
+
+    assert result["repeat"] == 2
+    assert result["min_ms"] <= result["median_ms"] <= result["max_ms"]
+    assert result["sql_statements"] >= 1
+    assert result["ops_per_second"] > 0
+
+
+def test_compare_flags_slowdowns_and_extra_queries():
+    baseline = {
+        "thresholds": {"noisy": 1.0},
+        "cases": {
+            "fast": {"median_ms": 10.0, "sql_statements": 4},
+            "noisy": {"median_ms": 10.0, "sql_statements": 4},
+            "tiny": {"median_ms": 0.5, "sql_statements": 1},
+        },
+    }
+    results = {
+        "fast": {"median_ms": 14.0, "sql_statements": 6},
+        "noisy": {"median_ms": 18.0, "sql_statements": 4},
+        "tiny": {"median_ms": 1.0, "sql_statements": 1},
+        "new": {"median_ms": 99.0, "sql_statements": 9},
+    }
+
+    regressions = compare_to_baseline(results, baseline, threshold=0.25, min_delta_ms=2.0)
+
+    assert len(regressions) == 2
+    assert regressions[0].startswith("fast: median 14.0 ms")
+    assert regressions[1] == "fast: 6 SQL statements vs baseline 4"
+
+
+def test_parse_scale():
+    assert parse_scale("100k") == 100_000
+    assert parse_scale("1M") == 1_000_000
+    assert parse_scale("2_500") == 2500
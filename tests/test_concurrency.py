@@ -0,0 +1,89 @@
+import asyncio
+import threading
+import time
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+import zoltag.concurrency as concurrency
+from zoltag.concurrency import EventLoopLagMonitor, InFlightRequestMiddleware, offload, run_blocking
+
+
+def test_offloaded_handler_keeps_signature_and_runs_off_loop():
+    app = FastAPI()
+    loop_threads = []
+
+    def _dep() -> str:
+        return "dep-value"
+
+    @app.middleware("http")
+    async def _capture_loop_thread(request, call_next):
+        loop_threads.append(threading.get_ident())
+        return await call_next(request)
+
+    @app.get("/items/{item_id}")
+    @offload("test.items")
+    def get_item(item_id: int, value: str = Depends(_dep)):
+        return {"item_id": item_id, "value": value, "thread": threading.get_ident()}
+
+    response = TestClient(app).get("/items/7")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["item_id"] == 7
+    assert body["value"] == "dep-value"
+    assert body["thread"] != loop_threads[0]
+
+
+def test_route_limiter_bounds_concurrency(monkeypatch):
+    monkeypatch.setitem(concurrency.ROUTE_CONCURRENCY_LIMITS, "test.bounded", 2)
+    monkeypatch.setattr(concurrency, "_route_limiters", {})
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def _work():
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.05)
+        with lock:
+            active -= 1
+
+    async def _main():
+        await asyncio.gather(*(run_blocking("test.bounded", _work) for _ in range(6)))
+
+    asyncio.run(_main())
+    assert peak == 2
+
+
+def test_lag_monitor_attributes_lag_to_requests_on_loop(monkeypatch):
+    monitor = EventLoopLagMonitor(warn_seconds=0.1)
+    monkeypatch.setattr(concurrency, "_in_flight", {
+        1: {"scope": {"method": "GET", "path": "/api/v1/slow"}, "started": 0.0, "offloaded": 0},
+        2: {"scope": {"method": "GET", "path": "/api/v1/offloaded"}, "started": 0.0, "offloaded": 1},
+    })
+
+    monitor.record(0.01)
+    monitor.record(0.4)
+
+    stats = monitor.stats()
+    assert stats["samples"] == 2
+    assert stats["lag_events"] == 1
+    assert stats["max_lag_ms"] == 400.0
+    assert stats["suspects"] == {"GET /api/v1/slow": 1}
+
+
+def test_in_flight_middleware_tracks_requests():
+    app = FastAPI()
+    seen = []
+
+    @app.get("/probe")
+    async def probe():
+        seen.extend(entry["scope"]["path"] for entry in concurrency._in_flight.values())
+        return {}
+
+    app.add_middleware(InFlightRequestMiddleware)
+    TestClient(app).get("/probe")
+    assert seen == ["/probe"]
+    assert concurrency._in_flight == {}
@@ -0,0 +1,217 @@
+import asyncio
+import inspect
+import json
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import sessionmaker
+
+import zoltag.supabase_admin as supabase_admin
+from zoltag import worker
+from zoltag.auth.models import UserProfile
+from zoltag.email import (
+    FileSinkTransport,
+    process_email_outbox,
+    queue_guest_invite_email,
+    queue_guest_magic_link_email,
+)
+from zoltag.metadata import EmailOutbox
+from zoltag.models.config import PhotoList
+from zoltag.routers.sharing import create_shares, ShareCreateRequest
+from zoltag.settings import settings
+
+
+class _FlakyTransport:
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.batches = []
+
+    def send_batch(self, messages):
+        self.batches.append(list(messages))
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("provider unavailable")
+        return [f"msg-{index}" for index, _ in enumerate(messages)]
+
+
+def _make_due(db):
+    db.query(EmailOutbox).update({EmailOutbox.next_attempt_at: datetime.utcnow() - timedelta(seconds=1)})
+    db.commit()
+
+
+def test_outbox_delivers_to_file_sink_in_one_batch(test_db, test_tenant, tmp_path):
+    queue_guest_invite_email(
+        test_db,
+        to_email="guest@example.com",
+        invite_link="https://app.example/guest?token=abc",
+        list_name="Summer",
+        inviter_name="Ana",
+        tenant_name=test_tenant.name,
+        tenant_id=test_tenant.id,
+    )
+    queue_guest_magic_link_email(test_db, to_email="other@example.com", magic_link="https://link", otp_code="123456")
+    test_db.commit()
+
+    sink = tmp_path / "outbox"
+    assert process_email_outbox(test_db, transport=FileSinkTransport(sink)) == 2
+    test_db.commit()
+
+    written = sorted((json.loads(path.read_text()) for path in sink.glob("*.json")), key=lambda message: message["to"])
+    assert [message["to"] for message in written] == [["guest@example.com"], ["other@example.com"]]
+    assert written[0]["subject"] == 'Invitation to view "Summer"'
+    assert "https://app.example/guest?token=abc" in written[0]["text"]
+    rows = test_db.query(EmailOutbox).all()
+    assert {row.status for row in rows} == {"sent"}
+    assert all(row.provider_message_id for row in rows)
+    # Sign-in links and OTP codes are not kept once delivered.
+    assert all(row.html_body is None and row.text_body is None for row in rows)
+    assert process_email_outbox(test_db, transport=FileSinkTransport(sink)) == 0
+
+
+def test_failed_batches_are_retried_with_backoff_then_given_up(test_db, monkeypatch):
+    monkeypatch.setattr(settings, "email_outbox_max_attempts", 2)
+    queue_guest_magic_link_email(test_db, to_email="a@example.com", magic_link="https://link")
+    queue_guest_magic_link_email(test_db, to_email="b@example.com", magic_link="https://link")
+    test_db.commit()
+
+    # The batch and both one-at-a-time retries fail.
+    transport = _FlakyTransport(failures=3)
+    assert process_email_outbox(test_db, transport=transport) == 2
+    test_db.commit()
+    assert [len(batch) for batch in transport.batches] == [2, 1, 1]
+    rows = test_db.query(EmailOutbox).order_by(EmailOutbox.id).all()
+    assert [row.status for row in rows] == ["pending", "pending"]
+    assert all(row.next_attempt_at > datetime.utcnow() for row in rows)
+    assert rows[0].last_error == "provider unavailable"
+    assert all(row.text_body for row in rows)  # still needed for the retry
+    # Not due yet.
+    assert process_email_outbox(test_db, transport=transport) == 0
+
+    _make_due(test_db)
+    assert process_email_outbox(test_db, transport=transport) == 2
+    test_db.commit()
+    assert [row.status for row in rows] == ["sent", "sent"]
+    assert [row.attempt_count for row in rows] == [2, 2]
+
+    queue_guest_magic_link_email(test_db, to_email="c@example.com", magic_link="https://link")
+    test_db.commit()
+    transport = _FlakyTransport(failures=5)
+    process_email_outbox(test_db, transport=transport)
+    test_db.commit()
+    _make_due(test_db)
+    process_email_outbox(test_db, transport=transport)
+    test_db.commit()
+    failed = test_db.query(EmailOutbox).filter(EmailOutbox.to_email == "c@example.com").one()
+    assert failed.status == "failed"
+    assert failed.attempt_count == 2
+    assert (failed.html_body, failed.text_body) == (None, None)
+
+
+def test_rejected_batch_only_fails_the_bad_row_and_sends_without_row_locks(test_db):
+    for address in ("good@example.com", "bad@example.com", "fine@example.com"):
+        queue_guest_magic_link_email(test_db, to_email=address, magic_link="https://link")
+    test_db.commit()
+
+    class _RejectingTransport:
+        def __init__(self):
+            self.batches = []
+
+        def send_batch(self, messages):
+            # The claim has been committed, so no FOR UPDATE lock is held during the send.
+            assert not test_db.in_transaction()
+            self.batches.append([message["to"][0] for message in messages])
+            if any(message["to"] == ["bad@example.com"] for message in messages):
+                raise ValueError("invalid recipient")
+            return [f"msg-{message['to'][0]}" for message in messages]
+
+    transport = _RejectingTransport()
+    assert process_email_outbox(test_db, transport=transport) == 3
+    test_db.commit()
+
+    assert len(transport.batches) == 4
+    rows = {row.to_email: row for row in test_db.query(EmailOutbox).all()}
+    assert rows["good@example.com"].status == "sent"
+    assert rows["fine@example.com"].provider_message_id == "msg-fine@example.com"
+    bad = rows["bad@example.com"]
+    assert (bad.status, bad.attempt_count, bad.last_error) == ("pending", 1, "invalid recipient")
+    assert rows["good@example.com"].last_error is None
+
+
+def test_per_tenant_rate_defers_excess_mail(test_db, test_tenant, monkeypatch):
+    monkeypatch.setattr(settings, "email_tenant_max_per_minute", 2)
+    for index in range(3):
+        queue_guest_magic_link_email(
+            test_db, to_email=f"busy{index}@example.com", magic_link="https://link", tenant_id=test_tenant.id
+        )
+    queue_guest_magic_link_email(test_db, to_email="quiet@example.com", magic_link="https://link")
+    test_db.commit()
+
+    transport = _FlakyTransport(failures=0)
+    assert process_email_outbox(test_db, transport=transport) == 3
+    test_db.commit()
+
+    deferred = test_db.query(EmailOutbox).filter(EmailOutbox.status == "pending").one()
+    assert deferred.to_email == "busy2@example.com"
+    assert deferred.attempt_count == 0
+    assert deferred.next_attempt_at > datetime.utcnow() + timedelta(seconds=30)
+
+
+def test_create_shares_queues_invites_without_sending(test_db, test_tenant, monkeypatch):
+    in_flight = 0
+    peak = 0
+
+    async def fake_create_guest_user(email, tenant_id):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return {"id": str(uuid.uuid5(uuid.NAMESPACE_DNS, email))}
+
+    async def fake_generate_magic_link(email, redirect_to):
+        return {"action_link": f"https://auth.example/verify?email={email}"}
+
+    monkeypatch.setattr(supabase_admin, "create_guest_user", fake_create_guest_user)
+    monkeypatch.setattr(supabase_admin, "generate_magic_link", fake_generate_magic_link)
+
+    owner = UserProfile(supabase_uid=uuid.uuid4(), email="owner@example.com", display_name="Owner")
+    photo_list = PhotoList(tenant_id=test_tenant.id, title="Trip", created_by_uid=owner.supabase_uid)
+    test_db.add(photo_list)
+    test_db.commit()
+    emails = [f"guest{index}@example.com" for index in range(20)]
+
+    handler = inspect.unwrap(create_shares)
+    shares = asyncio.run(handler(
+        list_id=photo_list.id,
+        body=ShareCreateRequest(emails=emails + ["GUEST0@example.com "]),
+        tenant=test_tenant,
+        current_user=owner,
+        db=test_db,
+    ))
+
+    assert [share["guest_email"] for share in shares] == emails
+    assert shares[3]["invite_link"] == "https://auth.example/verify?email=guest3@example.com"
+    assert 1 < peak <= 8
+    queued = test_db.query(EmailOutbox).order_by(EmailOutbox.id).all()
+    assert [row.to_email for row in queued] == emails
+    assert {row.status for row in queued} == {"pending"}
+    assert queued[0].subject == 'Invitation to view "Trip"'
+
+
+def test_worker_drain_purges_finished_rows_past_retention(test_db, monkeypatch):
+    monkeypatch.setattr(worker, "SessionLocal", sessionmaker(bind=test_db.get_bind()))
+    monkeypatch.setattr(settings, "email_outbox_retention_days", 7)
+    old = datetime.utcnow() - timedelta(days=8)
+    for status, created_at in (("sent", old), ("failed", old), ("pending", old), ("sent", datetime.utcnow())):
+        queue_guest_magic_link_email(test_db, to_email=f"{status}@example.com", magic_link="https://link")
+        test_db.flush()
+        row = test_db.query(EmailOutbox).order_by(EmailOutbox.id.desc()).first()
+        row.status, row.created_at = status, created_at
+        row.next_attempt_at = datetime.utcnow() + timedelta(hours=1)
+    test_db.commit()
+
+    assert worker._drain_email_outbox() == 0
+    test_db.expire_all()
+
+    remaining = test_db.query(EmailOutbox).order_by(EmailOutbox.id).all()
+    assert [(row.status, row.created_at > old) for row in remaining] == [("pending", False), ("sent", True)]
@@ -0,0 +1,111 @@
+import io
+import struct
+
+import numpy as np
+import pytest
+from PIL import ExifTags, Image
+
+from zoltag.exif_reader import ExifRangeError, read_exif_header
+from zoltag.storage.local_provider import LocalFilesystemProvider
+
+
+def _exif_block() -> Image.Exif:
+    exif = Image.Exif()
+    exif[ExifTags.Base.Make] = "Zoltag"
+    exif[ExifTags.Base.Model] = "Bench 1"
+    exif.get_ifd(ExifTags.IFD.Exif)[ExifTags.Base.DateTimeOriginal] = "2021:06:07 08:09:10"
+    exif.get_ifd(ExifTags.IFD.Exif)[ExifTags.Base.FNumber] = 2.8
+    gps = exif.get_ifd(ExifTags.IFD.GPSInfo)
+    gps[ExifTags.GPS.GPSLatitudeRef] = "S"
+    gps[ExifTags.GPS.GPSLatitude] = (33.0, 51.0, 54.0)
+    gps[ExifTags.GPS.GPSLongitudeRef] = "E"
+    gps[ExifTags.GPS.GPSLongitude] = (151.0, 12.0, 36.0)
+    return exif
+
+
+class _CountingSource:
+    def __init__(self, data: bytes):
+        self.data = data
+        self.calls = []
+
+    def __call__(self, start: int, length: int) -> bytes:
+        self.calls.append((start, length))
+        return self.data[start:start + length]
+
+
+def _noisy_jpeg() -> bytes:
+    pixels = np.random.default_rng(0).integers(0, 255, size=(1200, 1600, 3), dtype=np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format="JPEG", quality=95, exif=_exif_block().tobytes())
+    return buffer.getvalue()
+
+
+def _box(box_type: bytes, payload: bytes) -> bytes:
+    return struct.pack(">I4s", 8 + len(payload), box_type) + payload
+
+
+def _heif_with_exif() -> bytes:
+    item = b"\x00\x00\x00\x06" + _exif_block().tobytes()
+    ftyp = _box(b"ftyp", b"heic" + b"\x00\x00\x00\x00" + b"mif1heic")
+    infe = _box(b"infe", b"\x02\x00\x00\x00" + struct.pack(">HH4s", 7, 0, b"Exif") + b"\x00")
+    iinf = _box(b"iinf", b"\x00\x00\x00\x00" + struct.pack(">H", 1) + infe)
+
+    def build_meta(item_offset: int) -> bytes:
+        # iloc v0: offset_size=4, length_size=4, base_offset_size=0.
+        iloc = _box(
+            b"iloc",
+            b"\x00\x00\x00\x00" + bytes([0x44, 0x00]) + struct.pack(">HHHHII", 1, 7, 0, 1, item_offset, len(item)),
+        )
+        return _box(b"meta", b"\x00\x00\x00\x00" + iinf + iloc)
+
+    header_length = len(ftyp) + len(build_meta(0)) + 8
+    padding = b"\x00" * 200_000
+    return ftyp + build_meta(header_length + len(padding)) + _box(b"mdat", padding + item)
+
+
+def test_jpeg_header_is_read_without_fetching_the_pixels():
+    data = _noisy_jpeg()
+    source = _CountingSource(data)
+
+    exif = read_exif_header(source, chunk_bytes=16 * 1024)
+
+    assert exif["DateTimeOriginal"] == "2021:06:07 08:09:10"
+    assert exif["Make"] == "Zoltag"
+    assert exif["FNumber"] == pytest.approx(2.8)
+    assert exif["GPSLatitude"] == pytest.approx(-(33 + 51 / 60 + 54 / 3600))
+    assert exif["GPSLongitude"] == pytest.approx(151 + 12 / 60 + 36 / 3600)
+    assert len(data) > 1_000_000
+    assert sum(length for _, length in source.calls) <= 32 * 1024
+
+
+def test_heif_exif_item_is_located_through_meta_boxes():
+    data = _heif_with_exif()
+    source = _CountingSource(data)
+
+    exif = read_exif_header(source, chunk_bytes=16 * 1024)
+
+    assert exif["DateTimeOriginal"] == "2021:06:07 08:09:10"
+    assert exif["Model"] == "Bench 1"
+    # Header chunk plus the chunk holding the Exif item; the mdat padding is skipped.
+    assert sum(length for _, length in source.calls) <= 3 * 16 * 1024
+
+
+def test_tiff_and_local_provider_range_reads(tmp_path):
+    path = tmp_path / "raw.tif"
+    Image.new("RGB", (64, 48)).save(path, format="TIFF", exif=_exif_block().tobytes())
+    provider = LocalFilesystemProvider(thumbnail_dir=tmp_path / "thumbs")
+
+    assert provider.read_range(str(path), 0, 4) == path.read_bytes()[:4]
+    exif = read_exif_header(lambda start, length: provider.read_range(str(path), start, length))
+
+    assert exif["DateTimeOriginal"] == "2021:06:07 08:09:10"
+
+
+def test_unsupported_container_and_size_cap_raise():
+    png = io.BytesIO()
+    Image.new("RGB", (8, 8)).save(png, format="PNG")
+    with pytest.raises(ExifRangeError):
+        read_exif_header(_CountingSource(png.getvalue()))
+
+    with pytest.raises(ExifRangeError):
+        read_exif_header(_CountingSource(_heif_with_exif()), chunk_bytes=4096, max_bytes=4096)
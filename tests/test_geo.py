@@ -0,0 +1,158 @@
+import inspect
+import uuid
+
+import pytest
+from fastapi import HTTPException
+
+from zoltag.geo import (
+    cover_bbox,
+    decode_bounds,
+    encode_geohash,
+    fold_geo_cell_deltas,
+    parse_geo_filter,
+    prefix_ranges,
+    rebuild_geo_cells,
+    release_image_location,
+)
+from zoltag.metadata import Asset, GeoCell, GeoCellDelta, ImageMetadata
+from zoltag.routers.images.core import list_geo_clusters
+
+PARIS = (48.8566, 2.3522)
+VERSAILLES = (48.8049, 2.1204)
+LONDON = (51.5074, -0.1278)
+FIJI_EAST = (-17.8, 179.9)
+FIJI_WEST = (-17.8, -179.9)
+
+
+def test_geohash_encoding_cover_and_ranges():
+    assert encode_geohash(57.64911, 10.40744, 11) == "u4pruydqqvj"
+    west, south, east, north = decode_bounds("u4pruydqqvj")
+    assert west <= 10.40744 <= east and south <= 57.64911 <= north
+
+    cells = cover_bbox(2.0, 48.5, 2.6, 49.0, max_cells=32)
+    assert len(cells) <= 32
+    assert all(any(encode_geohash(*point).startswith(cell) for cell in cells) for point in (PARIS, VERSAILLES))
+    assert prefix_ranges(["u0d", "u0b", "u09"]) == [("u09", "u0c"), ("u0d", "u0e")]
+    assert prefix_ranges(["zz"]) == [("zz", None)]
+
+    with pytest.raises(ValueError):
+        parse_geo_filter(bbox="1,2,3")
+    with pytest.raises(ValueError):
+        parse_geo_filter(near="48.8,2.3")
+    with pytest.raises(ValueError):
+        parse_geo_filter(bbox="0,50,10,40")
+    assert parse_geo_filter() is None
+
+
+@pytest.fixture
+def add_image(test_db, test_tenant):
+    def add(point):
+        asset = Asset(
+            id=uuid.uuid4(),
+            tenant_id=test_tenant.id,
+            filename="geo.jpg",
+            source_provider="test",
+            source_key=f"/test/{uuid.uuid4()}.jpg",
+            thumbnail_key="thumb.jpg",
+        )
+        image = ImageMetadata(asset_id=asset.id, tenant_id=test_tenant.id, filename="geo.jpg")
+        if point is not None:
+            image.gps_latitude, image.gps_longitude = point
+        test_db.add_all([asset, image])
+        test_db.flush()
+        return image
+
+    return add
+
+
+def _cells(db, tenant_id, precision):
+    fold_geo_cell_deltas(db)
+    db.commit()
+    rows = db.query(GeoCell).filter(GeoCell.tenant_id == tenant_id, GeoCell.precision == precision).all()
+    return {row.cell: row.image_count for row in rows}
+
+
+def test_cells_follow_inserts_moves_and_deletes(test_db, test_tenant, add_image):
+    paris = add_image(PARIS)
+    add_image(VERSAILLES)
+    london = add_image(LONDON)
+    add_image(None)
+    test_db.commit()
+
+    assert paris.geohash == encode_geohash(*PARIS)
+    # Ingest only appends to the journal; the shared coarse cells are not touched.
+    assert test_db.query(GeoCell).count() == 0
+    assert test_db.query(GeoCellDelta).count() == 3
+    assert _cells(test_db, test_tenant.id, 1) == {"u": 2, "g": 1}
+    assert _cells(test_db, test_tenant.id, 5) == {"u09tv": 1, "u09t8": 1, "gcpvj": 1}
+    assert test_db.query(GeoCellDelta).count() == 0
+
+    # Expired rows still decrement the cell they were counted in.
+    test_db.expire_all()
+    london.gps_latitude, london.gps_longitude = PARIS
+    test_db.commit()
+    assert _cells(test_db, test_tenant.id, 1) == {"u": 3}
+    assert london.geohash == paris.geohash
+
+    test_db.delete(paris)
+    release_image_location(test_db, london)
+    test_db.query(ImageMetadata).filter(ImageMetadata.id == london.id).delete(synchronize_session=False)
+    test_db.commit()
+    assert _cells(test_db, test_tenant.id, 5) == {"u09t8": 1}
+
+    centroid = test_db.query(GeoCell).filter(GeoCell.tenant_id == test_tenant.id, GeoCell.precision == 7).one()
+    assert centroid.lat_sum == pytest.approx(VERSAILLES[0])
+
+    test_db.query(GeoCell).delete()
+    result = rebuild_geo_cells(test_db, test_tenant.id)
+    test_db.commit()
+    assert result["located"] == 1
+    assert _cells(test_db, test_tenant.id, 5) == {"u09t8": 1}
+
+
+def test_bbox_and_radius_filters(test_db, test_tenant, add_image):
+    paris = add_image(PARIS)
+    versailles = add_image(VERSAILLES)
+    london = add_image(LONDON)
+    fiji_east = add_image(FIJI_EAST)
+    fiji_west = add_image(FIJI_WEST)
+    add_image(None)
+    test_db.commit()
+
+    def matching(**params):
+        conditions = parse_geo_filter(**params).conditions()
+        rows = test_db.query(ImageMetadata.id).filter(*conditions).all()
+        return {row[0] for row in rows}
+
+    assert matching(bbox="-1,48,3,52") == {paris.id, versailles.id, london.id}
+    assert matching(near="48.8566,2.3522", radius_km=5) == {paris.id}
+    assert matching(near="48.8566,2.3522", radius_km=25) == {paris.id, versailles.id}
+    assert matching(near="48.8566,2.3522", radius_km=400, bbox="-1,48,3,50") == {paris.id, versailles.id}
+    # Both the box and the circle may cross the antimeridian.
+    assert matching(bbox="179,-19,-179,-17") == {fiji_east.id, fiji_west.id}
+    assert matching(near="-17.8,179.95", radius_km=30) == {fiji_east.id, fiji_west.id}
+
+
+def test_cluster_endpoint_counts_cells_in_viewport(test_db, test_tenant, add_image):
+    for point in (PARIS, VERSAILLES, LONDON, FIJI_EAST):
+        add_image(point)
+    test_db.commit()
+    fold_geo_cell_deltas(test_db)
+    test_db.commit()
+    handler = inspect.unwrap(list_geo_clusters)
+
+    europe = handler(bbox="-10,40,20,60", zoom=4, tenant=test_tenant, db=test_db)
+    assert europe["precision"] == 2
+    assert [(cluster["cell"], cluster["count"]) for cluster in europe["clusters"]] == [("u0", 2), ("gc", 1)]
+    assert europe["clusters"][0]["latitude"] == pytest.approx((PARIS[0] + VERSAILLES[0]) / 2)
+
+    city = handler(bbox="2.0,48.7,2.5,49.0", zoom=15, tenant=test_tenant, db=test_db)
+    assert city["precision"] == 7
+    assert city["total"] == 2
+
+    capped = handler(bbox="-180,-90,180,90", zoom=0, max_cells=1, tenant=test_tenant, db=test_db)
+    assert capped["truncated"] is True and capped["clusters"][0]["count"] == 2
+
+    with pytest.raises(HTTPException) as bad_bbox:
+        handler(bbox="nope", tenant=test_tenant, db=test_db)
+    assert bad_bbox.value.status_code == 400
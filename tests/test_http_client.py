@@ -0,0 +1,58 @@
+import httpx
+
+from zoltag.storage import GoogleDriveStorageProvider, http_client
+from zoltag.storage.http_client import send_with_backoff
+
+
+def test_pooled_client_is_shared_per_provider(monkeypatch):
+    monkeypatch.setattr(http_client, "_clients", {})
+    client = http_client.get_client("gdrive")
+
+    assert http_client.get_client("gdrive") is client
+    assert http_client.get_client("youtube") is not client
+    http_client.close_clients()
+    assert client.is_closed
+
+
+def test_throttled_responses_are_retried_with_retry_after(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(http_client.time, "sleep", sleeps.append)
+    responses = iter([
+        httpx.Response(429, headers={"Retry-After": "2"}),
+        httpx.Response(503),
+        httpx.Response(200),
+    ])
+
+    assert send_with_backoff("gdrive", lambda: next(responses)).status_code == 200
+    assert sleeps[0] == 2.0
+    assert 0.5 <= sleeps[1] <= 1.5
+
+    always_throttled = send_with_backoff("gdrive", lambda: httpx.Response(429), max_retries=1)
+    assert always_throttled.status_code == 429
+
+
+def test_access_tokens_are_shared_across_provider_instances(mock_provider_http):
+    issued = []
+
+    def handler(request):
+        if request.url.path == "/token":
+            issued.append(f"token-{len(issued) + 1}")
+            return httpx.Response(200, json={"access_token": issued[-1], "expires_in": 3600})
+        if request.headers["Authorization"] == "Bearer token-1" and len(issued) == 1 and request.url.params.get("q") == "revoked":
+            return httpx.Response(401)
+        return httpx.Response(200, json={"files": []})
+
+    calls = mock_provider_http(handler)
+    credentials = {"client_id": "id", "client_secret": "secret", "refresh_token": "refresh"}
+    first = GoogleDriveStorageProvider(**credentials)
+    second = GoogleDriveStorageProvider(**credentials)
+
+    first._request("GET", "/files")
+    second._request("GET", "/files")
+    assert issued == ["token-1"]
+    assert [call.headers["Authorization"] for call in calls if call.url.path != "/token"] == ["Bearer token-1"] * 2
+
+    # A rejected token is dropped and refreshed once.
+    second._request("GET", "/files", params={"q": "revoked"})
+    assert issued == ["token-1", "token-2"]
+    assert first._get_access_token() == "token-2"
@@ -1,9 +1,17 @@
 """Test image processing."""
 
+import io
+import json
+import subprocess
+import threading
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
 import pytest
 from PIL import Image
 
-from zoltag.image import ImageProcessor, FaceDetector
+import zoltag.image as image_module
+from zoltag.image import ImageProcessor, FaceDetector, VideoProcessor, split_jpeg_stream
 
 
 def test_image_processor_creation():
@@ -85,3 +93,84 @@ def test_extract_features(sample_image_data: bytes):
     
     assert features["width"] == 100
     assert features["height"] == 100
+
+
+def _jpeg(color) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 36), color=color).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+def test_split_jpeg_stream():
+    """Test splitting concatenated MJPEG output into frames."""
+    frames = [_jpeg("black"), _jpeg("blue"), _jpeg("green")]
+
+    assert split_jpeg_stream(b"".join(frames)) == frames
+    # A truncated trailing frame is dropped.
+    assert split_jpeg_stream(b"".join(frames)[:-10]) == frames[:2]
+    assert split_jpeg_stream(b"") == []
+
+
+def test_video_source_frames_come_from_one_ffmpeg_call(monkeypatch):
+    """Test that all seek candidates are extracted by a single ffmpeg process.
+
+    Auth headers stay off the command line: ffmpeg reads through a loopback
+    proxy that adds them upstream.
+    """
+    upstream_requests = []
+
+    class Upstream(BaseHTTPRequestHandler):
+        def do_GET(self):
+            upstream_requests.append((self.path, self.headers.get("Authorization"), self.headers.get("Range")))
+            self.send_response(206)
+            self.send_header("Content-Range", "bytes 0-3/100")
+            self.send_header("Content-Length", "4")
+            self.end_headers()
+            self.wfile.write(b"moov")
+
+        def log_message(self, *args):
+            pass
+
+    upstream = ThreadingHTTPServer(("127.0.0.1", 0), Upstream)
+    threading.Thread(target=upstream.serve_forever, daemon=True).start()
+    calls = []
+    proxied = []
+
+    def fake_run(cmd, **kwargs):
+        calls.append(cmd)
+        url = cmd[cmd.index("-i") + 1]
+        request = urllib.request.Request(url, headers={"Range": "bytes=0-3"})
+        with urllib.request.urlopen(request, timeout=5) as response:
+            proxied.append((response.status, response.read()))
+        if cmd[0] == "ffprobe":
+            payload = {"streams": [{"width": 1920, "height": 1080}], "format": {"duration": "40.0", "format_name": "mov,mp4"}}
+            return subprocess.CompletedProcess(cmd, 0, stdout=json.dumps(payload))
+        return subprocess.CompletedProcess(cmd, 0, stdout=_jpeg("black") + _jpeg("blue"))
+
+    monkeypatch.setattr(image_module.shutil, "which", lambda name: f"/usr/bin/{name}")
+    monkeypatch.setattr(image_module.subprocess, "run", fake_run)
+
+    processor = VideoProcessor(thumbnail_size=(32, 32))
+    try:
+        features = processor.extract_features_from_source(
+            f"http://127.0.0.1:{upstream.server_address[1]}/clip.mp4",
+            filename="clip.mp4",
+            headers={"Authorization": "Bearer t"},
+        )
+    finally:
+        upstream.shutdown()
+        upstream.server_close()
+
+    assert (features["width"], features["height"], features["duration_ms"], features["format"]) == (1920, 1080, 40000, "MOV")
+    # The black first frame is skipped in favour of the blue one.
+    thumbnail = Image.open(io.BytesIO(features["thumbnail"])).convert("RGB")
+    assert thumbnail.getpixel((5, 5))[2] > 200
+    ffmpeg_calls = [cmd for cmd in calls if cmd[0] == "ffmpeg"]
+    assert len(ffmpeg_calls) == 1
+    cmd = ffmpeg_calls[0]
+    assert cmd.count("-i") == 4
+    assert "concat=n=4:v=1:a=0[frames]" in cmd[cmd.index("-filter_complex") + 1]
+    assert not any("Bearer" in arg or arg == "-headers" for call in calls for arg in call)
+    assert cmd[cmd.index("-i") + 1].startswith("http://127.0.0.1:")
+    assert proxied == [(206, b"moov")] * 2
+    assert upstream_requests == [("/clip.mp4", "Bearer t", "bytes=0-3")] * 2
@@ -0,0 +1,113 @@
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from zoltag import instrumentation
+from zoltag.concurrency import offload
+from zoltag.instrumentation import (
+    PhaseTimer,
+    RequestMetricsMiddleware,
+    SamplingProfiler,
+    metrics,
+    render_prometheus,
+    span,
+)
+from zoltag.routers import metrics as metrics_router
+from zoltag.settings import settings
+
+
+@pytest.fixture
+def profiled_app(monkeypatch):
+    monkeypatch.setattr(settings, "sql_repeated_statement_warn", 5)
+    metrics.reset()
+    engine = create_engine("sqlite:///:memory:")
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    @offload("test.items")
+    def get_item(item_id: int):
+        phases = PhaseTimer()
+        with engine.connect() as conn:
+            for value in range(item_id):
+                conn.execute(text(f"SELECT {value}"))
+        phases.lap("query")
+        with span("render"):
+            time.sleep(0.001)
+        return {"id": item_id}
+
+    app.add_middleware(RequestMetricsMiddleware)
+    yield app
+    metrics.reset()
+    engine.dispose()
+
+
+def test_request_phases_and_sql_are_reported(profiled_app):
+    response = TestClient(profiled_app).get("/items/3")
+
+    assert response.status_code == 200
+    timing = response.headers["server-timing"]
+    assert "query;dur=" in timing
+    assert "render;dur=" in timing
+    assert 'desc="3 statements"' in timing
+
+    exported = render_prometheus()
+    assert 'zoltag_http_requests_total{method="GET",route="/items/{item_id}",status="200"} 1' in exported
+    assert 'zoltag_sql_statements_total{route="/items/{item_id}"} 3' in exported
+    assert 'zoltag_request_phase_duration_seconds_count{phase="render",route="/items/{item_id}"} 1' in exported
+    assert "zoltag_sql_repeated_statement_requests_total" not in exported
+
+
+def test_repeated_statement_shapes_are_flagged(profiled_app):
+    TestClient(profiled_app).get("/items/6")
+
+    assert 'zoltag_sql_repeated_statement_requests_total{route="/items/{item_id}"} 1' in render_prometheus()
+
+
+def test_spans_are_noops_outside_requests():
+    with span("outside"):
+        pass
+    PhaseTimer().lap("outside")
+    assert instrumentation.current_profile() is None
+
+
+def test_sampling_profiler_folds_stacks():
+    stop = threading.Event()
+
+    def busy_wait_for_profiler():
+        while not stop.is_set():
+            time.sleep(0.001)
+
+    worker = threading.Thread(target=busy_wait_for_profiler)
+    worker.start()
+    try:
+        profiler = SamplingProfiler(interval_seconds=0.002).run(0.05)
+    finally:
+        stop.set()
+        worker.join()
+
+    folded = profiler.folded()
+    assert profiler.samples > 0
+    line = next(line for line in folded.splitlines() if "busy_wait_for_profiler" in line)
+    stack, count = line.rsplit(" ", 1)
+    assert int(count) > 0
+    assert stack.split(";")[-1].startswith("busy_wait_for_profiler (test_instrumentation.py:")
+
+
+def test_metrics_endpoint_requires_configured_token(monkeypatch):
+    app = FastAPI()
+    app.include_router(metrics_router.router)
+    client = TestClient(app)
+
+    monkeypatch.setattr(settings, "metrics_token", None)
+    assert client.get("/metrics").status_code == 404
+
+    monkeypatch.setattr(settings, "metrics_token", "scrape-secret")
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    response = client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "zoltag_event_loop_lag_events_total" in response.text
@@ -0,0 +1,74 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from zoltag.cli.introspection import build_queue_command_argv
+from zoltag.job_coalescing import enqueue_asset_job
+from zoltag.metadata import Job, JobDefinition
+from zoltag.metadata import Tenant as TenantModel
+
+
+@pytest.fixture
+def tenant_id(test_db):
+    tenant_id = uuid.uuid4()
+    test_db.add(TenantModel(id=tenant_id, identifier="coalesce", name="coalesce", active=True))
+    test_db.add(JobDefinition(id=uuid.uuid4(), key="rebuild-asset-text-index", max_attempts=2))
+    test_db.commit()
+    return tenant_id
+
+
+def _enqueue(db, tenant_id, asset_ids, **kwargs):
+    jobs = enqueue_asset_job(
+        db,
+        tenant_id=tenant_id,
+        definition_key="rebuild-asset-text-index",
+        asset_ids=asset_ids,
+        base_payload=kwargs.pop("base_payload", {"include_embeddings": False}),
+        **kwargs,
+    )
+    db.commit()
+    return jobs
+
+
+def test_pending_jobs_absorb_new_asset_ids_up_to_max_batch(test_db, tenant_id):
+    assets = [str(uuid.uuid4()) for _ in range(7)]
+
+    first = _enqueue(test_db, tenant_id, assets[:2], max_batch=4, window_seconds=60)
+    second = _enqueue(test_db, tenant_id, assets[1:7], max_batch=4, window_seconds=60)
+
+    jobs = test_db.query(Job).order_by(Job.queued_at.asc(), Job.id.asc()).all()
+    assert len(jobs) == 2
+    assert first[0].id == second[0].id
+    assert jobs[0].id == first[0].id
+    assert jobs[0].payload == {"include_embeddings": False, "asset_id": assets[:4]}
+    overflow = next(job for job in jobs if job.id != first[0].id)
+    assert overflow.payload["asset_id"] == assets[4:]
+    assert overflow.scheduled_for > datetime.utcnow() + timedelta(seconds=30)
+
+
+def test_jobs_with_other_payloads_or_status_are_not_merged(test_db, tenant_id):
+    job = _enqueue(test_db, tenant_id, [str(uuid.uuid4())])[0]
+    _enqueue(test_db, tenant_id, [str(uuid.uuid4())], base_payload={"include_embeddings": True})
+    job.status = "running"
+    test_db.commit()
+    _enqueue(test_db, tenant_id, [str(uuid.uuid4())])
+
+    assert test_db.query(Job).count() == 3
+
+
+def test_batched_payload_builds_repeated_cli_options(test_db, tenant_id):
+    assets = [str(uuid.uuid4()) for _ in range(2)]
+    job = _enqueue(test_db, tenant_id, assets)[0]
+
+    argv = build_queue_command_argv(
+        command_name="rebuild-asset-text-index",
+        tenant_id=str(tenant_id),
+        payload=job.payload,
+        python_executable="python",
+    )
+
+    assert argv[argv.index("--asset-id"):argv.index("--asset-id") + 4] == [
+        "--asset-id", assets[0], "--asset-id", assets[1],
+    ]
+    assert "--no-include-embeddings" in argv
@@ -0,0 +1,121 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from zoltag.metadata import Job, JobAttempt, JobDefinition
+from zoltag.metadata import Tenant as TenantModel
+from zoltag.routers import jobs as jobs_router
+from zoltag.tenant import Tenant
+
+
+@pytest.fixture
+def queue(test_db):
+    tenant_id = uuid.uuid4()
+    test_db.add(TenantModel(id=tenant_id, identifier="batch", name="batch", active=True))
+    definition = JobDefinition(id=uuid.uuid4(), key="refresh-metadata", max_attempts=2)
+    test_db.add(definition)
+    past = datetime.utcnow() - timedelta(minutes=1)
+    test_db.add_all(
+        Job(
+            tenant_id=tenant_id, definition_id=definition.id, status="queued",
+            priority=100 + idx, queued_at=past, scheduled_for=past, max_attempts=2,
+        )
+        for idx in range(5)
+    )
+    test_db.commit()
+    tenant = Tenant(id=str(tenant_id), name="batch", identifier="batch", key_prefix="batch")
+    return test_db, tenant
+
+
+def _call(endpoint, db, tenant, body):
+    return asyncio.run(endpoint(body=body, tenant=tenant, _super_admin=None, db=db))
+
+
+def test_claim_with_idempotency_key_replays_the_same_jobs(queue):
+    db, tenant = queue
+    body = {"worker_id": "w1", "batch_size": 3, "idempotency_key": "claim-1"}
+
+    first = _call(jobs_router.worker_claim_jobs, db, tenant, body)
+    again = _call(jobs_router.worker_claim_jobs, db, tenant, body)
+    other = _call(jobs_router.worker_claim_jobs, db, tenant, {**body, "idempotency_key": "claim-2"})
+
+    assert first["claimed"] == 3 and first["replayed"] is False
+    assert again["replayed"] is True
+    assert [job["id"] for job in again["jobs"]] == [job["id"] for job in first["jobs"]]
+    assert other["claimed"] == 2
+    assert db.query(JobAttempt).count() == 5
+
+
+def test_batch_heartbeat_extends_owned_leases_and_reports_lost(queue, capture_statements):
+    db, tenant = queue
+    claimed = _call(jobs_router.worker_claim_jobs, db, tenant, {"worker_id": "w1", "batch_size": 2})
+    job_ids = [job["id"] for job in claimed["jobs"]]
+    db.query(Job).filter(Job.id == uuid.UUID(job_ids[1])).update({Job.claimed_by_worker: "w2"})
+    db.commit()
+
+    with capture_statements(db.get_bind()) as statements:
+        response = _call(
+            jobs_router.worker_batch_heartbeat, db, tenant,
+            {"worker_id": "w1", "lease_seconds": 900, "job_ids": job_ids},
+        )
+
+    # One UPDATE ... RETURNING, no follow-up SELECT of the extended ids.
+    job_statements = [sql for sql in statements if " jobs " in f"{sql} "]
+    assert len(job_statements) == 1
+    assert job_statements[0].startswith("UPDATE jobs") and "RETURNING" in job_statements[0]
+    assert response["extended"] == [job_ids[0]]
+    assert response["lost"] == [job_ids[1]]
+    db.expire_all()
+    extended = db.get(Job, uuid.UUID(job_ids[0]))
+    assert extended.lease_expires_at.replace(tzinfo=None) > datetime.utcnow() + timedelta(seconds=800)
+
+
+def test_batch_results_apply_each_item_once(queue):
+    db, tenant = queue
+    claimed = _call(jobs_router.worker_claim_jobs, db, tenant, {"worker_id": "w1", "batch_size": 3})
+    ok_id, failed_id, stolen_id = [job["id"] for job in claimed["jobs"]]
+    db.query(Job).filter(Job.id == uuid.UUID(stolen_id)).update({Job.claimed_by_worker: "w2"})
+    db.commit()
+    body = {
+        "worker_id": "w1",
+        "results": [
+            {"job_id": ok_id, "status": "succeeded", "idempotency_key": "r1", "stdout_tail": "done"},
+            {"job_id": failed_id, "status": "failed", "idempotency_key": "r2", "error_text": "boom"},
+            {"job_id": stolen_id, "status": "succeeded", "idempotency_key": "r3"},
+            {"job_id": str(uuid.uuid4()), "status": "succeeded"},
+        ],
+    }
+
+    first = _call(jobs_router.worker_report_results, db, tenant, body)
+    replay = _call(jobs_router.worker_report_results, db, tenant, body)
+
+    assert [entry["outcome"] for entry in first["results"]] == ["applied", "applied", "conflict", "not_found"]
+    assert first["results"][1]["requeued"] is True
+    assert [entry["outcome"] for entry in replay["results"]] == ["duplicate", "duplicate", "conflict", "not_found"]
+    db.expire_all()
+    assert db.get(Job, uuid.UUID(ok_id)).status == "succeeded"
+    assert db.get(Job, uuid.UUID(failed_id)).status == "queued"
+    attempt = db.query(JobAttempt).filter(JobAttempt.job_id == uuid.UUID(ok_id)).one()
+    assert (attempt.status, attempt.stdout_tail, attempt.result_key) == ("succeeded", "done", "r1")
+
+
+def test_batch_results_validate_every_item_before_writing(queue):
+    db, tenant = queue
+    claimed = _call(jobs_router.worker_claim_jobs, db, tenant, {"worker_id": "w1", "batch_size": 1})
+    job_id = claimed["jobs"][0]["id"]
+
+    with pytest.raises(HTTPException) as exc_info:
+        _call(
+            jobs_router.worker_report_results, db, tenant,
+            {"worker_id": "w1", "results": [
+                {"job_id": job_id, "status": "succeeded"},
+                {"job_id": job_id, "status": "failed", "attempt_status": "exploded"},
+            ]},
+        )
+
+    assert exc_info.value.status_code == 400
+    db.expire_all()
+    assert db.get(Job, uuid.UUID(job_id)).status == "running"
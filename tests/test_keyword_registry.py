@@ -0,0 +1,118 @@
+"""Tests for the versioned per-tenant keyword registry."""
+
+import uuid
+
+from sqlalchemy.orm import Session
+
+from zoltag.config.db_config import ConfigManager
+from zoltag.config.db_utils import load_keyword_info_by_name, load_keywords_map
+from zoltag.keyword_registry import bump_keyword_registry_version, get_keyword_registry
+from zoltag.tag_hydration import get_keyword_lookup
+from zoltag.models.config import Keyword, KeywordCategory, KeywordRegistryVersion
+
+
+TEST_TENANT_ID = uuid.uuid5(uuid.NAMESPACE_DNS, "keyword-registry-tenant")
+
+
+def _seed(test_db: Session):
+    animals = KeywordCategory(tenant_id=TEST_TENANT_ID, name="animals", sort_order=1)
+    places = KeywordCategory(tenant_id=TEST_TENANT_ID, name="places", sort_order=0)
+    test_db.add_all([animals, places])
+    test_db.flush()
+    pets = KeywordCategory(tenant_id=TEST_TENANT_ID, name="pets", parent_id=animals.id, sort_order=0)
+    test_db.add(pets)
+    test_db.flush()
+    test_db.add_all([
+        Keyword(tenant_id=TEST_TENANT_ID, category_id=animals.id, keyword="lion", sort_order=1, prompt="a lion"),
+        Keyword(tenant_id=TEST_TENANT_ID, category_id=animals.id, keyword="bear", sort_order=0),
+        Keyword(tenant_id=TEST_TENANT_ID, category_id=pets.id, keyword="dog", sort_order=0),
+        Keyword(tenant_id=TEST_TENANT_ID, category_id=places.id, keyword="beach", sort_order=0),
+    ])
+    test_db.commit()
+    return animals, places, pets
+
+
+def test_config_keywords_follow_category_tree_order(test_db: Session):
+    _seed(test_db)
+
+    keywords = ConfigManager(test_db, TEST_TENANT_ID).get_all_keywords()
+
+    assert [(kw["keyword"], kw["category"]) for kw in keywords] == [
+        ("beach", "places"),
+        ("bear", "animals"),
+        ("lion", "animals"),
+        ("dog", "animals/pets"),
+    ]
+    assert keywords[2]["prompt"] == "a lion"
+
+
+def test_registry_is_shared_until_version_changes(test_db: Session, capture_statements):
+    _seed(test_db)
+    registry = get_keyword_registry(test_db, TEST_TENANT_ID)
+    dog_id = registry.ids_for_names(["dog"])[0]
+
+    with capture_statements(test_db.get_bind()) as statements:
+        assert load_keywords_map(test_db, TEST_TENANT_ID, {dog_id}) == {dog_id: {"keyword": "dog", "category": "pets"}}
+        assert load_keyword_info_by_name(test_db, TEST_TENANT_ID, ["dog"]) == {"dog": {"id": dog_id, "category": "pets"}}
+        ConfigManager(test_db, TEST_TENANT_ID).get_all_keywords()
+    assert statements == []
+
+    keyword = test_db.get(Keyword, dog_id)
+    keyword.keyword = "puppy"
+    bump_keyword_registry_version(test_db, TEST_TENANT_ID)
+    test_db.commit()
+
+    refreshed = get_keyword_registry(test_db, TEST_TENANT_ID)
+    assert refreshed.version == 1
+    assert refreshed.keyword_map()[dog_id] == ("puppy", "pets")
+    assert test_db.query(KeywordRegistryVersion.version).scalar() == 1
+
+
+def test_registry_reloads_when_another_process_bumps_version(test_db: Session, monkeypatch):
+    animals, _, _ = _seed(test_db)
+    registry = get_keyword_registry(test_db, TEST_TENANT_ID)
+    assert "owl" not in registry.names
+
+    # Simulate a writer in another process: data + version change without local invalidation.
+    test_db.add(Keyword(tenant_id=TEST_TENANT_ID, category_id=animals.id, keyword="owl", sort_order=5))
+    test_db.add(KeywordRegistryVersion(tenant_id=TEST_TENANT_ID, version=7))
+    test_db.commit()
+
+    assert get_keyword_registry(test_db, TEST_TENANT_ID) is registry
+    monkeypatch.setattr("zoltag.keyword_registry.KEYWORD_REGISTRY_VERSION_CHECK_SECONDS", 0)
+    reloaded = get_keyword_registry(test_db, TEST_TENANT_ID)
+    assert reloaded.version == 7
+    assert "owl" in reloaded.names
+
+
+def test_unknown_ids_reload_only_on_version_change_and_are_negatively_cached(test_db: Session, capture_statements):
+    animals, _, _ = _seed(test_db)
+    registry = get_keyword_registry(test_db, TEST_TENANT_ID)
+    lion_id = registry.ids_for_names(["lion"])[0]
+
+    with capture_statements(test_db.get_bind()) as statements:
+        lookup = get_keyword_lookup(test_db, TEST_TENANT_ID, [lion_id, 999999])
+        assert lookup is registry.keyword_map()
+        assert lookup[lion_id] == ("lion", "animals")
+        assert len(statements) == 1  # version check only; the version is unchanged
+        assert load_keywords_map(test_db, TEST_TENANT_ID, {lion_id, 999999}) == {
+            lion_id: {"keyword": "lion", "category": "animals"}
+        }
+        assert len(statements) == 1  # 999999 is cached as unknown for this version
+
+    # Another process adds a keyword and bumps the version.
+    owl = Keyword(tenant_id=TEST_TENANT_ID, category_id=animals.id, keyword="owl", sort_order=5)
+    test_db.add(owl)
+    test_db.add(KeywordRegistryVersion(tenant_id=TEST_TENANT_ID, version=3))
+    test_db.commit()
+
+    assert get_keyword_lookup(test_db, TEST_TENANT_ID, [owl.id])[owl.id] == ("owl", "animals")
+    assert get_keyword_registry(test_db, TEST_TENANT_ID).version == 3
+
+
+def test_rolled_back_bump_keeps_version(test_db: Session):
+    _seed(test_db)
+    bump_keyword_registry_version(test_db, TEST_TENANT_ID)
+    test_db.rollback()
+
+    assert get_keyword_registry(test_db, TEST_TENANT_ID).version == 0
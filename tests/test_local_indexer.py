@@ -0,0 +1,163 @@
+import os
+import threading
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from zoltag import sync_pipeline
+from zoltag.local_indexer import LibraryManifest, LocalLibraryIndexer, iter_changed_files
+
+
+class _FakeSession:
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def library(tmp_path):
+    root = tmp_path / "photos"
+    (root / "2024").mkdir(parents=True)
+    (root / "2024" / "a.jpg").write_bytes(b"a")
+    (root / "2024" / "notes.txt").write_text("not an image")
+    (root / "b.png").write_bytes(b"b")
+    return root
+
+
+@pytest.fixture
+def processed(monkeypatch):
+    calls = []
+
+    def fake_process_storage_entry(*, entry, **kwargs):
+        if entry.name == "broken.jpg":
+            raise RuntimeError("cannot decode")
+        calls.append(entry.name)
+        return SimpleNamespace(skipped=False)
+
+    monkeypatch.setattr(sync_pipeline, "process_storage_entry", fake_process_storage_entry)
+    return calls
+
+
+def test_manifest_detects_new_changed_and_deleted_files(tmp_path, library):
+    manifest = LibraryManifest(tmp_path / "manifest.sqlite")
+
+    first = dict(iter_changed_files(manifest, [str(library)]))
+    assert sorted(os.path.basename(path) for path in first) == ["a.jpg", "b.png"]
+    for path, fingerprint in first.items():
+        manifest.record(path, fingerprint)
+
+    assert list(iter_changed_files(manifest, [str(library)])) == []
+
+    (library / "b.png").write_bytes(b"bigger")
+    (library / "2024" / "a.jpg").unlink()
+    changed = dict(iter_changed_files(manifest, [str(library)]))
+    assert [os.path.basename(path) for path in changed] == ["b.png"]
+    assert len(manifest) == 1
+
+
+def test_indexer_only_processes_new_or_changed_files(tmp_path, library, processed):
+    data_dir = tmp_path / "data"
+    indexer = LocalLibraryIndexer(
+        SimpleNamespace(id=uuid.uuid4()), [str(library)], data_dir=data_dir, session_factory=_FakeSession
+    )
+    (library / "broken.jpg").write_bytes(b"x")
+    try:
+        state = indexer.scan()
+        assert sorted(processed) == ["a.jpg", "b.png"]
+        assert (state["total"], state["processed"], state["errors"]) == (3, 2, 1)
+    finally:
+        indexer.stop()
+
+    # A new process reloads the manifest: only the failed file and a new one are redone.
+    (library / "2024" / "c.jpg").write_bytes(b"c")
+    processed.clear()
+    restarted = LocalLibraryIndexer(
+        SimpleNamespace(id=uuid.uuid4()), [str(library)], data_dir=data_dir, session_factory=_FakeSession
+    )
+    try:
+        state = restarted.scan()
+        assert processed == ["c.jpg"]
+        assert (state["total"], state["errors"]) == (2, 1)
+    finally:
+        restarted.stop()
+
+
+def test_watched_changes_are_dispatched_once_settled(tmp_path, library, processed):
+    indexer = LocalLibraryIndexer(
+        SimpleNamespace(id=uuid.uuid4()), [str(library)], data_dir=tmp_path / "data", session_factory=_FakeSession
+    )
+    try:
+        indexer.scan()
+        processed.clear()
+        new_file = library / "d.jpg"
+        new_file.write_bytes(b"d")
+        indexer.notify_changed(str(new_file))
+        indexer.notify_changed(str(library / "b.png"))  # unchanged since the scan
+        indexer.notify_changed(str(library / "readme.md"))
+
+        assert indexer.dispatch_settled_changes(settle_seconds=60) == 0
+        assert indexer.dispatch_settled_changes(settle_seconds=0) == 1
+        indexer.wait_idle(timeout=5)
+        assert processed == ["d.jpg"]
+    finally:
+        indexer.stop()
+
+
+def test_stop_winds_down_an_in_flight_scan(tmp_path, library, monkeypatch):
+    for index in range(20):
+        (library / f"extra-{index}.jpg").write_bytes(b"x")
+    started, release, calls = threading.Event(), threading.Event(), []
+
+    def slow_process_storage_entry(*, entry, **kwargs):
+        calls.append(entry.name)
+        started.set()
+        release.wait(5)
+        return SimpleNamespace(skipped=False)
+
+    monkeypatch.setattr(sync_pipeline, "process_storage_entry", slow_process_storage_entry)
+    indexer = LocalLibraryIndexer(
+        SimpleNamespace(id=uuid.uuid4()), [str(library)], data_dir=tmp_path / "data",
+        max_workers=1, session_factory=_FakeSession,
+    )
+    scanner = threading.Thread(target=indexer.scan)
+    scanner.start()
+    assert started.wait(5)
+
+    stopper = threading.Thread(target=indexer.stop)
+    stopper.start()
+    stopper.join(0.2)
+    assert stopper.is_alive()  # waits for the scan rather than shutting the pool under it
+    release.set()
+    stopper.join(5)
+    scanner.join(5)
+
+    assert not stopper.is_alive() and not scanner.is_alive()
+    assert indexer.state["last_error"] is None
+    assert indexer.state["total"] < 22 and len(calls) == indexer.state["total"]
+    assert not indexer.start_watching()
+
+
+def test_watch_dispatch_requeues_instead_of_blocking_on_full_pool(tmp_path, library, processed):
+    indexer = LocalLibraryIndexer(
+        SimpleNamespace(id=uuid.uuid4()), [str(library)], data_dir=tmp_path / "data",
+        max_workers=1, session_factory=_FakeSession,
+    )
+    try:
+        indexer.notify_changed(str(library / "b.png"))
+        for _ in range(4):  # a scan holding every slot
+            indexer._slots.acquire()
+        assert indexer.dispatch_settled_changes(settle_seconds=0) == 0
+        for _ in range(4):
+            indexer._slots.release()
+
+        assert indexer.dispatch_settled_changes(settle_seconds=0) == 1
+        indexer.wait_idle(timeout=5)
+        assert processed == ["b.png"]
+    finally:
+        indexer.stop()
@@ -0,0 +1,69 @@
+from types import SimpleNamespace
+
+from zoltag.maintenance_leader import AdvisoryLockLeader, maintenance_lock
+
+
+class _Result:
+    def __init__(self, value):
+        self.value = value
+
+    def scalar(self):
+        return self.value
+
+
+class _Connection:
+    def __init__(self, results):
+        self.results = list(results)
+        self.invalidated = False
+        self.closed = False
+
+    def execution_options(self, **_options):
+        return self
+
+    def execute(self, statement, params=None):
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return _Result(result)
+
+    def invalidate(self):
+        self.invalidated = True
+
+    def close(self):
+        self.closed = True
+
+
+class _Engine:
+    dialect = SimpleNamespace(name="postgresql")
+
+    def __init__(self, *connections):
+        self.connections = list(connections)
+
+    def connect(self):
+        return self.connections.pop(0)
+
+
+def test_failed_unlock_or_renewal_invalidates_instead_of_pooling():
+    lost = _Connection([True, RuntimeError("connection reset")])
+    released = _Connection([True, RuntimeError("unlock failed")])
+    leader = AdvisoryLockLeader(_Engine(lost, released), renew_seconds=0)
+
+    assert leader.is_leader()
+    assert leader.is_leader()  # renewal fails, then the next attempt takes the lock again
+    assert (lost.invalidated, lost.closed) == (True, True)
+
+    leader.release()
+    assert (released.invalidated, released.closed) == (True, True)
+
+
+def test_clean_unlock_returns_connection_to_pool():
+    busy = _Connection([False])
+    held = _Connection([True, True])
+    engine = _Engine(busy, held)
+
+    with maintenance_lock(engine) as acquired:
+        assert not acquired
+    with maintenance_lock(engine) as acquired:
+        assert acquired
+    assert (busy.invalidated, busy.closed) == (False, True)
+    assert (held.invalidated, held.closed) == (False, True)
@@ -0,0 +1,119 @@
+import inspect
+import uuid
+
+import numpy as np
+import pytest
+from fastapi import HTTPException
+
+from zoltag.metadata import Asset, ImageEmbedding, ImageMetadata
+from zoltag.near_duplicates import PerceptualHashIndex, get_phash_index, near_duplicate_groups, parse_phash
+from zoltag.routers.images.core import list_duplicate_images
+
+
+def _flip(value: int, *bits: int) -> str:
+    for bit in bits:
+        value ^= 1 << bit
+    return format(value, "016x")
+
+
+def _random_hashes(count: int, seed: int = 0) -> list[int]:
+    rng = np.random.default_rng(seed)
+    return [int(value) for value in rng.integers(0, 2**63, size=count, dtype=np.int64)]
+
+
+def test_index_groups_by_hamming_distance_and_grows_incrementally():
+    base = _random_hashes(2000)
+    rows = [(image_id, format(value, "016x")) for image_id, value in enumerate(base, start=1)]
+    # 5001 is an exact copy of 1, 5002 is 2 bits from 1, 5003 is 6 bits from 2.
+    extra = [
+        (5001, format(base[0], "016x")),
+        (5002, _flip(base[0], 3, 60)),
+        (5003, _flip(base[1], 0, 9, 18, 27, 36, 45)),
+    ]
+
+    full = PerceptualHashIndex()
+    full.add(rows + extra)
+    incremental = PerceptualHashIndex()
+    incremental.add(rows[:1000])
+    incremental.add(rows[1000:] + extra[:1])
+    incremental.add(extra[1:])
+
+    for index in (full, incremental):
+        assert index.groups(0) == [[1, 5001]]
+        assert index.groups(2) == [[1, 5001, 5002]]
+        assert index.groups(6) == [[1, 5001, 5002], [2, 5003]]
+    assert parse_phash("not-a-hash") is None
+
+
+@pytest.fixture
+def tenant_images(test_db, test_tenant):
+    def add_image(phash: str, embedding):
+        asset = Asset(
+            id=uuid.uuid4(),
+            tenant_id=test_tenant.id,
+            filename=f"{phash}.jpg",
+            source_provider="test",
+            source_key=f"/test/{uuid.uuid4()}.jpg",
+            thumbnail_key="thumb.jpg",
+        )
+        image = ImageMetadata(asset_id=asset.id, tenant_id=test_tenant.id, filename=asset.filename, perceptual_hash=phash)
+        test_db.add_all([asset, image])
+        if embedding is not None:
+            test_db.add(ImageEmbedding(asset_id=asset.id, tenant_id=test_tenant.id, embedding=embedding))
+        test_db.flush()
+        return image.id
+
+    return add_image
+
+
+def test_groups_track_new_rows_and_optional_embedding_confirmation(test_db, test_tenant, tenant_images):
+    base = _random_hashes(3, seed=5)
+    original = tenant_images(format(base[0], "016x"), [1.0, 0.0, 0.0])
+    resized = tenant_images(_flip(base[0], 1), [0.99, 0.1, 0.0])
+    lookalike = tenant_images(_flip(base[0], 2, 50), [0.0, 1.0, 0.0])
+    tenant_images(format(base[1], "016x"), None)
+    test_db.commit()
+
+    assert near_duplicate_groups(test_db, test_tenant.id, max_distance=4) == [[original, resized, lookalike]]
+    assert near_duplicate_groups(test_db, test_tenant.id, max_distance=4, min_cosine=0.9) == [[original, resized]]
+
+    index = get_phash_index(test_db, test_tenant.id)
+    copy = tenant_images(format(base[1], "016x"), None)
+    test_db.commit()
+    index.checked_at = 0.0
+
+    groups = near_duplicate_groups(test_db, test_tenant.id, max_distance=0)
+    assert groups == [[copy - 1, copy]]
+    assert get_phash_index(test_db, test_tenant.id) is index
+
+
+def test_list_duplicate_images_validates_near_match_parameters(test_db, test_tenant):
+    handler = inspect.unwrap(list_duplicate_images)
+
+    with pytest.raises(HTTPException) as bad_match:
+        handler(tenant=test_tenant, match="fuzzy", db=test_db)
+    with pytest.raises(HTTPException) as bad_distance:
+        handler(tenant=test_tenant, match="near", max_distance=12, db=test_db)
+
+    assert bad_match.value.status_code == 400
+    assert bad_distance.value.status_code == 400
+
+
+def test_exact_duplicates_ignore_equal_perceptual_hashes(test_db, test_tenant, tenant_images):
+    import hashlib
+
+    test_db.connection().connection.driver_connection.create_function(
+        "md5", 1, lambda value: hashlib.md5(str(value).encode()).hexdigest()
+    )
+    phash, other, third = (format(value, "016x") for value in _random_hashes(3, seed=9))
+    first, second = tenant_images(phash, None), tenant_images(phash, None)
+    copies = [tenant_images(other, [0.5, 0.5, 0.0]), tenant_images(third, [0.5, 0.5, 0.0])]
+    test_db.commit()
+    handler = inspect.unwrap(list_duplicate_images)
+
+    exact = handler(tenant=test_tenant, match="exact", db=test_db)["images"]
+    assert sorted(image["id"] for image in exact) == copies
+    assert {image["duplicate_basis"] for image in exact} == {"embedding"}
+    near = handler(tenant=test_tenant, match="near", max_distance=0, db=test_db)["images"]
+    assert sorted(image["id"] for image in near) == [first, second]
+    assert {image["duplicate_basis"] for image in near} == {"perceptual_hash"}
@@ -0,0 +1,84 @@
+import asyncio
+import json
+import sys
+
+import httpx
+import pytest
+
+from zoltag.storage import ProviderEntry
+from zoltag.storage.local_provider import LocalFilesystemProvider
+from zoltag.storage.providers import GooglePhotosStorageProvider
+
+
+@pytest.fixture
+def photos_provider(mock_provider_http):
+    """Google Photos provider whose albums hold two pages of two items each."""
+    calls = []
+
+    def handler(request):
+        if request.url.path == "/token":
+            return httpx.Response(200, json={"access_token": "token", "expires_in": 3600})
+        if request.method == "GET":
+            album_id = request.url.path.rsplit("/", 1)[-1]
+            return httpx.Response(200, json={"title": album_id.title()})
+        body = json.loads(request.content)
+        calls.append((body["albumId"], body.get("pageToken")))
+        page = 2 if body.get("pageToken") else 1
+        # "shared" appears in both albums.
+        ids = [f"{body['albumId']}-{page}a", "shared" if page == 2 else f"{body['albumId']}-{page}b"]
+        return httpx.Response(200, json={
+            "mediaItems": [{"id": media_id, "filename": f"{media_id}.jpg", "mimeType": "image/jpeg"} for media_id in ids],
+            "nextPageToken": "p2" if page == 1 else None,
+        })
+
+    mock_provider_http(handler, providers=("oauth", "gphotos"))
+    provider = GooglePhotosStorageProvider(client_id="id", client_secret="secret", refresh_token="refresh")
+    return provider, calls
+
+
+def test_pages_stream_lazily_and_resume_from_checkpoint(photos_provider):
+    provider, calls = photos_provider
+
+    pages = provider.iter_entry_pages(["trip", "home"])
+    first = next(pages)
+    assert [entry.source_key for entry in first.entries] == ["trip-1a", "trip-1b"]
+    assert first.entries[0].display_path == "/Trip/trip-1a.jpg"
+    assert calls == [("trip", None)]
+    pages.close()
+
+    resumed = list(provider.iter_entry_pages(["trip", "home"], checkpoint=first.checkpoint))
+    assert calls[1:] == [("trip", "p2"), ("home", None), ("home", "p2")]
+    assert [[entry.source_key for entry in page.entries] for page in resumed] == [
+        ["trip-2a", "shared"],
+        ["home-1a", "home-1b"],
+        ["home-2a"],
+    ]
+    assert resumed[-1].checkpoint is None
+    assert len(provider.list_image_entries(["trip", "home"])) == 7
+
+
+def test_entries_are_slotted_and_intern_provider_strings():
+    provider_name = "".join(["drop", "box"])
+    entry = ProviderEntry(provider=provider_name, source_key="id:1", name="a.jpg", mime_type="".join(["image/", "jpeg"]))
+
+    assert not hasattr(entry, "__dict__")
+    assert entry.provider is sys.intern("dropbox")
+    assert entry.mime_type is sys.intern("image/jpeg")
+
+
+def test_async_listing_yields_fixed_size_pages(tmp_path, monkeypatch):
+    for index in range(5):
+        (tmp_path / f"{index}.jpg").write_bytes(b"jpeg")
+    (tmp_path / "notes.txt").write_text("skip")
+    provider = LocalFilesystemProvider(tmp_path / "thumbs")
+    monkeypatch.setattr(LocalFilesystemProvider, "LIST_PAGE_SIZE", 2)
+
+    async def collect():
+        return [
+            sorted(entry.name for entry in page.entries)
+            async for page in provider.aiter_entry_pages([str(tmp_path)])
+        ]
+
+    pages = asyncio.run(collect())
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert sorted(name for page in pages for name in page) == [f"{index}.jpg" for index in range(5)]
@@ -0,0 +1,85 @@
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from zoltag.ratelimit import (
+    BucketPolicy,
+    InMemoryTokenBucketBackend,
+    check_rate_limit,
+    ip_rate_limit,
+    set_token_bucket_backend,
+)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_allows_burst_then_refills():
+    clock = _Clock()
+    backend = InMemoryTokenBucketBackend(clock=clock)
+    policy = BucketPolicy.per_minute(60, burst=2)
+
+    assert backend.take("search:t1", policy).allowed
+    assert backend.take("search:t1", policy).allowed
+    denied = backend.take("search:t1", policy)
+    assert not denied.allowed
+    assert denied.retry_after_seconds == pytest.approx(1.0)
+
+    # Buckets are independent per key.
+    assert backend.take("search:t2", policy).allowed
+
+    clock.now += 1.0
+    assert backend.take("search:t1", policy).allowed
+    assert not backend.take("search:t1", policy).allowed
+
+
+def test_idle_buckets_are_evicted():
+    clock = _Clock()
+    backend = InMemoryTokenBucketBackend(clock=clock)
+    policy = BucketPolicy.per_minute(60, burst=2)
+    backend.take("a", policy)
+    backend.take("b", policy)
+    assert len(backend) == 2
+
+    clock.now += 600
+    backend.take("c", policy)
+    assert len(backend) == 1
+
+
+def test_check_rate_limit_raises_429_with_retry_after():
+    backend = InMemoryTokenBucketBackend(clock=_Clock())
+    set_token_bucket_backend(backend)
+    try:
+        policy = BucketPolicy.per_hour(1)
+        check_rate_limit("lists.export_pptx", "tenant-1", policy)
+        with pytest.raises(HTTPException) as exc_info:
+            check_rate_limit("lists.export_pptx", "tenant-1", policy)
+        assert exc_info.value.status_code == 429
+        assert exc_info.value.headers["Retry-After"] == "3600"
+        check_rate_limit("lists.export_pptx", "tenant-2", policy)
+    finally:
+        set_token_bucket_backend(None)
+
+
+def test_ip_rate_limit_uses_the_shared_backend_per_client():
+    backend = InMemoryTokenBucketBackend(clock=_Clock())
+    set_token_bucket_backend(backend)
+    limit = ip_rate_limit("auth.accept_invitation", BucketPolicy.per_minute(1))
+
+    def request(host):
+        return Request({"type": "http", "method": "POST", "path": "/", "headers": [], "client": (host, 1234)})
+
+    try:
+        limit(request("203.0.113.7"))
+        with pytest.raises(HTTPException) as exc_info:
+            limit(request("203.0.113.7"))
+        assert exc_info.value.status_code == 429
+        limit(request("198.51.100.2"))
+        assert len(backend) == 2
+    finally:
+        set_token_bucket_backend(None)
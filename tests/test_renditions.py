@@ -0,0 +1,126 @@
+import asyncio
+import io
+import uuid
+from types import SimpleNamespace
+
+from PIL import Image
+from starlette.requests import Request
+
+from zoltag.routers import guest
+from zoltag.renditions import _LocalRenditionStore, rendition_for_asset, snap_rendition_size
+from zoltag.routers.images.file_serving import _rendition_not_modified, _rendition_response
+from zoltag.tenant import Tenant
+
+
+def _jpeg(width, height):
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), (120, 40, 200)).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+def _request(**headers):
+    raw = [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw, "query_string": b""})
+
+
+def _build(store, asset, downloads, fmt="jpeg", size=1600, tenant=None, image=None):
+    tenant = tenant or Tenant(id=str(uuid.uuid4()), name="t", identifier="t", key_prefix="t")
+    image = image or SimpleNamespace(content_hash="abc", modified_time=None)
+
+    def download():
+        downloads.append(1)
+        return _jpeg(4000, 3000)
+
+    return rendition_for_asset(store, tenant, image, asset, size=size, fmt=fmt, download_source=download)
+
+
+def test_rendition_is_built_once_and_bounded(tmp_path):
+    store = _LocalRenditionStore(tmp_path)
+    asset = SimpleNamespace(id=uuid.uuid4(), source_rev="rev-1")
+    downloads = []
+
+    first = _build(store, asset, downloads)
+    second = _build(store, asset, downloads)
+    webp = _build(store, asset, downloads, fmt="webp")
+    asset.source_rev = "rev-2"
+    changed = _build(store, asset, downloads)
+
+    assert downloads == [1, 1, 1]
+    assert second.data == first.data and second.etag == first.etag
+    assert Image.open(io.BytesIO(first.data)).size == (1600, 1200)
+    assert webp.content_type == "image/webp" and webp.key.endswith(".webp")
+    assert changed.key != first.key
+    assert snap_rendition_size(1800) == 2560
+    assert snap_rendition_size(9000) == 2560
+
+
+def test_rendition_response_supports_etag_and_range(tmp_path):
+    rendition = _build(_LocalRenditionStore(tmp_path), SimpleNamespace(id=uuid.uuid4(), source_rev="r"), [])
+    total = len(rendition.data)
+
+    full = _rendition_response(rendition, _request(), "IMG_1.HEIC")
+    cached = _rendition_response(rendition, _request(if_none_match=rendition.etag), "IMG_1.HEIC")
+    partial = _rendition_response(rendition, _request(range="bytes=10-19"), "IMG_1.HEIC")
+    stale_range = _rendition_response(rendition, _request(range="bytes=10-19", if_range='"other"'), "IMG_1.HEIC")
+
+    assert full.status_code == 200 and full.body == rendition.data
+    assert full.headers["etag"] == rendition.etag
+    assert full.headers["content-disposition"] == 'inline; filename="IMG_1.jpg"'
+    assert cached.status_code == 304
+    assert partial.status_code == 206
+    assert partial.body == rendition.data[10:20]
+    assert partial.headers["content-range"] == f"bytes 10-19/{total}"
+    assert stale_range.status_code == 200
+
+
+def test_revalidation_is_answered_before_loading_the_rendition(tmp_path):
+    tenant = Tenant(id=str(uuid.uuid4()), name="t", identifier="t", key_prefix="t")
+    image = SimpleNamespace(content_hash="abc", modified_time=None, filename="IMG_2.HEIC")
+    asset = SimpleNamespace(id=uuid.uuid4(), source_rev="r", media_type="image")
+    storage_info = SimpleNamespace(asset=asset, source_key="/IMG_2.HEIC")
+    rendition = _build(_LocalRenditionStore(tmp_path), asset, [], size=1600, tenant=tenant, image=image)
+
+    def check(**headers):
+        return _rendition_not_modified(
+            tenant=tenant, image=image, storage_info=storage_info, size=1500, request=_request(**headers)
+        )
+
+    cached = check(if_none_match=rendition.etag)
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == rendition.etag
+    assert cached.headers["content-disposition"] == 'inline; filename="IMG_2.jpg"'
+    # A different format, a stale tag or no tag at all goes on to load the rendition.
+    assert check(if_none_match=rendition.etag, accept="image/webp") is None
+    assert check(if_none_match='"stale"') is None
+    assert check() is None
+
+
+def test_guest_full_revalidation_skips_loading_the_rendition(tmp_path, monkeypatch):
+    tenant = Tenant(id=str(uuid.uuid4()), name="t", identifier="t", key_prefix="t")
+    image = SimpleNamespace(content_hash="abc", modified_time=None, filename="IMG_3.jpg")
+    asset = SimpleNamespace(id=uuid.uuid4(), source_rev="r", media_type="image")
+    storage_info = SimpleNamespace(asset=asset, source_key="/IMG_3.jpg")
+    rendition = _build(_LocalRenditionStore(tmp_path), asset, [], size=1600, tenant=tenant, image=image)
+
+    def load_image_rendition(**kwargs):
+        raise AssertionError("revalidation must not read or build the rendition")
+
+    monkeypatch.setattr(guest, "_get_active_share", lambda **kwargs: SimpleNamespace(tenant_id=tenant.id))
+    monkeypatch.setattr(guest, "_assert_asset_in_list", lambda *args: None)
+    monkeypatch.setattr(guest, "_build_tenant_runtime", lambda db, tenant_id: tenant)
+    monkeypatch.setattr(guest, "_resolve_storage_or_409", lambda **kwargs: storage_info)
+    monkeypatch.setattr(guest, "_resolve_provider_ref", lambda info, img: ("dropbox", "/IMG_3.jpg"))
+    monkeypatch.setattr(guest, "_load_image_rendition", load_image_rendition)
+    images = SimpleNamespace(filter=lambda *args: SimpleNamespace(first=lambda: image))
+
+    response = asyncio.run(guest.get_guest_asset_full(
+        list_id=1,
+        asset_id=asset.id,
+        request=_request(if_none_match=rendition.etag),
+        size=1600,
+        guest=SimpleNamespace(),
+        db=SimpleNamespace(query=lambda *args: images),
+    ))
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == rendition.etag
@@ -0,0 +1,121 @@
+import re
+
+import httpx
+import pytest
+
+from zoltag.metadata import ProviderSyncCursor, TenantProviderIntegration
+from zoltag.storage import GoogleDriveStorageProvider
+from zoltag.sync_cursors import DriveSyncListing
+
+FOLDER = "application/vnd.google-apps.folder"
+
+
+def _file(file_id, name, mime="image/jpeg", parents=()):
+    return {"id": file_id, "name": name, "mimeType": mime, "parents": list(parents), "modifiedTime": "2026-01-01T00:00:00Z"}
+
+
+class FakeDrive:
+    def __init__(self):
+        self.children = {
+            "root": [_file("a", "a.jpg"), _file("sub", "Sub", FOLDER)],
+            "sub": [_file("b", "b.jpg"), _file("c", "c.mp4", "video/mp4")],
+            "new": [_file("e", "e.jpg")],
+        }
+        self.changes = {"t1": []}
+        self.requests = []
+
+    def __call__(self, request):
+        self.requests.append(request)
+        params = request.url.params
+        if request.url.path == "/token":
+            return httpx.Response(200, json={"access_token": "token", "expires_in": 3600})
+        if request.url.path.endswith("/changes/startPageToken"):
+            return httpx.Response(200, json={"startPageToken": "t1"})
+        if request.url.path.endswith("/changes"):
+            token = params["pageToken"]
+            if token not in self.changes:
+                return httpx.Response(404, json={"error": "invalid page token"})
+            return httpx.Response(200, json={"changes": self.changes[token], "newStartPageToken": "t2"})
+        if request.url.path.endswith("/files/root"):
+            return httpx.Response(200, json={"id": "root", "name": "Photos"})
+        folder_id = re.match(r"'([^']+)' in parents", params["q"]).group(1)
+        items = self.children.get(folder_id, [])
+        # Serve one item per page to exercise pagination.
+        index = int(params.get("pageToken") or 0)
+        payload = {"files": items[index:index + 1]}
+        if index + 1 < len(items):
+            payload["nextPageToken"] = str(index + 1)
+        return httpx.Response(200, json=payload)
+
+
+@pytest.fixture
+def drive(mock_provider_http):
+    fake = FakeDrive()
+    mock_provider_http(fake)
+    return fake
+
+
+@pytest.fixture
+def integration(test_db, test_tenant):
+    row = TenantProviderIntegration(
+        tenant_id=test_tenant.id, provider_type="gdrive", label="Drive", secret_scope="scope", config_json={}
+    )
+    test_db.add(row)
+    test_db.commit()
+    return row
+
+
+def _listing(test_db, test_tenant, integration, sync_folders=("root",)):
+    provider = GoogleDriveStorageProvider(client_id="id", client_secret="secret", refresh_token="refresh")
+    return DriveSyncListing(
+        test_db, provider, tenant_id=test_tenant.id, provider_id=integration.id, sync_folders=list(sync_folders)
+    )
+
+
+def test_full_walk_then_changes_delta(test_db, test_tenant, integration, drive):
+    first = _listing(test_db, test_tenant, integration)
+    assert not first.is_incremental
+    assert sorted(entry.display_path for entry in first) == ["/Photos/Sub/b.jpg", "/Photos/Sub/c.mp4", "/Photos/a.jpg"]
+    assert first.mark_complete()
+    test_db.commit()
+
+    cursor = test_db.get(ProviderSyncCursor, integration.id)
+    assert cursor.cursor == "t1"
+    assert cursor.state["folder_paths"] == {"root": "/Photos", "sub": "/Photos/Sub"}
+
+    drive.changes["t1"] = [
+        {"fileId": "d", "file": _file("d", "d.jpg", parents=["sub"])},
+        {"fileId": "x", "file": _file("x", "x.jpg", parents=["elsewhere"])},
+        {"fileId": "new", "file": _file("new", "New", FOLDER, parents=["root"])},
+        {"fileId": "b", "removed": True},
+    ]
+    drive.requests.clear()
+    second = _listing(test_db, test_tenant, integration)
+    assert second.is_incremental
+    assert [entry.display_path for entry in second] == ["/Photos/Sub/d.jpg", "/Photos/New/e.jpg"]
+    assert not any(request.url.params.get("q", "").startswith("'sub'") for request in drive.requests)
+    assert second.mark_complete()
+    test_db.commit()
+    test_db.refresh(cursor)
+    assert cursor.cursor == "t2"
+    assert cursor.state["folder_paths"]["new"] == "/Photos/New"
+
+
+def test_cursor_only_advances_after_full_consumption(test_db, test_tenant, integration, drive):
+    partial = _listing(test_db, test_tenant, integration)
+    next(iter(partial))
+    assert not partial.mark_complete()
+    assert test_db.get(ProviderSyncCursor, integration.id) is None
+
+    complete = _listing(test_db, test_tenant, integration)
+    list(complete)
+    complete.mark_complete()
+    test_db.commit()
+
+    # A different folder selection, or a token Drive no longer accepts, falls back to a full walk.
+    assert not _listing(test_db, test_tenant, integration, sync_folders=("other",)).is_incremental
+    del drive.changes["t1"]
+    expired = _listing(test_db, test_tenant, integration)
+    assert expired.is_incremental
+    assert len(list(expired)) == 3
+    assert expired.mark_complete()
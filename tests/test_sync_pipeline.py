@@ -0,0 +1,144 @@
+import uuid
+
+from zoltag.metadata import Asset, ImageMetadata
+from zoltag.storage import ProviderEntry
+from zoltag.sync_pipeline import iter_pending_entries, plan_entry_page, process_storage_entry
+
+
+class _YouTube:
+    provider_name = "youtube"
+
+
+def _entry(source_key, revision=None, *, provider="youtube", content_hash=None):
+    return ProviderEntry(
+        provider=provider,
+        source_key=source_key,
+        name=f"{source_key}.mp4",
+        revision=revision,
+        content_hash=content_hash,
+        mime_type="video/youtube",
+        no_download=True,
+    )
+
+
+def _add_asset(db, tenant, source_key, *, source_rev=None, with_metadata=True, provider="youtube", content_hash=None):
+    asset = Asset(
+        id=uuid.uuid4(),
+        tenant_id=tenant.id,
+        filename=f"{source_key}.mp4",
+        source_provider=provider,
+        source_key=source_key,
+        source_rev=source_rev,
+        thumbnail_key="thumb.jpg",
+    )
+    db.add(asset)
+    if with_metadata:
+        db.add(ImageMetadata(asset_id=asset.id, tenant_id=tenant.id, filename=asset.filename, content_hash=content_hash))
+    db.flush()
+    return asset
+
+
+def test_page_is_resolved_in_one_query_with_revision_changes(test_db, test_tenant, capture_statements):
+    dropbox = {"provider": "dropbox"}
+    _add_asset(test_db, test_tenant, "synced", source_rev="r1", **dropbox)
+    _add_asset(test_db, test_tenant, "no-metadata", with_metadata=False, **dropbox)
+    changed = _add_asset(test_db, test_tenant, "changed", source_rev="r1", **dropbox)
+    _add_asset(test_db, test_tenant, "legacy", **dropbox)
+    _add_asset(test_db, test_tenant, "renamed", source_rev="r1", content_hash="h1", **dropbox)
+    test_db.commit()
+    page = [
+        _entry("synced", "r1", **dropbox),
+        _entry("no-metadata", **dropbox),
+        _entry("changed", "r2", **dropbox),
+        _entry("legacy", "r9", **dropbox),
+        # Same bytes under a new rev: the content hash wins.
+        _entry("renamed", "r2", content_hash="h1", **dropbox),
+        _entry("new", **dropbox),
+        _entry("new", **dropbox),
+    ]
+
+    with capture_statements(test_db.get_bind()) as statements:
+        pending = plan_entry_page(test_db, test_tenant, page, provider_name="dropbox")
+
+    assert len(statements) == 1
+    assert [item.entry.source_key for item in pending] == ["no-metadata", "changed", "new"]
+    assert [item.revision_changed for item in pending] == [False, True, False]
+    assert pending[1].existing.asset_id == changed.id
+
+    reprocess = plan_entry_page(test_db, test_tenant, page, provider_name="dropbox", reprocess_existing=True)
+    assert len(reprocess) == 6
+
+
+def test_metadata_only_revisions_do_not_trigger_reprocessing(test_db, test_tenant):
+    _add_asset(test_db, test_tenant, "drive-file", source_rev="12", provider="gdrive", content_hash="md5-a")
+    _add_asset(test_db, test_tenant, "drive-edit", source_rev="12", provider="gdrive", content_hash="md5-a")
+    _add_asset(test_db, test_tenant, "flickr-photo", source_rev="1700000000", provider="flickr")
+    test_db.commit()
+
+    drive = plan_entry_page(
+        test_db,
+        test_tenant,
+        [
+            _entry("drive-file", "13", provider="gdrive", content_hash="md5-a"),
+            _entry("drive-edit", "13", provider="gdrive", content_hash="md5-b"),
+        ],
+        provider_name="gdrive",
+    )
+    flickr = plan_entry_page(
+        test_db, test_tenant, [_entry("flickr-photo", "1700000500", provider="flickr")], provider_name="flickr"
+    )
+
+    assert [item.entry.source_key for item in drive] == ["drive-edit"]
+    assert flickr == []
+
+
+def test_pending_entries_update_the_planned_asset(test_db, test_tenant):
+    changed = _add_asset(test_db, test_tenant, "changed", source_rev="r1")
+    image_id = test_db.query(ImageMetadata.id).filter(ImageMetadata.asset_id == changed.id).scalar()
+    test_db.commit()
+
+    entries = (_entry(key, "r2") for key in ("changed", "new-1", "new-2"))
+    pending = list(iter_pending_entries(
+        test_db, test_tenant, entries, provider_name="youtube", reprocess_existing=True, batch_size=2
+    ))
+    assert [item.entry.source_key for item in pending] == ["changed", "new-1", "new-2"]
+
+    results = [
+        process_storage_entry(
+            db=test_db,
+            tenant=test_tenant,
+            entry=item.entry,
+            provider=_YouTube(),
+            thumbnail_bucket=None,
+            pending=item,
+        )
+        for item in pending
+    ]
+
+    assert [result.status for result in results] == ["processed"] * 3
+    assert results[0].image_id == image_id
+    test_db.refresh(changed)
+    assert changed.source_rev == "r2"
+    assert test_db.query(Asset).count() == 3
+    assert plan_entry_page(test_db, test_tenant, [_entry("new-1", "r2")], provider_name="youtube") == []
+
+
+def test_planned_new_entry_is_rechecked_before_insert(test_db, test_tenant):
+    pending = plan_entry_page(test_db, test_tenant, [_entry("racing", "r1")], provider_name="youtube")
+    assert pending[0].existing is None
+    # An overlapping sync creates the asset after this page was planned.
+    other = _add_asset(test_db, test_tenant, "racing", source_rev="r1")
+    test_db.commit()
+
+    result = process_storage_entry(
+        db=test_db,
+        tenant=test_tenant,
+        entry=pending[0].entry,
+        provider=_YouTube(),
+        thumbnail_bucket=None,
+        pending=pending[0],
+    )
+
+    assert result.status == "processed"
+    assert [asset.id for asset in test_db.query(Asset).all()] == [other.id]
+    assert test_db.query(ImageMetadata).count() == 1
@@ -0,0 +1,125 @@
+"""Tests for set-based tag hydration helpers."""
+
+import uuid
+from datetime import datetime
+
+from sqlalchemy.orm import Session
+
+from zoltag.keyword_registry import bump_keyword_registry_version
+from zoltag.metadata import Asset, ImageMetadata, MachineTag, Permatag
+from zoltag.models.config import Keyword, KeywordCategory, KeywordRegistryVersion
+from zoltag.tag_hydration import (
+    get_keyword_lookup,
+    load_tag_rows_for_assets,
+    load_tag_rows_for_image_ids,
+    sum_machine_tag_confidence,
+)
+
+
+def _create_asset_image(test_db: Session, tenant_id, image_id: int) -> ImageMetadata:
+    asset = Asset(
+        id=uuid.uuid4(),
+        tenant_id=tenant_id,
+        filename=f"image{image_id}.jpg",
+        source_provider="test",
+        source_key=f"/test/image{image_id}.jpg",
+        thumbnail_key=f"thumbnails/image{image_id}.jpg",
+    )
+    test_db.add(asset)
+    test_db.flush()
+    image = ImageMetadata(
+        id=image_id,
+        asset_id=asset.id,
+        tenant_id=tenant_id,
+        filename=asset.filename,
+        file_size=1024,
+        width=100,
+        height=100,
+        format="JPEG",
+    )
+    test_db.add(image)
+    test_db.flush()
+    return image
+
+
+def _create_keyword(test_db: Session, tenant_id, name: str, category: KeywordCategory) -> Keyword:
+    keyword = Keyword(tenant_id=tenant_id, category_id=category.id, keyword=name)
+    test_db.add(keyword)
+    test_db.flush()
+    return keyword
+
+
+def _seed(test_db: Session, tenant_id):
+    category = KeywordCategory(tenant_id=tenant_id, name="animals")
+    test_db.add(category)
+    test_db.flush()
+    dog = _create_keyword(test_db, tenant_id, "dog", category)
+    cat = _create_keyword(test_db, tenant_id, "cat", category)
+    image = _create_asset_image(test_db, tenant_id, 1)
+    other = _create_asset_image(test_db, tenant_id, 2)
+    test_db.add_all([
+        MachineTag(asset_id=image.asset_id, tenant_id=tenant_id, keyword_id=dog.id, confidence=0.9, tag_type="siglip", model_name="siglip", model_version="1"),
+        MachineTag(asset_id=image.asset_id, tenant_id=tenant_id, keyword_id=cat.id, confidence=0.4, tag_type="siglip", model_name="siglip", model_version="1"),
+        MachineTag(asset_id=image.asset_id, tenant_id=tenant_id, keyword_id=cat.id, confidence=0.7, tag_type="clip", model_name="clip", model_version="1"),
+        Permatag(asset_id=image.asset_id, tenant_id=tenant_id, keyword_id=cat.id, signum=-1, created_at=datetime(2024, 1, 1)),
+        Permatag(asset_id=image.asset_id, tenant_id=tenant_id, keyword_id=dog.id, signum=1, created_at=datetime(2024, 2, 1)),
+    ])
+    test_db.commit()
+    return image, other, dog, cat
+
+
+def test_load_tag_rows_for_assets_groups_by_image(test_db: Session, test_tenant):
+    image, other, dog, cat = _seed(test_db, test_tenant.id)
+
+    rows = load_tag_rows_for_assets(
+        test_db,
+        test_tenant,
+        {image.asset_id: image.id, other.asset_id: other.id},
+        "siglip",
+    )
+
+    assert sorted(rows[image.id].machine_tags) == sorted([(dog.id, 0.9), (cat.id, 0.4)])
+    assert {(kw_id, signum) for _, kw_id, signum, _ in rows[image.id].permatags} == {(cat.id, -1), (dog.id, 1)}
+    assert rows[image.id].reviewed_at() == datetime(2024, 2, 1)
+    assert rows[image.id].current_keyword_ids() == [dog.id]
+    assert rows[other.id].machine_tags == []
+    assert rows[other.id].reviewed_at() is None
+
+
+def test_load_tag_rows_for_image_ids_matches_asset_variant(test_db: Session, test_tenant):
+    image, other, dog, cat = _seed(test_db, test_tenant.id)
+
+    by_image = load_tag_rows_for_image_ids(test_db, test_tenant, [image.id, other.id], "clip")
+
+    assert by_image[image.id].machine_tags == [(cat.id, 0.7)]
+    assert by_image[image.id].current_keyword_ids() == [dog.id]
+    assert by_image[other.id].permatags == []
+
+
+def test_keyword_lookup_reloads_for_unknown_ids(test_db: Session, test_tenant):
+    _, _, dog, _ = _seed(test_db, test_tenant.id)
+    lookup = get_keyword_lookup(test_db, test_tenant.id)
+    assert lookup[dog.id] == ("dog", "animals")
+
+    category = test_db.query(KeywordCategory).first()
+    bird = _create_keyword(test_db, test_tenant.id, "bird", category)
+    # Written by another instance: the stored version moves, the local copy is not invalidated.
+    test_db.add(KeywordRegistryVersion(tenant_id=test_tenant.id, version=1))
+    test_db.commit()
+
+    assert bird.id not in get_keyword_lookup(test_db, test_tenant.id)
+    assert get_keyword_lookup(test_db, test_tenant.id, {bird.id})[bird.id] == ("bird", "animals")
+
+    dog.keyword = "puppy"
+    bump_keyword_registry_version(test_db, test_tenant.id)
+    test_db.commit()
+    assert get_keyword_lookup(test_db, test_tenant.id)[dog.id] == ("puppy", "animals")
+
+
+def test_sum_machine_tag_confidence(test_db: Session, test_tenant):
+    image, other, dog, cat = _seed(test_db, test_tenant.id)
+
+    scores = sum_machine_tag_confidence(test_db, test_tenant, [image.id, other.id], {dog.id, cat.id}, "siglip")
+
+    assert scores.keys() == {image.id}
+    assert abs(scores[image.id] - 1.3) < 1e-6
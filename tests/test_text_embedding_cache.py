@@ -0,0 +1,61 @@
+import numpy as np
+
+from zoltag.text_embedding_cache import TextEmbeddingCache
+
+
+class _CountingEncoder:
+    def __init__(self, dim: int = 4):
+        self.dim = dim
+        self.calls = []
+
+    def __call__(self, prompts):
+        self.calls.append(list(prompts))
+        rows = []
+        for prompt in prompts:
+            seed = sum(ord(ch) for ch in prompt)
+            rows.append(np.arange(self.dim, dtype=np.float32) + seed)
+        return np.stack(rows)
+
+
+def test_only_missing_prompts_are_encoded(tmp_path):
+    encoder = _CountingEncoder()
+    cache = TextEmbeddingCache("model-a", cache_dir=tmp_path, max_entries=100)
+
+    first = cache.get_or_compute(["a photo of dog", "a photo of cat", "a photo of dog"], encoder)
+    second = cache.get_or_compute(["a photo of cat", "a photo of bird"], encoder)
+
+    assert encoder.calls == [["a photo of dog", "a photo of cat"], ["a photo of bird"]]
+    assert first.shape == (3, 4)
+    np.testing.assert_array_equal(first[0], first[2])
+    np.testing.assert_array_equal(second[0], first[1])
+
+
+def test_store_reloads_from_disk_as_one_matrix(tmp_path):
+    encoder = _CountingEncoder()
+    cache = TextEmbeddingCache("model-a", cache_dir=tmp_path, max_entries=100)
+    expected = cache.get_or_compute(["dog", "cat"], encoder)
+    cache.flush()
+
+    reloaded = TextEmbeddingCache("model-a", cache_dir=tmp_path, max_entries=100)
+    assert len(reloaded) == 2
+    result = reloaded.get_or_compute(["cat", "dog"], encoder)
+    np.testing.assert_array_equal(result, expected[::-1])
+    assert len(encoder.calls) == 1
+
+    other_model = TextEmbeddingCache("model-b", cache_dir=tmp_path, max_entries=100)
+    assert len(other_model) == 0
+
+
+def test_flush_keeps_most_recently_used_prompts(tmp_path):
+    encoder = _CountingEncoder()
+    cache = TextEmbeddingCache("model-a", cache_dir=tmp_path, max_entries=2)
+    cache.get_or_compute(["old"], encoder)
+    cache.get_or_compute(["newer"], encoder)
+    cache.get_or_compute(["newest"], encoder)
+    cache.flush()
+
+    reloaded = TextEmbeddingCache("model-a", cache_dir=tmp_path, max_entries=2)
+    reloaded.get_or_compute(["newer", "newest"], encoder)
+    assert len(encoder.calls) == 3
+    reloaded.get_or_compute(["old"], encoder)
+    assert encoder.calls[-1] == ["old"]
@@ -0,0 +1,95 @@
+import uuid
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from zoltag import vector_store
+from zoltag.auth.models import UserProfile  # noqa: F401 - registers tables referenced by metadata FKs
+from zoltag.metadata import Base, ImageEmbedding
+from zoltag.settings import settings
+from zoltag.vector_store import KIND_IMAGE, LocalVectorStore, get_vector_store, reset_vector_stores
+
+
+def test_store_search_upsert_remove_and_reload(tmp_path):
+    store = LocalVectorStore(tmp_path, "image-test")
+    store.upsert([("a", [1.0, 0.0, 0.0]), ("b", [0.8, 0.6, 0.0]), ("c", [0.0, 0.0, 1.0])])
+
+    results = store.search([1.0, 0.0, 0.0], 2)
+    assert [key for key, _score in results] == ["a", "b"]
+    assert results[0][1] == pytest.approx(1.0, abs=1e-3)
+    assert [key for key, _score in store.search([1.0, 0.0, 0.0], 2, exclude=["a"])] == ["b", "c"]
+
+    store.upsert([("a", [0.0, 0.0, 2.0]), ("d", [0.0, 0.0, 0.0])])
+    store.remove(["c"])
+    assert "d" not in store
+    assert [key for key, _score in store.search([0.0, 0.0, 1.0], 5)] == ["a", "b"]
+
+    store.watermark = [2, 7]
+    store.flush()
+    reloaded = LocalVectorStore(tmp_path, "image-test")
+    assert len(reloaded) == 2
+    assert reloaded.watermark == [2, 7]
+    assert [key for key, _score in reloaded.search([0.0, 0.0, 1.0], 1)] == ["a"]
+
+
+def test_store_scans_in_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(vector_store, "VECTOR_STORE_SEARCH_CHUNK_ROWS", 7)
+    store = LocalVectorStore(tmp_path, "chunked")
+    rng = np.random.default_rng(3)
+    vectors = rng.normal(size=(50, 8)).astype(np.float32)
+    store.upsert((str(idx), vec) for idx, vec in enumerate(vectors))
+
+    query = vectors[11]
+    units = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    expected = [str(idx) for idx in np.argsort(units @ (query / np.linalg.norm(query)))[::-1][:5]]
+    assert [key for key, _score in store.search(query, 5)] == expected
+
+
+@pytest.fixture
+def file_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "local_vector_store_dir", str(tmp_path / "vectors"))
+    monkeypatch.setattr(vector_store, "VECTOR_STORE_RECHECK_SECONDS", 0.0)
+    reset_vector_stores()
+    engine = create_engine(f"sqlite:///{tmp_path / 'zoltag.db'}")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    reset_vector_stores()
+    engine.dispose()
+
+
+def test_store_follows_database_writes(file_db):
+    tenant_id = uuid.uuid4()
+    first, second, third = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    file_db.add(ImageEmbedding(asset_id=first, tenant_id=tenant_id, embedding=[1.0, 0.0]))
+    file_db.commit()
+
+    store = get_vector_store(file_db, tenant_id, KIND_IMAGE)
+    assert len(store) == 1
+
+    # Written through the session after commit.
+    file_db.add(ImageEmbedding(asset_id=second, tenant_id=tenant_id, embedding=[0.0, 1.0]))
+    file_db.commit()
+    assert second in store
+
+    # Written by another process: picked up by the watermark check.
+    file_db.execute(
+        ImageEmbedding.__table__.insert().values(asset_id=third, tenant_id=tenant_id, embedding=[0.6, 0.8])
+    )
+    file_db.commit()
+    store = get_vector_store(file_db, tenant_id, KIND_IMAGE)
+    assert [key for key, _score in store.search([0.0, 1.0], 3)] == [str(second), str(third), str(first)]
+
+    # Deleted outside the ORM: the store is rebuilt.
+    file_db.execute(ImageEmbedding.__table__.delete().where(ImageEmbedding.asset_id == first))
+    file_db.commit()
+    store = get_vector_store(file_db, tenant_id, KIND_IMAGE)
+    assert first not in store
+    assert len(store) == 2
+
+
+def test_in_memory_databases_do_not_use_the_store(test_db):
+    assert get_vector_store(test_db, uuid.uuid4(), KIND_IMAGE) is None
@@ -0,0 +1,119 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from zoltag import worker
+from zoltag.maintenance_leader import AdvisoryLockLeader, maintenance_lock
+from zoltag.metadata import Job, JobAttempt, JobDefinition, WorkflowDefinition, WorkflowRun, WorkflowStepRun
+from zoltag.metadata import Tenant as TenantModel
+from zoltag.workflow_queue import start_workflow_run, start_workflow_runs
+
+
+def _tenant(db, identifier):
+    tenant = TenantModel(id=uuid.uuid4(), identifier=identifier, name=identifier, active=True)
+    db.add(tenant)
+    return tenant
+
+
+def _definition(db, key, max_attempts=3):
+    definition = JobDefinition(id=uuid.uuid4(), key=key, max_attempts=max_attempts)
+    db.add(definition)
+    return definition
+
+
+@pytest.fixture
+def worker_sessions(test_db, monkeypatch):
+    monkeypatch.setattr(worker, "SessionLocal", sessionmaker(bind=test_db.get_bind()))
+    return test_db
+
+
+def test_reclaim_requeues_or_dead_letters_expired_leases(worker_sessions):
+    db = worker_sessions
+    tenant = _tenant(db, "reclaim")
+    definition = _definition(db, "refresh-metadata")
+    expired = datetime.utcnow() - timedelta(minutes=5)
+    retryable = Job(
+        tenant_id=tenant.id, definition_id=definition.id, status="running",
+        attempt_count=1, max_attempts=3, lease_expires_at=expired, claimed_by_worker="w1",
+    )
+    exhausted = Job(
+        tenant_id=tenant.id, definition_id=definition.id, status="running",
+        attempt_count=3, max_attempts=3, lease_expires_at=expired, claimed_by_worker="w1",
+    )
+    healthy = Job(
+        tenant_id=tenant.id, definition_id=definition.id, status="running",
+        attempt_count=1, max_attempts=3,
+        lease_expires_at=datetime.utcnow() + timedelta(minutes=5), claimed_by_worker="w2",
+    )
+    db.add_all([retryable, exhausted, healthy])
+    db.flush()
+    db.add(JobAttempt(job_id=retryable.id, attempt_no=1, worker_id="w1", status="running"))
+    db.commit()
+
+    worker._reclaim_stale_leases()
+    db.expire_all()
+
+    assert retryable.status == "queued"
+    assert retryable.claimed_by_worker is None
+    assert retryable.started_at is None
+    assert retryable.scheduled_for > datetime.utcnow() + timedelta(seconds=200)
+    assert retryable.last_error == "Lease expired; requeued (attempt 1/3)"
+    assert exhausted.status == "dead_letter"
+    assert exhausted.finished_at is not None
+    assert exhausted.last_error == "Lease expired after 3 attempt(s); no retries remaining"
+    assert healthy.status == "running"
+    assert healthy.claimed_by_worker == "w2"
+    attempt = db.query(JobAttempt).filter(JobAttempt.job_id == retryable.id).one()
+    assert attempt.status == "failed"
+    assert attempt.error_text == "Lease expired; worker presumed dead"
+
+
+def test_batched_fan_out_matches_single_run_start(test_db):
+    db = test_db
+    tenants = [_tenant(db, f"fanout-{idx}") for idx in range(3)]
+    _definition(db, "refresh-metadata")
+    _definition(db, "build-embeddings")
+    _definition(db, "recompute-trained-tags")
+    workflow = WorkflowDefinition(
+        key="nightly",
+        max_parallel_steps=1,
+        steps=[
+            {"step_key": "metadata", "definition_key": "refresh-metadata"},
+            {"step_key": "embeddings", "definition_key": "build-embeddings"},
+            {"step_key": "tags", "definition_key": "recompute-trained-tags", "depends_on": ["embeddings"]},
+        ],
+    )
+    db.add(workflow)
+    db.flush()
+
+    single = start_workflow_run(db, tenant_id=tenants[0].id, workflow=workflow, created_by=None, priority=200)
+    batch = start_workflow_runs(
+        db, tenant_ids=[tenant.id for tenant in tenants[1:]], workflow=workflow, created_by=None, priority=200
+    )
+    db.commit()
+
+    def snapshot(run):
+        steps = db.query(WorkflowStepRun).filter(WorkflowStepRun.workflow_run_id == run.id).all()
+        queued = {}
+        for step in steps:
+            if step.child_job_id:
+                job = db.get(Job, step.child_job_id)
+                assert job.tenant_id == run.tenant_id
+                queued[step.step_key] = (job.status, job.priority, job.source_ref.endswith(step.step_key))
+        return run.status, sorted((step.step_key, step.status) for step in steps), queued
+
+    assert len(batch) == 2
+    assert db.query(WorkflowRun).count() == 3
+    for run in batch:
+        assert snapshot(run) == snapshot(single)
+    assert snapshot(single)[2] == {"embeddings": ("queued", 200, True)}
+
+
+def test_non_postgres_process_is_always_maintenance_leader(test_db):
+    leader = AdvisoryLockLeader(test_db.get_bind())
+    assert leader.is_leader()
+    leader.release()
+    with maintenance_lock(test_db.get_bind()) as acquired:
+        assert acquired
@@ -0,0 +1,120 @@
+import uuid
+from datetime import datetime
+
+import zoltag.workflow_queue as workflow_queue
+from zoltag.metadata import Job, JobDefinition, WorkflowDefinition, WorkflowJobEvent, WorkflowRun, WorkflowStepRun
+from zoltag.metadata import Tenant as TenantModel
+from zoltag.workflow_queue import (
+    process_workflow_job_events,
+    reconcile_running_workflows,
+    record_workflow_job_state_change,
+    start_workflow_run,
+)
+
+
+def _start_run(db, *, failure_policy="fail_fast"):
+    tenant = TenantModel(id=uuid.uuid4(), identifier="wf", name="wf", active=True)
+    db.add(tenant)
+    for key in ("refresh-metadata", "build-embeddings", "recompute-trained-tags"):
+        db.add(JobDefinition(id=uuid.uuid4(), key=key))
+    workflow = WorkflowDefinition(
+        key="nightly",
+        max_parallel_steps=2,
+        failure_policy=failure_policy,
+        steps=[
+            {"step_key": "metadata", "definition_key": "refresh-metadata"},
+            {"step_key": "embeddings", "definition_key": "build-embeddings"},
+            {"step_key": "tags", "definition_key": "recompute-trained-tags", "depends_on": ["embeddings"]},
+        ],
+    )
+    db.add(workflow)
+    db.flush()
+    run = start_workflow_run(db, tenant_id=tenant.id, workflow=workflow, created_by=None, priority=100)
+    db.commit()
+    return run
+
+
+def _steps(db, run):
+    return {
+        step.step_key: step
+        for step in db.query(WorkflowStepRun).filter(WorkflowStepRun.workflow_run_id == run.id).all()
+    }
+
+
+def _finish(db, step, status):
+    job = db.get(Job, step.child_job_id)
+    job.status = status
+    job.finished_at = datetime.utcnow()
+    assert record_workflow_job_state_change(db, job=job)
+    db.commit()
+    return job
+
+
+def test_outbox_events_advance_dependent_steps(test_db):
+    run = _start_run(test_db)
+    steps = _steps(test_db, run)
+    assert steps["tags"].status == "pending"
+
+    _finish(test_db, steps["embeddings"], "succeeded")
+    assert steps["tags"].status == "pending"
+
+    assert process_workflow_job_events(test_db) == 1
+    test_db.commit()
+
+    steps = _steps(test_db, run)
+    assert steps["embeddings"].status == "succeeded"
+    assert steps["tags"].status == "queued"
+    assert test_db.get(Job, steps["tags"].child_job_id).status == "queued"
+    assert test_db.query(WorkflowJobEvent).count() == 0
+    assert process_workflow_job_events(test_db) == 0
+
+
+def test_outbox_batch_applies_all_events_for_a_run(test_db):
+    run = _start_run(test_db)
+    steps = _steps(test_db, run)
+    _finish(test_db, steps["metadata"], "succeeded")
+    _finish(test_db, steps["embeddings"], "failed")
+
+    assert process_workflow_job_events(test_db) == 2
+    test_db.commit()
+
+    steps = _steps(test_db, run)
+    assert steps["metadata"].status == "succeeded"
+    assert steps["embeddings"].status == "failed"
+    assert steps["tags"].status == "canceled"
+    test_db.refresh(run)
+    assert run.status == "failed"
+
+
+def test_non_workflow_jobs_are_not_recorded(test_db):
+    job = Job(id=uuid.uuid4(), source_ref="retry:abc", status="succeeded")
+    assert not record_workflow_job_state_change(test_db, job=job)
+    assert test_db.query(WorkflowJobEvent).count() == 0
+
+
+def test_runs_are_locked_in_id_order(test_db, monkeypatch):
+    run_ids = sorted(uuid.uuid4() for _ in range(3))
+    for run_id in reversed(run_ids):
+        test_db.add(WorkflowJobEvent(workflow_run_id=run_id, step_key="metadata", job_id=uuid.uuid4(), job_status="succeeded"))
+    test_db.commit()
+    locked = []
+    monkeypatch.setattr(workflow_queue, "_lock_workflow_run", lambda db, run_id: locked.append(run_id))
+
+    assert process_workflow_job_events(test_db) == 3
+    assert locked == run_ids
+
+    run = _start_run(test_db)
+    # Queued first but with the larger id: still locked second.
+    ids = sorted([uuid.uuid4(), uuid.uuid4()])
+    test_db.add(WorkflowRun(
+        id=ids[1],
+        tenant_id=run.tenant_id,
+        workflow_definition_id=run.workflow_definition_id,
+        status="running",
+        queued_at=datetime(2000, 1, 1),
+    ))
+    test_db.query(WorkflowRun).filter(WorkflowRun.id == run.id).update({WorkflowRun.id: ids[0], WorkflowRun.status: "running"})
+    test_db.commit()
+    locked.clear()
+    reconcile_running_workflows(test_db)
+    assert locked == ids